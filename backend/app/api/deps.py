@@ -2,20 +2,32 @@
 Dependency injection helpers for FastAPI routes.
 """
 
-from fastapi import Depends, Request
-from fastapi.security import HTTPBearer
+import hmac
+
+from fastapi import Depends, Header, HTTPException, Request
+from app.core.config import Settings, settings
 from app.core.database import get_db
-from app.core.security import decode_token
+from app.core.security import get_current_user  # single implementation lives in security.py
 from sqlalchemy.orm import Session
 
-oauth2_scheme = HTTPBearer()
-
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    payload = decode_token(token)
-    return payload  # should be dict with "id"
-
 def db_session() -> Session:
     """
     Returns a database session for route usage
     """
     return Depends(get_db)
+
+def get_settings(request: Request) -> Settings:
+    """
+    The Settings the app was built with (create_app(settings)), else the global ones.
+    """
+    return getattr(request.app.state, "settings", settings)
+
+def require_debug_token(x_debug_token: str | None = Header(None), app_settings: Settings = Depends(get_settings)):
+    """
+    Guards /debug/*: hidden (404) unless DEBUG_TOKEN is configured,
+    403 when the X-Debug-Token header does not match.
+    """
+    if not app_settings.DEBUG_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(x_debug_token or "", app_settings.DEBUG_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
@@ -1,10 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from app.core.cache import cached
 from app.services.ai_service import classify_panic, analyze_report
 
 router = APIRouter(prefix="/ai", tags=["AI"])
 
-@router.post("/panic")
-def classify_panic_route(code: str):
+# GET is cached (a pure lookup of the code), POST kept for older clients
+@router.api_route("/panic", methods=["GET", "POST"])
+@cached(ttl=3600)
+def classify_panic_route(request: Request, code: str):
     return {"panic_level": classify_panic(code)}
 
 @router.post("/report_risk")
@@ -1,32 +1,113 @@
-from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.schemas.alert import AlertCreate, AlertResponse
+from app.schemas.alert import AlertCreate, AlertResponse, AlertPage
 from app.models.alert_volunteer import AlertVolunteer
 from app.models.alert import Alert
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.services.alert_service import create_alert
-from app.core.security import get_current_user
+from app.services.analytics_service import record_resolution, set_response
+from app.services.notifications_service import alert_payload, notify_new_alert
+from app.services.gateway_service import can_watch_alert
+from app.services.geocoder import region_filter
+from app.services.track_service import read_track, track_chunks
+from app.utils.polyline import TRACK_FACTORS
+from app.core.gateway import gateway
+from app.core.tracing import span, current_span, request_start_ns
+from app.core.security import get_current_user, require_admin
+from app.utils.response import RowEncoder, dumps
+from app.utils.pagination import parse_sort, keyset_page, stream_export, DEFAULT_PAGE_SIZE
 from datetime import datetime
 
 router = APIRouter(prefix="/alerts", tags=["Alerts"])
 
+alert_encoder = RowEncoder.for_model(AlertResponse)
+ALERT_COLUMNS = [getattr(Alert, name) for name in alert_encoder.fields]
+ALERT_SORTS = {"created_at": Alert.created_at, "id": Alert.id}
+
+def _filtered_alerts(query, status, level, since, until, region=None):
+    if status:
+        query = query.filter(Alert.status == status)
+    if level:
+        query = query.filter(Alert.emergency_level == level)
+    if since:
+        query = query.filter(Alert.created_at >= since)
+    if until:
+        query = query.filter(Alert.created_at < until)
+    if region:
+        query = query.filter(region_filter(Alert.region_id, region))
+    return query
+
+@router.get("/", response_model=AlertPage, dependencies=[Depends(require_admin)])
+def list_alerts(
+    request: Request,
+    status: str | None = None,
+    level: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    region: str | None = None,
+    sort: str = "-created_at",
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Alerts page by page, newest first by default (admin feature).
+    """
+    keys = parse_sort(sort, ALERT_SORTS, Alert.id)
+    query = _filtered_alerts(db.query(*ALERT_COLUMNS, *(col for col, _ in keys)), status, level, since, until, region)
+    rows, next_cursor = keyset_page(query, keys, sort, cursor, limit)
+    return alert_encoder.respond(request, rows, next_cursor=next_cursor)
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+def export_alerts(
+    status: str | None = None,
+    level: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    region: str | None = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Matching alerts as NDJSON, streamed from a server-side cursor.
+    """
+    return stream_export(
+        db,
+        lambda session: _filtered_alerts(session.query(*ALERT_COLUMNS), status, level, since, until, region).order_by(Alert.id),
+        alert_encoder,
+        "alerts.ndjson",
+    )
+
+def _socket_notifier(background_tasks: BackgroundTasks):
+    """
+    Schedules the NEW_ALERT push after the response is sent,
+    carrying the current trace so the dispatch span tree stays connected.
+    """
+    def notify(alert, volunteer_ids, watchers=None):
+        background_tasks.add_task(
+            notify_new_alert, alert_payload(alert), volunteer_ids, current_span().traceparent, watchers
+        )
+    return notify
+
 @router.post("/", response_model=AlertResponse)
 def send_alert(
     alert: AlertCreate,
+    request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    print("👤 Current user:", current_user)
-
     user_id = current_user["id"]  # ✅ FIX — dict se id nikalo
 
-    new_alert = create_alert(db, user_id=user_id, **alert.dict())
+    with span("alerts.send_alert", start_ns=request_start_ns(request), user_id=user_id):
+        new_alert = create_alert(db, user_id=user_id, notify=_socket_notifier(background_tasks), **alert.dict())
     return new_alert
 
 @router.post("/guest", response_model=AlertResponse)
-def guest_alert(alert: AlertCreate, db: Session = Depends(get_db)):
+def guest_alert(alert: AlertCreate, request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     # Skip login, SOS directly
-    new_alert = create_alert(db, user_id=None, **alert.dict())
+    with span("alerts.guest_alert", start_ns=request_start_ns(request)):
+        new_alert = create_alert(db, user_id=None, notify=_socket_notifier(background_tasks), **alert.dict())
     return new_alert
 
 @router.post("/{alert_id}/volunteers/respond")
@@ -48,8 +129,10 @@ def volunteer_respond(alert_id: int, volunteer_id: int, action: str, db: Session
     if action not in ["accept", "reject"]:
         raise HTTPException(status_code=400, detail="Invalid action")
 
-    av.status = action
-    av.responded_at = datetime.utcnow()
+    # conditional write: of simultaneous taps only one gets past this
+    if not set_response(db, av, action):
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Already responded")
     db.commit()
     db.refresh(av)
 
@@ -71,7 +154,46 @@ def resolve_alert(alert_id: int, db: Session = Depends(get_db)):
 
     alert.status = "resolved"
     alert.resolved_at = datetime.utcnow()
+    record_resolution(db, alert)
     db.commit()
     db.refresh(alert)
+    gateway.forget_alert(alert_id)  # no more live location for it
 
     return {"message": "Alert resolved successfully"}
+
+@router.get("/{alert_id}/track")
+def alert_track(
+    alert_id: int,
+    tolerance: float = Query(0, ge=0, le=1000),
+    since: int | None = None,
+    raw: bool = False,
+    chunk: int = Query(500, ge=10, le=5000),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Movement history of the alert's user and volunteer, for its owner and
+    assigned volunteers. NDJSON: a header line, then delta-encoded polyline
+    chunks of (lat, lng, epoch ms), then {"done": true, "until": <ms>}.
+    - tolerance: Douglas-Peucker simplification in metres (0 = every point)
+    - since: only points after this epoch ms (pass the last `until` to poll)
+    - raw: full detail from the archive for compacted old tracks
+    """
+    if not db.query(Alert.id).filter(Alert.id == alert_id).first():
+        raise HTTPException(status_code=404, detail="Alert not found")
+    principal = {"sub": str(current_user.get("sub")), "role": current_user.get("role")}
+    if principal["role"] not in ("user", "volunteer") or not can_watch_alert(db, principal, alert_id):
+        raise HTTPException(status_code=403, detail="Not allowed to view this alert's track")
+
+    track = read_track(db, alert_id, since_ms=since, raw=raw)
+    times = [p[2] for p in track.user[-1:] + track.volunteer[-1:]]
+    header = {"alert_id": alert_id, "tier": track.tier, "tolerance": tolerance, "since": since,
+              "factors": TRACK_FACTORS}
+
+    def body():
+        yield dumps(header) + b"\n"
+        for item in track_chunks(track, tolerance, chunk):
+            yield dumps(item) + b"\n"
+        yield dumps({"done": True, "until": max(times) if times else since}) + b"\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
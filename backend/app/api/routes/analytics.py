@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.core.database import get_read_db
+from app.core.security import get_current_user, require_staff
+from app.services.analytics_service import CELL_PRECISIONS, RESOLUTION_TIME, TIME_TO_FIRST_ACCEPT, summary, \
+    volunteer_summary
+from app.utils.geohash import BASE32
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"], dependencies=[Depends(get_current_user)])
+
+# Every endpoint reads a few pre-aggregated rows (see analytics_service),
+# never the alert history, so cost doesn't grow with the number of alerts
+
+
+@router.get("/response-times")
+def response_times(db: Session = Depends(get_read_db)):
+    """
+    Time to first accept and resolution time (seconds) over all alerts.
+    """
+    return {
+        "time_to_first_accept": summary(db, TIME_TO_FIRST_ACCEPT, "all"),
+        "resolution_time": summary(db, RESOLUTION_TIME, "all"),
+    }
+
+
+@router.get("/cells/{cell}")
+def cell_response_times(cell: str, db: Session = Depends(get_read_db)):
+    """
+    Same, for the alerts raised inside one geohash cell (precision 4 or 5).
+    """
+    cell = cell.lower()
+    if len(cell) not in CELL_PRECISIONS or any(c not in BASE32 for c in cell):
+        raise HTTPException(status_code=400,
+                            detail=f"cell must be a geohash of length {' or '.join(map(str, CELL_PRECISIONS))}")
+    return {
+        "cell": cell,
+        "time_to_first_accept": summary(db, TIME_TO_FIRST_ACCEPT, f"cell:{cell}"),
+        "resolution_time": summary(db, RESOLUTION_TIME, f"cell:{cell}"),
+    }
+
+
+@router.get("/regions/{region_id}")
+def region_response_times(region_id: str, db: Session = Depends(get_read_db)):
+    """
+    Same, per city ("IN-KA.bengaluru", see app/services/geocoder.py).
+    """
+    return {
+        "region_id": region_id,
+        "time_to_first_accept": summary(db, TIME_TO_FIRST_ACCEPT, f"region:{region_id}"),
+        "resolution_time": summary(db, RESOLUTION_TIME, f"region:{region_id}"),
+    }
+
+
+@router.get("/volunteers/{volunteer_id}", dependencies=[Depends(require_staff("admin", "analyst"))])
+def volunteer_response_times(volunteer_id: int, db: Session = Depends(get_read_db)):
+    """
+    Acceptance rate and time from assignment to response (seconds), staff only.
+    """
+    return volunteer_summary(db, volunteer_id)
@@ -7,16 +7,16 @@ from app.schemas.user import UserCreate
 from app.core.security import (
     get_password_hash,
     verify_password,
-    create_access_token
+    create_access_token,
+    STAFF_ROLES
 )
-from passlib.context import CryptContext
 from app.schemas.auth import SignupSchema, LoginSchema
+from app.core.cache import invalidate
 # from app.utils import get_password_hash
 
 
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 # ---------------- USER SIGNUP ----------------
@@ -31,10 +31,11 @@ def signup(data: SignupSchema, db: Session = Depends(get_db)):
         full_name=data.full_name,
         email=data.email,
         hashed_password=get_password_hash(data.password),
-        role=data.role
+        role=data.role.value
     )
     db.add(user)
     db.commit()
+    invalidate(f"user:{user.id}")  # /users/me for this id
     return {"message": "Signup successful"}
 
 
@@ -48,7 +49,10 @@ def universal_login(data: LoginSchema, db: Session = Depends(get_db)):
     # 🔍 USER
     user = db.query(User).filter(User.email == email).first()
     if user and verify_password(password, user.hashed_password):
-        token = create_access_token({"sub": str(user.id), "role": "user"})
+        claims = {"sub": str(user.id), "role": "user"}
+        if user.role in STAFF_ROLES:
+            claims["staff"] = STAFF_ROLES[user.role]
+        token = create_access_token(claims)
         return {
             "access_token": token,
             "token_type": "bearer",
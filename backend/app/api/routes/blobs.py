@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.stored_blob import StoredBlob
+from app.models.volunteer import Volunteer
+from app.services.blob_store import is_digest, blob_path, variant_path, VARIANTS
+import os
+
+router = APIRouter(prefix="/blobs", tags=["Blobs"])
+
+# Content never changes for a digest, but ID photos are personal data
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def _owns_photo(db: Session, user: dict, digest: str) -> bool:
+    if user.get("role") != "volunteer" or not str(user.get("sub", "")).isdigit():
+        return False
+    return db.query(Volunteer.id).filter(Volunteer.id == int(user["sub"]), Volunteer.id_photo == digest).first() is not None
+
+
+@router.get("/{digest}")
+def get_blob(
+    digest: str,
+    request: Request,
+    variant: str | None = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """
+    Serves a stored file with a strong ETag, to the volunteer whose ID
+    photo it is and to staff. Range requests are handled by FileResponse.
+    """
+    if not is_digest(digest) or (variant and variant not in VARIANTS):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    blob = db.query(StoredBlob.content_type).filter(StoredBlob.sha256 == digest).first()
+    if not blob:
+        raise HTTPException(status_code=404, detail="File not found")
+    if user.get("staff") not in ("admin", "analyst") and not _owns_photo(db, user, digest):
+        raise HTTPException(status_code=403, detail="Not allowed to view this file")
+
+    etag = f'"{digest}.{variant}"' if variant else f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    # The digest is the content, so a matching tag means nothing changed
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    path, media_type = blob_path(digest), blob.content_type
+    if variant:
+        path, media_type = variant_path(digest, variant), "image/jpeg"
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return FileResponse(path, media_type=media_type, headers=headers)
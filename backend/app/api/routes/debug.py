@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from app.api.deps import require_debug_token
+from app.core import tracing, profiler
+
+router = APIRouter(prefix="/debug", tags=["Debug"], dependencies=[Depends(require_debug_token)])
+
+
+@router.get("/traces")
+def slowest_traces(limit: int = Query(10, ge=1, le=100), root: str | None = None):
+    """
+    Slowest traces still in the ring buffer, with their spans.
+    root: only traces whose root span has this name (e.g. alerts.guest_alert)
+    """
+    return {"traces": tracing.slowest_traces(limit, root)}
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def sample_profile(
+    seconds: float = Query(10, gt=0, le=profiler.MAX_SAMPLE_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+):
+    """
+    Samples every thread (event loop included) for `seconds` and returns
+    collapsed stacks, e.g. `flamegraph.pl < out.txt > out.svg`.
+    """
+    try:
+        stacks, samples = await run_in_threadpool(profiler.sampler.run, seconds, interval_ms / 1000)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return PlainTextResponse(profiler.collapsed(stacks), headers={"X-Profile-Samples": str(samples)})
+
+
+@router.get("/profile/requests/{profile_id}", response_class=PlainTextResponse)
+def request_profile(profile_id: str):
+    """
+    cProfile report of a request sent with X-Profile (id from X-Profile-Id).
+    """
+    report = profiler.get_request_profile(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(report)
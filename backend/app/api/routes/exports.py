@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.core.database import get_read_db
+from app.core.security import require_staff
+from app.services.export_service import DATASETS, FORMATS, ExportFilters, export_filename, iter_export, \
+    parse_bbox, resolve_format, run_export
+
+# bulk exports of every SOS location: staff accounts only
+router = APIRouter(prefix="/exports", tags=["Exports"], dependencies=[Depends(require_staff("admin", "analyst"))])
+
+
+def _request(dataset: str, format: str | None, since, until, level, bbox) -> tuple[str, ExportFilters]:
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset '{dataset}'")
+    try:
+        return resolve_format(format), ExportFilters(since, until, level, parse_bbox(bbox))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/{dataset}")
+def download_export(
+    dataset: str,
+    format: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    level: str | None = None,
+    bbox: str | None = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    alerts / reports as parquet, arrow (IPC stream) or csv, streamed chunk
+    by chunk. Columnar formats fall back to CSV when pyarrow isn't
+    installed; X-Export-Format says what was sent.
+    bbox: min_lat,min_lng,max_lat,max_lng; level: emergency / risk level.
+    """
+    fmt, filters = _request(dataset, format, since, until, level, bbox)
+    return StreamingResponse(
+        iter_export(db.get_bind(), dataset, fmt, filters),
+        media_type=FORMATS[fmt][1],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(dataset, fmt)}"',
+                 "X-Export-Format": fmt},
+    )
+
+
+@router.post("/{dataset}")
+def export_to_file(
+    dataset: str,
+    format: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    level: str | None = None,
+    bbox: str | None = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Export job: writes the file into EXPORT_DIR, returns its path, row
+    count and rows/s.
+    """
+    fmt, filters = _request(dataset, format, since, until, level, bbox)
+    return run_export(db.get_bind(), dataset, fmt, filters)
@@ -1,10 +1,21 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.services.heatmap_service import get_heatmap_data
+from app.core.cache import cached, get_cached_read_db
+from app.services.heatmap_service import get_heatmap_rows, HEATMAP_FIELDS
+from app.utils.response import RowEncoder
 
 router = APIRouter(prefix="/heatmap", tags=["Heatmap"])
 
+heatmap_encoder = RowEncoder(HEATMAP_FIELDS)
+
 @router.get("/")
-def get_heatmap(db: Session = Depends(get_db)):
-    return get_heatmap_data(db)
+@cached(tags=("heatmap",))  # new alerts / reports invalidate it
+def get_heatmap(
+    request: Request,
+    lat: float | None = Query(None, ge=-90, le=90),
+    lng: float | None = Query(None, ge=-180, le=180),
+    radius_km: float | None = Query(None, gt=0, le=500),
+    db: Session = Depends(get_cached_read_db),
+):
+    # lat + lng + radius_km: only that area, otherwise everything
+    return heatmap_encoder.respond(request, get_heatmap_rows(db, lat, lng, radius_km))
@@ -1,28 +1,53 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from app.core.database import get_session_factory
+from app.core.gateway import gateway
+from app.core.security import get_current_user
 from app.core.socket_manager import manager
+from app.models.alert import Alert
+from app.services.read_models import volunteer_ids_for_alert
+from app.services.track_service import record_batch
 
 router = APIRouter(prefix="/location", tags=["Location"])
 
+
+def _accepted_volunteers(session_factory, alert_id: int, user: dict) -> list[int] | None:
+    """
+    Accepted volunteers of an active alert; None if there is no such alert.
+    Only the user who raised the alert may post its location.
+    """
+    db = session_factory()
+    try:
+        alert = db.query(Alert.user_id, Alert.status).filter(Alert.id == alert_id).first()
+        if alert is None or alert.status != "active":
+            return None
+        if user.get("role") != "user" or str(alert.user_id) != user["sub"]:
+            raise HTTPException(status_code=403, detail="Not your alert")
+        return volunteer_ids_for_alert(db, alert_id, "accepted")
+    finally:
+        db.close()
+
+
 @router.post("/update")
-async def update_location(data: dict, request: Request):
-    user = request.state.user
-    alert_id = data.get("alert_id")
+async def update_location(data: dict, request: Request, user=Depends(get_current_user),
+                          session_factory=Depends(get_session_factory)):
+    try:
+        alert_id = int(data["alert_id"])
+        point = (float(data["latitude"]), float(data["longitude"]))
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="alert_id, latitude and longitude are required")
+    if not (-90 <= point[0] <= 90 and -180 <= point[1] <= 180):
+        raise HTTPException(status_code=422, detail="Location out of range")
+
+    # only points for a live alert are kept (a bad alert_id would fail the whole track flush)
+    volunteer_ids = await run_in_threadpool(_accepted_volunteers, session_factory, alert_id, user)
+    if volunteer_ids is None:
+        raise HTTPException(status_code=404, detail="Active alert not found")
 
     # send to all accepted volunteers
-    from app.core.database import SessionLocal
-    from app.models.alert_volunteer import AlertVolunteer
-
-    db = SessionLocal()
-    rows = db.query(AlertVolunteer).filter(
-        AlertVolunteer.alert_id == alert_id,
-        AlertVolunteer.status == "accepted"
-    ).all()
-
-    for row in rows:
-        await manager.send_to_volunteer(row.volunteer_id, {
-            "type": "LIVE_LOCATION",
-            "latitude": data["latitude"],
-            "longitude": data["longitude"]
-        })
+    batch = gateway.location_batch(alert_id, [point])
+    record_batch(batch, None)  # the alert owner's track
+    if volunteer_ids:
+        await manager.send_location(volunteer_ids, batch)
 
     return {"status": "ok"}
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.api.deps import require_debug_token
+from app.core.database import engine, read_router
+from app.core.metrics import registry
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _pools():
+    return [engine] + read_router.replicas
+
+
+def _pool_gauge(field):
+    def collect():
+        return {(e.pool.stats.name,): e.pool.stats.snapshot(e.pool)[field] for e in _pools()}
+    return collect
+
+
+for _field, _help in [
+    ("in_use", "DB connections checked out"),
+    ("max_in_use", "Peak DB connections checked out"),
+    ("overflow_hits", "Checkouts that needed an overflow connection"),
+    ("timeouts", "Checkouts that timed out waiting for the pool"),
+    ("disconnects", "Disconnects detected on pooled connections"),
+    ("checkouts", "Pool checkouts"),
+]:
+    registry.gauge(f"db_pool_{_field}", _help, ("pool",), collect=_pool_gauge(_field))
+
+registry.gauge(
+    "db_pool_wait_seconds_total", "Total time spent waiting for a pooled connection", ("pool",),
+    collect=lambda: {(e.pool.stats.name,): e.pool.stats.wait_total for e in _pools()},
+)
+
+
+@router.get("", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Everything in Prometheus text format.
+    """
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/pool", dependencies=[Depends(require_debug_token)])
+def pool_metrics():
+    """
+    Checkout wait, in-use count, overflow hits and timeouts per DB pool.
+    Behind the /debug token, like the other internals.
+    """
+    health = {r["name"]: r["healthy"] for r in read_router.status()}
+    return {
+        "primary": engine.pool.stats.snapshot(engine.pool),
+        "replicas": [
+            {**e.pool.stats.snapshot(e.pool), "healthy": health[e.pool.stats.name]}
+            for e in read_router.replicas
+        ],
+    }
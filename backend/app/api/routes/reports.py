@@ -1,14 +1,56 @@
 from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
-from app.schemas.report import ReportCreate, ReportResponse
-from app.core.database import get_db
+from app.schemas.report import ReportCreate, ReportResponse, ReportPage
+from app.models.report import Report
+from app.core.database import get_db, get_read_db
+from app.core.security import require_admin
 from app.services.report_service import create_report
+from app.utils.response import RowEncoder
+from app.utils.pagination import parse_sort, keyset_page, stream_export, DEFAULT_PAGE_SIZE
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
+report_encoder = RowEncoder.for_model(ReportResponse)
+REPORT_COLUMNS = [getattr(Report, name) for name in report_encoder.fields]
+REPORT_SORTS = {"id": Report.id}
+
+def _filtered_reports(query, risk_level: str | None):
+    if risk_level:
+        query = query.filter(Report.risk_level == risk_level)
+    return query
+
 @router.post("/", response_model=ReportResponse)
 def create_user_report(report: ReportCreate, request: Request, db: Session = Depends(get_db)):
     user_id = getattr(request.state, "user", None)
     user_id = user_id.id if user_id else None
     new_report = create_report(db, user_id=user_id, **report.dict())
     return new_report
+
+@router.get("/", response_model=ReportPage, dependencies=[Depends(require_admin)])
+def list_reports(
+    request: Request,
+    risk_level: str | None = None,
+    sort: str = "-id",
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Reports page by page, newest first by default.
+    """
+    keys = parse_sort(sort, REPORT_SORTS, Report.id)
+    query = _filtered_reports(db.query(*REPORT_COLUMNS, *(col for col, _ in keys)), risk_level)
+    rows, next_cursor = keyset_page(query, keys, sort, cursor, limit)
+    return report_encoder.respond(request, rows, next_cursor=next_cursor)
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+def export_reports(risk_level: str | None = None, db: Session = Depends(get_read_db)):
+    """
+    Matching reports as NDJSON, streamed from a server-side cursor.
+    """
+    return stream_export(
+        db,
+        lambda session: _filtered_reports(session.query(*REPORT_COLUMNS), risk_level).order_by(Report.id),
+        report_encoder,
+        "reports.ndjson",
+    )
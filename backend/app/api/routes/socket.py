@@ -1,22 +1,168 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import json
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from app.core.database import get_session_factory
+from app.core.gateway import gateway, WebSocketConnection, alert_topic, home_topics
 from app.core.socket_manager import manager
+from app.core.tracing import record_ack
+from app.services.gateway_service import authenticate, authorize_with
+from app.services.track_service import record_batch
+from app.utils import wire
+from app.utils.response import dumps
 
 router = APIRouter()
 
+WS_UNAUTHORIZED = 4401
+
+
+def _bearer(websocket: WebSocket, token: str | None) -> str | None:
+    if token:
+        return token
+    auth = websocket.headers.get("authorization", "")
+    return auth[7:] if auth.lower().startswith("bearer ") else None
+
+
+async def _owns_path(websocket: WebSocket, token: str | None, role: str, owner_id: int) -> bool:
+    """
+    Legacy sockets join the same topics as /ws, so they need the same
+    token, and it must belong to the id in the path (a reconnect replaces
+    the old socket, so anyone else could kick the owner off).
+    """
+    principal = authenticate(_bearer(websocket, token))
+    if principal is None or principal["role"] != role or principal["sub"] != str(owner_id):
+        await websocket.close(code=WS_UNAUTHORIZED)
+        return False
+    return True
+
+
 @router.websocket("/ws/user/{user_id}")
-async def user_socket(websocket: WebSocket, user_id: int):
-    await manager.connect_user(user_id, websocket)
+async def user_socket(websocket: WebSocket, user_id: int, token: str | None = None):
+    if not await _owns_path(websocket, token, "user", user_id):
+        return
+    conn = await manager.connect_user(user_id, websocket)
     try:
         while True:
             await websocket.receive_text()
+            gateway.touch(conn)
+            manager.message_received("user")
     except WebSocketDisconnect:
-        manager.disconnect_user(user_id)
+        pass
+    finally:
+        manager.disconnect_user(user_id, conn)
 
 @router.websocket("/ws/volunteer/{volunteer_id}")
-async def volunteer_socket(websocket: WebSocket, volunteer_id: int):
-    await manager.connect_volunteer(volunteer_id, websocket)
+async def volunteer_socket(websocket: WebSocket, volunteer_id: int, token: str | None = None):
+    if not await _owns_path(websocket, token, "volunteer", volunteer_id):
+        return
+    conn = await manager.connect_volunteer(volunteer_id, websocket)
     try:
         while True:
-            await websocket.receive_text()
+            text = await websocket.receive_text()
+            gateway.touch(conn)
+            manager.message_received("volunteer", text, volunteer_id=volunteer_id)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect_volunteer(volunteer_id, conn)
+
+
+# ----------------- UNIFIED GATEWAY -----------------
+# One socket per client, channels multiplexed as topics:
+#   -> {"op": "subscribe", "topic": "alert:12"}      <- {"op": "subscribed", "topic": ...}
+#   -> {"op": "unsubscribe", "topic": "area:tdr1w"}
+#   -> {"op": "location", "alert_id": 12, "latitude": .., "longitude": ..}
+#   -> {"op": "ack", "trace": {...}}                  (closes a NEW_ALERT trace)
+#   <- {"op": "ping"}  -> {"op": "pong"}              (any message keeps the socket alive)
+#   <- {"topic": "volunteer:7", "data": {...}}        every published message
+# Offering the "silentshield.loc.v1" subprotocol switches live location to
+# binary frames (app/utils/wire.py) both ways: the client gets them instead
+# of LIVE_LOCATION JSON and may send its own batches of points as one frame.
+# No DB session is held for a socket's lifetime, one is opened per subscribe check.
+
+
+async def _handle(conn: WebSocketConnection, message: dict, session_factory) -> dict | None:
+    op = message.get("op")
+    topic = message.get("topic")
+
+    if op == "subscribe":
+        allowed = await run_in_threadpool(authorize_with, session_factory, conn.principal, topic)
+        if not allowed:
+            return {"op": "error", "topic": topic, "detail": "Not allowed"}
+        gateway.subscribe(conn, topic)
+        return {"op": "subscribed", "topic": topic}
+
+    if op == "unsubscribe":
+        gateway.unsubscribe(conn, topic)
+        return {"op": "unsubscribed", "topic": topic}
+
+    if op == "location":
+        return await _publish_location(conn, int(message["alert_id"]),
+                                       [(float(message["latitude"]), float(message["longitude"]))])
+
+    if op == "pong":
+        return None
+
+    if op == "ack":
+        trace = message.get("trace") or {}
+        record_ack(trace.get("traceparent"), trace.get("sent_at", 0), kind="gateway", **conn.principal)
+        return None
+
+    return {"op": "error", "detail": f"Unknown op {op!r}"}
+
+
+async def _publish_location(conn: WebSocketConnection, alert_id: int, points: list) -> dict | None:
+    topic = alert_topic(alert_id)
+    # only people already watching the alert may publish on it
+    if topic not in conn.topics:
+        return {"op": "error", "topic": topic, "detail": "Subscribe to the alert first"}
+    batch = gateway.location_batch(alert_id, points, sender=conn.principal)
+    record_batch(batch, conn.principal)
+    await gateway.publish(topic, batch, exclude=conn)
+    return None
+
+
+async def _handle_binary(conn: WebSocketConnection, data: bytes) -> dict | None:
+    if not conn.binary:
+        return {"op": "error", "detail": f"Binary frames need the {wire.SUBPROTOCOL} subprotocol"}
+    try:
+        # the client's seq is ignored, the gateway numbers points per alert
+        alert_id, _, points = wire.decode_locations(data)
+    except ValueError as exc:
+        return {"op": "error", "detail": str(exc)}
+    return await _publish_location(conn, alert_id, points)
+
+
+@router.websocket("/ws")
+async def gateway_socket(websocket: WebSocket, token: str | None = None, session_factory=Depends(get_session_factory)):
+    # Auth at handshake: ?token=<jwt> (browsers) or Authorization: Bearer
+    principal = authenticate(_bearer(websocket, token))
+    if principal is None:
+        await websocket.close(code=WS_UNAUTHORIZED)
+        return
+
+    subprotocol = wire.negotiate(websocket.scope.get("subprotocols"))
+    await websocket.accept(subprotocol=subprotocol)
+    conn = gateway.register(
+        WebSocketConnection(websocket, "gateway", principal, binary=subprotocol is not None), home_topics(principal)
+    )
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            gateway.touch(conn)
+            manager.message_received("gateway")
+            try:
+                if message.get("bytes") is not None:
+                    reply = await _handle_binary(conn, message["bytes"])
+                else:
+                    reply = await _handle(conn, json.loads(message["text"]), session_factory)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                reply = {"op": "error", "detail": "Malformed message"}
+            if reply is not None:
+                await websocket.send_text(dumps(reply).decode())
     except WebSocketDisconnect:
-        manager.disconnect_volunteer(volunteer_id)
+        pass
+    finally:
+        gateway.unregister(conn)
@@ -0,0 +1,63 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.area_subscription import AreaSubscription
+from app.schemas.subscription import AreaSubscriptionCreate, AreaSubscriptionResponse
+from app.services.gateway_service import is_verified_volunteer
+from app.services.subscription_service import OWNER_ROLES, create_subscription, delete_subscription
+
+router = APIRouter(prefix="/subscriptions", tags=["Subscriptions"])
+
+
+def _owner(user: dict) -> tuple[str, int]:
+    if user.get("role") not in OWNER_ROLES:
+        raise HTTPException(status_code=403, detail="Only users and volunteers can subscribe to areas")
+    return user["role"], int(user["sub"])
+
+
+def _response(sub: AreaSubscription) -> dict:
+    return {
+        "id": sub.id, "name": sub.name, "shape": sub.shape,
+        "center_lat": sub.center_lat, "center_lng": sub.center_lng, "radius_km": sub.radius_km,
+        "polygon": json.loads(sub.polygon) if sub.polygon else None, "created_at": sub.created_at,
+    }
+
+
+@router.post("/", response_model=AreaSubscriptionResponse)
+def subscribe_area(data: AreaSubscriptionCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    """
+    Get pushed every new alert inside a circle or polygon (AREA_ALERT on the user's socket).
+    Verified volunteers get the exact location, plain users a ~1 km one.
+    """
+    role, owner_id = _owner(user)
+    if role == "volunteer" and not is_verified_volunteer(db, user):
+        raise HTTPException(status_code=403, detail="Volunteer not verified yet")
+    try:
+        sub = create_subscription(db, role, owner_id, **data.dict())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return _response(sub)
+
+
+@router.get("/", response_model=list[AreaSubscriptionResponse])
+def my_subscriptions(db: Session = Depends(get_db), user=Depends(get_current_user)):
+    role, owner_id = _owner(user)
+    subs = db.query(AreaSubscription).filter(
+        AreaSubscription.owner_role == role,
+        AreaSubscription.owner_id == owner_id,
+        AreaSubscription.active.is_(True),
+    ).order_by(AreaSubscription.id).all()
+    return [_response(sub) for sub in subs]
+
+
+@router.delete("/{subscription_id}")
+def unsubscribe_area(subscription_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    role, owner_id = _owner(user)
+    sub = db.query(AreaSubscription).filter(AreaSubscription.id == subscription_id).first()
+    if not sub or not sub.active or (sub.owner_role, sub.owner_id) != (role, owner_id):
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    delete_subscription(db, sub)
+    return {"message": "Subscription removed"}
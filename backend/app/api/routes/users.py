@@ -1,16 +1,32 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, status
 from sqlalchemy.orm import Session
-from app.schemas.user import UserResponse
-from app.core.database import get_db
+from app.schemas.user import UserResponse, UserPage
+from app.core.database import get_read_db
 from app.models.user import User
-from app.core.security import get_current_user
+from app.core.security import get_current_user, require_admin
+from app.core.cache import cached, get_cached_read_db
+from app.utils.response import RowEncoder, FastJSONResponse
+from app.utils.pagination import parse_sort, keyset_page, stream_export, DEFAULT_PAGE_SIZE
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+user_encoder = RowEncoder.for_model(UserResponse)
+USER_COLUMNS = [getattr(User, name) for name in user_encoder.fields]
+USER_SORTS = {"id": User.id}
+
 @router.get("/me", response_model=UserResponse)
+@cached(tags=("user:{user[sub]}",), vary=("{user[role]}",), private=True)
+def get_me(request: Request, user=Depends(get_current_user), db: Session = Depends(get_cached_read_db)):
+    """
+    Profile of the token's user (volunteer tokens have no user profile).
+    """
+    if user.get("role") != "user":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not a user account")
+    row = db.query(*USER_COLUMNS).filter(User.id == int(user["sub"])).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return FastJSONResponse(user_encoder.to_dicts([row])[0])
 
-def get_me(user=Depends(get_current_user)):
-    return user
 def get_current_user(request: Request):
     """
     Fetch logged-in user's profile.
@@ -20,10 +36,37 @@ def get_current_user(request: Request):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
     return user
 
-@router.get("/", response_model=list[UserResponse])
-def list_users(db: Session = Depends(get_db)):
+def _filtered_users(query, role: str | None):
+    if role:
+        query = query.filter(User.role == role)
+    return query
+
+@router.get("/", response_model=UserPage, dependencies=[Depends(require_admin)])
+def list_users(
+    request: Request,
+    role: str | None = None,
+    sort: str = "id",
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Fetch users page by page (admin feature).
+    Pass next_cursor back as ?cursor= to get the next page.
+    """
+    keys = parse_sort(sort, USER_SORTS, User.id)
+    query = _filtered_users(db.query(*USER_COLUMNS, *(col for col, _ in keys)), role)
+    rows, next_cursor = keyset_page(query, keys, sort, cursor, limit)
+    return user_encoder.respond(request, rows, next_cursor=next_cursor)
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+def export_users(role: str | None = None, db: Session = Depends(get_read_db)):
     """
-    Fetch all users (admin feature).
+    Every user as NDJSON, streamed from a server-side cursor.
     """
-    users = db.query(User).all()
-    return users
+    return stream_export(
+        db,
+        lambda session: _filtered_users(session.query(*USER_COLUMNS), role).order_by(User.id),
+        user_encoder,
+        "users.ndjson",
+    )
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models.volunteer import Volunteer
@@ -6,17 +7,43 @@ from app.models.alert_volunteer import AlertVolunteer
 from app.models.alert import Alert
 from app.core.security import get_password_hash
 from app.core.socket_manager import manager
+from app.services.upload_service import save_upload, schedule_id_photo_processing
+from app.services.blob_store import add_ref, place_file, blob_path
+from app.services.analytics_service import set_response
 from datetime import datetime
-import os, shutil, uuid, asyncio
+import os, asyncio
 from app.core.security import get_current_user
 
 router = APIRouter(prefix="/volunteers", tags=["Volunteers"])
 
-UPLOAD_DIR = "uploads/volunteer_ids"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+def _volunteer_exists(db: Session, email: str) -> bool:
+    return db.query(Volunteer.id).filter(Volunteer.email == email).first() is not None
+
+
+def _insert_volunteer(db: Session, photo, **fields) -> Volunteer:
+    # bcrypt + DB insert + file move are blocking, so this runs in the threadpool
+    fields["password"] = get_password_hash(fields["password"])
+    add_ref(db, photo.sha256, photo.size, photo.content_type)
+    new_volunteer = Volunteer(is_verified=False, id_photo=photo.sha256, **fields)
+    db.add(new_volunteer)
+    db.commit()
+    # moved only after the commit: a failed insert leaves just the staged file,
+    # which the caller removes, never an unreferenced blob
+    try:
+        place_file(photo.path, photo.sha256)
+    except OSError:
+        # no row may point at a blob that isn't there: deleting the volunteer
+        # also drops its reference (release_dropped_photos)
+        db.delete(new_volunteer)
+        db.commit()
+        raise HTTPException(status_code=500, detail="Could not store the ID photo")
+    return new_volunteer
+
 
 @router.post("/signup")
-def signup_volunteer(
+async def signup_volunteer(
+    background_tasks: BackgroundTasks,
     full_name: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
@@ -25,33 +52,51 @@ def signup_volunteer(
     id_photo: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    existing = db.query(Volunteer).filter(Volunteer.email == email).first()
-    if existing:
+    if await run_in_threadpool(_volunteer_exists, db, email):
         raise HTTPException(status_code=400, detail="Volunteer already exists")
 
-    ext = id_photo.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{ext}"
-    file_path = os.path.join(UPLOAD_DIR, filename)
-
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(id_photo.file, buffer)
-
-    new_volunteer = Volunteer(
-        full_name=full_name,
-        email=email,
-        phone=phone,
-        city=city,
-        password=get_password_hash(password),
-        id_photo=file_path,
-        is_verified=False
-    )
-
-    db.add(new_volunteer)
-    db.commit()
-    db.refresh(new_volunteer)
+    photo = await save_upload(id_photo)
+
+    try:
+        await run_in_threadpool(
+            _insert_volunteer, db, photo,
+            full_name=full_name,
+            email=email,
+            phone=phone,
+            city=city,
+            password=password,
+        )
+    except Exception:
+        if os.path.exists(photo.path):
+            os.remove(photo.path)
+        raise
+
+    # Thumbnail + recompression after the response is sent
+    background_tasks.add_task(schedule_id_photo_processing, blob_path(photo.sha256), photo.sha256)
 
     return {"message": "Volunteer registered successfully"}
 
+@router.get("/online")
+async def online_volunteers(ids: str | None = None, user=Depends(get_current_user)):
+    """
+    Volunteers with an open socket and when they were last heard from.
+    ids: optional comma separated filter.
+    """
+    wanted = None
+    if ids:
+        try:
+            wanted = [int(i) for i in ids.split(",")]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be comma separated integers")
+    online = manager.online_volunteers(wanted)
+    return {
+        "count": len(online),
+        "volunteers": [
+            {"id": int(volunteer_id), "last_seen": datetime.utcfromtimestamp(seen).isoformat()}
+            for volunteer_id, seen in sorted(online.items(), key=lambda item: -item[1])
+        ],
+    }
+
 @router.post("/alerts/{alert_id}/accept")
 def accept_alert(alert_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
     if user.get("role") != "volunteer":
@@ -70,25 +115,32 @@ def accept_alert(alert_id: int, db: Session = Depends(get_db), user=Depends(get_
     if av.status != "pending":
         raise HTTPException(status_code=400, detail="Already responded")
 
-    av.status = "accepted"
-    av.responded_at = datetime.utcnow()
+    if not set_response(db, av, "accepted"):
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Already responded")
     db.commit()
 
     return {"message": "Alert accepted"}
 
 @router.post("/alerts/{alert_id}/reject")
-def reject_alert(alert_id: int, request: Request, db: Session = Depends(get_db)):
-    volunteer = request.state.user
+def reject_alert(alert_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    if user.get("role") != "volunteer":
+        raise HTTPException(status_code=403, detail="Only volunteers allowed")
 
     av = db.query(AlertVolunteer).filter(
         AlertVolunteer.alert_id == alert_id,
-        AlertVolunteer.volunteer_id == volunteer.id
+        AlertVolunteer.volunteer_id == int(user["sub"])
     ).first()
 
     if not av:
         raise HTTPException(status_code=404, detail="Alert not assigned")
 
-    av.status = "rejected"
+    if av.status != "pending":
+        raise HTTPException(status_code=400, detail="Already responded")
+
+    if not set_response(db, av, "rejected"):
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Already responded")
     db.commit()
 
     return {"message": "Alert rejected"}
@@ -0,0 +1,334 @@
+"""
+Response cache for read routes whose inputs change rarely.
+- @cached(tags=..., ttl=..., vary=...) on a sync GET route; the route
+  needs a `request: Request` parameter and returns a Response (or plain
+  content, sent as FastJSONResponse). Only 200s are stored
+- tiers: in-process LRU + TTL, plus a shared Redis tier when
+  CACHE_REDIS_URL is set (redis-py, imported only then)
+- invalidation is by tag: a key embeds the current version of each of its
+  tags, invalidate(tag) bumps the version, so every entry built before
+  that is unreachable and just ages out. Write paths call invalidate()
+  after their commit. Without Redis versions are per process, other
+  workers catch up within the TTL
+- ETag = tag versions + body digest; a matching If-None-Match gets a 304
+  without the route running
+- singleflight: concurrent misses for one key wait for a single build, so
+  an expiry or invalidation under load costs one recompute, not N
+- cached routes read through get_cached_read_db: with the cache on a miss
+  is built from the primary, since a lagging replica could store rows from
+  before the write under the tag version that write just bumped
+The cache lives on the app (create_app() installs it), apps without one
+run the routes uncached.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict, namedtuple
+
+from fastapi import Depends, Request
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.metrics import registry
+from app.utils.response import FastJSONResponse, wants_msgpack
+
+logger = logging.getLogger("silent_shield.cache")
+
+# headers the route's response may carry into the cache
+DROPPED_HEADERS = {"content-length", "content-type", "etag", "cache-control"}
+
+Entry = namedtuple("Entry", "status body media_type headers etag")
+
+cache_requests = registry.counter(
+    "http_cache_requests_total", "Response cache lookups by result (hit / miss / coalesced / not_modified)",
+    ("route", "result"),
+)
+_caches = weakref.WeakSet()
+registry.gauge("http_cache_entries", "Responses held in the in-process cache",
+               collect=lambda: {(): sum(len(c.local) for c in list(_caches))})
+
+
+# ----------------- SHARED TIER -----------------
+
+_redis = None
+
+
+def shared_client():
+    """
+    Redis client for CACHE_REDIS_URL, None when it isn't set.
+    """
+    global _redis
+    if _redis is None and settings.CACHE_REDIS_URL:
+        import redis  # optional, only needed for the shared tier
+        _redis = redis.Redis.from_url(settings.CACHE_REDIS_URL)
+    return _redis
+
+
+def _pack(entry: Entry) -> bytes:
+    head = json.dumps([entry.status, entry.media_type, entry.headers, entry.etag]).encode()
+    return head + b"\n" + entry.body
+
+
+def _unpack(blob: bytes) -> Entry:
+    head, _, body = blob.partition(b"\n")
+    status, media_type, headers, etag = json.loads(head)
+    return Entry(status, body, media_type, headers, etag)
+
+
+class SharedTier:
+    def __init__(self, client, prefix: str = "cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Entry | None:
+        blob = self.client.get(self.prefix + key)
+        return _unpack(blob) if blob is not None else None
+
+    def set(self, key: str, entry: Entry, ttl: float):
+        self.client.set(self.prefix + key, _pack(entry), px=max(1, int(ttl * 1000)))
+
+
+# ----------------- TAG VERSIONS -----------------
+
+class TagVersions:
+    """
+    Current version per tag, in Redis when the shared tier is on.
+    """
+    def __init__(self):
+        self._local = {}
+        self._lock = threading.Lock()
+
+    def get(self, tags: list[str]) -> list[int]:
+        client = shared_client()
+        if client is not None and tags:
+            try:
+                return [int(v or 0) for v in client.mget([f"cache:tag:{t}" for t in tags])]
+            except Exception:
+                logger.exception("shared cache unavailable, using local tag versions")
+        return [self._local.get(t, 0) for t in tags]
+
+    def bump(self, tags: tuple[str, ...]):
+        with self._lock:
+            for tag in tags:
+                self._local[tag] = self._local.get(tag, 0) + 1
+        client = shared_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                for tag in tags:
+                    pipe.incr(f"cache:tag:{tag}")
+                pipe.execute()
+            except Exception:
+                logger.exception("shared cache unavailable, tag bumped locally only", extra={"tags": list(tags)})
+
+
+versions = TagVersions()
+
+
+def invalidate(*tags: str):
+    """
+    For write paths, after the commit: drops every cached response with one of these tags.
+    """
+    versions.bump(tags)
+
+
+# ----------------- SINGLEFLIGHT -----------------
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn) -> tuple[object, bool]:
+        """
+        (fn's result, whether it was shared from another caller's run).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+
+# ----------------- CACHE -----------------
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 2048, ttl: float = 30, shared: SharedTier | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = shared
+        self.local = OrderedDict()  # key -> (expires_at, Entry)
+        self._lock = threading.Lock()
+        self.flights = SingleFlight()
+        _caches.add(self)
+
+    @classmethod
+    def from_settings(cls, settings):
+        client = shared_client()
+        return cls(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS,
+                   SharedTier(client) if client is not None else None)
+
+    def get(self, key: str) -> Entry | None:
+        now = time.monotonic()
+        with self._lock:
+            item = self.local.get(key)
+            if item is not None:
+                if item[0] > now:
+                    self.local.move_to_end(key)
+                    return item[1]
+                del self.local[key]
+        if self.shared is not None:
+            try:
+                entry = self.shared.get(key)
+            except Exception:
+                logger.exception("shared cache unavailable")
+                return None
+            if entry is not None:
+                self._store_local(key, entry, self.ttl)
+            return entry
+        return None
+
+    def set(self, key: str, entry: Entry, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._store_local(key, entry, ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, entry, ttl)
+            except Exception:
+                logger.exception("shared cache unavailable")
+
+    def _store_local(self, key: str, entry: Entry, ttl: float):
+        with self._lock:
+            self.local[key] = (time.monotonic() + ttl, entry)
+            self.local.move_to_end(key)
+            while len(self.local) > self.max_entries:
+                self.local.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.local.clear()
+
+
+def install_cache(app, settings):
+    if settings.CACHE_ENABLED:
+        app.state.response_cache = ResponseCache.from_settings(settings)
+
+
+# ----------------- ROUTE DECORATOR -----------------
+
+def get_cached_read_db(request: Request, primary: Session = Depends(get_db),
+                       replica: Session = Depends(get_read_db)) -> Session:
+    """
+    Session for @cached routes: the primary while the app has a response
+    cache (entries outlive the replica's lag), the usual replica pick
+    otherwise. Sessions connect on first query, so the unused one costs nothing.
+    """
+    return primary if getattr(request.app.state, "response_cache", None) is not None else replica
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _entry(response: Response, tag_versions: list[int]) -> Entry:
+    digest = hashlib.blake2b(response.body, digest_size=8).hexdigest()
+    etag = f'"{".".join(map(str, tag_versions)) or "0"}-{digest}"'
+    headers = {k: v for k, v in response.headers.items() if k not in DROPPED_HEADERS}
+    return Entry(response.status_code, response.body, response.media_type, headers, etag)
+
+
+def cached(tags: tuple[str, ...] = (), ttl: float | None = None, vary: tuple[str, ...] = (),
+           private: bool = False):
+    """
+    tags / vary are format strings over the route's parameters, e.g.
+    vary=("{user[sub]}",). The key is the path, query string, response
+    format, vary values and tag versions.
+    private: per-user responses (Cache-Control: private).
+    """
+    cache_control = "private, no-cache" if private else "no-cache"
+
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            raise TypeError("@cached supports sync routes only")
+        request_param = next((name for name, p in inspect.signature(fn).parameters.items()
+                              if p.annotation is Request), None)
+        if request_param is None:
+            raise TypeError(f"{fn.__name__} needs a `request: Request` parameter for @cached")
+
+        def build(kwargs, tag_versions) -> Entry:
+            response = fn(**kwargs)
+            if not isinstance(response, Response):
+                response = FastJSONResponse(response)
+            return _entry(response, tag_versions)
+
+        @functools.wraps(fn)
+        def wrapper(**kwargs):
+            request = kwargs[request_param]
+            cache = getattr(request.app.state, "response_cache", None)
+            if cache is None or request.method not in ("GET", "HEAD"):
+                return fn(**kwargs)
+
+            route = getattr(request.scope.get("route"), "path", request.url.path)
+            tag_names = [t.format(**kwargs) for t in tags]
+            tag_versions = versions.get(tag_names)
+            key = "|".join([
+                route, request.url.path, request.url.query,
+                "msgpack" if wants_msgpack(request) else "json",
+                *(v.format(**kwargs) for v in vary),
+                *(f"{t}@{v}" for t, v in zip(tag_names, tag_versions)),
+            ])
+
+            entry = cache.get(key)
+            if entry is not None:
+                result = "hit"
+            else:
+                entry, shared = cache.flights.do(key, lambda: build(kwargs, tag_versions))
+                result = "coalesced" if shared else "miss"
+                if entry.status == 200 and not shared:
+                    cache.set(key, entry, ttl)
+
+            headers = dict(entry.headers)
+            if entry.status == 200:
+                headers.update({"ETag": entry.etag, "Cache-Control": cache_control})
+                if _matches(request.headers.get("if-none-match"), entry.etag):
+                    cache_requests.inc(route, "not_modified")
+                    return Response(status_code=304, headers=headers)
+            cache_requests.inc(route, result)
+            return Response(entry.body, status_code=entry.status, media_type=entry.media_type, headers=headers)
+
+        return wrapper
+
+    return decorate
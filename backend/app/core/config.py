@@ -3,10 +3,14 @@ Loads all environment variables safely.
 This file is used everywhere in the project.
 """
 
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
+# backend/.env (what load_dotenv() found walking up from here); python-dotenv
+# is only imported when the file exists, deployments pass real env vars
+ENV_FILE = os.getenv("ENV_FILE", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".env"))
+if os.path.isfile(ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
 
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL")
@@ -15,4 +19,125 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
     HUGGINGFACE_API_KEY: str = os.getenv("HUGGINGFACE_API_KEY")
 
+    # Logging: DEBUG/INFO/WARNING..., format "text" or "json"
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")
+
+    # Tracing: finished spans kept in memory, optional OTLP/JSON lines file
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", 10000))
+    TRACE_EXPORT_PATH: str | None = os.getenv("TRACE_EXPORT_PATH")
+
+    # /debug/* endpoints are off unless this is set (sent as X-Debug-Token)
+    DEBUG_TOKEN: str | None = os.getenv("DEBUG_TOKEN")
+
+    # Per-request cProfile via "X-Profile: <token>"; profiling hooks are only
+    # installed when at least one token is configured
+    PROFILE_TOKENS: list[str] = [t.strip() for t in os.getenv("PROFILE_TOKENS", "").split(",") if t.strip()]
+
+    # DB pool: pick a named profile, individual values override it
+    DB_POOL_PROFILE: str = os.getenv("DB_POOL_PROFILE", "default")
+    DB_POOL_SIZE: str | None = os.getenv("DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: str | None = os.getenv("DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: str | None = os.getenv("DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE: str | None = os.getenv("DB_POOL_RECYCLE")
+
+    # Read replicas (comma separated URLs), used by get_read_db routes
+    REPLICA_DATABASE_URLS: list[str] = [u.strip() for u in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if u.strip()]
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+    REPLICA_HEALTH_INTERVAL: float = float(os.getenv("REPLICA_HEALTH_INTERVAL", 10))
+
+    # WebSocket heartbeat: a connection silent for WS_PING_INTERVAL seconds
+    # gets a ping, one silent for WS_PING_TIMEOUT seconds is closed
+    WS_PING_INTERVAL: float = float(os.getenv("WS_PING_INTERVAL", 25))
+    WS_PING_TIMEOUT: float = float(os.getenv("WS_PING_TIMEOUT", 60))
+
+    # Notification outbox. A channel is only used when it is configured:
+    # email via SMTP, SMS and volunteer push via HTTP gateways (JSON POST)
+    SMTP_HOST: str | None = os.getenv("SMTP_HOST")
+    SMTP_PORT: int = int(os.getenv("SMTP_PORT", 25))
+    SMTP_FROM: str = os.getenv("SMTP_FROM", "alerts@silentshield.local")
+    SMS_WEBHOOK_URL: str | None = os.getenv("SMS_WEBHOOK_URL")
+    PUSH_WEBHOOK_URL: str | None = os.getenv("PUSH_WEBHOOK_URL")
+    OUTBOX_WORKERS: int = int(os.getenv("OUTBOX_WORKERS", 2))
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", 50))
+    OUTBOX_POLL_INTERVAL: float = float(os.getenv("OUTBOX_POLL_INTERVAL", 1.0))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+    OUTBOX_BACKOFF_SECONDS: float = float(os.getenv("OUTBOX_BACKOFF_SECONDS", 2))
+    OUTBOX_BACKOFF_MAX_SECONDS: float = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", 300))
+    # Concurrent sends per channel, e.g. "email=4,sms=8,push=16"
+    OUTBOX_CONCURRENCY: dict[str, int] = {
+        name.strip(): int(limit)
+        for name, _, limit in (pair.partition("=") for pair in os.getenv("OUTBOX_CONCURRENCY", "").split(","))
+        if name.strip() and limit.strip()
+    }
+
+    # Live location history: raw points are written in batches every
+    # TRACK_FLUSH_INTERVAL seconds; closed alerts are compacted to
+    # simplified polylines, and raw rows older than TRACK_RETENTION_DAYS
+    # are moved to gzip files under TRACK_ARCHIVE_DIR
+    TRACK_FLUSH_INTERVAL: float = float(os.getenv("TRACK_FLUSH_INTERVAL", 1.0))
+    TRACK_COMPACT_INTERVAL: float = float(os.getenv("TRACK_COMPACT_INTERVAL", 300))
+    TRACK_TOLERANCE_M: float = float(os.getenv("TRACK_TOLERANCE_M", 5))
+    TRACK_RETENTION_DAYS: float = float(os.getenv("TRACK_RETENTION_DAYS", 7))
+    TRACK_ARCHIVE_DIR: str = os.getenv("TRACK_ARCHIVE_DIR", "archive/live_locations")
+
+    # Bulk exports for analysts: Parquet / Arrow IPC when pyarrow is
+    # installed, CSV otherwise. Export jobs write into EXPORT_DIR
+    EXPORT_DIR: str = os.getenv("EXPORT_DIR", "exports")
+    EXPORT_CHUNK_ROWS: int = int(os.getenv("EXPORT_CHUNK_ROWS", 10_000))
+
+    # Region shards for volunteer matching and the heatmap (see
+    # app/core/sharding.py), e.g.
+    # REGION_SHARDS="south=mysql+pymysql://.../south,north=mysql+pymysql://.../north"
+    # REGION_MAP="tdr=south,tf=south,tt=north"  (geohash prefix=shard)
+    REGION_SHARDS: dict[str, str] = {
+        name.strip(): url.strip()
+        for name, _, url in (pair.partition("=") for pair in os.getenv("REGION_SHARDS", "").split(","))
+        if name.strip() and url.strip()
+    }
+    REGION_MAP: dict[str, str] = {
+        prefix.strip(): name.strip()
+        for prefix, _, name in (pair.partition("=") for pair in os.getenv("REGION_MAP", "").split(","))
+        if prefix.strip() and name.strip()
+    }
+    REGION_DEFAULT_SHARD: str | None = os.getenv("REGION_DEFAULT_SHARD")
+
+    # Offline reverse geocoder: city centroids (CSV), a point is tagged with
+    # the nearest city within GEOCODER_MAX_KM. The KD-tree built from the
+    # dataset is cached (and memory-mapped) in GEOCODER_CACHE_DIR
+    GEOCODER_DATASET: str = os.getenv(
+        "GEOCODER_DATASET", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "in_cities.csv")
+    )
+    GEOCODER_CACHE_DIR: str = os.getenv("GEOCODER_CACHE_DIR", "cache")
+    GEOCODER_MAX_KM: float = float(os.getenv("GEOCODER_MAX_KM", 50))
+
+    # Volunteer ID photo uploads
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads/volunteer_ids")
+    MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", 5 * 1024 * 1024))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 64 * 1024))
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", 2))
+    BLOB_DIR: str = os.getenv("BLOB_DIR", "uploads/blobs")
+
+    # Response cache for hot reads (app/core/cache.py): in-process LRU + TTL,
+    # plus a shared tier in Redis when CACHE_REDIS_URL is set (needs redis-py);
+    # entries are dropped by write paths through tag invalidation
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", 2048))
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", 30))
+    CACHE_REDIS_URL: str | None = os.getenv("CACHE_REDIS_URL")
+
+    # Warm-up after startup (passlib / jose, geocoder, subscription index,
+    # socket.io); GET /ready answers 503 until it is done
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "1").lower() not in ("0", "false", "no")
+
+    def __init__(self, **overrides):
+        # create_app(Settings(DEBUG_TOKEN="x")) in tests / tools. Only the app-level
+        # wiring reads these (middlewares, cache, warm-up, profiling, /debug token);
+        # the engine, JWT keys and services use the global `settings` below
+        # (env / .env), which are read at import.
+        for name, value in overrides.items():
+            if not hasattr(type(self), name):
+                raise AttributeError(f"Unknown setting {name}")
+            setattr(self, name, value)
+
 settings = Settings()
@@ -1,16 +1,148 @@
 """
 Creates MySQL database engine and session.
 All models and routes use this.
+- get_db: read/write session on the primary
+- get_read_db: read-only session, routed to a replica when one is configured
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
+import hashlib
+import itertools
+import threading
+import time
+
+from starlette.requests import HTTPConnection
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.core.pool_metrics import InstrumentedQueuePool, instrument
+from app.core.metrics import instrument_queries
+from app.core.tracing import instrument_commits
+
+# Named pool profiles (DB_POOL_PROFILE). LIFO keeps a few hot connections
+# busy so idle ones can expire; recycle stays below MySQL wait_timeout.
+POOL_PROFILES = {
+    "default": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 10, "pool_recycle": 1800},
+    "small": {"pool_size": 2, "max_overflow": 3, "pool_timeout": 5, "pool_recycle": 1800},
+    "burst": {"pool_size": 30, "max_overflow": 70, "pool_timeout": 3, "pool_recycle": 900},
+}
+
+def pool_options(profile: str = "default", **overrides) -> dict:
+    if profile not in POOL_PROFILES:
+        raise ValueError(f"Unknown DB pool profile '{profile}', choose from {sorted(POOL_PROFILES)}")
+    options = dict(POOL_PROFILES[profile])
+    for key in ("pool_size", "max_overflow", "pool_timeout", "pool_recycle"):
+        value = overrides.get(key, getattr(settings, f"DB_{key.upper()}", None))
+        if value is not None:
+            options[key] = type(options[key])(value)
+    return options
+
+def build_engine(url: str, profile: str = "default", name: str = "primary", **overrides):
+    """
+    Engine with the profile's pool sizing and pool telemetry.
+    No pre-ping on checkout; disconnects are handled when they happen.
+    """
+    connect_args = {}
+    if url.startswith("sqlite"):
+        connect_args["check_same_thread"] = False
+    engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_use_lifo=True,
+        pool_pre_ping=False,
+        connect_args=connect_args,
+        **pool_options(profile, **overrides),
+    )
+    instrument(engine, name)
+    instrument_queries(engine, name)
+    return engine
+
+
+class ReadRouter:
+    """
+    Picks the engine for read-only sessions.
+    - round-robin over healthy replicas
+    - a replica is re-checked with SELECT 1 every health_interval seconds,
+      and marked down straight away when it drops a connection
+    - a client that just wrote reads from the primary for sticky_seconds
+    """
+    def __init__(self, primary, replicas=(), sticky_seconds: float = 5, health_interval: float = 10):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_seconds = sticky_seconds
+        self.health_interval = health_interval
+        self._counter = itertools.count()
+        self._healthy = {id(e): True for e in self.replicas}
+        self._checked_at = {id(e): time.monotonic() for e in self.replicas}
+        self._recent_writes: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        for replica in self.replicas:
+            event.listen(replica, "handle_error", self._on_replica_error(replica))
+
+    def _on_replica_error(self, replica):
+        def handler(context):
+            if context.is_disconnect:
+                self._healthy[id(replica)] = False
+        return handler
+
+    def mark_write(self, client_key: str | None):
+        if not client_key or not self.replicas:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[client_key] = now + self.sticky_seconds
+            # Drop expired entries now and then so the dict stays small
+            if len(self._recent_writes) > 10000:
+                self._recent_writes = {k: t for k, t in self._recent_writes.items() if t > now}
+
+    def is_sticky(self, client_key: str | None) -> bool:
+        return bool(client_key) and self._recent_writes.get(client_key, 0) > time.monotonic()
+
+    def _check(self, replica) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at[id(replica)] < self.health_interval:
+            return self._healthy[id(replica)]
+        self._checked_at[id(replica)] = now
+        try:
+            with replica.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            self._healthy[id(replica)] = True
+        except Exception:
+            self._healthy[id(replica)] = False
+        return self._healthy[id(replica)]
+
+    def pick(self, client_key: str | None = None):
+        if not self.replicas or self.is_sticky(client_key):
+            return self.primary
+        start = next(self._counter)
+        for i in range(len(self.replicas)):
+            replica = self.replicas[(start + i) % len(self.replicas)]
+            if self._check(replica):
+                return replica
+        # Every replica is down, the primary still answers
+        return self.primary
+
+    def status(self) -> list[dict]:
+        return [
+            {"name": e.pool.stats.name, "healthy": self._healthy[id(e)]}
+            for e in self.replicas
+        ]
+
 
 DATABASE_URL = settings.DATABASE_URL
 # Engine create karo
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = build_engine(DATABASE_URL, settings.DB_POOL_PROFILE)
+
+replica_engines = [
+    build_engine(url, settings.DB_POOL_PROFILE, name=f"replica{i}")
+    for i, url in enumerate(settings.REPLICA_DATABASE_URLS)
+]
+read_router = ReadRouter(
+    engine,
+    replica_engines,
+    sticky_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    health_interval=settings.REPLICA_HEALTH_INTERVAL,
+)
 
 # Session banane ke liye
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -18,9 +150,59 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base class for models
 Base = declarative_base()
 
-def get_db():
+
+def client_key(request: HTTPConnection) -> str | None:
+    """
+    Identifies the caller for read-your-writes: bearer token if present,
+    otherwise the client address.
+    """
+    auth = request.headers.get("authorization")
+    if auth:
+        return hashlib.sha1(auth.encode()).hexdigest()
+    return request.client.host if request.client else None
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _remember_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _stick_to_primary(session):
+    if session.info.pop("wrote", False):
+        read_router.mark_write(session.info.get("client_key"))
+
+
+# db.commit spans for every Session (ours and any test/bench sessionmaker)
+instrument_commits()
+
+
+def get_db(request: HTTPConnection):
+    # HTTPConnection, not Request, so WebSocket endpoints can depend on it too
     db = SessionLocal()
+    db.info["client_key"] = client_key(request)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db(request: HTTPConnection):
+    """
+    Read-only session for heavy read endpoints.
+    Goes to a replica unless this client wrote within the sticky window.
+    """
+    db = SessionLocal(bind=read_router.pick(client_key(request)))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_session_factory():
+    """
+    The session factory itself, for long-lived endpoints (WebSockets) that
+    open a short session per operation instead of holding one open.
+    Async so resolving it needs no threadpool hop.
+    """
+    return SessionLocal
@@ -0,0 +1,396 @@
+"""
+Realtime gateway: one registry of connections and topics for every
+transport (native WebSockets on /ws, the legacy /ws/user and
+/ws/volunteer sockets, and socket.io clients when python-socketio is
+installed).
+
+Topics:
+- user:<id>        a logged-in user's own channel
+- volunteer:<id>   a volunteer's own channel (NEW_ALERT, LIVE_LOCATION)
+- alert:<id>       everyone watching one alert (owner, assigned volunteers)
+- area:<geohash>   everyone watching an area
+
+Each topic is a set of connections, so publish costs O(subscribers) and
+the payload is JSON-encoded once per publish, not once per socket.
+Live location travels as a LocationBatch: connections that negotiated
+binary framing (app/utils/wire.py) get the packed frame, the rest JSON.
+
+Heartbeat: every received message marks a connection as seen. One that
+stays silent for ping_interval gets a ping, one still silent at
+ping_timeout is closed, so half-open mobile sockets don't linger. Timers
+live in a timing wheel, so a sweep only visits the connections that are due.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+
+from app.core.config import settings
+from app.core.metrics import ws_messages_sent, ws_reaped
+from app.utils import geohash, wire
+from app.utils.timing_wheel import TimingWheel
+from app.utils.response import dumps
+
+logger = logging.getLogger("silent_shield.gateway")
+
+AREA_PRECISION = 5  # ~5 km cells
+TOPIC_KINDS = ("user", "volunteer", "alert", "area")
+HEARTBEAT_TICK = 1.0  # seconds, resolution of ping / reap times
+
+PING = '{"op":"ping"}'  # /ws clients answer {"op": "pong"}
+LEGACY_PING = '{"type":"PING"}'  # legacy sockets: any message counts as an answer
+
+_ids = itertools.count(1)
+
+
+class LocationBatch:
+    """
+    Points of one alert, [(latitude, longitude, epoch ms), ...] in time
+    order. Built once per update and shared by every topic it goes to, so
+    each encoding is made at most once.
+    """
+    __slots__ = ("alert_id", "seq", "points", "data", "_raw", "_binary")
+
+    def __init__(self, alert_id: int, seq: int, points: list, sender: dict | None = None):
+        self.alert_id = alert_id
+        self.seq = seq
+        self.points = points
+        lat, lng, ts = points[-1]
+        # JSON fallback: the latest point where legacy clients expect it
+        self.data = {"type": "LIVE_LOCATION", "alert_id": alert_id, "seq": seq,
+                     "latitude": lat, "longitude": lng, "ts": ts}
+        if len(points) > 1:
+            self.data["points"] = [list(p) for p in points]
+        if sender is not None:
+            self.data["from"] = sender
+        self._raw = None
+        self._binary = None
+
+    @property
+    def raw(self) -> str:
+        if self._raw is None:
+            self._raw = dumps(self.data).decode()
+        return self._raw
+
+    @property
+    def binary(self) -> bytes:
+        if self._binary is None:
+            self._binary = wire.encode_locations(self.alert_id, self.seq, self.points)
+        return self._binary
+
+
+class Frame:
+    """
+    One published message; encodings are built on first use and shared
+    by every subscriber.
+    """
+    __slots__ = ("topic", "data", "batch", "_raw", "_wrapped")
+
+    def __init__(self, topic: str, data):
+        self.topic = topic
+        self.batch = data if isinstance(data, LocationBatch) else None
+        self.data = data.data if self.batch is not None else data
+        self._raw = None
+        self._wrapped = None
+
+    @property
+    def raw(self) -> str:
+        if self._raw is None:
+            self._raw = self.batch.raw if self.batch is not None else dumps(self.data).decode()
+        return self._raw
+
+    @property
+    def wrapped(self) -> str:
+        """
+        {"topic": ..., "data": ...} for multiplexed connections.
+        """
+        if self._wrapped is None:
+            self._wrapped = '{"topic":' + dumps(self.topic).decode() + ',"data":' + self.raw + "}"
+        return self._wrapped
+
+    @property
+    def binary(self) -> bytes | None:
+        """
+        Packed location frame, None for anything that only has JSON.
+        """
+        return self.batch.binary if self.batch is not None else None
+
+
+class Connection:
+    """
+    kind: "gateway" (multiplexed /ws), "user"/"volunteer" (legacy) or "socketio".
+    principal: decoded token ({"sub", "role"}) or None for legacy sockets.
+    binary: negotiated binary location frames at handshake.
+    last_seen: epoch seconds of the last message received.
+    """
+    __slots__ = ("id", "kind", "principal", "topics", "binary", "last_seen", "pinged")
+
+    # False when the transport runs its own heartbeat (socket.io)
+    heartbeat = True
+
+    def __init__(self, kind: str, principal: dict | None = None, binary: bool = False):
+        self.id = next(_ids)
+        self.kind = kind
+        self.principal = principal
+        self.topics = set()
+        self.binary = binary
+        self.last_seen = time.time()
+        self.pinged = False
+
+    async def deliver(self, frame: Frame):
+        raise NotImplementedError
+
+    async def ping(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class WebSocketConnection(Connection):
+    __slots__ = ("websocket", "envelope")
+
+    def __init__(self, websocket, kind: str, principal: dict | None = None, envelope: bool = True,
+                 binary: bool = False):
+        super().__init__(kind, principal, binary)
+        self.websocket = websocket
+        # legacy sockets get the bare payload, /ws gets {"topic", "data"}
+        self.envelope = envelope
+
+    async def deliver(self, frame: Frame):
+        # a binary frame carries its alert id, so it needs no envelope
+        if self.binary and frame.batch is not None:
+            await self.websocket.send_bytes(frame.binary)
+            return
+        await self.websocket.send_text(frame.wrapped if self.envelope else frame.raw)
+
+    async def ping(self):
+        await self.websocket.send_text(PING if self.envelope else LEGACY_PING)
+
+    async def close(self):
+        try:
+            await self.websocket.close()
+        except RuntimeError:  # already closed
+            pass
+
+
+class Gateway:
+    def __init__(self, ping_interval: float = 25, ping_timeout: float = 60):
+        if not 0 < ping_interval < ping_timeout:
+            raise ValueError("ping_interval must be positive and below ping_timeout")
+        self.connections: dict[int, Connection] = {}
+        self.topics: dict[str, set[Connection]] = {}
+        # alert id -> next location seq, so clients can spot gaps
+        self.sequences: dict[int, int] = {}
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.wheel = TimingWheel(HEARTBEAT_TICK, int(ping_timeout / HEARTBEAT_TICK) + 3)
+
+    # ----------------- REGISTRY -----------------
+
+    def register(self, conn: Connection, topics=()) -> Connection:
+        self.connections[conn.id] = conn
+        for topic in topics:
+            self.subscribe(conn, topic)
+        self.touch(conn)
+        return conn
+
+    def unregister(self, conn: Connection):
+        """
+        O(topics of this connection), not O(all topics).
+        """
+        self.connections.pop(conn.id, None)
+        self.wheel.cancel(conn)
+        for topic in conn.topics:
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(conn)
+                if not subscribers:
+                    del self.topics[topic]
+        conn.topics = set()
+
+    def subscribe(self, conn: Connection, topic: str):
+        self.topics.setdefault(topic, set()).add(conn)
+        conn.topics.add(topic)
+
+    def unsubscribe(self, conn: Connection, topic: str):
+        subscribers = self.topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(conn)
+            if not subscribers:
+                del self.topics[topic]
+        conn.topics.discard(topic)
+
+    def subscribers(self, topic: str) -> set[Connection]:
+        return self.topics.get(topic, set())
+
+    # ----------------- HEARTBEAT / PRESENCE -----------------
+
+    def touch(self, conn: Connection):
+        """
+        Call on every message received from the connection.
+        """
+        conn.last_seen = time.time()
+        conn.pinged = False
+        if conn.heartbeat:
+            self.wheel.schedule(conn, self.ping_interval)
+
+    async def sweep(self) -> int:
+        """
+        Pings connections that came due, closes those that didn't answer
+        the last ping. Returns how many were closed.
+        """
+        reaped = 0
+        for conn in self.wheel.advance():
+            if conn.id not in self.connections:
+                continue
+            if not conn.pinged:
+                conn.pinged = True
+                self.wheel.schedule(conn, self.ping_timeout - self.ping_interval)
+                try:
+                    await conn.ping()
+                except Exception:  # the send failing is as good as no pong
+                    self.unregister(conn)
+                continue
+            logger.debug("closing silent connection", extra={"conn": conn.id, "kind": conn.kind})
+            self.unregister(conn)
+            ws_reaped.inc(conn.kind)
+            reaped += 1
+            await conn.close()
+        return reaped
+
+    def presence(self, role: str, ids=None) -> dict[str, float]:
+        """
+        {id: last seen (epoch seconds)} for everyone of `role` ("user" or
+        "volunteer") with at least one open connection on any transport.
+        O(ids) when ids are given, else O(topics).
+        """
+        prefix = f"{role}:"
+        if ids is not None:
+            topics = (prefix + str(i) for i in ids)
+        else:
+            topics = (t for t in self.topics if t.startswith(prefix))
+        online = {}
+        for topic in topics:
+            # a user/volunteer topic's subscribers are that person's own connections
+            subscribers = self.topics.get(topic)
+            if subscribers:
+                online[topic[len(prefix):]] = max(conn.last_seen for conn in subscribers)
+        return online
+
+    # ----------------- PUBLISH -----------------
+
+    def location_batch(self, alert_id: int, points: list, sender: dict | None = None) -> LocationBatch:
+        """
+        Numbers the points with the alert's next seqs. Points without a
+        time ((lat, lng) pairs) get the current time.
+        """
+        now = time.time_ns() // 1_000_000
+        points = [p if len(p) == 3 else (p[0], p[1], now) for p in points]
+        seq = self.sequences.get(alert_id, 0)
+        self.sequences[alert_id] = seq + len(points)
+        return LocationBatch(alert_id, seq, points, sender)
+
+    def forget_alert(self, alert_id: int):
+        self.sequences.pop(alert_id, None)
+
+    async def publish(self, topic: str, data, exclude: Connection | None = None) -> int:
+        """
+        Sends a dict or a LocationBatch to every subscriber of the topic
+        (except `exclude`, usually the sender), returns how many got it.
+        A connection whose send fails is dropped.
+        """
+        subscribers = self.topics.get(topic)
+        if not subscribers:
+            return 0
+        frame = Frame(topic, data)
+        delivered = 0
+        # copy: a failed send unregisters while we iterate
+        for conn in tuple(subscribers):
+            if conn is exclude:
+                continue
+            try:
+                await conn.deliver(frame)
+            except Exception:
+                logger.debug("dropping connection after failed send", extra={"conn": conn.id, "topic": topic})
+                self.unregister(conn)
+                continue
+            delivered += 1
+            ws_messages_sent.inc(conn.kind)
+        return delivered
+
+    def counts(self) -> dict:
+        totals = {}
+        for conn in self.connections.values():
+            totals[(conn.kind,)] = totals.get((conn.kind,), 0) + 1
+        return totals
+
+
+# ----------------- TOPICS -----------------
+
+def user_topic(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def volunteer_topic(volunteer_id) -> str:
+    return f"volunteer:{volunteer_id}"
+
+
+def alert_topic(alert_id) -> str:
+    return f"alert:{alert_id}"
+
+
+def area_topic(lat: float, lng: float, precision: int = AREA_PRECISION) -> str:
+    return f"area:{geohash.encode(lat, lng, precision)}"
+
+
+def parse_topic(topic: str) -> tuple[str, str] | None:
+    """
+    "alert:12" -> ("alert", "12"); None when malformed.
+    """
+    kind, _, key = (topic or "").partition(":")
+    if kind not in TOPIC_KINDS or not key:
+        return None
+    if kind == "area":
+        return (kind, key) if geohash.is_valid(key) and 3 <= len(key) <= 8 else None
+    return (kind, key) if key.isdigit() else None
+
+
+def home_topics(principal: dict) -> list[str]:
+    """
+    Topics a connection joins at handshake, from its token.
+    """
+    role, sub = principal.get("role"), principal.get("sub")
+    if role == "user":
+        return [user_topic(sub)]
+    if role == "volunteer":
+        return [volunteer_topic(sub)]
+    return []
+
+
+async def run_heartbeat(hub: Gateway):
+    while True:
+        await asyncio.sleep(HEARTBEAT_TICK)
+        try:
+            await hub.sweep()
+        except Exception:
+            logger.exception("heartbeat sweep failed")
+
+
+gateway = Gateway(settings.WS_PING_INTERVAL, settings.WS_PING_TIMEOUT)
+
+_heartbeat_task: asyncio.Task | None = None
+
+
+async def start_heartbeat():
+    global _heartbeat_task
+    if _heartbeat_task is None:
+        _heartbeat_task = asyncio.create_task(run_heartbeat(gateway))
+
+
+async def stop_heartbeat():
+    global _heartbeat_task
+    if _heartbeat_task is not None:
+        _heartbeat_task.cancel()
+        _heartbeat_task = None
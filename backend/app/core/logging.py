@@ -1,13 +1,58 @@
 """
 Central logging setup.
-Used for debugging and production logs.
+Level comes from LOG_LEVEL; LOG_FORMAT=json gives one JSON object per line
+so log shippers can index fields passed via extra={...}.
+Hot paths should log at DEBUG so nothing is formatted in production.
 """
 
+import json
 import logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+from app.core.config import settings
 
-logger = logging.getLogger("silent_shield")
+# Attributes every LogRecord has; anything else came in through extra=
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def _extra(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _RESERVED}
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **_extra(record),
+        }
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        line = super().format(record)
+        fields = _extra(record)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+def setup_logging(level: str = settings.LOG_LEVEL, fmt: str = settings.LOG_FORMAT) -> logging.Logger:
+    handler = logging.StreamHandler()
+    if fmt == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(TextFormatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s"))
+
+    root = logging.getLogger("silent_shield")
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    root.propagate = False
+    return root
+
+
+logger = setup_logging()
@@ -0,0 +1,235 @@
+"""
+In-process metrics with Prometheus text output.
+Every thread writes to its own cells (threading.local), so the hot path
+never takes a lock; /metrics sums the cells when it is scraped. Cells of
+threads that have exited are folded into one retired total.
+"""
+
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+
+from sqlalchemy import event
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+LAG_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+class _Cells:
+    """
+    One dict per thread; a thread only ever touches its own dict.
+    Threadpool workers exit after idling and get replaced, so when a new
+    thread registers (and on scrape) the dicts of dead threads are merged
+    into `_retired` and dropped: the list stays as long as the live threads.
+    """
+    def __init__(self, merge):
+        self._local = threading.local()
+        self._lock = threading.Lock()  # registration and scrape only
+        self._threads = []  # (thread, cells)
+        self._retired = {}
+        self._merge = merge
+
+    def mine(self) -> dict:
+        cells = getattr(self._local, "cells", None)
+        if cells is None:
+            cells = self._local.cells = {}
+            with self._lock:
+                self._fold_dead()
+                self._threads.append((threading.current_thread(), cells))
+        return cells
+
+    def _fold_dead(self):
+        live = []
+        for thread, cells in self._threads:
+            if thread.is_alive():
+                live.append((thread, cells))
+                continue
+            for key, value in cells.items():
+                self._retired[key] = self._merge(self._retired.get(key), value)
+        self._threads = live
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            self._fold_dead()
+            return [dict(self._retired)] + [dict(cells) for _, cells in self._threads]
+
+
+def _add(total, value):
+    return value if total is None else total + value
+
+
+def _add_cells(total, cell):
+    return list(cell) if total is None else [a + b for a, b in zip(total, cell)]
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._cells = _Cells(_add)
+
+    def inc(self, *label_values, value: float = 1):
+        cells = self._cells.mine()
+        cells[label_values] = cells.get(label_values, 0) + value
+
+    def values(self) -> dict:
+        total = {}
+        for cells in self._cells.snapshot():
+            for key, value in cells.items():
+                total[key] = total.get(key, 0) + value
+        return total
+
+    def samples(self):
+        for key, value in sorted(self.values().items()):
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Gauge(Counter):
+    """
+    Up/down gauge (inc/dec deltas summed across threads), or a callback
+    gauge when `collect` returns {label_values: value} at scrape time.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), collect=None):
+        super().__init__(name, help, labels)
+        self.collect = collect
+
+    def dec(self, *label_values, value: float = 1):
+        self.inc(*label_values, value=-value)
+
+    def values(self) -> dict:
+        return self.collect() if self.collect else super().values()
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = tuple(buckets)
+        self._cells = _Cells(_add_cells)
+
+    def observe(self, value: float, *label_values):
+        cells = self._cells.mine()
+        cell = cells.get(label_values)
+        if cell is None:
+            # [count per bucket..., +Inf count, sum]
+            cell = cells[label_values] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                cell[i] += 1
+                break
+        else:
+            cell[-2] += 1
+        cell[-1] += value
+
+    def samples(self):
+        merged = {}
+        for cells in self._cells.snapshot():
+            for key, cell in cells.items():
+                total = merged.setdefault(key, [0] * len(cell))
+                for i, v in enumerate(cell):
+                    total[i] += v
+        for key, cell in sorted(merged.items()):
+            labels = dict(zip(self.labels, key))
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), cell[:-1]):
+                running += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", {**labels, "le": le}, running
+            yield f"{self.name}_count", labels, running
+            yield f"{self.name}_sum", labels, cell[-1]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{label_text}}} {value}")
+                else:
+                    lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+registry = Registry()
+
+# ----------------- HTTP -----------------
+http_requests = registry.counter("http_requests_total", "HTTP requests", ("method", "route", "status"))
+http_latency = registry.histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+http_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being served")
+http_response_size = registry.histogram("http_response_size_bytes", "HTTP response body size", ("route",), SIZE_BUCKETS)
+request_db_queries = registry.histogram("http_request_db_queries", "DB queries per request", ("route",), COUNT_BUCKETS)
+request_db_time = registry.histogram("http_request_db_duration_seconds", "DB time per request", ("route",))
+
+# ----------------- DATABASE -----------------
+db_queries = registry.counter("db_queries_total", "SQL statements executed", ("engine",))
+db_query_time = registry.histogram("db_query_duration_seconds", "SQL statement latency", ("engine",))
+
+# ----------------- WEBSOCKETS -----------------
+ws_messages_sent = registry.counter("ws_messages_sent_total", "WebSocket messages sent", ("kind",))
+ws_messages_received = registry.counter("ws_messages_received_total", "WebSocket messages received", ("kind",))
+ws_reaped = registry.counter("ws_reaped_total", "WebSocket connections closed for missing heartbeats", ("kind",))
+
+# ----------------- OUTBOX -----------------
+outbox_messages = registry.counter("outbox_messages_total", "Outbox delivery attempts", ("channel", "outcome"))
+outbox_send_time = registry.histogram("outbox_send_duration_seconds", "Outbox batch send latency", ("channel",))
+outbox_lag = registry.histogram("outbox_lag_seconds", "Outbox enqueue to delivery delay", ("channel",), LAG_BUCKETS)
+
+# Per-request DB stats: [query count, seconds]. The list is shared with
+# threadpool workers because run_in_threadpool copies the context.
+request_db_stats: ContextVar[list | None] = ContextVar("request_db_stats", default=None)
+
+
+def instrument_queries(engine, name: str):
+    """
+    Counts and times every SQL statement on the engine. Start times are
+    kept per cursor, and a failed statement's is dropped in handle_error.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", {})[id(cursor)] = perf_counter()
+
+    @event.listens_for(engine, "handle_error")
+    def failed(context):
+        cursor = getattr(context.execution_context, "cursor", None)
+        if context.connection is not None and cursor is not None:
+            context.connection.info.get("query_start", {}).pop(id(cursor), None)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = perf_counter() - conn.info["query_start"].pop(id(cursor))
+        db_queries.inc(name)
+        db_query_time.observe(elapsed, name)
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
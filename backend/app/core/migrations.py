@@ -0,0 +1,89 @@
+"""
+Minimal schema migration runner.
+Migrations live in app/migrations as mNNNN_<name>.py modules with an
+upgrade(conn) function. Applied versions are recorded in schema_migrations.
+Helpers are idempotent so a fresh database (created from the models) and
+an old one end up with the same schema.
+Migrations spell out their own tables, columns and indexes instead of
+importing the models, so later model changes can't rewrite old migrations.
+"""
+
+import importlib
+import pkgutil
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select
+
+import app.migrations
+from app.core.logging import logger
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", String(100), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def discover() -> list[str]:
+    return sorted(
+        name for _, name, _ in pkgutil.iter_modules(app.migrations.__path__)
+        if name.startswith("m")
+    )
+
+
+def applied_versions(conn) -> set[str]:
+    metadata.create_all(conn)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def upgrade(engine) -> list[str]:
+    """
+    Applies every pending migration in order, each in its own transaction.
+    Returns the versions that were applied.
+    """
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+
+    applied = []
+    for version in discover():
+        if version in done:
+            continue
+        module = importlib.import_module(f"app.migrations.{version}")
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.utcnow()))
+        logger.info("Applied migration %s", version)
+        applied.append(version)
+    return applied
+
+
+# ----------------- HELPERS FOR MIGRATIONS -----------------
+
+def create_table(conn, table: Table):
+    """
+    Creates a Table (and its indexes) unless it exists; missing indexes
+    are still added to an existing table.
+    """
+    table.create(conn, checkfirst=True)
+    for index in table.indexes:
+        create_index(conn, index)
+
+
+def create_index(conn, index):
+    """
+    Creates a sqlalchemy Index unless an index with that name exists.
+    """
+    existing = {ix["name"] for ix in inspect(conn).get_indexes(index.table.name)}
+    if index.name not in existing:
+        index.create(conn)
+
+
+def add_column(conn, table_name: str, column: Column):
+    existing = {col["name"] for col in inspect(conn).get_columns(table_name)}
+    if column.name in existing:
+        return
+    column_type = column.type.compile(dialect=conn.dialect)
+    conn.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}")
@@ -0,0 +1,127 @@
+"""
+Connection pool telemetry.
+InstrumentedQueuePool times every checkout and counts in-use connections,
+overflow hits, timeouts and disconnects. `+=` on an attribute is not
+atomic across threads, so every update takes PoolStats.lock (held for a
+few increments, next to a checkout that already takes the pool's lock).
+"""
+
+import threading
+from time import perf_counter
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+# Checkout wait buckets in seconds (Prometheus-style, cumulative on export)
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+
+class PoolStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.overflow_hits = 0
+        self.timeouts = 0
+        self.disconnects = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+
+    def record_wait(self, seconds: float):
+        with self.lock:
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+
+    def bump(self, counter: str):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def checked_out(self):
+        with self.lock:
+            self.checkouts += 1
+            self.in_use += 1
+            if self.in_use > self.max_in_use:
+                self.max_in_use = self.in_use
+
+    def checked_in(self):
+        with self.lock:
+            self.in_use -= 1
+
+    def snapshot(self, pool=None) -> dict:
+        with self.lock:
+            data = self._counters()
+        # the pool's own numbers are read outside our lock (it has its own)
+        if isinstance(pool, QueuePool):
+            data.update(size=pool.size(), overflow=max(pool.overflow(), 0), idle=pool.checkedin())
+        return data
+
+    def _counters(self) -> dict:
+        return {
+            "name": self.name,
+            "checkouts": self.checkouts,
+            "in_use": self.in_use,
+            "max_in_use": self.max_in_use,
+            "overflow_hits": self.overflow_hits,
+            "timeouts": self.timeouts,
+            "disconnects": self.disconnects,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "wait_buckets": dict(zip((str(b) for b in WAIT_BUCKETS), self.wait_buckets)),
+        }
+
+
+class InstrumentedQueuePool(QueuePool):
+    stats: PoolStats
+
+    def connect(self):
+        start = perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.stats.bump("timeouts")
+            raise
+        finally:
+            self.stats.record_wait(perf_counter() - start)
+        if self.checkedout() > self.size():
+            self.stats.bump("overflow_hits")
+        return conn
+
+    def recreate(self):
+        # Pool is rebuilt after dispose / disconnect; keep the counters
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+
+def instrument(engine, name: str) -> PoolStats:
+    """
+    Attaches stats to the engine's pool plus checkout/checkin/error hooks.
+    """
+    stats = PoolStats(name)
+    engine.pool.stats = stats
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_conn, record, proxy):
+        stats.checked_out()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_conn, record):
+        stats.checked_in()
+
+    @event.listens_for(engine, "handle_error")
+    def on_error(context):
+        # Pessimistic check: no ping per checkout, but a dropped connection
+        # invalidates the whole pool so stale siblings are not reused
+        if context.is_disconnect:
+            stats.bump("disconnects")
+            context.invalidate_pool_on_disconnect = True
+
+    return stats
@@ -0,0 +1,197 @@
+"""
+Production profiling without a redeploy.
+- SamplingProfiler: samples every thread's stack (event loop included)
+  with sys._current_frames, output is collapsed stacks for flamegraph.pl
+  / speedscope.
+- Per-request cProfile when the request carries "X-Profile: <token>" and
+  the token is in PROFILE_TOKENS. Hooks are only installed when tokens are
+  configured, so nothing runs on the request path otherwise.
+"""
+
+import asyncio
+import cProfile
+import hmac
+import io
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+
+MAX_SAMPLE_SECONDS = 60
+KEPT_REQUEST_PROFILES = 50
+
+
+class SamplingProfiler:
+    """
+    One session at a time; run() blocks the calling thread for `seconds`
+    and skips that thread while sampling.
+    """
+    def __init__(self, interval: float = 0.005, max_depth: int = 128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def run(self, seconds: float, interval: float | None = None) -> tuple[Counter, int]:
+        """
+        Returns ({collapsed stack: hits}, number of sampling rounds).
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profiling session is already running")
+        try:
+            return self._sample(seconds, interval or self.interval)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, interval: float) -> tuple[Counter, int]:
+        me = threading.get_ident()
+        stacks = Counter()
+        samples = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    stacks[self._collapse(names.get(ident, str(ident)), frame)] += 1
+            samples += 1
+            time.sleep(interval)
+        return stacks, samples
+
+    def _collapse(self, thread_name: str, frame) -> str:
+        parts = []
+        while frame is not None and len(parts) < self.max_depth:
+            code = frame.f_code
+            parts.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}:{code.co_firstlineno}")
+            frame = frame.f_back
+        parts.append(thread_name.replace(";", "_"))
+        return ";".join(reversed(parts))
+
+
+def collapsed(stacks: Counter) -> str:
+    """
+    "thread;module:func:line;... count" lines, heaviest first.
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+sampler = SamplingProfiler()
+
+
+# ----------------- PER-REQUEST cPROFILE -----------------
+
+# Profiles taken for the current request: one for the loop, one per worker call
+_request_profiles: ContextVar[list | None] = ContextVar("request_profiles", default=None)
+_reports: OrderedDict[str, str] = OrderedDict()
+_ids = itertools.count(1)
+
+
+def token_allowed(token: str | None, tokens: list[str] | None = None) -> bool:
+    tokens = settings.PROFILE_TOKENS if tokens is None else tokens
+    return bool(token) and any(hmac.compare_digest(token, t) for t in tokens)
+
+
+def profile_report(profiles: list, limit: int = 60) -> str:
+    out = io.StringIO()
+    stats = pstats.Stats(profiles[0], stream=out)
+    for profile in profiles[1:]:
+        stats.add(profile)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def get_request_profile(profile_id: str) -> str | None:
+    return _reports.get(profile_id)
+
+
+class ProfileMiddleware:
+    """
+    Profiles the request's event-loop work; a sync endpoint runs in a
+    threadpool worker and gets its own profile from the route wrapper.
+    Other coroutines interleaving on the loop show up in the loop profile.
+    The loop has one profile at a time: a second X-Profile request while
+    one is running gets 409 instead of mixing into (or breaking) it.
+    The report is fetched from /debug/profile/requests/{X-Profile-Id}.
+    """
+    def __init__(self, app, tokens: list[str]):
+        self.app = app
+        self.tokens = tokens
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = next((v.decode() for k, v in scope["headers"] if k == b"x-profile"), None)
+        if not token_allowed(token, self.tokens):
+            await self.app(scope, receive, send)
+            return
+
+        if not self._lock.acquire(blocking=False):
+            busy = JSONResponse({"detail": "Another request is being profiled"}, status_code=409)
+            await busy(scope, receive, send)
+            return
+
+        profile_id = f"{os.getpid()}-{next(_ids)}"
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        loop_profile = cProfile.Profile()
+        profiles = [loop_profile]
+        reset = _request_profiles.set(profiles)
+        loop_profile.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            loop_profile.disable()
+            _request_profiles.reset(reset)
+            self._lock.release()
+            _reports[profile_id] = profile_report(profiles)
+            while len(_reports) > KEPT_REQUEST_PROFILES:
+                _reports.popitem(last=False)
+
+
+def _profiled(call):
+    def wrapper(*args, **kwargs):
+        profiles = _request_profiles.get()
+        if profiles is None:
+            return call(*args, **kwargs)
+        # cProfile state is per profiler, so the worker thread gets its own
+        profile = cProfile.Profile()
+        profiles.append(profile)
+        profile.enable()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            profile.disable()
+    return wrapper
+
+
+def install_profiling(app, app_settings=None):
+    """
+    Adds the X-Profile hooks to an app whose routes are already included.
+    No-op unless PROFILE_TOKENS is set (in app_settings, else the global settings).
+    """
+    tokens = (app_settings or settings).PROFILE_TOKENS
+    if not tokens:
+        return False
+    for route in app.routes:
+        # async endpoints run on the loop, already inside the middleware's profile
+        if isinstance(route, APIRoute) and not asyncio.iscoroutinefunction(route.dependant.call):
+            route.dependant.call = _profiled(route.dependant.call)
+    app.add_middleware(ProfileMiddleware, tokens=tokens)
+    return True
@@ -3,8 +3,6 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 
 # oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 security = HTTPBearer()
@@ -13,25 +11,46 @@ SECRET_KEY = "supersecretkey"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto"
-)
+# passlib + its bcrypt backend and jose are imported on first use (or by
+# the warm-up hook), not when the app is imported
+_pwd_context = None
+
+
+def password_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto"
+        )
+        context.handler("bcrypt").get_backend()  # loads the bcrypt backend now, not on the first hash
+        _pwd_context = context
+    return _pwd_context
+
+
+def load():
+    """
+    Warm-up hook: password hashing and JWT libraries.
+    """
+    password_context()
+    from jose import jwt  # noqa: F401
 
 
 def get_password_hash(password: str) -> str:
     # 🔒 bcrypt limit safety
     # if len(password.encode("utf-8")) > 72:
     #     password = password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
-     return pwd_context.hash(password[:72])
+     return password_context().hash(password[:72])
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     # if len(plain_password.encode("utf-8")) > 72:
     #     plain_password = plain_password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
-    return pwd_context.verify(plain_password[:72], hashed_password)
+    return password_context().verify(plain_password[:72], hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
@@ -39,6 +58,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 
 def decode_access_token(token: str):
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
@@ -52,4 +72,21 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     payload = decode_access_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    return payload
\ No newline at end of file
+    return payload
+
+
+# ----------------- STAFF ROLES -----------------
+# users.role ADMIN / ANALYST (set by promote_user.py, never by signup) log
+# in as role "user" with an extra "staff" claim
+STAFF_ROLES = {"ADMIN": "admin", "ANALYST": "analyst"}
+
+
+def require_staff(*staff: str):
+    def dependency(user=Depends(get_current_user)):
+        if user.get("staff") not in staff:
+            raise HTTPException(status_code=403, detail="Not allowed for this account")
+        return user
+    return dependency
+
+
+require_admin = require_staff("admin")
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Region shards for the geo data the matching loop and the heatmap scan.
+- REGION_SHARDS: name=url pairs, one database (or schema) per region
+- REGION_MAP: geohash prefix=shard name, longest prefix wins, anything
+  unmapped goes to REGION_DEFAULT_SHARD
+Accounts, alerts and assignments stay on the primary with their ids; the
+shards hold region partitions of volunteer positions and heat points
+(app/models/region_point.py), kept by app/services/region_service.py.
+With no REGION_SHARDS the router is disabled and the primary is read as before.
+"""
+
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+
+from app.core.config import settings
+from app.core.database import build_engine
+from app.utils import geohash
+from app.utils.geo import bounding_box
+
+# Base for the tables that live in region shards (not on the primary)
+RegionBase = declarative_base()
+
+# Points are stored with their cell at this precision (~1.2 km), so a map
+# prefix can be up to this long and rebalancing never re-reads lat/lng
+CELL_PRECISION = 6
+
+# A radius covering more cells than this just asks every shard
+MAX_COVER_CELLS = 256
+
+
+def covering_cells(bbox, precision: int) -> list[str] | None:
+    """
+    Geohash cells at `precision` that intersect a (min_lat, max_lat,
+    min_lng, max_lng) box, None if there are more than MAX_COVER_CELLS.
+    """
+    min_lat, max_lat, min_lng, max_lng = bbox
+    lat_bits, lng_bits = geohash.grid_bits(precision)
+
+    def index(value, low, span, bits):
+        return min(max(int((value - low) / span * (1 << bits)), 0), (1 << bits) - 1)
+
+    rows = range(index(min_lat, -90, 180, lat_bits), index(max_lat, -90, 180, lat_bits) + 1)
+    cols = range(index(min_lng, -180, 360, lng_bits), index(max_lng, -180, 360, lng_bits) + 1)
+    if len(rows) * len(cols) > MAX_COVER_CELLS:
+        return None
+    return [geohash.encode_cell(row, col, precision) for row in rows for col in cols]
+
+
+class RegionRouter:
+    """
+    Maps coordinates to shards.
+    - shard_for(lat, lng): the home shard of a point
+    - shards_for_radius(): home shard first, then every other shard the
+      radius reaches into (an SOS near a region boundary)
+    """
+    def __init__(self, engines: dict, regions: dict, default: str | None = None):
+        self.engines = dict(engines)
+        self.regions = {}
+        for prefix, name in regions.items():
+            prefix = prefix.strip().lower()
+            if not geohash.is_valid(prefix) or len(prefix) > CELL_PRECISION:
+                raise ValueError(f"Region '{prefix}' must be a geohash of at most {CELL_PRECISION} characters")
+            if name not in self.engines:
+                raise ValueError(f"Region '{prefix}' points at unknown shard '{name}'")
+            self.regions[prefix] = name
+        self.default = default or next(iter(self.engines), None)
+        if self.engines and self.default not in self.engines:
+            raise ValueError(f"Unknown default shard '{self.default}'")
+        self.precision = max(map(len, self.regions), default=1)
+        self._sessions = {name: sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                          for name, engine in self.engines.items()}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.engines)
+
+    def shard_for_cell(self, cell: str) -> str:
+        for length in range(min(len(cell), self.precision), 0, -1):
+            name = self.regions.get(cell[:length])
+            if name is not None:
+                return name
+        return self.default
+
+    def shard_for(self, lat: float, lng: float) -> str:
+        return self.shard_for_cell(geohash.encode(lat, lng, self.precision))
+
+    def shards_for_radius(self, lat: float, lng: float, radius_km: float) -> list[str]:
+        home = self.shard_for(lat, lng)
+        cells = covering_cells(bounding_box(lat, lng, radius_km), self.precision)
+        others = set(self.engines) if cells is None else {self.shard_for_cell(cell) for cell in cells}
+        return [home] + sorted(others - {home})
+
+    def session(self, name: str) -> Session:
+        return self._sessions[name]()
+
+    def create_tables(self):
+        from app.models import region_point  # registers the tables on RegionBase
+        for engine in self.engines.values():
+            RegionBase.metadata.create_all(bind=engine)
+
+
+region_router = RegionRouter(
+    {name: build_engine(url, settings.DB_POOL_PROFILE, name=f"region-{name}")
+     for name, url in settings.REGION_SHARDS.items()},
+    settings.REGION_MAP,
+    settings.REGION_DEFAULT_SHARD,
+)
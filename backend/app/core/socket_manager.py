@@ -1,33 +1,115 @@
+"""
+ConnectionManager: the legacy per-id socket API, now a thin facade over
+the realtime gateway. send_to_user / send_to_volunteer publish to the
+user:<id> / volunteer:<id> topics, so they reach the legacy sockets,
+multiplexed /ws connections and socket.io clients alike.
+A socket that offers the wire.SUBPROTOCOL gets live location as binary
+frames, everything else stays JSON.
+"""
+
+import json
+import time
 from typing import Dict
 from fastapi import WebSocket
+from app.core.gateway import gateway, LocationBatch, WebSocketConnection, user_topic, volunteer_topic
+from app.core.metrics import registry, ws_messages_received
+from app.core.tracing import current_span, span, record_ack
+from app.utils import wire
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_users: Dict[int, WebSocket] = {}
-        self.active_volunteers: Dict[int, WebSocket] = {}
+    def __init__(self, gateway):
+        self.gateway = gateway
+        self.active_users: Dict[int, WebSocketConnection] = {}
+        self.active_volunteers: Dict[int, WebSocketConnection] = {}
+
+    async def connect_user(self, user_id: int, websocket: WebSocket) -> WebSocketConnection:
+        conn = await self._accept(websocket, "user")
+        return await self._attach(self.active_users, user_id, conn, user_topic(user_id))
+
+    async def connect_volunteer(self, volunteer_id: int, websocket: WebSocket) -> WebSocketConnection:
+        conn = await self._accept(websocket, "volunteer")
+        return await self._attach(self.active_volunteers, volunteer_id, conn, volunteer_topic(volunteer_id))
 
-    async def connect_user(self, user_id: int, websocket: WebSocket):
-        await websocket.accept()
-        self.active_users[user_id] = websocket
+    async def _accept(self, websocket: WebSocket, kind: str) -> WebSocketConnection:
+        subprotocol = wire.negotiate(websocket.scope.get("subprotocols"))
+        await websocket.accept(subprotocol=subprotocol)
+        return WebSocketConnection(websocket, kind, envelope=False, binary=subprotocol is not None)
 
-    async def connect_volunteer(self, volunteer_id: int, websocket: WebSocket):
-        await websocket.accept()
-        self.active_volunteers[volunteer_id] = websocket
+    async def _attach(self, registry_: dict, key: int, conn: WebSocketConnection, topic: str) -> WebSocketConnection:
+        """
+        A reconnect replaces the old socket for the same id: the swap has no
+        await in it, so no send can see neither or both, then the old socket
+        is closed instead of being left open.
+        """
+        old = registry_.get(key)
+        if old is not None:
+            self.gateway.unregister(old)
+        registry_[key] = self.gateway.register(conn, [topic])
+        if old is not None:
+            await old.close()
+        return conn
 
-    def disconnect_user(self, user_id: int):
-        self.active_users.pop(user_id, None)
+    def disconnect_user(self, user_id: int, conn: WebSocketConnection | None = None):
+        self._detach(self.active_users, user_id, conn)
 
-    def disconnect_volunteer(self, volunteer_id: int):
-        self.active_volunteers.pop(volunteer_id, None)
+    def disconnect_volunteer(self, volunteer_id: int, conn: WebSocketConnection | None = None):
+        self._detach(self.active_volunteers, volunteer_id, conn)
+
+    def _detach(self, registry_: dict, key: int, conn: WebSocketConnection | None):
+        # a replaced socket disconnecting late must not drop its replacement
+        current = registry_.get(key)
+        if conn is not None and current is not conn:
+            self.gateway.unregister(conn)
+            return
+        registry_.pop(key, None)
+        if current is not None:
+            self.gateway.unregister(current)
 
     async def send_to_user(self, user_id: int, data: dict):
-        ws = self.active_users.get(user_id)
-        if ws:
-            await ws.send_json(data)
+        await self.gateway.publish(user_topic(user_id), data)
 
     async def send_to_volunteer(self, volunteer_id: int, data: dict):
-        ws = self.active_volunteers.get(volunteer_id)
-        if ws:
-            await ws.send_json(data)
+        topic = volunteer_topic(volunteer_id)
+        if current_span() is None:
+            await self.gateway.publish(topic, data)
+            return
+
+        # Inside a trace: the payload carries the context so the client can ACK it
+        with span("ws.send_to_volunteer", volunteer_id=volunteer_id) as s:
+            delivered = await self.gateway.publish(
+                topic, {**data, "trace": {"traceparent": s.traceparent, "sent_at": time.time_ns() / 1e6}}
+            )
+            s.set(delivered=delivered)
+
+    async def send_location(self, volunteer_ids, batch: LocationBatch):
+        """
+        One LocationBatch for every volunteer: JSON and binary are each
+        encoded once however many volunteers get it.
+        """
+        for volunteer_id in volunteer_ids:
+            await self.gateway.publish(volunteer_topic(volunteer_id), batch)
+
+    def message_received(self, kind: str, text: str | None = None, **attributes):
+        """
+        Counts an incoming message; an ACK {"type": "ACK", "trace": {...}}
+        echoing a traced payload's context closes that trace.
+        """
+        ws_messages_received.inc(kind)
+        if not text or '"ACK"' not in text:
+            return
+        try:
+            message = json.loads(text)
+            trace = message["trace"]
+            record_ack(trace["traceparent"], trace["sent_at"], kind=kind, **attributes)
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    def connection_counts(self) -> dict:
+        return self.gateway.counts()
+
+    def online_volunteers(self, ids=None) -> dict[str, float]:
+        return self.gateway.presence("volunteer", ids)
+
+manager = ConnectionManager(gateway)
 
-manager = ConnectionManager()
+registry.gauge("ws_connections", "Open WebSocket connections", ("kind",), collect=manager.connection_counts)
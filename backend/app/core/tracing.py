@@ -0,0 +1,276 @@
+"""
+Lightweight span tracing for the SOS dispatch path.
+Spans nest through a ContextVar, finished spans go to an in-memory ring
+buffer (and to an OTLP/JSON lines file when TRACE_EXPORT_PATH is set).
+Trace context crosses to the volunteer's socket as a W3C traceparent,
+the client ACK closes the loop.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger("silent_shield.tracing")
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None = None,
+                 start_ns: int | None = None, attributes: dict | None = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self, end_ns: int | None = None):
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+            _record(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": self.start_ns / 1e6,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_finished: deque = deque(maxlen=settings.TRACE_BUFFER_SIZE)  # append is thread-safe
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """
+    "00-<trace_id>-<span_id>-<flags>" -> (trace_id, span_id)
+    """
+    parts = (value or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+def start_span(name: str, parent: Span | str | None = None, start_ns: int | None = None, **attributes) -> Span:
+    """
+    Starts a span without making it current (end it yourself).
+    parent: a Span, a traceparent string, or None for the current span.
+    """
+    if parent is None:
+        parent = _current.get()
+    if isinstance(parent, str):
+        parent = parse_traceparent(parent)
+        trace_id, parent_id = parent if parent else (os.urandom(16).hex(), None)
+    elif parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_id = os.urandom(16).hex(), None
+    return Span(name, trace_id, parent_id, start_ns, attributes)
+
+
+@contextmanager
+def span(name: str, parent: Span | str | None = None, start_ns: int | None = None, **attributes):
+    """
+    with span("create_alert", alert_level="red") as s: ...
+    """
+    s = start_span(name, parent, start_ns, **attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as exc:
+        s.error = type(exc).__name__
+        raise
+    finally:
+        _current.reset(token)
+        s.end()
+
+
+def record_ack(traceparent: str, sent_at_ms: float, **attributes):
+    """
+    Client ACK for a message sent with trace context.
+    The span runs from the server-side send time echoed back by the client.
+    """
+    if not parse_traceparent(traceparent):
+        return None
+    ack = start_span("volunteer.ack", parent=traceparent, start_ns=int(float(sent_at_ms) * 1e6), **attributes)
+    ack.end()
+    return ack
+
+
+# ----------------- STORAGE / QUERY -----------------
+
+def _record(s: Span):
+    _finished.append(s)
+    if _exporter is not None:
+        _exporter.put(s)
+
+
+def traces() -> dict[str, list[Span]]:
+    grouped = {}
+    for s in list(_finished):
+        grouped.setdefault(s.trace_id, []).append(s)
+    return grouped
+
+
+def slowest_traces(limit: int = 10, name: str | None = None) -> list[dict]:
+    """
+    Traces in the buffer ranked by wall time from first span start to last
+    span end (for an SOS: POST arrival -> volunteer ACK).
+    """
+    summaries = []
+    for trace_id, spans in traces().items():
+        ids = {s.span_id for s in spans}
+        roots = [s for s in spans if s.parent_id not in ids]
+        root = min(roots, key=lambda s: s.start_ns)
+        if name and root.name != name:
+            continue
+        start = min(s.start_ns for s in spans)
+        end = max(s.end_ns for s in spans)
+        summaries.append({
+            "trace_id": trace_id,
+            "root": root.name,
+            "duration_ms": round((end - start) / 1e6, 3),
+            "acked": any(s.name == "volunteer.ack" for s in spans),
+            "spans": [s.to_dict() for s in sorted(spans, key=lambda s: s.start_ns)],
+        })
+    summaries.sort(key=lambda t: t["duration_ms"], reverse=True)
+    return summaries[:limit]
+
+
+def request_start_ns(request) -> int | None:
+    """
+    When the request hit the outermost middleware (before body parsing
+    and threadpool wait), so root spans measure from real arrival.
+    """
+    return getattr(request.state, "received_ns", None)
+
+
+def clear():
+    _finished.clear()
+
+
+# ----------------- OTLP FILE EXPORT -----------------
+
+class OTLPFileExporter:
+    """
+    Writes ExportTraceServiceRequest JSON, one batch per line (what the
+    collector's otlpjsonfile receiver reads). A daemon thread does the
+    file I/O so request threads only do a queue put.
+    """
+    def __init__(self, path: str, service_name: str = "silent-shield", max_batch: int = 512):
+        self.path = path
+        self.service_name = service_name
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        threading.Thread(target=self._run, name="otlp-exporter", daemon=True).start()
+
+    def put(self, s: Span):
+        self._queue.put(s)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write(batch)
+            except OSError:
+                logger.exception("trace export failed", extra={"path": self.path, "spans": len(batch)})
+
+    def write(self, batch: list[Span]):
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "silent_shield"}, "spans": [s.to_otlp() for s in batch]}],
+        }]}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload) + "\n")
+
+
+_exporter = OTLPFileExporter(settings.TRACE_EXPORT_PATH) if settings.TRACE_EXPORT_PATH else None
+
+
+# ----------------- DB COMMITS -----------------
+
+def instrument_commits(session_cls=Session):
+    """
+    A "db.commit" span for every commit made while a trace is active.
+    """
+    @event.listens_for(session_cls, "before_commit")
+    def before(session):
+        if _current.get() is not None:
+            session.info["commit_span"] = start_span("db.commit")
+
+    def finish(session):
+        s = session.info.pop("commit_span", None)
+        if s is not None:
+            s.end()
+
+    event.listen(session_cls, "after_commit", finish)
+
+    @event.listens_for(session_cls, "after_rollback")
+    def rolled_back(session):
+        s = session.info.get("commit_span")
+        if s is not None:
+            s.error = "rollback"
+        finish(session)
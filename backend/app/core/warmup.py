@@ -0,0 +1,66 @@
+"""
+Warm-up after startup: subsystems that are loaded lazily (password hashing,
+JWT, reverse geocoder, area subscription index, socket.io) are loaded here
+in the background, so a new worker starts serving at once and the first
+requests don't pay for them.
+GET /ready reports 503 until every step has run (a failing step is logged
+and reported, the subsystem then loads on first use as before).
+"""
+
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("silent_shield.warmup")
+
+
+class WarmUp:
+    def __init__(self):
+        self.steps = []  # (name, blocking callable)
+        self.timings = {}  # step -> ms
+        self.errors = {}  # step -> message
+        self.started_at = None
+        self.finished_at = None
+        self._task = None
+
+    def add(self, name: str, fn):
+        self.steps.append((name, fn))
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None
+
+    async def run(self):
+        """
+        Steps run one after the other, each in a thread (they block on
+        imports, file I/O or the DB), the event loop keeps serving.
+        """
+        loop = asyncio.get_running_loop()
+        self.started_at = time.time()
+        for name, fn in self.steps:
+            start = time.perf_counter()
+            try:
+                await loop.run_in_executor(None, fn)
+            except Exception as exc:
+                self.errors[name] = f"{type(exc).__name__}: {exc}"
+                logger.exception("warm-up step failed", extra={"step": name})
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+        self.finished_at = time.time()
+        logger.info("warm-up done", extra={"ms": round((self.finished_at - self.started_at) * 1000, 1)})
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "steps": {name: {"ms": self.timings.get(name), "error": self.errors.get(name)}
+                      for name, _ in self.steps},
+            "seconds": round(self.finished_at - self.started_at, 3) if self.ready else None,
+        }
@@ -1,69 +1,195 @@
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import socket
-from fastapi import FastAPI
-from fastapi.security import OAuth2PasswordBearer
-
-app = FastAPI()
+"""
+App factory: `uvicorn app.main:app` or `uvicorn app.main:create_app --factory`.
+`app` is built on first access, so --factory builds the app only once.
+Heavy subsystems (passlib / bcrypt, jose, requests, socket.io, geocoder,
+subscription index) load on first use or in the warm-up after startup,
+see app/core/warmup.py.
+"""
 
-#-----------------TOKEN AUTH SCHEME -----------------
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+import importlib.util
 
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.staticfiles import StaticFiles
 
 # ----------------- MIDDLEWARES -----------------
-
 from app.middlewares.auth_middleware import AuthMiddleware
 from app.middlewares.error_middleware import global_exception_handler
 from app.middlewares.rate_limit import RateLimitMiddleware
+from app.middlewares.upload_limit import UploadLimitMiddleware
+from app.middlewares.metrics_middleware import MetricsMiddleware
 
 # ----------------- ROUTERS -----------------
-from app.api.routes import auth, alerts, reports, volunteers, heatmap, ai, users
+from app.api.routes import auth, alerts, reports, volunteers, heatmap, ai, users, blobs, metrics, debug, subscriptions, exports, analytics, socket, location
 
 # ----------------- LOGGING -----------------
 from app.core.logging import logger
-
-# ----------------- CREATE APP -----------------
-app = FastAPI(title="Silent Shield", version="1.0")
-
-from fastapi.staticfiles import StaticFiles
-
-# Mount static folder
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-
-# ----------------- MIDDLEWARES -----------------
-# Global error handler
-app.add_exception_handler(Exception, global_exception_handler)
-
-# CORS Middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # ya frontend ka URL
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# JWT Auth Middleware
-# app.add_middleware(AuthMiddleware)
-
-# Rate limiting (optional but recommended)
-app.add_middleware(RateLimitMiddleware, max_requests=5, window_seconds=10)
-
-# ----------------- ROUTERS -----------------
-app.include_router(auth.router)
-app.include_router(alerts.router, prefix="/alerts", tags=["Alerts"])
-app.include_router(reports.router, prefix="/reports", tags=["Reports"])
-app.include_router(volunteers.router, prefix="/volunteers", tags=["Volunteers"])
-app.include_router(heatmap.router, prefix="/heatmap", tags=["Heatmap"])
-app.include_router(ai.router, prefix="/ai", tags=["AI"])
-app.include_router(users.router, prefix="/users", tags=["Users"])
-
-# ----------------- ROOT -----------------
-@app.get("/")
-def root():
-    return JSONResponse({"message": "Welcome to Silent Shield Backend!"})
-
-
-# ----------------- WEBSOCKETS -----------------
-app.include_router(socket.router)
\ No newline at end of file
+from app.core.config import Settings, settings as default_settings
+from app.core import security
+from app.core.warmup import WarmUp
+from app.core.cache import install_cache
+from app.utils.response import FastJSONResponse
+from app.services.upload_service import shutdown_image_pool
+from app.core.profiler import install_profiling
+from app.core.gateway import start_heartbeat, stop_heartbeat
+from app.services.subscription_service import warm_index
+from app.services import geocoder
+from app.services.outbox import start_relay, stop_relay
+from app.services.track_service import start_track_tasks, stop_track_tasks
+from app.core.database import SessionLocal
+
+
+class LazySocketIO:
+    """
+    socket.io ASGI app, imported on the first socket.io request or by the warm-up.
+    """
+    def __init__(self):
+        self.app = None
+
+    def load(self):
+        if self.app is None:
+            from app.socket import socket_app
+            from app.socket_events import location as socketio_handlers  # registers the handlers
+            self.app = socket_app
+        return self.app
+
+    async def __call__(self, scope, receive, send):
+        await self.load()(scope, receive, send)
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """
+    settings apply to what is wired here (middlewares, cache, warm-up,
+    profiling, the /debug token via app.state.settings); the DB engine,
+    JWT keys and services always use the global settings.
+    """
+    settings = settings or default_settings
+
+    # ----------------- CREATE APP -----------------
+    app = FastAPI(title="Silent Shield", version="1.0", default_response_class=FastJSONResponse)
+    app.state.settings = settings
+
+    # Mount static folder
+    app.mount("/static", StaticFiles(directory="app/static"), name="static")
+
+    # ----------------- MIDDLEWARES -----------------
+    # Global error handler
+    app.add_exception_handler(Exception, global_exception_handler)
+
+    # CORS Middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # ya frontend ka URL
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # JWT Auth Middleware
+    # app.add_middleware(AuthMiddleware)
+
+    # Rate limiting (optional but recommended); readiness probes are not limited
+    app.add_middleware(RateLimitMiddleware, max_requests=5, window_seconds=10, exempt_paths=["/ready"])
+
+    # Reject oversized ID photos before the multipart body is parsed
+    # (extra 64 KB covers the text form fields)
+    app.add_middleware(
+        UploadLimitMiddleware,
+        paths=["/volunteers/signup"],
+        max_bytes=settings.MAX_UPLOAD_BYTES + 64 * 1024,
+    )
+
+    # Added last = outermost, so latency covers every other middleware too
+    app.add_middleware(MetricsMiddleware)
+
+    app.add_event_handler("shutdown", shutdown_image_pool)
+
+    # WebSocket ping / stale connection reaper
+    app.add_event_handler("startup", start_heartbeat)
+    app.add_event_handler("shutdown", stop_heartbeat)
+
+    # Notification outbox relay (email / SMS / push), only if a channel is configured
+    async def start_outbox_relay():
+        await start_relay(SessionLocal)
+
+    app.add_event_handler("startup", start_outbox_relay)
+    app.add_event_handler("shutdown", stop_relay)
+
+    # Live location history: batched writes + compaction / archival of closed alerts
+    async def start_tracks():
+        await start_track_tasks(SessionLocal)
+
+    async def stop_tracks():
+        await stop_track_tasks(SessionLocal)
+
+    app.add_event_handler("startup", start_tracks)
+    app.add_event_handler("shutdown", stop_tracks)
+
+    # ----------------- ROUTERS -----------------
+    # Prefixes are set on each APIRouter already
+    app.include_router(auth.router)
+    app.include_router(alerts.router)
+    app.include_router(reports.router)
+    app.include_router(volunteers.router)
+    app.include_router(heatmap.router)
+    app.include_router(ai.router)
+    app.include_router(users.router)
+    app.include_router(blobs.router)
+    app.include_router(metrics.router)
+    app.include_router(debug.router)
+    app.include_router(subscriptions.router)
+    app.include_router(exports.router)
+    app.include_router(analytics.router)
+    app.include_router(location.router)
+
+    # ----------------- ROOT -----------------
+    @app.get("/")
+    def root():
+        return {"message": "Welcome to Silent Shield Backend!"}
+
+    # ----------------- WEBSOCKETS -----------------
+    # /ws (unified gateway) + legacy /ws/user/{id}, /ws/volunteer/{id} (same ?token=)
+    app.include_router(socket.router)
+
+    # socket.io clients join the same gateway (only if python-socketio is installed)
+    socketio_app = None
+    if importlib.util.find_spec("socketio") is not None:
+        socketio_app = LazySocketIO()
+        app.mount("/socket.io", socketio_app)
+
+    # Response cache for @cached routes (heatmap, /ai/panic, /users/me)
+    install_cache(app, settings)
+
+    # ----------------- WARM-UP / READINESS -----------------
+    warmup = WarmUp()
+    if settings.WARMUP_ENABLED:
+        warmup.add("security", security.load)
+        # Reverse geocoder (region ids on write): dataset + memory-mapped KD-tree
+        warmup.add("geocoder", geocoder.load)
+        # Area subscription index, so the first alert doesn't pay for it
+        warmup.add("subscriptions", lambda: warm_index(SessionLocal))
+        if socketio_app is not None:
+            warmup.add("socketio", socketio_app.load)
+    app.state.warmup = warmup
+
+    app.add_event_handler("startup", warmup.start)
+    app.add_event_handler("shutdown", warmup.stop)
+
+    @app.get("/ready", tags=["Health"])
+    def ready():
+        # for the load balancer: route traffic to this worker once it answers 200
+        return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+    # ----------------- PROFILING -----------------
+    # X-Profile hooks, only when PROFILE_TOKENS is set (needs the routes above)
+    install_profiling(app, settings)
+    return app
+
+
+def __getattr__(name):
+    # `uvicorn app.main:app` / `from app.main import app`: built on first access
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,58 @@
+"""
+Per-request instrumentation.
+Pure ASGI (no BaseHTTPMiddleware), so the body is not buffered and the
+overhead is a couple of timer calls per request.
+"""
+
+from time import perf_counter, time_ns
+
+from app.core.metrics import (
+    http_requests, http_latency, http_in_flight, http_response_size,
+    request_db_queries, request_db_time, request_db_stats,
+)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def counting_send(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        # Arrival time for root trace spans (request.state.received_ns)
+        scope.setdefault("state", {})["received_ns"] = time_ns()
+
+        db_stats = [0, 0.0]
+        token = request_db_stats.set(db_stats)
+        http_in_flight.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, counting_send)
+        finally:
+            elapsed = perf_counter() - start
+            http_in_flight.dec()
+            request_db_stats.reset(token)
+
+            # Route template keeps label cardinality low (/alerts/{alert_id}/resolve)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+
+            http_requests.inc(method, path, status)
+            http_latency.observe(elapsed, method, path)
+            http_response_size.observe(size, path)
+            request_db_queries.observe(db_stats[0], path)
+            request_db_time.observe(db_stats[1], path)
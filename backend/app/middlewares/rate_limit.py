@@ -11,14 +11,19 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     """
     Limits requests per IP.
     Example: max 5 requests per 10 seconds
+    exempt_paths: never limited (health / readiness probes)
     """
-    def __init__(self, app, max_requests: int = 5, window_seconds: int = 10):
+    def __init__(self, app, max_requests: int = 5, window_seconds: int = 10, exempt_paths=()):
         super().__init__(app)
         self.max_requests = max_requests
         self.window_seconds = window_seconds
+        self.exempt_paths = set(exempt_paths)
         self.requests = {}  # {ip: [timestamps]}
 
     async def dispatch(self, request: Request, call_next):
+        if request.url.path in self.exempt_paths:
+            return await call_next(request)
+
         client_ip = request.client.host
 
         now = time.time()
@@ -0,0 +1,59 @@
+"""
+Request body size limit for upload routes.
+Pure ASGI middleware, so oversized bodies are rejected before
+they are parsed or spooled to disk.
+"""
+
+from starlette.responses import JSONResponse
+
+
+class UploadLimitMiddleware:
+    """
+    Rejects bodies bigger than max_bytes on the given path prefixes.
+    Content-Length is checked up front; chunked bodies are counted
+    while they stream in and cut off as soon as they cross the limit.
+    """
+    def __init__(self, app, paths: list[str], max_bytes: int):
+        self.app = app
+        self.paths = tuple(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        too_large = JSONResponse(
+            {"detail": f"Upload exceeds {self.max_bytes} bytes"}, status_code=413
+        )
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if int(value) > self.max_bytes:
+                    await too_large(scope, receive, send)
+                    return
+                break
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    rejected = True
+                    await too_large(scope, receive, send)
+                    # Downstream parser sees a disconnect and stops reading
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            # Response already sent by us, drop whatever the route tries to send
+            if not rejected:
+                await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
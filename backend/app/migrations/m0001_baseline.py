@@ -0,0 +1,108 @@
+"""
+Baseline: the tables as they were before migrations existed.
+Existing tables are left alone (checkfirst); later columns and indexes
+come from later migrations.
+"""
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, Enum, Float, ForeignKey, Integer, MetaData, String, Table,
+)
+
+from app.core.migrations import create_table
+
+metadata = MetaData()
+
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("full_name", String(100), nullable=False),
+    Column("email", String(100), unique=True, index=True, nullable=False),
+    Column("hashed_password", String),
+    Column("role", Enum("USER", "VOLUNTEER"), nullable=False),
+    Column("is_active", Boolean),
+)
+
+volunteers = Table(
+    "volunteers", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("full_name", String(255), nullable=False),
+    Column("email", String(100), unique=True, index=True),
+    Column("phone", String(20), nullable=True),
+    Column("city", String(100), nullable=True),
+    Column("id_photo", String(255), nullable=True),
+    Column("is_active", Boolean),
+    Column("password", String(255), nullable=False),
+    Column("is_verified", Boolean),
+    Column("latitude", Float, nullable=True),
+    Column("longitude", Float, nullable=True),
+)
+
+alerts = Table(
+    "alerts", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("code", String(50), nullable=False),
+    Column("message", String(255)),
+    Column("emergency_level", String(10), nullable=False),
+    Column("emergency_type", String(50), nullable=False),
+    Column("panic_level", Integer),
+    Column("status", String(20)),
+    Column("latitude", Float, nullable=False),
+    Column("longitude", Float, nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+    Column("resolved_at", DateTime, nullable=True),
+    Column("created_at", DateTime),
+)
+
+alert_volunteers = Table(
+    "alert_volunteers", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("alert_id", Integer, ForeignKey("alerts.id", ondelete="CASCADE")),
+    Column("volunteer_id", Integer, ForeignKey("volunteers.id", ondelete="CASCADE")),
+    Column("status", String(20)),
+    Column("accepted_at", DateTime),
+)
+
+reports = Table(
+    "reports", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("description", String(255), nullable=False),
+    Column("risk_level", String(20), nullable=False),
+    Column("latitude", Float, nullable=False),
+    Column("longitude", Float, nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+)
+
+live_locations = Table(
+    "live_locations", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("alert_id", Integer, ForeignKey("alerts.id")),
+    Column("user_lat", Float),
+    Column("user_lng", Float),
+    Column("volunteer_lat", Float, nullable=True),
+    Column("volunteer_lng", Float, nullable=True),
+    Column("timestamp", DateTime),
+)
+
+trusted_contacts = Table(
+    "trusted_contacts", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id")),
+    Column("name", String(100)),
+    Column("phone", String(20)),
+    Column("email", String(100)),
+    Column("relation", String(50)),
+)
+
+stored_blobs = Table(
+    "stored_blobs", metadata,
+    Column("sha256", String(64), primary_key=True),
+    Column("size", Integer, nullable=False),
+    Column("content_type", String(50), nullable=False),
+    Column("ref_count", Integer, nullable=False),
+    Column("created_at", DateTime),
+)
+
+
+def upgrade(conn):
+    for table in metadata.sorted_tables:
+        create_table(conn, table)
@@ -0,0 +1,41 @@
+"""
+Composite indexes for the hot filters in the alerts, volunteers
+and location routes, plus the keyset listing indexes.
+"""
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, MetaData, String, Table
+
+from app.core.migrations import create_index
+
+# only the columns the indexes use
+metadata = MetaData()
+alerts = Table("alerts", metadata, Column("id", Integer), Column("status", String(20)),
+               Column("emergency_level", String(10)), Column("created_at", DateTime),
+               Column("user_id", Integer))
+alert_volunteers = Table("alert_volunteers", metadata, Column("alert_id", Integer),
+                         Column("volunteer_id", Integer), Column("status", String(20)))
+volunteers = Table("volunteers", metadata, Column("is_verified", Boolean),
+                   Column("latitude", Float), Column("longitude", Float))
+live_locations = Table("live_locations", metadata, Column("alert_id", Integer), Column("timestamp", DateTime))
+reports = Table("reports", metadata, Column("id", Integer), Column("risk_level", String(20)))
+users = Table("users", metadata, Column("id", Integer), Column("role", String(20)))
+
+INDEXES = [
+    # admin listing: filter by status/level, newest first
+    Index("ix_alerts_status_created", alerts.c.status, alerts.c.created_at, alerts.c.id),
+    Index("ix_alerts_level_created", alerts.c.emergency_level, alerts.c.created_at, alerts.c.id),
+    Index("ix_alerts_created", alerts.c.created_at, alerts.c.id),
+    # create_alert: one active alert per user
+    Index("ix_alerts_user_status", alerts.c.user_id, alerts.c.status),
+    Index("ix_alert_volunteers_alert_volunteer", alert_volunteers.c.alert_id, alert_volunteers.c.volunteer_id),
+    Index("ix_alert_volunteers_alert_status", alert_volunteers.c.alert_id, alert_volunteers.c.status),
+    Index("ix_volunteers_verified_location", volunteers.c.is_verified, volunteers.c.latitude, volunteers.c.longitude),
+    Index("ix_live_locations_alert_timestamp", live_locations.c.alert_id, live_locations.c.timestamp),
+    Index("ix_reports_risk_level_id", reports.c.risk_level, reports.c.id),
+    Index("ix_users_role_id", users.c.role, users.c.id),
+]
+
+
+def upgrade(conn):
+    for index in INDEXES:
+        create_index(conn, index)
@@ -0,0 +1,33 @@
+"""
+area_subscriptions table for geofenced alert subscriptions.
+"""
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, MetaData, String, Table, Text
+
+from app.core.migrations import create_table
+
+metadata = MetaData()
+
+area_subscriptions = Table(
+    "area_subscriptions", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("owner_role", String(20), nullable=False),
+    Column("owner_id", Integer, nullable=False),
+    Column("name", String(100)),
+    Column("shape", String(10), nullable=False),
+    Column("center_lat", Float),
+    Column("center_lng", Float),
+    Column("radius_km", Float),
+    Column("polygon", Text),
+    Column("min_lat", Float, nullable=False),
+    Column("max_lat", Float, nullable=False),
+    Column("min_lng", Float, nullable=False),
+    Column("max_lng", Float, nullable=False),
+    Column("active", Boolean, nullable=False),
+    Column("created_at", DateTime),
+    Index("ix_area_subscriptions_owner", "owner_role", "owner_id"),
+)
+
+
+def upgrade(conn):
+    create_table(conn, area_subscriptions)
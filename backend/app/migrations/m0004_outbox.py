@@ -0,0 +1,34 @@
+"""
+outbox_messages table for the notification outbox.
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text
+
+from app.core.migrations import create_table
+
+metadata = MetaData()
+
+# referenced only, never created here
+Table("alerts", metadata, Column("id", Integer, primary_key=True))
+
+outbox_messages = Table(
+    "outbox_messages", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("channel", String(20), nullable=False),
+    Column("recipient", String(255), nullable=False),
+    Column("payload", Text, nullable=False),
+    Column("alert_id", Integer, ForeignKey("alerts.id", ondelete="SET NULL"), nullable=True),
+    Column("status", String(10), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("available_at", DateTime, nullable=False),
+    Column("lease_token", String(32), nullable=True),
+    Column("last_error", String(255), nullable=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("sent_at", DateTime, nullable=True),
+    Index("ix_outbox_status_available", "status", "available_at", "id"),
+    Index("ix_outbox_lease", "lease_token"),
+)
+
+
+def upgrade(conn):
+    create_table(conn, outbox_messages)
@@ -0,0 +1,32 @@
+"""
+alert_tracks table: compacted live location history.
+"""
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text
+
+from app.core.migrations import create_table
+
+metadata = MetaData()
+
+# referenced only, never created here
+Table("alerts", metadata, Column("id", Integer, primary_key=True))
+
+alert_tracks = Table(
+    "alert_tracks", metadata,
+    Column("alert_id", Integer, ForeignKey("alerts.id", ondelete="CASCADE"), primary_key=True),
+    Column("user_track", Text, nullable=False),
+    Column("volunteer_track", Text, nullable=False),
+    Column("tolerance_m", Float, nullable=False),
+    Column("raw_points", Integer, nullable=False),
+    Column("kept_points", Integer, nullable=False),
+    Column("started_at", DateTime, nullable=True),
+    Column("ended_at", DateTime, nullable=True),
+    Column("compacted_at", DateTime),
+    Column("archive_path", String(255), nullable=True),
+    Column("archived_at", DateTime, nullable=True),
+    Index("ix_alert_tracks_archived_ended", "archived_at", "ended_at"),
+)
+
+
+def upgrade(conn):
+    create_table(conn, alert_tracks)
@@ -0,0 +1,16 @@
+"""
+reports.created_at, so exports can filter reports by time like alerts.
+Existing reports keep NULL (their time was never recorded).
+"""
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, Table
+
+from app.core.migrations import add_column, create_index
+
+metadata = MetaData()
+reports = Table("reports", metadata, Column("id", Integer), Column("created_at", DateTime, nullable=True))
+
+
+def upgrade(conn):
+    add_column(conn, "reports", reports.c.created_at)
+    create_index(conn, Index("ix_reports_created", reports.c.created_at, reports.c.id))
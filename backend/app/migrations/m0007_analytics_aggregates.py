@@ -0,0 +1,23 @@
+"""
+analytics_aggregates table for incremental response-time analytics.
+"""
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, Text
+
+from app.core.migrations import create_table
+
+metadata = MetaData()
+
+analytics_aggregates = Table(
+    "analytics_aggregates", metadata,
+    Column("metric", String(32), primary_key=True),
+    Column("scope", String(32), primary_key=True),
+    Column("accepted", Integer, nullable=False),
+    Column("rejected", Integer, nullable=False),
+    Column("sketch", Text, nullable=False),
+    Column("updated_at", DateTime),
+)
+
+
+def upgrade(conn):
+    create_table(conn, analytics_aggregates)
@@ -0,0 +1,28 @@
+"""
+region_id on alerts, reports and volunteers (offline reverse geocoder).
+New rows are tagged on insert; run backfill_regions.py for existing ones.
+"""
+
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, MetaData, String, Table
+
+from app.core.migrations import add_column, create_index
+
+metadata = MetaData()
+alerts = Table("alerts", metadata, Column("id", Integer), Column("created_at", DateTime),
+               Column("region_id", String(64), nullable=True))
+reports = Table("reports", metadata, Column("id", Integer), Column("region_id", String(64), nullable=True))
+volunteers = Table("volunteers", metadata, Column("is_verified", Boolean),
+                   Column("region_id", String(64), nullable=True))
+
+INDEXES = [
+    Index("ix_alerts_region_created", alerts.c.region_id, alerts.c.created_at, alerts.c.id),
+    Index("ix_reports_region", reports.c.region_id, reports.c.id),
+    Index("ix_volunteers_region", volunteers.c.region_id, volunteers.c.is_verified),
+]
+
+
+def upgrade(conn):
+    for table in (alerts, reports, volunteers):
+        add_column(conn, table.name, table.c.region_id)
+    for index in INDEXES:
+        create_index(conn, index)
@@ -0,0 +1,12 @@
+"""
+ADMIN / ANALYST values for users.role (listings and exports are staff-only).
+SQLite stores the enum as VARCHAR without a CHECK, so only MySQL needs it.
+"""
+
+
+def upgrade(conn):
+    if conn.dialect.name == "mysql":
+        conn.exec_driver_sql(
+            "ALTER TABLE users MODIFY role "
+            "ENUM('USER','VOLUNTEER','ADMIN','ANALYST') NOT NULL DEFAULT 'USER'"
+        )
@@ -0,0 +1,9 @@
+"""
+analytics_aggregates.scope fits "region:<region id>" (region_id is String(64)).
+SQLite doesn't enforce VARCHAR lengths, so only MySQL needs it.
+"""
+
+
+def upgrade(conn):
+    if conn.dialect.name == "mysql":
+        conn.exec_driver_sql("ALTER TABLE analytics_aggregates MODIFY scope VARCHAR(80) NOT NULL")
@@ -0,0 +1,15 @@
+"""
+Index on area_subscriptions.created_at: each worker's subscription index
+re-reads the recently created rows (see subscription_service.refresh).
+"""
+
+from sqlalchemy import Column, DateTime, Index, MetaData, Table
+
+from app.core.migrations import create_index
+
+metadata = MetaData()
+area_subscriptions = Table("area_subscriptions", metadata, Column("created_at", DateTime))
+
+
+def upgrade(conn):
+    create_index(conn, Index("ix_area_subscriptions_created", area_subscriptions.c.created_at))
@@ -4,8 +4,9 @@
 # """
 # Gunjan's Code 
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index, event
 from app.models.base import Base
+from app.services.geocoder import tag_point
 from datetime import datetime
 
 class Alert(Base):
@@ -22,4 +23,18 @@ class Alert(Base):
     longitude = Column(Float, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     resolved_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+    region_id = Column(String(64), nullable=True)  # "IN-KA.bengaluru", set on insert (geocoder)
+
+    __table_args__ = (
+        # Admin listing: filter by status/level, newest first
+        Index("ix_alerts_status_created", "status", "created_at", "id"),
+        Index("ix_alerts_level_created", "emergency_level", "created_at", "id"),
+        Index("ix_alerts_created", "created_at", "id"),
+        # create_alert: one active alert per user
+        Index("ix_alerts_user_status", "user_id", "status"),
+        # per-city / per-state (prefix) filters
+        Index("ix_alerts_region_created", "region_id", "created_at", "id"),
+    )
+
+event.listen(Alert, "before_insert", tag_point)
@@ -0,0 +1,32 @@
+"""
+AlertTrack table:
+The compacted tier of live location history, one row per closed alert.
+User and volunteer tracks are Douglas-Peucker simplified and stored as
+encoded polylines of (lat, lng, epoch ms) (app/utils/polyline.py).
+Once the raw live_locations rows are past retention they are moved to a
+gzip file (archive_path) and deleted from the hot table.
+"""
+
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, Index
+from app.models.base import Base
+from datetime import datetime
+
+class AlertTrack(Base):
+    __tablename__ = "alert_tracks"
+
+    alert_id = Column(Integer, ForeignKey("alerts.id", ondelete="CASCADE"), primary_key=True)
+    user_track = Column(Text, nullable=False, default="")
+    volunteer_track = Column(Text, nullable=False, default="")
+    tolerance_m = Column(Float, nullable=False)
+    raw_points = Column(Integer, nullable=False)
+    kept_points = Column(Integer, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    ended_at = Column(DateTime, nullable=True)
+    compacted_at = Column(DateTime, default=datetime.utcnow)
+    archive_path = Column(String(255), nullable=True)  # relative to TRACK_ARCHIVE_DIR
+    archived_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # archiver: compacted tracks past retention, oldest first
+        Index("ix_alert_tracks_archived_ended", "archived_at", "ended_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, Index
 from app.models.base import Base
 from datetime import datetime
 
@@ -10,3 +10,10 @@ class AlertVolunteer(Base):
     volunteer_id = Column(Integer, ForeignKey("volunteers.id", ondelete="CASCADE"))
     status = Column(String(20), default="pending")
     accepted_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # respond/accept/reject look up one assignment
+        Index("ix_alert_volunteers_alert_volunteer", "alert_id", "volunteer_id"),
+        # accepted count + live location fan-out
+        Index("ix_alert_volunteers_alert_status", "alert_id", "status"),
+    )
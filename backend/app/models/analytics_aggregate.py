@@ -0,0 +1,21 @@
+"""
+AnalyticsAggregate table:
+Response-time aggregates kept up to date on every alert / assignment
+state change (app/services/analytics_service.py), one row per
+(metric, scope) so a dashboard read is a primary-key lookup.
+scope: "all", "cell:<geohash>", "region:<region id>" or "volunteer:<id>".
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from app.models.base import Base
+from datetime import datetime
+
+class AnalyticsAggregate(Base):
+    __tablename__ = "analytics_aggregates"
+
+    metric = Column(String(32), primary_key=True)   # time_to_first_accept / resolution_time / volunteer_response
+    scope = Column(String(80), primary_key=True)    # "region:" + a region_id (String(64))
+    accepted = Column(Integer, nullable=False, default=0)
+    rejected = Column(Integer, nullable=False, default=0)
+    sketch = Column(Text, nullable=False)           # DDSketch as JSON, seconds
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,36 @@
+"""
+Area subscriptions: a volunteer or user (e.g. a trusted contact) watching
+a circle or polygon around home, campus, ... and pushed every new alert
+inside it. The bounding box is stored so the spatial index can be rebuilt
+without parsing shapes.
+"""
+
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, Index
+from app.models.base import Base
+from datetime import datetime
+
+class AreaSubscription(Base):
+    __tablename__ = "area_subscriptions"
+
+    id = Column(Integer, primary_key=True)
+    owner_role = Column(String(20), nullable=False)   # volunteer / user
+    owner_id = Column(Integer, nullable=False)
+    name = Column(String(100))
+    shape = Column(String(10), nullable=False)        # circle / polygon
+    center_lat = Column(Float)
+    center_lng = Column(Float)
+    radius_km = Column(Float)
+    polygon = Column(Text)                            # JSON [[lat, lng], ...]
+    min_lat = Column(Float, nullable=False)
+    max_lat = Column(Float, nullable=False)
+    min_lng = Column(Float, nullable=False)
+    max_lng = Column(Float, nullable=False)
+    active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # "my subscriptions"
+        Index("ix_area_subscriptions_owner", "owner_role", "owner_id"),
+        # SubscriptionIndex.refresh: rows created in the last few minutes
+        Index("ix_area_subscriptions_created", "created_at"),
+    )
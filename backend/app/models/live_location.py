@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Index
 from app.models.base import Base
 from datetime import datetime
 
@@ -12,3 +12,8 @@ class LiveLocation(Base):
     volunteer_lat = Column(Float, nullable=True)
     volunteer_lng = Column(Float, nullable=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # track replay: one alert's points in time order
+        Index("ix_live_locations_alert_timestamp", "alert_id", "timestamp"),
+    )
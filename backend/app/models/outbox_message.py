@@ -0,0 +1,34 @@
+"""
+OutboxMessage table:
+Notifications (email, SMS, push, ...) written in the same transaction as
+the alert that caused them, delivered later by the outbox relay.
+status: pending -> sending (leased by a relay) -> sent, or back to pending
+with a backoff, or dead after too many attempts.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from app.models.base import Base
+from datetime import datetime
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+
+    id = Column(Integer, primary_key=True)
+    channel = Column(String(20), nullable=False)        # email / sms / push / webhook
+    recipient = Column(String(255), nullable=False)     # address, phone, volunteer id, ...
+    payload = Column(Text, nullable=False)              # JSON
+    alert_id = Column(Integer, ForeignKey("alerts.id", ondelete="SET NULL"), nullable=True)
+    status = Column(String(10), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    # pending: next attempt time; sending: when the relay's lease runs out
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    lease_token = Column(String(32), nullable=True)
+    last_error = Column(String(255), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # relay: due messages in id order
+        Index("ix_outbox_status_available", "status", "available_at", "id"),
+        Index("ix_outbox_lease", "lease_token"),
+    )
@@ -0,0 +1,41 @@
+"""
+Region shard tables (created on each shard, never on the primary).
+Copies of the primary's geo data, keyed by the primary's ids:
+- region_volunteers: verified volunteers with a known location
+- region_heat_points: alerts and reports for the heatmap
+cell is the point's geohash at CELL_PRECISION, used to rebalance.
+"""
+
+from sqlalchemy import Column, Float, Index, Integer, String
+
+from app.core.sharding import RegionBase
+
+
+class RegionVolunteer(RegionBase):
+    __tablename__ = "region_volunteers"
+
+    volunteer_id = Column(Integer, primary_key=True, autoincrement=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    cell = Column(String(12), nullable=False)
+
+    __table_args__ = (
+        Index("ix_region_volunteers_location", "latitude", "longitude"),
+        Index("ix_region_volunteers_cell", "cell"),
+    )
+
+
+class RegionHeatPoint(RegionBase):
+    __tablename__ = "region_heat_points"
+
+    kind = Column(String(10), primary_key=True)  # "alert" / "report"
+    source_id = Column(Integer, primary_key=True, autoincrement=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    level = Column(String(20), nullable=True)  # panic_level or risk_level
+    cell = Column(String(12), nullable=False)
+
+    __table_args__ = (
+        Index("ix_region_heat_points_location", "latitude", "longitude"),
+        Index("ix_region_heat_points_cell", "cell"),
+    )
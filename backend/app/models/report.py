@@ -4,8 +4,10 @@ Anonymous or logged-in area safety reports.
 Used for heatmap + risk analysis.
 """
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index, event
 from app.models.base import Base
+from app.services.geocoder import tag_point
+from datetime import datetime
 
 class Report(Base):
     __tablename__ = "reports"
@@ -16,3 +18,14 @@ class Report(Base):
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)  # NULL for reports made before m0006
+    region_id = Column(String(64), nullable=True)  # set on insert (geocoder)
+
+    __table_args__ = (
+        Index("ix_reports_risk_level_id", "risk_level", "id"),
+        # exports: time range
+        Index("ix_reports_created", "created_at", "id"),
+        Index("ix_reports_region", "region_id", "id"),
+    )
+
+event.listen(Report, "before_insert", tag_point)
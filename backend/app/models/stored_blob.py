@@ -0,0 +1,18 @@
+"""
+StoredBlob table:
+One row per unique file in the content-addressed blob store.
+ref_count tracks how many records point at the same bytes.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from app.models.base import Base
+from datetime import datetime
+
+class StoredBlob(Base):
+    __tablename__ = "stored_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    content_type = Column(String(50), nullable=False)
+    ref_count = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -3,7 +3,7 @@ User table:
 Stores both normal users and volunteers.
 """
 
-from sqlalchemy import Column, Integer, String, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Enum, Boolean, Index
 from app.core.database import Base
 
 
@@ -14,5 +14,9 @@ class User(Base):
     full_name = Column(String(100), nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String)
-    role = Column(Enum("USER", "VOLUNTEER"), default="USER", nullable=False)
+    role = Column(Enum("USER", "VOLUNTEER", "ADMIN", "ANALYST"), default="USER", nullable=False)
     is_active = Column(Boolean, default=True)
+
+    __table_args__ = (
+        Index("ix_users_role_id", "role", "id"),
+    )
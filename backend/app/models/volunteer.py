@@ -3,9 +3,12 @@ Volunteer table:
 Extra data only if user.role == VOLUNTEER.
 """
 
-from sqlalchemy import Column, Float, Integer, String, ForeignKey, Boolean
+from sqlalchemy import Column, Float, Integer, String, ForeignKey, Boolean, Index, event
+from sqlalchemy.orm import Session, column_property
 # from app.models.base import Base
 from app.core.database import Base
+from app.services.geocoder import tag_volunteer
+from app.services.blob_store import release_dropped_photos
 
 
 class Volunteer(Base):
@@ -17,9 +20,31 @@ class Volunteer(Base):
     email = Column(String(100), unique=True, index=True)
     phone = Column(String(20), nullable=True)
     city = Column(String(100), nullable=True)
-    id_photo = Column(String(255), nullable=True)
+    # active_history: the old digest is loaded on change, so its blob can be released
+    id_photo = column_property(Column(String(255), nullable=True), active_history=True)
     is_active = Column(Boolean, default=True)
     password = Column(String(255), nullable=False)
     is_verified = Column(Boolean, default=True)   # ✅ ADD THIS
     latitude = Column(Float, nullable=True)
-    longitude = Column(Float, nullable=True)
\ No newline at end of file
+    longitude = Column(Float, nullable=True)
+    region_id = Column(String(64), nullable=True)  # from lat/lng, else from city (geocoder)
+
+    __table_args__ = (
+        # assign_volunteers: verified + bounding box on lat/lng
+        Index("ix_volunteers_verified_location", "is_verified", "latitude", "longitude"),
+        Index("ix_volunteers_region", "region_id", "is_verified"),
+    )
+
+event.listen(Volunteer, "before_insert", tag_volunteer)
+event.listen(Volunteer, "before_update", tag_volunteer)
+event.listen(Session, "before_flush", release_dropped_photos)
+
+
+def _track_region_volunteers(session, flush_context):
+    # region_service imports this model, so it is imported on first flush;
+    # that also registers its after_commit hook, which places the volunteers
+    from app.services.region_service import track_volunteers
+    track_volunteers(session, flush_context)
+
+
+event.listen(Session, "after_flush", _track_region_volunteers)
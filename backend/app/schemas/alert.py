@@ -4,6 +4,7 @@ Schemas for SOS alerts.
 
 from pydantic import BaseModel
 from typing import Optional
+from datetime import datetime
 
 class AlertCreate(BaseModel):
     emergency_level: str
@@ -23,6 +24,13 @@ class AlertResponse(BaseModel):
     status: str
     latitude: float
     longitude: float
+    panic_level: Optional[int] = None
+    created_at: Optional[datetime] = None
+    region_id: Optional[str] = None
 
     class Config:
-       from_attributes = True
\ No newline at end of file
+       from_attributes = True
+
+class AlertPage(BaseModel):
+    items: list[AlertResponse]
+    next_cursor: Optional[str]
\ No newline at end of file
@@ -22,4 +22,4 @@ class SignupSchema(BaseModel):
     full_name: str
     email: EmailStr
     password: str
-    role: str
\ No newline at end of file
+    role: Role  # staff roles are granted with promote_user.py, not at signup
\ No newline at end of file
@@ -20,3 +20,7 @@ class ReportResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+class ReportPage(BaseModel):
+    items: list[ReportResponse]
+    next_cursor: Optional[str]
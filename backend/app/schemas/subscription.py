@@ -0,0 +1,25 @@
+"""
+Schemas for geofenced area subscriptions.
+A circle (center_lat, center_lng, radius_km) or a polygon ([[lat, lng], ...]).
+"""
+
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class AreaSubscriptionCreate(BaseModel):
+    name: Optional[str] = None
+    center_lat: Optional[float] = None
+    center_lng: Optional[float] = None
+    radius_km: Optional[float] = None
+    polygon: Optional[list[list[float]]] = None
+
+class AreaSubscriptionResponse(BaseModel):
+    id: int
+    name: Optional[str]
+    shape: str
+    center_lat: Optional[float]
+    center_lng: Optional[float]
+    radius_km: Optional[float]
+    polygon: Optional[list[list[float]]]
+    created_at: Optional[datetime] = None
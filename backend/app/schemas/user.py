@@ -30,3 +30,8 @@ class UserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class UserPage(BaseModel):
+    items: list[UserResponse]
+    next_cursor: Optional[str]
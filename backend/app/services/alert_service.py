@@ -1,8 +1,17 @@
 from sqlalchemy.orm import Session
 from app.models.alert import Alert
-from app.models.volunteer import Volunteer
 from app.models.alert_volunteer import AlertVolunteer
+from app.services.region_service import place_alert, volunteer_points
+from app.services.subscription_service import area_watchers
+from app.services.notifications_service import queue_alert_notifications
+from app.services import outbox
 from app.utils.geo import haversine
+from app.core.tracing import span
+from app.core.cache import invalidate
+import heapq
+import logging
+
+logger = logging.getLogger("silent_shield.alerts")
 
 # from backend.apps.models import alert
 
@@ -11,66 +20,79 @@ MIN_RADIUS_KM = 0
 REQUIRED_VOLUNTEERS = 3
 MAX_VOLUNTEERS_NOTIFIED = 5
 
-def create_alert(db: Session, user_id: int | None, **data):
-    existing = db.query(Alert).filter(
-        Alert.user_id == user_id,
-        Alert.status == "active"
-    ).first()
-    if existing:
-        return existing
-
-    if "panic_level" not in data or data["panic_level"] is None:
-        data["panic_level"] = 1
-
-    alert = Alert(user_id=user_id, status="active", **data)  # ✅ FIXED
-    db.add(alert)
-    db.commit()
-    db.refresh(alert)
-
-    print("✅ Alert created:", alert.id)
-
-    if alert.emergency_level in ["yellow", "red"]:
-        assign_volunteers(db, alert)
-
-    return alert
-
-
-def assign_volunteers(db: Session, alert: Alert):
-    print("🔥 assign_volunteers() CALLED for alert:", alert.id)
-
-    volunteers = db.query(Volunteer).filter(Volunteer.is_verified == True).all()
-    print("👥 Volunteers found:", len(volunteers))
-
-    matched = []
-
-    for v in volunteers:
-        if not hasattr(v, "latitude") or not hasattr(v, "longitude"):
-            print("⚠️ Volunteer missing lat/lng:", v.id)
-            continue
-
-        distance = haversine(alert.latitude, alert.longitude, v.latitude, v.longitude)
-        if MIN_RADIUS_KM <= distance <= MAX_RADIUS_KM:
-            matched.append((v, distance))
-
-    matched.sort(key=lambda x: x[1])
-
-    for v, _ in matched[:REQUIRED_VOLUNTEERS]:
-        av = AlertVolunteer(
-            alert_id=alert.id,
-            volunteer_id=v.id,
-            status="pending"
-        )
-        db.add(av)
-
-    db.commit()
-    print("✅ Volunteers assigned:", len(matched[:REQUIRED_VOLUNTEERS]))
-
-# async def notify_volunteer(volunteer_id, alert):
-#     await manager.send_to_volunteer(volunteer_id, {
-#         "type": "NEW_ALERT",
-#         "alert_id": alert.id,
-#         "latitude": alert.latitude,
-#         "longitude": alert.longitude,
-#         "level": alert.emergency_level,
-#         "type_need": alert.emergency_type
-#     })
\ No newline at end of file
+def create_alert(db: Session, user_id: int | None, notify=None, **data):
+    """
+    notify(alert, volunteer_ids, watchers) is called once volunteers are
+    assigned and area subscriptions matched (routes use it to schedule the
+    socket pushes). watchers: {(owner_role, owner_id): [subscription ids]}.
+    """
+    with span("create_alert", user_id=user_id or 0) as s:
+        existing = db.query(Alert).filter(
+            Alert.user_id == user_id,
+            Alert.status == "active"
+        ).first()
+        if existing:
+            s.set(alert_id=existing.id, existing=True)
+            return existing
+
+        if "panic_level" not in data or data["panic_level"] is None:
+            data["panic_level"] = 1
+
+        alert = Alert(user_id=user_id, status="active", **data)  # ✅ FIXED
+        db.add(alert)
+        db.flush()  # alert.id, still in the same transaction
+
+        # alert + assignments + outbox messages commit together
+        volunteer_ids = []
+        if alert.emergency_level in ["yellow", "red"]:
+            volunteer_ids = assign_volunteers(db, alert)
+        queued = queue_alert_notifications(db, alert, volunteer_ids)
+        db.commit()
+        db.refresh(alert)
+        s.set(alert_id=alert.id, level=alert.emergency_level or "", queued=queued)
+        if queued:
+            outbox.wake()
+
+        logger.info("alert created", extra={"alert_id": alert.id, "level": alert.emergency_level})
+        place_alert(alert)
+        invalidate("heatmap")
+
+        watchers = area_watchers(db, alert, skip_volunteers=volunteer_ids)
+        if notify and (volunteer_ids or watchers):
+            notify(alert, volunteer_ids, watchers)
+
+        return alert
+
+
+def assign_volunteers(db: Session, alert: Alert) -> list[int]:
+    """
+    Assigns the nearest verified volunteers, returns their ids.
+    Rows are flushed, not committed.
+    """
+    with span("assign_volunteers", alert_id=alert.id) as s:
+        # Only (id, lat, lng) of volunteers inside the radius box are loaded,
+        # from the region shards the radius reaches when sharding is on
+        volunteers = volunteer_points(db, alert.latitude, alert.longitude, MAX_RADIUS_KM)
+        logger.debug("volunteer candidates", extra={"alert_id": alert.id, "candidates": len(volunteers)})
+
+        matched = []
+
+        for v in volunteers:
+            distance = haversine(alert.latitude, alert.longitude, v.latitude, v.longitude)
+            if MIN_RADIUS_KM <= distance <= MAX_RADIUS_KM:
+                matched.append((v, distance))
+
+        nearest = heapq.nsmallest(REQUIRED_VOLUNTEERS, matched, key=lambda x: x[1])
+
+        for v, _ in nearest:
+            av = AlertVolunteer(
+                alert_id=alert.id,
+                volunteer_id=v.id,
+                status="pending"
+            )
+            db.add(av)
+
+        db.flush()  # the caller commits
+        s.set(candidates=len(volunteers), assigned=len(nearest))
+        logger.info("volunteers assigned", extra={"alert_id": alert.id, "assigned": len(nearest)})
+        return [v.id for v, _ in nearest]
@@ -0,0 +1,155 @@
+"""
+Incremental response-time analytics.
+Each state change updates its aggregates in the caller's transaction:
+- first accept of an alert: time_to_first_accept (since Alert.created_at)
+  for everywhere, the alert's geohash cells and its city
+- volunteer accept / reject: the volunteer's accepted / rejected counts
+  and volunteer_response (since they were assigned)
+- resolve: resolution_time (Alert.created_at -> resolved_at), everywhere
+  per cell and per city
+Percentiles come from DDSketches (app/utils/sketch.py), so reads are one
+primary-key lookup plus a walk over a bounded number of buckets.
+"""
+
+import json
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.alert import Alert
+from app.models.alert_volunteer import AlertVolunteer
+from app.models.analytics_aggregate import AnalyticsAggregate
+from app.utils import geohash
+from app.utils.sketch import DDSketch
+
+TIME_TO_FIRST_ACCEPT = "time_to_first_accept"
+RESOLUTION_TIME = "resolution_time"
+VOLUNTEER_RESPONSE = "volunteer_response"
+
+# /alerts/respond stores accept / reject, /volunteers/alerts/* accepted / rejected
+ACCEPTED = ("accept", "accepted")
+REJECTED = ("reject", "rejected")
+
+CELL_PRECISIONS = (4, 5)  # ~39 km and ~5 km cells
+
+
+def cell_scopes(lat: float, lng: float) -> list[str]:
+    cell = geohash.encode(lat, lng, max(CELL_PRECISIONS))
+    return [f"cell:{cell[:p]}" for p in CELL_PRECISIONS]
+
+
+def alert_scopes(alert: Alert) -> list[str]:
+    """
+    Everywhere, the alert's cells and its city (region id from the geocoder).
+    """
+    scopes = ["all", *cell_scopes(alert.latitude, alert.longitude)]
+    if alert.region_id:
+        scopes.append(f"region:{alert.region_id}")
+    return scopes
+
+
+def _aggregate(db: Session, metric: str, scope: str) -> AnalyticsAggregate:
+    """
+    The row, locked for the rest of the transaction (FOR UPDATE on MySQL);
+    created on first use. A concurrent first insert loses the race
+    quietly and re-reads the winner's row.
+    """
+    row = db.query(AnalyticsAggregate).filter_by(metric=metric, scope=scope).with_for_update().first()
+    if row is not None:
+        return row
+    row = AnalyticsAggregate(metric=metric, scope=scope, accepted=0, rejected=0,
+                             sketch=json.dumps(DDSketch().to_dict()))
+    try:
+        with db.begin_nested():
+            db.add(row)
+    except IntegrityError:
+        row = db.query(AnalyticsAggregate).filter_by(metric=metric, scope=scope).with_for_update().one()
+    return row
+
+
+def _observe(db: Session, metric: str, scopes: list[str], seconds: float, accepted: int = 0, rejected: int = 0):
+    for scope in scopes:
+        row = _aggregate(db, metric, scope)
+        if seconds is not None:
+            sketch = DDSketch.from_dict(json.loads(row.sketch))
+            sketch.add(seconds)
+            row.sketch = json.dumps(sketch.to_dict(), separators=(",", ":"))
+        row.accepted += accepted
+        row.rejected += rejected
+
+
+def set_response(db: Session, av: AlertVolunteer, status: str, now: datetime | None = None) -> bool:
+    """
+    Moves a pending assignment to `status` and records the response, in the
+    caller's transaction. The write is a conditional UPDATE (status still
+    'pending'), so of several simultaneous taps only one wins; the others
+    get False and record nothing.
+    """
+    now = now or datetime.utcnow()
+    won = db.execute(
+        update(AlertVolunteer)
+        .where(AlertVolunteer.id == av.id, AlertVolunteer.status == "pending")
+        .values(status=status)
+    ).rowcount == 1
+    if won:
+        record_response(db, av, accepted=status in ACCEPTED, now=now)
+    return won
+
+
+def record_response(db: Session, av: AlertVolunteer, accepted: bool, now: datetime | None = None):
+    """
+    Call after setting av.status and before the commit (set_response does both).
+    """
+    now = now or datetime.utcnow()
+    # assigned time: accepted_at is filled in when the assignment is created
+    waited = (now - av.accepted_at).total_seconds() if av.accepted_at else None
+    _observe(db, VOLUNTEER_RESPONSE, [f"volunteer:{av.volunteer_id}"], waited,
+             accepted=int(accepted), rejected=int(not accepted))
+    if not accepted:
+        return
+
+    # lock the alert so two simultaneous accepts can't both count as first
+    alert = db.query(Alert).filter(Alert.id == av.alert_id).with_for_update().first()
+    earlier = db.query(AlertVolunteer.id).filter(
+        AlertVolunteer.alert_id == av.alert_id,
+        AlertVolunteer.status.in_(ACCEPTED),
+        AlertVolunteer.id != av.id,
+    ).first()
+    if alert is None or earlier is not None or alert.created_at is None:
+        return
+    _observe(db, TIME_TO_FIRST_ACCEPT, alert_scopes(alert),
+             (now - alert.created_at).total_seconds())
+
+
+def record_resolution(db: Session, alert: Alert):
+    """
+    Call after setting alert.resolved_at and before the commit.
+    """
+    if alert.created_at is None or alert.resolved_at is None:
+        return
+    _observe(db, RESOLUTION_TIME, alert_scopes(alert),
+             (alert.resolved_at - alert.created_at).total_seconds())
+
+
+# ----------------- READS -----------------
+
+def summary(db: Session, metric: str, scope: str) -> dict:
+    row = db.get(AnalyticsAggregate, (metric, scope))
+    if row is None:
+        return DDSketch().summary()
+    return DDSketch.from_dict(json.loads(row.sketch)).summary()
+
+
+def volunteer_summary(db: Session, volunteer_id: int) -> dict:
+    row = db.get(AnalyticsAggregate, (VOLUNTEER_RESPONSE, f"volunteer:{volunteer_id}"))
+    accepted, rejected = (row.accepted, row.rejected) if row else (0, 0)
+    responded = accepted + rejected
+    return {
+        "volunteer_id": volunteer_id,
+        "accepted": accepted,
+        "rejected": rejected,
+        "acceptance_rate": accepted / responded if responded else None,
+        "response_seconds": DDSketch.from_dict(json.loads(row.sketch)).summary() if row else DDSketch().summary(),
+    }
@@ -0,0 +1,131 @@
+"""
+Content-addressed blob store for uploaded files.
+- Files are keyed by SHA-256 and sharded as {root}/ab/cd/{digest}
+- Identical uploads share one file; stored_blobs.ref_count tracks users
+- Derived files (thumbnails etc.) live next to the blob as {digest}.{variant}.jpg
+- A volunteer deleted or given another id_photo releases its reference
+  (before_flush hook, registered in app/models/volunteer.py); files are
+  removed only once the release is committed
+"""
+
+import hashlib
+import os
+import re
+
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.stored_blob import StoredBlob
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+VARIANTS = ("thumb", "web")
+CONTENT_TYPES = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+
+
+def is_digest(value: str | None) -> bool:
+    return bool(value) and DIGEST_RE.match(value) is not None
+
+
+def blob_path(digest: str, root: str | None = None) -> str:
+    root = root or settings.BLOB_DIR
+    return os.path.join(root, digest[:2], digest[2:4], digest)
+
+
+def variant_path(digest: str, variant: str, root: str | None = None) -> str:
+    return f"{blob_path(digest, root)}.{variant}.jpg"
+
+
+def staging_dir(root: str | None = None) -> str:
+    # Same filesystem as the blobs, so the final move is an atomic rename
+    path = os.path.join(root or settings.BLOB_DIR, "tmp")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def place_file(staged_path: str, digest: str, root: str | None = None) -> bool:
+    """
+    Moves a staged file to its content address.
+    Returns False (and drops the staged copy) if the bytes are already stored.
+    """
+    final_path = blob_path(digest, root)
+    if os.path.exists(final_path):
+        os.remove(staged_path)
+        return False
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(staged_path, final_path)
+    return True
+
+
+def add_ref(db: Session, digest: str, size: int, content_type: str):
+    """
+    Counts one more reference to the blob. Caller commits.
+    """
+    updated = db.query(StoredBlob).filter(StoredBlob.sha256 == digest).update(
+        {StoredBlob.ref_count: StoredBlob.ref_count + 1}, synchronize_session=False
+    )
+    if updated:
+        return
+
+    try:
+        with db.begin_nested():
+            db.add(StoredBlob(sha256=digest, size=size, content_type=content_type, ref_count=1))
+    except IntegrityError:
+        # Someone else inserted the same digest in the meantime
+        db.query(StoredBlob).filter(StoredBlob.sha256 == digest).update(
+            {StoredBlob.ref_count: StoredBlob.ref_count + 1}, synchronize_session=False
+        )
+
+
+def release(db: Session, digest: str, root: str | None = None):
+    """
+    Drops one reference; the files go once nobody uses them and the
+    caller's commit went through.
+    """
+    with db.no_autoflush:
+        blob = db.query(StoredBlob).filter(StoredBlob.sha256 == digest).with_for_update().first()
+    if not blob:
+        return
+    blob.ref_count -= 1
+    if blob.ref_count > 0:
+        return
+
+    db.delete(blob)
+    db.info.setdefault("released_blobs", []).append((digest, root))
+
+
+@event.listens_for(Session, "after_commit")
+def _remove_released_files(session):
+    for digest, root in session.info.pop("released_blobs", []):
+        for path in [blob_path(digest, root)] + [variant_path(digest, v, root) for v in VARIANTS]:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_released_files(session):
+    session.info.pop("released_blobs", None)
+
+
+def release_dropped_photos(session, flush_context, instances):
+    """
+    before_flush: deleted volunteers and replaced id photos give up their blob.
+    """
+    from app.models.volunteer import Volunteer
+    for volunteer in list(session.deleted):
+        if isinstance(volunteer, Volunteer) and is_digest(volunteer.id_photo):
+            release(session, volunteer.id_photo)
+    for volunteer in list(session.dirty):
+        if isinstance(volunteer, Volunteer):
+            for old in inspect(volunteer).attrs.id_photo.history.deleted:
+                if is_digest(old) and old != volunteer.id_photo:
+                    release(session, old)
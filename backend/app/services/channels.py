@@ -0,0 +1,151 @@
+"""
+Outbox channel adapters: turn outbox messages into real sends.
+Adapters are plain blocking code; the relay (app/services/outbox.py) runs
+them in its own thread pool, at most `concurrency` batches per channel at
+once, and takes care of leasing, retries and dead-lettering.
+
+A new channel = a ChannelAdapter subclass + a line in build_adapters().
+"""
+
+import smtplib
+from collections import namedtuple
+from email.message import EmailMessage
+
+from app.core.config import settings
+
+# What an adapter gets: payload is the decoded JSON
+Envelope = namedtuple("Envelope", "id channel recipient payload attempts created_at lease_token")
+
+
+class DeliveryError(Exception):
+    """
+    permanent=True: retrying can't help (bad address, 4xx), dead-letter now.
+    """
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+class ChannelAdapter:
+    name = ""
+    concurrency = 4
+    max_batch = 1  # messages handed to one send_batch call
+
+    def send(self, message: Envelope):
+        raise NotImplementedError
+
+    def send_batch(self, messages: list[Envelope]) -> list[Exception | None]:
+        """
+        One result per message, None = delivered.
+        """
+        results = []
+        for message in messages:
+            try:
+                self.send(message)
+                results.append(None)
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    def close(self):
+        pass
+
+
+class EmailAdapter(ChannelAdapter):
+    """
+    SMTP; a batch shares one connection. Payload: {"subject", "body"}.
+    """
+    name = "email"
+    concurrency = 2
+    max_batch = 20
+
+    def __init__(self, host: str, port: int, sender: str, timeout: float = 10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+
+    def _email(self, message: Envelope) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message.recipient
+        email["Subject"] = message.payload["subject"]
+        email["Message-ID"] = f"<outbox-{message.id}@silentshield>"
+        email.set_content(message.payload["body"])
+        return email
+
+    def send_batch(self, messages: list[Envelope]) -> list[Exception | None]:
+        results = []
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            for message in messages:
+                try:
+                    smtp.send_message(self._email(message))
+                    results.append(None)
+                except smtplib.SMTPRecipientsRefused as exc:
+                    results.append(DeliveryError(f"recipient refused: {exc.recipients}", permanent=True))
+                except smtplib.SMTPServerDisconnected:
+                    # the rest of the batch can't go out on this connection
+                    results += [DeliveryError("SMTP server disconnected")] * (len(messages) - len(results))
+                    break
+                except smtplib.SMTPException as exc:
+                    results.append(exc)
+        return results
+
+
+class HttpAdapter(ChannelAdapter):
+    """
+    JSON POST per message to a gateway (SMS provider, push service):
+    {"to": recipient, **payload}. The message id goes out as the
+    Idempotency-Key header, so a retried send can be deduplicated.
+    """
+    def __init__(self, name: str, url: str, concurrency: int = 8, timeout: float = 5):
+        self.name = name
+        self.url = url
+        self.concurrency = concurrency
+        self.timeout = timeout
+        import requests  # only needed once an HTTP channel is configured
+        self.session = requests.Session()
+
+    def send(self, message: Envelope):
+        response = self.session.post(
+            self.url,
+            json={"to": message.recipient, **message.payload},
+            headers={"Idempotency-Key": f"outbox-{message.id}"},
+            timeout=self.timeout,
+        )
+        if response.status_code >= 400:
+            # 408 / 429 / 5xx are worth retrying, other 4xx are not
+            permanent = response.status_code < 500 and response.status_code not in (408, 429)
+            raise DeliveryError(f"HTTP {response.status_code}", permanent=permanent)
+
+    def close(self):
+        self.session.close()
+
+
+def build_adapters() -> dict[str, ChannelAdapter]:
+    """
+    Adapters for every configured channel; OUTBOX_CONCURRENCY overrides
+    their default concurrency.
+    """
+    adapters = {}
+    if settings.SMTP_HOST:
+        adapters["email"] = EmailAdapter(settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_FROM)
+    if settings.SMS_WEBHOOK_URL:
+        adapters["sms"] = HttpAdapter("sms", settings.SMS_WEBHOOK_URL)
+    if settings.PUSH_WEBHOOK_URL:
+        adapters["push"] = HttpAdapter("push", settings.PUSH_WEBHOOK_URL, concurrency=16)
+    for name, limit in settings.OUTBOX_CONCURRENCY.items():
+        if name in adapters:
+            adapters[name].concurrency = limit
+    return adapters
+
+
+def enabled_channels() -> set[str]:
+    channels = set()
+    if settings.SMTP_HOST:
+        channels.add("email")
+    if settings.SMS_WEBHOOK_URL:
+        channels.add("sms")
+    if settings.PUSH_WEBHOOK_URL:
+        channels.add("push")
+    return channels
@@ -0,0 +1,241 @@
+"""
+Columnar bulk exports of alerts and reports for offline analysis.
+- rows are read over a server-side cursor, EXPORT_CHUNK_ROWS at a time,
+  and every chunk is encoded and handed on before the next is fetched,
+  so memory stays flat however many rows match
+- Parquet (one row group per chunk) or Arrow IPC stream when pyarrow is
+  installed, CSV otherwise
+- iter_export() feeds a StreamingResponse, run_export() writes the file
+  into EXPORT_DIR and reports rows/s
+"""
+
+import csv
+import io
+import logging
+import os
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.alert import Alert
+from app.models.report import Report
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # optional, exports fall back to CSV
+    pyarrow = None
+
+logger = logging.getLogger("silent_shield.exports")
+
+FORMATS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrows", "application/vnd.apache.arrow.stream"),
+    "csv": ("csv", "text/csv"),
+}
+
+# level: the column `level=` filters on; time: the one since / until filter on
+Dataset = namedtuple("Dataset", "model columns level time")
+
+DATASETS = {
+    "alerts": Dataset(Alert, [Alert.id, Alert.code, Alert.emergency_level, Alert.emergency_type, Alert.panic_level,
+                              Alert.status, Alert.latitude, Alert.longitude, Alert.user_id, Alert.created_at,
+                              Alert.resolved_at], Alert.emergency_level, Alert.created_at),
+    "reports": Dataset(Report, [Report.id, Report.description, Report.risk_level, Report.latitude, Report.longitude,
+                                Report.user_id, Report.created_at], Report.risk_level, Report.created_at),
+}
+
+ExportFilters = namedtuple("ExportFilters", "since until level bbox", defaults=(None, None, None, None))
+
+
+def resolve_format(requested: str | None) -> str:
+    """
+    The format actually written: columnar formats need pyarrow.
+    """
+    requested = requested or ("parquet" if pyarrow is not None else "csv")
+    if requested not in FORMATS:
+        raise ValueError(f"Unknown format '{requested}', use one of {', '.join(FORMATS)}")
+    if requested != "csv" and pyarrow is None:
+        return "csv"
+    return requested
+
+
+def parse_bbox(value: str | None) -> tuple | None:
+    """
+    "min_lat,min_lng,max_lat,max_lng" -> tuple of floats.
+    """
+    if not value:
+        return None
+    try:
+        min_lat, min_lng, max_lat, max_lng = (float(v) for v in value.split(","))
+    except ValueError:
+        raise ValueError("bbox must be min_lat,min_lng,max_lat,max_lng")
+    if min_lat > max_lat or min_lng > max_lng:
+        raise ValueError("bbox minimums must not exceed maximums")
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def export_query(session: Session, dataset: Dataset, filters: ExportFilters):
+    model = dataset.model
+    query = session.query(*dataset.columns)
+    if filters.since:
+        query = query.filter(dataset.time >= filters.since)
+    if filters.until:
+        query = query.filter(dataset.time < filters.until)
+    if filters.level:
+        query = query.filter(dataset.level == filters.level)
+    if filters.bbox:
+        min_lat, min_lng, max_lat, max_lng = filters.bbox
+        query = query.filter(model.latitude.between(min_lat, max_lat), model.longitude.between(min_lng, max_lng))
+    return query.order_by(model.id)
+
+
+# ----------------- ENCODERS -----------------
+
+class _Spool:
+    """
+    Write-only file object that hands back what was written since the last
+    drain(). pyarrow writers write into it, the caller ships the bytes.
+    """
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def arrow_schema(columns):
+    def arrow_type(column):
+        if isinstance(column.type, Integer):
+            return pyarrow.int64()
+        if isinstance(column.type, Float):
+            return pyarrow.float64()
+        if isinstance(column.type, DateTime):
+            return pyarrow.timestamp("us")
+        return pyarrow.string()
+    return pyarrow.schema([(column.key, arrow_type(column)) for column in columns])
+
+
+class CsvEncoder:
+    def __init__(self, columns):
+        self.header = [column.key for column in columns]
+        self.started = False
+
+    def encode(self, rows) -> bytes:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        if not self.started:
+            writer.writerow(self.header)
+            self.started = True
+        writer.writerows(rows)
+        return out.getvalue().encode("utf-8")
+
+    def finish(self) -> bytes:
+        return b"" if self.started else self.encode([])
+
+
+class ArrowEncoder:
+    """
+    Parquet (a row group per chunk) or Arrow IPC stream (a record batch per chunk).
+    """
+    def __init__(self, columns, fmt: str):
+        self.schema = arrow_schema(columns)
+        self.sink = _Spool()
+        if fmt == "parquet":
+            self.writer = pyarrow.parquet.ParquetWriter(self.sink, self.schema, compression="zstd")
+        else:
+            self.writer = pyarrow.ipc.new_stream(self.sink, self.schema)
+
+    def encode(self, rows) -> bytes:
+        columns = list(zip(*rows)) if rows else [[] for _ in self.schema]
+        batch = pyarrow.RecordBatch.from_arrays(
+            [pyarrow.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema,
+        )
+        self.writer.write_batch(batch)
+        return self.sink.drain()
+
+    def finish(self) -> bytes:
+        self.writer.close()  # parquet footer / IPC end-of-stream marker
+        return self.sink.drain()
+
+
+def encoder_for(fmt: str, columns):
+    return CsvEncoder(columns) if fmt == "csv" else ArrowEncoder(columns, fmt)
+
+
+# ----------------- EXPORTS -----------------
+
+def iter_export(bind, name: str, fmt: str, filters: ExportFilters, chunk_size: int = settings.EXPORT_CHUNK_ROWS,
+                stats: dict | None = None):
+    """
+    Yields the encoded file piece by piece. Opens its own session on
+    `bind` (a request's session is closed before a streamed body is sent).
+    `stats` gets rows / seconds / rows_per_second once the file is done.
+    """
+    dataset = DATASETS[name]
+    encoder = encoder_for(fmt, dataset.columns)
+    rows = 0
+    start = time.perf_counter()
+    with Session(bind=bind) as session:
+        statement = export_query(session, dataset, filters).statement.execution_options(yield_per=chunk_size)
+        for chunk in session.execute(statement).partitions():
+            rows += len(chunk)
+            yield encoder.encode([tuple(row) for row in chunk])
+    yield encoder.finish()
+    elapsed = time.perf_counter() - start
+    result = {"rows": rows, "seconds": round(elapsed, 3), "rows_per_second": round(rows / elapsed) if elapsed else 0}
+    if stats is not None:
+        stats.update(result)
+    logger.info("export finished", extra={"dataset": name, "format": fmt, **result})
+
+
+def export_filename(name: str, fmt: str) -> str:
+    # random suffix: two jobs in the same second must not share a .part file
+    return f"{name}-{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.{FORMATS[fmt][0]}"
+
+
+def run_export(bind, name: str, fmt: str, filters: ExportFilters, directory: str | None = None) -> dict:
+    """
+    Export job: writes the file into EXPORT_DIR (temp file + rename, so a
+    half-written export never shows up under its final name; a failed one
+    leaves nothing behind).
+    """
+    directory = directory or settings.EXPORT_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, export_filename(name, fmt))
+    stats = {}
+    size = 0
+    try:
+        with open(path + ".part", "wb") as f:
+            for piece in iter_export(bind, name, fmt, filters, stats=stats):
+                f.write(piece)
+                size += len(piece)
+        os.replace(path + ".part", path)
+    except Exception:
+        if os.path.exists(path + ".part"):
+            os.remove(path + ".part")
+        raise
+    return {"dataset": name, "format": fmt, "path": path, "bytes": size, **stats}
@@ -0,0 +1,66 @@
+"""
+Who may connect to the realtime gateway and what they may subscribe to.
+"""
+
+from sqlalchemy.orm import Session
+from app.core.gateway import parse_topic
+from app.core.security import decode_access_token
+from app.models.alert import Alert
+from app.models.alert_volunteer import AlertVolunteer
+from app.models.volunteer import Volunteer
+
+
+def authenticate(token: str | None) -> dict | None:
+    """
+    Handshake auth: a login token ({"sub", "role"}) or None.
+    """
+    payload = decode_access_token(token) if token else None
+    if not payload or not payload.get("sub") or payload.get("role") not in ("user", "volunteer"):
+        return None
+    return {"sub": str(payload["sub"]), "role": payload["role"]}
+
+
+def can_watch_alert(db: Session, principal: dict, alert_id: int) -> bool:
+    """
+    The alert's owner and the volunteers assigned to it.
+    """
+    sub = int(principal["sub"])
+    if principal["role"] == "user":
+        query = db.query(Alert.id).filter(Alert.id == alert_id, Alert.user_id == sub)
+    else:
+        query = db.query(AlertVolunteer.id).filter(
+            AlertVolunteer.alert_id == alert_id, AlertVolunteer.volunteer_id == sub
+        )
+    return query.first() is not None
+
+
+def is_verified_volunteer(db: Session, principal: dict) -> bool:
+    if principal["role"] != "volunteer":
+        return False
+    return db.query(Volunteer.id).filter(
+        Volunteer.id == int(principal["sub"]), Volunteer.is_verified.is_(True)
+    ).first() is not None
+
+
+def authorize_with(session_factory, principal: dict, topic: str) -> bool:
+    """
+    authorize() on a short-lived session (for sockets and threadpool calls).
+    """
+    db = session_factory()
+    try:
+        return authorize(db, principal, topic)
+    finally:
+        db.close()
+
+
+def authorize(db: Session, principal: dict, topic: str) -> bool:
+    parsed = parse_topic(topic)
+    if parsed is None:
+        return False
+    kind, key = parsed
+    if kind in ("user", "volunteer"):
+        return principal["role"] == kind and principal["sub"] == key
+    if kind == "alert":
+        return can_watch_alert(db, principal, int(key))
+    # area topics carry exact SOS coordinates: verified volunteers only
+    return is_verified_volunteer(db, principal)
@@ -0,0 +1,231 @@
+"""
+Offline reverse geocoder: coordinates or a free-text city -> region id.
+- region ids look like "IN-KA.bengaluru"; the part before the dot is the
+  state ("IN-KA"), so a prefix filter covers a whole state
+- a point belongs to the nearest city centroid in GEOCODER_DATASET within
+  GEOCODER_MAX_KM (no boundary polygons: nearest centroid approximates
+  the city limits), farther away it gets no region
+- centroids are kept as a KD-tree over unit vectors, written flat into a
+  cache file and memory-mapped: built once per dataset version, the pages
+  are shared by every worker process
+"""
+
+import csv
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import namedtuple
+
+from sqlalchemy import inspect
+
+from app.core.config import settings
+
+EARTH_RADIUS_KM = 6371.0
+
+# magic, city count, dataset size, dataset mtime (ns); then 3 doubles per
+# node (x, y, z in tree order) and one int32 city index per node
+HEADER = struct.Struct("<8sIqq")
+MAGIC = b"SSKDT001"
+
+City = namedtuple("City", "region_id name state lat lng")
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+def make_region_id(state: str, city: str) -> str:
+    return f"IN-{state.upper()}.{normalize(city).replace(' ', '-')}"
+
+
+def unit_vector(lat: float, lng: float) -> tuple[float, float, float]:
+    lat, lng = math.radians(lat), math.radians(lng)
+    return math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat)
+
+
+def read_dataset(path: str) -> tuple[list[City], dict[str, str]]:
+    """
+    Cities plus a normalized name / alias -> region id map.
+    """
+    cities, names = [], {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            city = City(make_region_id(row["state"], row["city"]), row["city"], row["state"].upper(),
+                        float(row["lat"]), float(row["lng"]))
+            cities.append(city)
+            for name in [row["city"], *(row.get("aliases") or "").split("|")]:
+                if normalize(name):
+                    names.setdefault(normalize(name), city.region_id)
+    return cities, names
+
+
+def tree_order(points: list[tuple[float, float, float]]) -> list[int]:
+    """
+    Implicit KD-tree: the median of a range is its node, the halves on
+    either side its subtrees, axis = depth % 3.
+    """
+    order = list(range(len(points)))
+    stack = [(0, len(order), 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo <= 1:
+            continue
+        axis = depth % 3
+        order[lo:hi] = sorted(order[lo:hi], key=lambda i: points[i][axis])
+        mid = (lo + hi) // 2
+        stack.append((lo, mid, depth + 1))
+        stack.append((mid + 1, hi, depth + 1))
+    return order
+
+
+def write_tree(path: str, cities: list[City], dataset_stat: os.stat_result):
+    points = [unit_vector(city.lat, city.lng) for city in cities]
+    order = tree_order(points)
+    data = bytearray(HEADER.pack(MAGIC, len(cities), dataset_stat.st_size, dataset_stat.st_mtime_ns))
+    for i in order:
+        data += struct.pack("<3d", *points[i])
+    data += struct.pack(f"<{len(order)}i", *order)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # temp file + rename, so a worker never maps a half-written tree
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class ReverseGeocoder:
+    def __init__(self, dataset: str, cache_dir: str, max_km: float):
+        self.cities, self.names = read_dataset(dataset)
+        self.max_km = max_km
+        # compared against squared chord lengths on the unit sphere
+        self.max_chord2 = (2 * math.sin(min(max_km / EARTH_RADIUS_KM, math.pi) / 2)) ** 2
+        self.path = os.path.join(cache_dir, os.path.splitext(os.path.basename(dataset))[0] + ".kdtree")
+        stat = os.stat(dataset)
+        if not self._is_current(stat):
+            write_tree(self.path, self.cities, stat)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        n = len(self.cities)
+        view = memoryview(self._map)
+        self.coords = view[HEADER.size:HEADER.size + 24 * n].cast("d")
+        self.index = view[HEADER.size + 24 * n:HEADER.size + 28 * n].cast("i")
+
+    def _is_current(self, stat: os.stat_result) -> bool:
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(HEADER.size)
+        except OSError:
+            return False
+        return len(header) == HEADER.size and \
+            HEADER.unpack(header) == (MAGIC, len(self.cities), stat.st_size, stat.st_mtime_ns)
+
+    def nearest(self, lat: float, lng: float) -> tuple[City, float] | None:
+        """
+        Nearest city within max_km and its distance (km), or None.
+        """
+        target = unit_vector(lat, lng)
+        x, y, z = target
+        coords = self.coords
+        best, best_d = -1, self.max_chord2
+        stack = [(0, len(self.cities), 0, 0.0)]
+        while stack:
+            lo, hi, axis, plane_d = stack.pop()
+            if lo >= hi or plane_d >= best_d:
+                continue
+            mid = (lo + hi) >> 1
+            base = 3 * mid
+            dx, dy, dz = coords[base] - x, coords[base + 1] - y, coords[base + 2] - z
+            d = dx * dx + dy * dy + dz * dz
+            if d < best_d:
+                best, best_d = mid, d
+            diff = target[axis] - coords[base + axis]
+            nxt = axis + 1 if axis < 2 else 0
+            if diff < 0:
+                stack.append((mid + 1, hi, nxt, diff * diff))
+                stack.append((lo, mid, nxt, 0.0))
+            else:
+                stack.append((lo, mid, nxt, diff * diff))
+                stack.append((mid + 1, hi, nxt, 0.0))
+        if best < 0:
+            return None
+        km = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(best_d) / 2))
+        return self.cities[self.index[best]], km
+
+    def region_for_point(self, lat: float, lng: float) -> str | None:
+        found = self.nearest(lat, lng)
+        return found[0].region_id if found else None
+
+    def region_for_city(self, text: str) -> str | None:
+        """
+        "Bangalore", "bengaluru, Karnataka", "New Delhi" -> region id.
+        """
+        for part in (text, text.split(",")[0]):
+            region = self.names.get(normalize(part))
+            if region:
+                return region
+        return None
+
+
+_geocoder = None
+_lock = threading.Lock()
+
+
+def get_geocoder() -> ReverseGeocoder:
+    global _geocoder
+    if _geocoder is None:
+        with _lock:
+            if _geocoder is None:
+                _geocoder = ReverseGeocoder(settings.GEOCODER_DATASET, settings.GEOCODER_CACHE_DIR,
+                                            settings.GEOCODER_MAX_KM)
+    return _geocoder
+
+
+def load():
+    """
+    Startup hook: reads the dataset and maps the tree before the first write needs it.
+    """
+    get_geocoder()
+
+
+def region_for_point(lat: float | None, lng: float | None) -> str | None:
+    if lat is None or lng is None:
+        return None
+    return get_geocoder().region_for_point(lat, lng)
+
+
+def region_for_city(text: str | None) -> str | None:
+    return get_geocoder().region_for_city(text) if text else None
+
+
+def region_filter(column, region: str):
+    """
+    "IN-KA.bengaluru" matches the city, "IN-KA" every city in the state
+    (a prefix range, so it still uses the region_id index).
+    """
+    if "." in region:
+        return column == region
+    return column.like(f"{region}.%")
+
+
+# ----------------- WRITE HOOKS -----------------
+# Registered on the models (before_insert / before_update), so every
+# insert through the ORM is tagged whichever route or service made it
+
+def tag_point(mapper, connection, target):
+    if target.region_id is None:
+        target.region_id = region_for_point(target.latitude, target.longitude)
+
+
+def tag_volunteer(mapper, connection, volunteer):
+    """
+    Position if known, otherwise the free-text city. Re-tagged when either changes.
+    """
+    attrs = inspect(volunteer).attrs
+    if volunteer.region_id is not None and not any(
+        attrs[name].history.has_changes() for name in ("latitude", "longitude", "city")
+    ):
+        return
+    volunteer.region_id = region_for_point(volunteer.latitude, volunteer.longitude) or region_for_city(volunteer.city)
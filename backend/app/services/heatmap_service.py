@@ -3,27 +3,19 @@ Generate heatmap data from reports and alerts.
 """
 
 from sqlalchemy.orm import Session
-from app.models.report import Report
-from app.models.alert import Alert
+from app.services.read_models import HeatPoint
+from app.services.region_service import heat_points
 
-def get_heatmap_data(db: Session):
-    alerts = db.query(Alert).all()
-    reports = db.query(Report).all()
-
-    data = []
+HEATMAP_FIELDS = list(HeatPoint._fields)
 
-    for alert in alerts:
-        data.append({
-            "lat": alert.latitude,
-            "lon": alert.longitude,
-            "level": alert.panic_level
-        })
+def get_heatmap_rows(db: Session, lat: float | None = None, lng: float | None = None,
+                     radius_km: float | None = None) -> list[HeatPoint]:
+    """
+    (lat, lon, level) tuples straight from the columns,
+    no ORM objects are built. With lat/lng/radius_km only that area
+    (and only the region shards covering it) is read.
+    """
+    return heat_points(db, lat, lng, radius_km)
 
-    for report in reports:
-        data.append({
-            "lat": report.latitude,
-            "lon": report.longitude,
-            "level": report.risk_level
-        })
-
-    return data
+def get_heatmap_data(db: Session):
+    return [point._asdict() for point in get_heatmap_rows(db)]
@@ -1,10 +1,90 @@
 """
-Placeholder for notifications.
-Can integrate email, push, or SMS later.
+Alert notifications:
+- live: socket pushes right after the response (notify_new_alert)
+- durable: email / SMS to the owner's trusted contacts and push to the
+  assigned volunteers, queued in the outbox inside the alert transaction
+  (app/services/outbox.py delivers them)
 """
 
-def notify_volunteer(volunteer_id: int, alert_id: int):
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.gateway import gateway, area_topic, user_topic, volunteer_topic
+from app.core.socket_manager import manager
+from app.core.tracing import span
+from app.models.trusted_contacts import TrustedContact
+from app.services.channels import enabled_channels
+from app.services.outbox import enqueue
+
+logger = logging.getLogger("silent_shield.notifications")
+
+# AREA_ALERT for plain users (not volunteers): ~1 km, enough to stay away
+# but not to find the person
+COARSE_DECIMALS = 2
+
+
+def queue_alert_notifications(db: Session, alert, volunteer_ids: list[int]) -> int:
+    """
+    Adds the alert's outbox messages to the session (not committed here).
+    Only channels that are configured get messages. Returns how many.
+    """
+    channels = enabled_channels()
+    if not channels:
+        return 0
+    count = 0
+    map_link = f"https://maps.google.com/?q={alert.latitude},{alert.longitude}"
+    if alert.user_id and channels & {"email", "sms"}:
+        text = f"Silent Shield {alert.emergency_level or ''} alert ({alert.emergency_type or 'emergency'}): {map_link}"
+        contacts = db.query(TrustedContact.email, TrustedContact.phone).filter(
+            TrustedContact.user_id == alert.user_id
+        ).all()
+        for email, phone in contacts:
+            if email and "email" in channels:
+                enqueue(db, "email", email, {"subject": "Silent Shield emergency alert", "body": text}, alert.id)
+                count += 1
+            if phone and "sms" in channels:
+                enqueue(db, "sms", phone, {"text": text}, alert.id)
+                count += 1
+    if "push" in channels:
+        for volunteer_id in volunteer_ids:
+            enqueue(db, "push", volunteer_id, alert_payload(alert), alert.id)
+            count += 1
+    return count
+
+
+def coarse_payload(payload: dict) -> dict:
+    return {**payload, "latitude": round(payload["latitude"], COARSE_DECIMALS),
+            "longitude": round(payload["longitude"], COARSE_DECIMALS), "approximate": True}
+
+
+def alert_payload(alert) -> dict:
+    return {
+        "type": "NEW_ALERT",
+        "alert_id": alert.id,
+        "latitude": alert.latitude,
+        "longitude": alert.longitude,
+        "level": alert.emergency_level,
+        "type_need": alert.emergency_type,
+    }
+
+
+async def notify_new_alert(payload: dict, volunteer_ids: list[int], traceparent: str | None = None,
+                           watchers: dict | None = None):
     """
-    Dummy notification: just print for now
+    Pushes NEW_ALERT to each assigned volunteer's socket, then to anyone
+    watching the alert's area topic, then AREA_ALERT to the owners of
+    matching area subscriptions ({(role, id): [subscription ids]}),
+    coarsened for plain users.
+    Runs as a background task, so the trace is continued from `traceparent`.
     """
-    print(f"Volunteer {volunteer_id} notified about alert {alert_id}")
+    with span("alert.notify", parent=traceparent, alert_id=payload["alert_id"], volunteers=len(volunteer_ids)):
+        for volunteer_id in volunteer_ids:
+            await manager.send_to_volunteer(volunteer_id, payload)
+        await gateway.publish(area_topic(payload["latitude"], payload["longitude"]), payload)
+        for (role, owner_id), subscription_ids in (watchers or {}).items():
+            if role == "volunteer":
+                topic, data = volunteer_topic(owner_id), payload
+            else:
+                topic, data = user_topic(owner_id), coarse_payload(payload)
+            await gateway.publish(topic, {**data, "type": "AREA_ALERT", "subscription_ids": subscription_ids})
@@ -0,0 +1,293 @@
+"""
+Transactional outbox for notifications.
+- enqueue() adds the message to the caller's session, so it commits (or
+  rolls back) together with the alert that caused it
+- OutboxRelay claims due messages with a lease, sends them through the
+  channel adapters in its own thread pool (per-channel concurrency limits),
+  then marks them sent, retries them with backoff or dead-letters them
+
+Delivery is at-least-once: a relay that dies mid-send leaves its lease to
+run out and the message is sent again, so adapters pass the message id on
+(Idempotency-Key / Message-ID) for the receiver to deduplicate.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import outbox_lag, outbox_messages, outbox_send_time, registry
+from app.models.outbox_message import OutboxMessage
+from app.services.channels import ChannelAdapter, DeliveryError, Envelope, build_adapters
+
+logger = logging.getLogger("silent_shield.outbox")
+
+LEASE_SECONDS = 60  # a claimed message is handed out again after this
+DUE = ("pending", "sending")  # sending + expired lease = relay died mid-send
+
+_relay = None  # the running OutboxRelay, see start_relay()
+
+
+def enqueue(db: Session, channel: str, recipient: str, payload: dict, alert_id: int | None = None) -> OutboxMessage:
+    """
+    Adds a message to the session; nothing is sent until the caller commits.
+    """
+    message = OutboxMessage(channel=channel, recipient=str(recipient), payload=json.dumps(payload),
+                            alert_id=alert_id, status="pending", available_at=datetime.utcnow())
+    db.add(message)
+    return message
+
+
+def backoff_delay(attempts: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with jitter (50-100% of the step), so messages that
+    failed together don't all retry together.
+    """
+    step = min(cap, base * 2 ** (attempts - 1))
+    return step * (0.5 + random.random() / 2)
+
+
+class OutboxRelay:
+    def __init__(self, session_factory, adapters: dict[str, ChannelAdapter],
+                 batch_size: int = settings.OUTBOX_BATCH_SIZE,
+                 poll_interval: float = settings.OUTBOX_POLL_INTERVAL,
+                 max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS,
+                 backoff: float = settings.OUTBOX_BACKOFF_SECONDS,
+                 backoff_max: float = settings.OUTBOX_BACKOFF_MAX_SECONDS,
+                 workers: int = settings.OUTBOX_WORKERS):
+        self.session_factory = session_factory
+        self.adapters = adapters
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.workers = workers
+        # sends + DB work; the semaphores below keep each channel in its limit
+        self.executor = ThreadPoolExecutor(
+            max_workers=sum(a.concurrency for a in adapters.values()) + workers,
+            thread_name_prefix="outbox",
+        )
+        self.limits = {}
+        self.tasks = []
+        self.loop = None
+        self.wakeup = None
+
+    # ----------------- DB (blocking, run in the executor) -----------------
+
+    def claim(self) -> list[Envelope]:
+        """
+        Leases up to batch_size due messages. The UPDATE re-checks
+        available_at, so two relays racing for a row can't both win it.
+        """
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        db = self.session_factory()
+        try:
+            ids = [row.id for row in db.query(OutboxMessage.id).filter(
+                OutboxMessage.status.in_(DUE),
+                OutboxMessage.available_at <= now,
+                OutboxMessage.channel.in_(list(self.adapters)),
+            ).order_by(OutboxMessage.available_at, OutboxMessage.id).limit(self.batch_size)]
+            if not ids:
+                return []
+            db.query(OutboxMessage).filter(
+                OutboxMessage.id.in_(ids),
+                OutboxMessage.status.in_(DUE),
+                OutboxMessage.available_at <= now,
+            ).update({
+                OutboxMessage.status: "sending",
+                OutboxMessage.lease_token: token,
+                OutboxMessage.available_at: now + timedelta(seconds=LEASE_SECONDS),
+                OutboxMessage.attempts: OutboxMessage.attempts + 1,
+            }, synchronize_session=False)
+            db.commit()
+            rows = db.query(OutboxMessage).filter(OutboxMessage.lease_token == token).order_by(OutboxMessage.id).all()
+            return [Envelope(m.id, m.channel, m.recipient, json.loads(m.payload), m.attempts, m.created_at, token)
+                    for m in rows]
+        finally:
+            db.close()
+
+    def record(self, results: list[tuple[Envelope, Exception | None]]):
+        """
+        Stores the outcome of each send. Only rows still holding our lease
+        are touched (a lease that ran out may belong to another relay now).
+        """
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            # deliveries: one UPDATE per lease
+            sent = defaultdict(list)
+            for message, error in results:
+                if error is None:
+                    sent[message.lease_token].append(message.id)
+                    outbox_messages.inc(message.channel, "sent")
+                    outbox_lag.observe((now - message.created_at).total_seconds(), message.channel)
+            for token, ids in sent.items():
+                db.query(OutboxMessage).filter(
+                    OutboxMessage.id.in_(ids), OutboxMessage.lease_token == token
+                ).update({OutboxMessage.status: "sent", OutboxMessage.sent_at: now,
+                          OutboxMessage.lease_token: None, OutboxMessage.last_error: None},
+                         synchronize_session=False)
+
+            for message, error in results:
+                if error is None:
+                    continue
+                mine = db.query(OutboxMessage).filter(
+                    OutboxMessage.id == message.id, OutboxMessage.lease_token == message.lease_token
+                )
+                permanent = isinstance(error, DeliveryError) and error.permanent
+                if permanent or message.attempts >= self.max_attempts:
+                    changes = {OutboxMessage.status: "dead"}
+                    outcome = "dead"
+                    logger.warning("outbox message dead-lettered", extra={
+                        "message_id": message.id, "channel": message.channel, "error": str(error)})
+                else:
+                    delay = backoff_delay(message.attempts, self.backoff, self.backoff_max)
+                    changes = {OutboxMessage.status: "pending",
+                               OutboxMessage.available_at: now + timedelta(seconds=delay)}
+                    outcome = "retry"
+                mine.update({**changes, OutboxMessage.lease_token: None,
+                             OutboxMessage.last_error: str(error)[:255] or type(error).__name__},
+                            synchronize_session=False)
+                outbox_messages.inc(message.channel, outcome)
+            db.commit()
+        finally:
+            db.close()
+
+    def send(self, channel: str, messages: list[Envelope]) -> list[tuple[Envelope, Exception | None]]:
+        start = perf_counter()
+        try:
+            errors = self.adapters[channel].send_batch(messages)
+        except Exception as exc:  # connect failed etc.: the whole batch failed
+            errors = [exc] * len(messages)
+        outbox_send_time.observe(perf_counter() - start, channel)
+        return list(zip(messages, errors))
+
+    # ----------------- async side -----------------
+
+    async def drain_once(self) -> int:
+        """
+        One claim -> send -> record round. Returns how many were claimed.
+        """
+        loop = asyncio.get_running_loop()
+        messages = await loop.run_in_executor(self.executor, self.claim)
+        if not messages:
+            return 0
+
+        by_channel = defaultdict(list)
+        for message in messages:
+            by_channel[message.channel].append(message)
+
+        async def send_chunk(channel, chunk):
+            limit = self.limits.get(channel)
+            if limit is None:
+                limit = self.limits[channel] = asyncio.Semaphore(self.adapters[channel].concurrency)
+            async with limit:
+                return await loop.run_in_executor(self.executor, self.send, channel, chunk)
+
+        sends = []
+        for channel, queued in by_channel.items():
+            size = self.adapters[channel].max_batch
+            sends += [send_chunk(channel, queued[i:i + size]) for i in range(0, len(queued), size)]
+        results = [result for chunk in await asyncio.gather(*sends) for result in chunk]
+        await loop.run_in_executor(self.executor, self.record, results)
+        return len(messages)
+
+    async def _worker(self):
+        while True:
+            self.wakeup.clear()
+            try:
+                claimed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("outbox relay round failed")
+                claimed = 0
+            if claimed < self.batch_size:  # a full batch means more is waiting
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.executor.shutdown(wait=True)
+        for adapter in self.adapters.values():
+            adapter.close()
+
+    def wake(self):
+        """
+        Thread-safe: new messages were committed, don't wait for the poll.
+        """
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    def backlog(self) -> dict:
+        """
+        {(channel, status): count} of undelivered messages.
+        """
+        db = self.session_factory()
+        try:
+            rows = db.query(OutboxMessage.channel, OutboxMessage.status, func.count()).filter(
+                OutboxMessage.status.in_(DUE + ("dead",))
+            ).group_by(OutboxMessage.channel, OutboxMessage.status).all()
+            return {(channel, status): count for channel, status, count in rows}
+        finally:
+            db.close()
+
+
+def wake():
+    if _relay is not None:
+        _relay.wake()
+
+
+def _backlog() -> dict:
+    if _relay is None:
+        return {}
+    try:
+        return _relay.backlog()
+    except Exception:
+        logger.exception("outbox backlog query failed")
+        return {}
+
+
+outbox_backlog = registry.gauge("outbox_backlog", "Undelivered outbox messages", ("channel", "status"),
+                                collect=_backlog)
+
+
+async def start_relay(session_factory):
+    """
+    Starts the relay if any channel is configured (SMTP_HOST, *_WEBHOOK_URL).
+    """
+    global _relay
+    adapters = build_adapters()
+    if _relay is not None or not adapters:
+        return
+    _relay = OutboxRelay(session_factory, adapters)
+    _relay.start()
+    logger.info("outbox relay started", extra={"channels": sorted(adapters)})
+
+
+async def stop_relay():
+    global _relay
+    if _relay is not None:
+        relay, _relay = _relay, None
+        await relay.stop()
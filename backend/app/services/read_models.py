@@ -0,0 +1,91 @@
+"""
+Read models for hot read paths.
+Column-projected queries that return small tuples (or plain arrays)
+instead of full ORM entities, so no identity map, no change tracking
+and no unused columns.
+"""
+
+from array import array
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.alert import Alert
+from app.models.alert_volunteer import AlertVolunteer
+from app.models.report import Report
+from app.models.volunteer import Volunteer
+
+
+class VolunteerPoint(NamedTuple):
+    id: int
+    latitude: float
+    longitude: float
+
+
+class HeatPoint(NamedTuple):
+    lat: float
+    lon: float
+    level: int | str
+
+
+class VolunteerColumns(NamedTuple):
+    """
+    Struct-of-arrays form for bulk scans: 8 bytes per value, no per-row objects.
+    """
+    ids: array
+    latitudes: array
+    longitudes: array
+
+
+def _verified_volunteers_query(bbox=None):
+    query = select(Volunteer.id, Volunteer.latitude, Volunteer.longitude).where(
+        Volunteer.is_verified == True,
+        Volunteer.latitude.isnot(None),
+        Volunteer.longitude.isnot(None),
+    )
+    if bbox:
+        min_lat, max_lat, min_lon, max_lon = bbox
+        query = query.where(
+            Volunteer.latitude.between(min_lat, max_lat),
+            Volunteer.longitude.between(min_lon, max_lon),
+        )
+    return query
+
+
+def verified_volunteer_points(db: Session, bbox=None) -> list[VolunteerPoint]:
+    """
+    Verified volunteers with a known location, optionally inside a
+    (min_lat, max_lat, min_lon, max_lon) box.
+    """
+    return list(map(VolunteerPoint._make, db.execute(_verified_volunteers_query(bbox))))
+
+
+def verified_volunteer_columns(db: Session, bbox=None) -> VolunteerColumns:
+    cols = VolunteerColumns(array("q"), array("d"), array("d"))
+    for vid, lat, lng in db.execute(_verified_volunteers_query(bbox)):
+        cols.ids.append(vid)
+        cols.latitudes.append(lat)
+        cols.longitudes.append(lng)
+    return cols
+
+
+def heat_points(db: Session, bbox=None) -> list[HeatPoint]:
+    alerts = select(Alert.latitude, Alert.longitude, Alert.panic_level)
+    reports = select(Report.latitude, Report.longitude, Report.risk_level)
+    if bbox:
+        min_lat, max_lat, min_lon, max_lon = bbox
+        alerts = alerts.where(Alert.latitude.between(min_lat, max_lat), Alert.longitude.between(min_lon, max_lon))
+        reports = reports.where(Report.latitude.between(min_lat, max_lat), Report.longitude.between(min_lon, max_lon))
+    points = list(map(HeatPoint._make, db.execute(alerts)))
+    points += map(HeatPoint._make, db.execute(reports))
+    return points
+
+
+def volunteer_ids_for_alert(db: Session, alert_id: int, status: str) -> list[int]:
+    return list(db.scalars(
+        select(AlertVolunteer.volunteer_id).where(
+            AlertVolunteer.alert_id == alert_id,
+            AlertVolunteer.status == status,
+        )
+    ))
@@ -0,0 +1,295 @@
+"""
+Region-partitioned geo data (see app/core/sharding.py).
+- volunteer_points() / heat_points(): read only the shards covering the
+  radius; if a shard can't be reached the read falls back to the primary,
+  which still has every row
+- place_alert() / place_report(): copy a new row into its home shard
+  after the primary commit (best effort, a sync repairs misses)
+- volunteers are placed by Session hooks: any flush that inserts, deletes
+  or changes a volunteer's is_verified / latitude / longitude is copied
+  (or removed, once unverified) after the commit
+- sync_from_primary() / rebalance(): used by rebalance_regions.py
+With the router disabled everything reads the primary, as before.
+"""
+
+import logging
+from collections import Counter
+
+from sqlalchemy import delete, event, insert, inspect, select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core import sharding
+from app.core.sharding import CELL_PRECISION
+from app.models.alert import Alert
+from app.models.region_point import RegionHeatPoint, RegionVolunteer
+from app.models.report import Report
+from app.models.volunteer import Volunteer
+from app.services import read_models
+from app.services.read_models import HeatPoint, VolunteerPoint
+from app.utils import geohash
+from app.utils.geo import bounding_box
+
+logger = logging.getLogger("silent_shield.regions")
+
+
+def _volunteer_row(volunteer_id, lat, lng) -> dict:
+    return {"volunteer_id": volunteer_id, "latitude": lat, "longitude": lng,
+            "cell": geohash.encode(lat, lng, CELL_PRECISION)}
+
+
+def _heat_row(kind, source_id, lat, lng, level) -> dict:
+    return {"kind": kind, "source_id": source_id, "latitude": lat, "longitude": lng,
+            "level": None if level is None else str(level), "cell": geohash.encode(lat, lng, CELL_PRECISION)}
+
+
+def _in_box(model, bbox):
+    min_lat, max_lat, min_lng, max_lng = bbox
+    return model.latitude.between(min_lat, max_lat), model.longitude.between(min_lng, max_lng)
+
+
+def _keys_clause(model, rows):
+    pk = list(model.__table__.primary_key)
+    if len(pk) == 1:
+        return pk[0].in_([row[pk[0].key] for row in rows])
+    return tuple_(*pk).in_([tuple(row[c.key] for c in pk) for row in rows])
+
+
+# ----------------- READS -----------------
+
+def volunteer_points(db: Session, lat: float, lng: float, radius_km: float) -> list[VolunteerPoint]:
+    """
+    (id, lat, lng) of verified volunteers inside the radius box.
+    """
+    router = sharding.region_router
+    bbox = bounding_box(lat, lng, radius_km)
+    if not router.enabled:
+        return read_models.verified_volunteer_points(db, bbox)
+    points = {}  # by id: mid-rebalance a row can briefly be in two shards
+    query = select(RegionVolunteer.volunteer_id, RegionVolunteer.latitude, RegionVolunteer.longitude) \
+        .where(*_in_box(RegionVolunteer, bbox))
+    for name in router.shards_for_radius(lat, lng, radius_km):
+        try:
+            with router.session(name) as shard:
+                for row in shard.execute(query):
+                    points[row[0]] = VolunteerPoint._make(row)
+        except SQLAlchemyError:
+            logger.exception("region shard unavailable, reading the primary", extra={"shard": name})
+            return read_models.verified_volunteer_points(db, bbox)
+    return list(points.values())
+
+
+def heat_points(db: Session, lat: float | None = None, lng: float | None = None,
+                radius_km: float | None = None) -> list[HeatPoint]:
+    """
+    Alert and report points, all of them or the ones inside the radius box.
+    """
+    router = sharding.region_router
+    bbox = bounding_box(lat, lng, radius_km) if lat is not None and lng is not None and radius_km else None
+    if not router.enabled:
+        return read_models.heat_points(db, bbox)
+    query = select(RegionHeatPoint.kind, RegionHeatPoint.source_id, RegionHeatPoint.latitude,
+                   RegionHeatPoint.longitude, RegionHeatPoint.level)
+    if bbox:
+        query = query.where(*_in_box(RegionHeatPoint, bbox))
+    points = {}
+    for name in router.shards_for_radius(lat, lng, radius_km) if bbox else router.names:
+        try:
+            with router.session(name) as shard:
+                for kind, source_id, p_lat, p_lng, level in shard.execute(query):
+                    if kind == "alert" and level is not None:
+                        level = int(level)  # panic_level, as the primary returns it
+                    points[kind, source_id] = HeatPoint(p_lat, p_lng, level)
+        except SQLAlchemyError:
+            logger.exception("region shard unavailable, reading the primary", extra={"shard": name})
+            return read_models.heat_points(db, bbox)
+    return list(points.values())
+
+
+# ----------------- WRITES -----------------
+
+def _replace(shard: Session, model, rows: list[dict]):
+    shard.execute(delete(model).where(_keys_clause(model, rows)))
+    shard.execute(insert(model), rows)
+
+
+def _place(model, rows: list[dict]):
+    router = sharding.region_router
+    by_shard = {}
+    for row in rows:
+        by_shard.setdefault(router.shard_for_cell(row["cell"]), []).append(row)
+    for name, shard_rows in by_shard.items():
+        with router.session(name) as shard:
+            _replace(shard, model, shard_rows)
+            shard.commit()
+
+
+def _place_quietly(model, rows: list[dict]):
+    if not sharding.region_router.enabled:
+        return
+    try:
+        _place(model, rows)
+    except SQLAlchemyError:
+        # the primary has the row; `rebalance_regions.py --sync` copies it later
+        logger.exception("region placement failed", extra={"table": model.__tablename__})
+
+
+def place_alert(alert: Alert):
+    _place_quietly(RegionHeatPoint, [_heat_row("alert", alert.id, alert.latitude, alert.longitude,
+                                               alert.panic_level)])
+
+
+def place_report(report: Report):
+    _place_quietly(RegionHeatPoint, [_heat_row("report", report.id, report.latitude, report.longitude,
+                                               report.risk_level)])
+
+
+def place_volunteers(volunteers: list[tuple]):
+    """
+    (id, is_verified, lat, lng) of volunteers that changed: the row is
+    cleared from every shard (it may have moved, or stopped qualifying),
+    then written to its home shard if the volunteer is verified and located.
+    """
+    router = sharding.region_router
+    if not router.enabled or not volunteers:
+        return
+    keys = [{"volunteer_id": volunteer_id} for volunteer_id, *_ in volunteers]
+    by_shard = {}
+    for volunteer_id, verified, lat, lng in volunteers:
+        if verified and lat is not None and lng is not None:
+            row = _volunteer_row(volunteer_id, lat, lng)
+            by_shard.setdefault(router.shard_for_cell(row["cell"]), []).append(row)
+    try:
+        for name in router.names:
+            with router.session(name) as shard:
+                shard.execute(delete(RegionVolunteer).where(_keys_clause(RegionVolunteer, keys)))
+                if by_shard.get(name):
+                    shard.execute(insert(RegionVolunteer), by_shard[name])
+                shard.commit()
+    except SQLAlchemyError:
+        # the primary has the row; `rebalance_regions.py --sync` copies it later
+        logger.exception("region placement failed", extra={"table": RegionVolunteer.__tablename__})
+
+
+PLACEMENT_FIELDS = ("is_verified", "latitude", "longitude")
+
+
+def track_volunteers(session, flush_context):
+    """
+    after_flush (registered in app/models/volunteer.py): remembers the
+    volunteers whose placement may have changed, placed after the commit.
+    """
+    if not sharding.region_router.enabled:
+        return
+    changed = session.info.setdefault("region_volunteers", {})
+    for volunteer in session.new:
+        if isinstance(volunteer, Volunteer):
+            changed[volunteer.id] = (volunteer.is_verified, volunteer.latitude, volunteer.longitude)
+    for volunteer in session.dirty:
+        if isinstance(volunteer, Volunteer):
+            state = inspect(volunteer)
+            if any(state.attrs[field].history.has_changes() for field in PLACEMENT_FIELDS):
+                changed[volunteer.id] = (volunteer.is_verified, volunteer.latitude, volunteer.longitude)
+    for volunteer in session.deleted:
+        if isinstance(volunteer, Volunteer):
+            changed[volunteer.id] = (False, None, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _place_tracked_volunteers(session):
+    changed = session.info.pop("region_volunteers", None)
+    if changed:
+        place_volunteers([(volunteer_id, *values) for volunteer_id, values in changed.items()])
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_tracked_volunteers(session):
+    session.info.pop("region_volunteers", None)
+
+
+# ----------------- TOOLS -----------------
+
+def _sync_table(db: Session, model, query, to_row, batch_size: int, counts: Counter, scope=None):
+    """
+    scope: the shard rows this query is the source for (stale ones are pruned).
+    """
+    router = sharding.region_router
+    seen = set()
+    for chunk in db.execute(query.execution_options(yield_per=batch_size)).partitions():
+        rows = [to_row(*row) for row in chunk]
+        by_shard = {}
+        for row in rows:
+            by_shard.setdefault(router.shard_for_cell(row["cell"]), []).append(row)
+            seen.add(tuple(row[c.key] for c in model.__table__.primary_key))
+        # the batch's keys are cleared everywhere first, so a row that changed region moves
+        for name in router.names:
+            with router.session(name) as shard:
+                shard.execute(delete(model).where(_keys_clause(model, rows)))
+                if by_shard.get(name):
+                    shard.execute(insert(model), by_shard[name])
+                shard.commit()
+            counts[name, model.__tablename__] += len(by_shard.get(name, ()))
+
+    # rows the primary no longer has (or no longer qualify, e.g. unverified)
+    pk = list(model.__table__.primary_key)
+    for name in router.names:
+        with router.session(name) as shard:
+            keys = select(*pk) if scope is None else select(*pk).where(scope)
+            stale = [dict(zip((c.key for c in pk), key)) for key in shard.execute(keys) if tuple(key) not in seen]
+            for start in range(0, len(stale), batch_size):
+                shard.execute(delete(model).where(_keys_clause(model, stale[start:start + batch_size])))
+            shard.commit()
+
+
+def sync_from_primary(db: Session, batch_size: int = 1000) -> Counter:
+    """
+    Rebuilds every shard from the primary. Safe to re-run.
+    Returns rows per (shard, table).
+    """
+    counts = Counter()
+    _sync_table(db, RegionVolunteer,
+                select(Volunteer.id, Volunteer.latitude, Volunteer.longitude).where(
+                    Volunteer.is_verified == True, Volunteer.latitude.isnot(None), Volunteer.longitude.isnot(None)
+                ).order_by(Volunteer.id),
+                _volunteer_row, batch_size, counts)
+    _sync_table(db, RegionHeatPoint,
+                select(Alert.id, Alert.latitude, Alert.longitude, Alert.panic_level).order_by(Alert.id),
+                lambda *row: _heat_row("alert", *row), batch_size, counts, RegionHeatPoint.kind == "alert")
+    _sync_table(db, RegionHeatPoint,
+                select(Report.id, Report.latitude, Report.longitude, Report.risk_level).order_by(Report.id),
+                lambda *row: _heat_row("report", *row), batch_size, counts, RegionHeatPoint.kind == "report")
+    return counts
+
+
+def rebalance(batch_size: int = 1000, dry_run: bool = False) -> Counter:
+    """
+    Moves rows whose cell now maps to another shard (after REGION_MAP
+    changed). Copied into the new shard first, then deleted from the old
+    one, so an interrupted run leaves duplicates, never gaps.
+    Returns rows moved per (from shard, to shard).
+    """
+    router = sharding.region_router
+    moved = Counter()
+    for model in (RegionVolunteer, RegionHeatPoint):
+        pk = list(model.__table__.primary_key)
+        for name in router.names:
+            with router.session(name) as source:
+                moving = [dict(zip((c.key for c in pk), row[:-1]))
+                          for row in source.execute(select(*pk, model.cell))
+                          if router.shard_for_cell(row[-1]) != name]
+                for start in range(0, len(moving), batch_size):
+                    keys = _keys_clause(model, moving[start:start + batch_size])
+                    rows = [dict(row._mapping) for row in source.execute(select(*model.__table__.columns).where(keys))]
+                    by_target = {}
+                    for row in rows:
+                        by_target.setdefault(router.shard_for_cell(row["cell"]), []).append(row)
+                    for target, target_rows in by_target.items():
+                        moved[name, target] += len(target_rows)
+                        if not dry_run:
+                            with router.session(target) as shard:
+                                _replace(shard, model, target_rows)
+                                shard.commit()
+                    if not dry_run:
+                        source.execute(delete(model).where(keys))
+                        source.commit()
+    return moved
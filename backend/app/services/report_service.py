@@ -5,6 +5,8 @@ Handles anonymous or logged-in area safety reports.
 from sqlalchemy.orm import Session
 from app.models.report import Report
 from app.services.ai_service import analyze_report
+from app.services.region_service import place_report
+from app.core.cache import invalidate
 
 def create_report(db: Session, user_id: int | None, description: str, latitude: float, longitude: float):
     risk_level = analyze_report(description)
@@ -20,4 +22,6 @@ def create_report(db: Session, user_id: int | None, description: str, latitude:
     db.add(report)
     db.commit()
     db.refresh(report)
+    place_report(report)
+    invalidate("heatmap")
     return report
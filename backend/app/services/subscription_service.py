@@ -0,0 +1,218 @@
+"""
+Geofenced alert subscriptions.
+
+Each worker keeps a GridIndex of subscription ids by cell; shapes stay in
+the DB. A match first pulls in subscriptions added since the last load
+(by any worker), then loads only the candidate rows and runs the exact
+circle / polygon test, which also drops subscriptions another worker
+deleted.
+"Added since" is by id, plus a periodic sweep by created_at: ids from
+concurrent transactions commit out of order, so the id high-water mark
+alone would skip a row that becomes visible after a larger id was loaded.
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.tracing import span
+from app.models.area_subscription import AreaSubscription
+from app.utils.geo import bounding_box, haversine, point_in_polygon
+from app.utils.spatial_index import GridIndex
+
+logger = logging.getLogger("silent_shield.subscriptions")
+
+OWNER_ROLES = ("user", "volunteer")
+MAX_RADIUS_KM = 50
+MAX_POLYGON_POINTS = 100
+MAX_POLYGON_SPAN_DEG = 1.0  # ~110 km
+LOAD_CHUNK = 50_000
+RELOAD_OVERLAP = timedelta(minutes=5)  # longer than a subscription insert takes to commit, plus clock skew
+SWEEP_EVERY = timedelta(seconds=10)    # how late an out-of-order subscription can start matching
+CANDIDATE_CHUNK = 500
+
+MATCH_COLUMNS = (
+    AreaSubscription.id, AreaSubscription.owner_role, AreaSubscription.owner_id, AreaSubscription.shape,
+    AreaSubscription.center_lat, AreaSubscription.center_lng, AreaSubscription.radius_km, AreaSubscription.polygon,
+)
+
+
+def shape_fields(center_lat=None, center_lng=None, radius_km=None, polygon=None) -> dict:
+    """
+    Column values for a circle or a polygon, bounding box included.
+    Raises ValueError for anything else.
+    """
+    if polygon is not None:
+        if center_lat is not None or radius_km is not None:
+            raise ValueError("Give either a circle or a polygon, not both")
+        if not 3 <= len(polygon) <= MAX_POLYGON_POINTS or any(len(p) != 2 for p in polygon):
+            raise ValueError(f"A polygon needs 3 to {MAX_POLYGON_POINTS} [lat, lng] points")
+        lats, lngs = [p[0] for p in polygon], [p[1] for p in polygon]
+        if not (-90 <= min(lats) and max(lats) <= 90 and -180 <= min(lngs) and max(lngs) <= 180):
+            raise ValueError("Polygon points out of range")
+        if max(lats) - min(lats) > MAX_POLYGON_SPAN_DEG or max(lngs) - min(lngs) > MAX_POLYGON_SPAN_DEG:
+            raise ValueError("Polygon too large")
+        return {"shape": "polygon", "polygon": json.dumps(polygon),
+                "min_lat": min(lats), "max_lat": max(lats), "min_lng": min(lngs), "max_lng": max(lngs)}
+
+    if center_lat is None or center_lng is None or radius_km is None:
+        raise ValueError("A circle needs center_lat, center_lng and radius_km")
+    if not (-90 <= center_lat <= 90 and -180 <= center_lng <= 180):
+        raise ValueError("Center out of range")
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise ValueError(f"radius_km must be between 0 and {MAX_RADIUS_KM}")
+    min_lat, max_lat, min_lng, max_lng = bounding_box(center_lat, center_lng, radius_km)
+    return {"shape": "circle", "center_lat": center_lat, "center_lng": center_lng, "radius_km": radius_km,
+            "min_lat": min_lat, "max_lat": max_lat, "min_lng": min_lng, "max_lng": max_lng}
+
+
+def contains(row, lat: float, lng: float) -> bool:
+    if row.shape == "circle":
+        return haversine(row.center_lat, row.center_lng, lat, lng) <= row.radius_km
+    return point_in_polygon(lat, lng, json.loads(row.polygon))
+
+
+def _bbox(sub) -> tuple[float, float, float, float]:
+    return sub.min_lat, sub.max_lat, sub.min_lng, sub.max_lng
+
+
+LOAD_COLUMNS = (
+    AreaSubscription.id, AreaSubscription.min_lat, AreaSubscription.max_lat,
+    AreaSubscription.min_lng, AreaSubscription.max_lng, AreaSubscription.active, AreaSubscription.created_at,
+)
+
+
+class SubscriptionIndex:
+    def __init__(self):
+        self.grid = GridIndex()
+        self.loaded_id = 0
+        self.loaded_at = None  # newest created_at seen; None until the first load
+        self.swept_at = None
+        self.recent = {}       # id -> created_at inside the overlap window, so a sweep doesn't add it twice
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.grid = GridIndex()
+            self.loaded_id = 0
+            self.loaded_at = self.swept_at = None
+            self.recent = {}
+
+    def _add(self, rows, keep_after) -> int:
+        added = 0
+        for row in rows:
+            self.loaded_id = max(self.loaded_id, row.id)
+            if row.created_at is not None:
+                self.loaded_at = max(self.loaded_at, row.created_at)
+            if row.id in self.recent:
+                continue
+            if row.created_at is not None and row.created_at >= keep_after:
+                self.recent[row.id] = row.created_at
+            if row.active:
+                self.grid.insert(row.id, *_bbox(row))
+                added += 1
+        return added
+
+    def refresh(self, db: Session) -> int:
+        """
+        Indexes active subscriptions with ids above the last one seen, and
+        every SWEEP_EVERY re-reads the ones created in the last
+        RELOAD_OVERLAP, for ids that committed after a larger one.
+        """
+        with self._lock:
+            now = datetime.utcnow()
+            if self.loaded_at is None:
+                self.loaded_at = self.swept_at = now
+            keep_after = self.loaded_at - 2 * RELOAD_OVERLAP
+            added = 0
+            while True:
+                rows = db.query(*LOAD_COLUMNS).filter(AreaSubscription.id > self.loaded_id) \
+                    .order_by(AreaSubscription.id).limit(LOAD_CHUNK).all()
+                added += self._add(rows, keep_after)
+                if len(rows) < LOAD_CHUNK:
+                    break
+
+            if now - self.swept_at >= SWEEP_EVERY:
+                since = self.loaded_at - RELOAD_OVERLAP
+                added += self._add(db.query(*LOAD_COLUMNS).filter(AreaSubscription.created_at >= since).all(), since)
+                self.swept_at = now
+                cutoff = self.loaded_at - RELOAD_OVERLAP
+                self.recent = {sub_id: created for sub_id, created in self.recent.items() if created >= cutoff}
+            return added
+
+    def remove(self, sub: AreaSubscription):
+        with self._lock:
+            self.grid.remove(sub.id, *_bbox(sub))
+
+    def candidates(self, lat: float, lng: float) -> list[int]:
+        with self._lock:
+            return self.grid.candidates(lat, lng)
+
+    def match(self, db: Session, lat: float, lng: float) -> list:
+        """
+        Active subscriptions whose shape contains the point.
+        """
+        self.refresh(db)
+        ids = self.candidates(lat, lng)
+        matched = []
+        for start in range(0, len(ids), CANDIDATE_CHUNK):
+            rows = db.query(*MATCH_COLUMNS).filter(
+                AreaSubscription.id.in_(ids[start:start + CANDIDATE_CHUNK]),
+                AreaSubscription.active.is_(True),
+                AreaSubscription.min_lat <= lat, AreaSubscription.max_lat >= lat,
+                AreaSubscription.min_lng <= lng, AreaSubscription.max_lng >= lng,
+            ).all()
+            matched += [row for row in rows if contains(row, lat, lng)]
+        return matched
+
+
+index = SubscriptionIndex()
+
+
+# ----------------- SUBSCRIPTIONS -----------------
+
+def create_subscription(db: Session, owner_role: str, owner_id: int, name: str | None, **shape) -> AreaSubscription:
+    sub = AreaSubscription(owner_role=owner_role, owner_id=owner_id, name=name, **shape_fields(**shape))
+    db.add(sub)
+    db.commit()
+    db.refresh(sub)
+    return sub
+
+
+def delete_subscription(db: Session, sub: AreaSubscription):
+    sub.active = False
+    db.commit()
+    index.remove(sub)
+
+
+def area_watchers(db: Session, alert, skip_volunteers=()) -> dict[tuple[str, int], list[int]]:
+    """
+    {(owner_role, owner_id): [subscription ids]} of everyone whose area
+    contains the alert, minus its sender and volunteers already assigned.
+    """
+    with span("match_area_subscriptions", alert_id=alert.id) as s:
+        skip = {("volunteer", v) for v in skip_volunteers}
+        if alert.user_id is not None:
+            skip.add(("user", alert.user_id))
+        watchers = {}
+        for row in index.match(db, alert.latitude, alert.longitude):
+            owner = (row.owner_role, row.owner_id)
+            if owner not in skip:
+                watchers.setdefault(owner, []).append(row.id)
+        s.set(watchers=len(watchers))
+        return watchers
+
+
+def warm_index(session_factory):
+    """
+    Loads the index up front, so the first alert doesn't pay for it.
+    """
+    db = session_factory()
+    try:
+        added = index.refresh(db)
+        logger.info("area subscriptions indexed", extra={"subscriptions": added})
+    finally:
+        db.close()
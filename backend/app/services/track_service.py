@@ -0,0 +1,322 @@
+"""
+Live location history in three tiers:
+- hot: raw points in live_locations, written in batches by TrackWriter
+- compacted: once an alert is closed its track is simplified and stored
+  as encoded polylines in alert_tracks (one row per alert)
+- archive: raw rows past TRACK_RETENTION_DAYS are moved to a gzip CSV per
+  alert (TRACK_ARCHIVE_DIR/YYYY/MM/alert_<id>.csv.gz) and deleted from the
+  hot table, so it only ever holds live and recently closed alerts
+
+read_track() picks the tier, so callers don't need to know where a track is.
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import logging
+import os
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.alert import Alert
+from app.models.alert_track import AlertTrack
+from app.models.live_location import LiveLocation
+from app.utils import polyline
+
+logger = logging.getLogger("silent_shield.tracks")
+
+# user / volunteer: [(lat, lng, epoch ms), ...] in time order
+Track = namedtuple("Track", "tier user volunteer")
+
+ARCHIVE_COLUMNS = ["timestamp_ms", "user_lat", "user_lng", "volunteer_lat", "volunteer_lng"]
+
+
+def epoch_ms(value: datetime) -> int:
+    return int(value.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def from_epoch_ms(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).replace(tzinfo=None)
+
+
+# ----------------- HOT TIER: BATCHED WRITES -----------------
+
+class TrackWriter:
+    """
+    Collects points on the event loop; run_track_writer() inserts them
+    every TRACK_FLUSH_INTERVAL seconds with one executemany. If that
+    fails the rows are retried one alert at a time, so a bad row only
+    costs its own alert's points for that interval.
+    """
+    def __init__(self):
+        self.rows = []
+
+    def record(self, alert_id: int, role: str, points: list):
+        lat_key, lng_key = ("volunteer_lat", "volunteer_lng") if role == "volunteer" else ("user_lat", "user_lng")
+        for lat, lng, ts in points:
+            row = {"alert_id": alert_id, "user_lat": None, "user_lng": None,
+                   "volunteer_lat": None, "volunteer_lng": None, "timestamp": from_epoch_ms(ts)}
+            row[lat_key], row[lng_key] = lat, lng
+            self.rows.append(row)
+
+    def take(self) -> list[dict]:
+        rows, self.rows = self.rows, []
+        return rows
+
+    @staticmethod
+    def write(session_factory, rows: list[dict]):
+        try:
+            TrackWriter._insert(session_factory, rows)
+            return
+        except DBAPIError:
+            logger.warning("track batch failed, retrying per alert", extra={"rows": len(rows)})
+        by_alert = {}
+        for row in rows:
+            by_alert.setdefault(row["alert_id"], []).append(row)
+        for alert_id, alert_rows in by_alert.items():
+            try:
+                TrackWriter._insert(session_factory, alert_rows)
+            except DBAPIError:
+                logger.exception("track points dropped", extra={"alert_id": alert_id, "rows": len(alert_rows)})
+
+    @staticmethod
+    def _insert(session_factory, rows: list[dict]):
+        db = session_factory()
+        try:
+            db.execute(LiveLocation.__table__.insert(), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+writer = TrackWriter()
+
+
+def record_batch(batch, sender: dict | None):
+    """
+    Stores a gateway LocationBatch; the sender's role says whose track it is.
+    """
+    writer.record(batch.alert_id, (sender or {}).get("role", "user"), batch.points)
+
+
+async def flush_tracks(session_factory):
+    rows = writer.take()
+    if rows:
+        await asyncio.get_running_loop().run_in_executor(None, TrackWriter.write, session_factory, rows)
+
+
+# ----------------- COMPACTED TIER -----------------
+
+def raw_points(db: Session, alert_id: int, since_ms: int | None = None) -> tuple[list, list]:
+    query = db.query(LiveLocation.user_lat, LiveLocation.user_lng, LiveLocation.volunteer_lat,
+                     LiveLocation.volunteer_lng, LiveLocation.timestamp).filter(LiveLocation.alert_id == alert_id)
+    if since_ms is not None:
+        query = query.filter(LiveLocation.timestamp > from_epoch_ms(since_ms))
+    user, volunteer = [], []
+    for user_lat, user_lng, volunteer_lat, volunteer_lng, timestamp in query.order_by(LiveLocation.timestamp):
+        ts = epoch_ms(timestamp)
+        if user_lat is not None:
+            user.append((user_lat, user_lng, ts))
+        if volunteer_lat is not None:
+            volunteer.append((volunteer_lat, volunteer_lng, ts))
+    return user, volunteer
+
+
+def compact_alert(db: Session, alert_id: int, tolerance: float = settings.TRACK_TOLERANCE_M) -> AlertTrack:
+    """
+    Simplifies the alert's raw track into an alert_tracks row (added to
+    the session, not committed). The raw rows stay until archived.
+    """
+    user, volunteer = raw_points(db, alert_id)
+    user_kept, volunteer_kept = polyline.simplify(user, tolerance), polyline.simplify(volunteer, tolerance)
+    times = [p[2] for p in user + volunteer]
+    track = AlertTrack(
+        alert_id=alert_id,
+        user_track=polyline.encode(user_kept),
+        volunteer_track=polyline.encode(volunteer_kept),
+        tolerance_m=tolerance,
+        raw_points=len(user) + len(volunteer),
+        kept_points=len(user_kept) + len(volunteer_kept),
+        started_at=from_epoch_ms(min(times)) if times else None,
+        ended_at=from_epoch_ms(max(times)) if times else None,
+        compacted_at=datetime.utcnow(),
+    )
+    db.add(track)
+    return track
+
+
+def compact_closed(session_factory, limit: int = 100, tolerance: float = settings.TRACK_TOLERANCE_M) -> int:
+    """
+    Compacts closed alerts that have raw points but no alert_tracks row.
+    """
+    db = session_factory()
+    try:
+        alert_ids = [row.id for row in db.query(Alert.id).filter(
+            Alert.status != "active",
+            db.query(LiveLocation.id).filter(LiveLocation.alert_id == Alert.id).exists(),
+            ~db.query(AlertTrack.alert_id).filter(AlertTrack.alert_id == Alert.id).exists(),
+        ).order_by(Alert.id).limit(limit)]
+        for alert_id in alert_ids:
+            compact_alert(db, alert_id, tolerance)
+            db.commit()
+        return len(alert_ids)
+    finally:
+        db.close()
+
+
+# ----------------- ARCHIVE TIER -----------------
+
+def write_archive(db: Session, track: AlertTrack, root: str) -> str:
+    """
+    Raw rows -> gzip CSV. Written to a temp file and renamed, so a crash
+    never leaves half an archive behind a path the DB points at.
+    """
+    month = track.ended_at or datetime.utcnow()
+    relative = os.path.join(f"{month:%Y}", f"{month:%m}", f"alert_{track.alert_id}.csv.gz")
+    path = os.path.join(root, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = db.query(LiveLocation.timestamp, LiveLocation.user_lat, LiveLocation.user_lng,
+                    LiveLocation.volunteer_lat, LiveLocation.volunteer_lng).filter(
+        LiveLocation.alert_id == track.alert_id).order_by(LiveLocation.timestamp)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+            text = io.TextIOWrapper(gz, encoding="utf-8", newline="")
+            out = csv.writer(text)
+            out.writerow(ARCHIVE_COLUMNS)
+            for timestamp, *coords in rows:
+                out.writerow([epoch_ms(timestamp), *("" if v is None else v for v in coords)])
+            text.flush()
+            text.detach()
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+    return relative
+
+
+def archive_expired(session_factory, root: str | None = None, retention_days: float = settings.TRACK_RETENTION_DAYS,
+                    limit: int = 100) -> int:
+    """
+    Moves raw rows of compacted tracks that ended before the retention
+    cutoff into archive files, then deletes them from live_locations.
+    """
+    root = root or settings.TRACK_ARCHIVE_DIR
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    db = session_factory()
+    try:
+        tracks = db.query(AlertTrack).filter(
+            AlertTrack.archived_at.is_(None), AlertTrack.ended_at < cutoff
+        ).order_by(AlertTrack.ended_at).limit(limit).all()
+        for track in tracks:
+            track.archive_path = write_archive(db, track, root)
+            track.archived_at = datetime.utcnow()
+            db.query(LiveLocation).filter(LiveLocation.alert_id == track.alert_id).delete(synchronize_session=False)
+            db.commit()
+        return len(tracks)
+    finally:
+        db.close()
+
+
+def read_archive(root: str, relative: str, since_ms: int | None = None) -> tuple[list, list]:
+    user, volunteer = [], []
+    with gzip.open(os.path.join(root, relative), "rt", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            ts = int(row["timestamp_ms"])
+            if since_ms is not None and ts <= since_ms:
+                continue
+            if row["user_lat"]:
+                user.append((float(row["user_lat"]), float(row["user_lng"]), ts))
+            if row["volunteer_lat"]:
+                volunteer.append((float(row["volunteer_lat"]), float(row["volunteer_lng"]), ts))
+    return user, volunteer
+
+
+# ----------------- READS ACROSS TIERS -----------------
+
+def read_track(db: Session, alert_id: int, since_ms: int | None = None, raw: bool = False,
+               root: str | None = None) -> Track:
+    """
+    Raw points while they are in the hot table; after archival the
+    compacted track, or the archive file when raw=True.
+    """
+    track = db.get(AlertTrack, alert_id)
+    if track is None or track.archived_at is None:
+        return Track("hot", *raw_points(db, alert_id, since_ms))
+    if raw and track.archive_path:
+        return Track("archive", *read_archive(root or settings.TRACK_ARCHIVE_DIR, track.archive_path, since_ms))
+
+    def decoded(text):
+        points = polyline.decode(text) if text else []
+        return [p for p in points if since_ms is None or p[2] > since_ms]
+    return Track("compacted", decoded(track.user_track), decoded(track.volunteer_track))
+
+
+def track_chunks(track: Track, tolerance: float = 0, chunk_size: int = 500):
+    """
+    The track as polyline chunks: {"track", "points", "polyline", "last"}.
+    Each chunk's deltas continue from the previous chunk's last point
+    (`last`), so a client decodes them with polyline.decode(previous=last).
+    """
+    for name, points in (("user", track.user), ("volunteer", track.volunteer)):
+        points = polyline.simplify(points, tolerance)
+        previous = None
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start:start + chunk_size]
+            yield {"track": name, "points": len(chunk), "polyline": polyline.encode(chunk, previous=previous),
+                   "last": list(chunk[-1])}
+            previous = chunk[-1]
+
+
+# ----------------- BACKGROUND TASKS -----------------
+
+def maintain(session_factory) -> tuple[int, int]:
+    """
+    One compactor round: compact closed alerts, archive expired raw rows.
+    """
+    compacted = compact_closed(session_factory)
+    archived = archive_expired(session_factory)
+    if compacted or archived:
+        logger.info("tracks maintained", extra={"compacted": compacted, "archived": archived})
+    return compacted, archived
+
+
+async def run_track_writer(session_factory):
+    while True:
+        await asyncio.sleep(settings.TRACK_FLUSH_INTERVAL)
+        try:
+            await flush_tracks(session_factory)
+        except Exception:  # the loop must survive; write() already retried per alert
+            logger.exception("track flush failed")
+
+
+async def run_track_compactor(session_factory):
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(None, maintain, session_factory)
+        except Exception:
+            logger.exception("track compaction failed")
+        await asyncio.sleep(settings.TRACK_COMPACT_INTERVAL)
+
+
+_tasks: list[asyncio.Task] = []
+
+
+async def start_track_tasks(session_factory):
+    if not _tasks:
+        _tasks.append(asyncio.create_task(run_track_writer(session_factory)))
+        _tasks.append(asyncio.create_task(run_track_compactor(session_factory)))
+
+
+async def stop_track_tasks(session_factory):
+    while _tasks:
+        _tasks.pop().cancel()
+    await flush_tracks(session_factory)  # don't lose the last second of points
@@ -0,0 +1,132 @@
+"""
+Volunteer ID photo uploads:
+- Streams the upload to a staging file in chunks without blocking the event loop
+- Enforces size and type limits and hashes the bytes while streaming
+- Thumbnail + recompressed copies are made later in a process pool
+"""
+
+import asyncio
+import hashlib
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+from app.services.blob_store import CONTENT_TYPES, staging_dir, variant_path
+
+# Magic bytes -> extension. Client filename/content-type is not trusted.
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "jpg",
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"RIFF": "webp",
+}
+
+THUMBNAIL_SIZE = (256, 256)
+MAX_IMAGE_SIDE = 1600
+JPEG_QUALITY = 85
+
+_image_pool: ProcessPoolExecutor | None = None
+
+
+class StagedUpload(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+    content_type: str
+
+
+def detect_image_type(head: bytes) -> str | None:
+    for signature, ext in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            if ext == "webp" and head[8:12] != b"WEBP":
+                continue
+            return ext
+    return None
+
+
+async def save_upload(upload: UploadFile, root: str | None = None) -> StagedUpload:
+    """
+    Copies the upload chunk by chunk into the blob store's staging folder.
+    File writes go to a worker thread so the event loop stays free.
+    """
+    first = await upload.read(settings.UPLOAD_CHUNK_SIZE)
+    ext = detect_image_type(first)
+    if not ext:
+        raise HTTPException(status_code=415, detail="ID photo must be a JPEG, PNG or WebP image")
+
+    file_path = os.path.join(staging_dir(root), str(uuid.uuid4()))
+    sha = hashlib.sha256()
+
+    size = 0
+    buffer = await asyncio.to_thread(open, file_path, "wb")
+    try:
+        chunk = first
+        while chunk:
+            size += len(chunk)
+            if size > settings.MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds {settings.MAX_UPLOAD_BYTES} bytes")
+            sha.update(chunk)
+            await asyncio.to_thread(buffer.write, chunk)
+            chunk = await upload.read(settings.UPLOAD_CHUNK_SIZE)
+    except BaseException:
+        buffer.close()
+        os.remove(file_path)
+        raise
+    await asyncio.to_thread(buffer.close)
+
+    return StagedUpload(file_path, sha.hexdigest(), size, CONTENT_TYPES[ext])
+
+
+def process_id_photo(file_path: str, thumb_path: str, web_path: str) -> bool:
+    """
+    Runs inside the process pool.
+    The stored blob is immutable, so the thumbnail and the recompressed
+    copy are written as separate variant files.
+    Needs Pillow; without it only the original is served.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+
+    if os.path.exists(thumb_path) and os.path.exists(web_path):
+        return True
+
+    with Image.open(file_path) as img:
+        img = img.convert("RGB")
+
+        thumb = img.copy()
+        thumb.thumbnail(THUMBNAIL_SIZE)
+        thumb.save(thumb_path, "JPEG", quality=JPEG_QUALITY)
+
+        img.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+        img.save(web_path, "JPEG", optimize=True, quality=JPEG_QUALITY)
+
+    return True
+
+
+def _get_image_pool() -> ProcessPoolExecutor:
+    global _image_pool
+    if _image_pool is None:
+        _image_pool = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return _image_pool
+
+
+def schedule_id_photo_processing(file_path: str, digest: str):
+    """
+    Hands the photo to the process pool and returns immediately.
+    Meant to be called as a background task after the response.
+    """
+    _get_image_pool().submit(
+        process_id_photo, file_path, variant_path(digest, "thumb"), variant_path(digest, "web")
+    )
+
+
+def shutdown_image_pool():
+    global _image_pool
+    if _image_pool is not None:
+        _image_pool.shutdown(wait=False)
+        _image_pool = None
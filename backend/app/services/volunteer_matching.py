@@ -1,19 +1,18 @@
+import heapq
 from sqlalchemy.orm import Session
-from app.models.volunteer import Volunteer
+from app.services.region_service import volunteer_points
 from app.utils.distance import haversine
 
-def find_nearby_volunteers(db: Session, lat: float, lon: float):
-    volunteers = db.query(Volunteer).filter(
-        Volunteer.is_verified == True
-    ).all()
+def find_nearby_volunteers(db: Session, lat: float, lon: float, radius_km: float = 1, limit: int = 5):
+    # only volunteers inside the box are loaded, as (id, lat, lng) tuples
+    volunteers = volunteer_points(db, lat, lon, radius_km)
 
     nearby = []
 
     for v in volunteers:
         dist = haversine(lat, lon, v.latitude, v.longitude)
-        if dist <= 1:  # 1 km
+        if dist <= radius_km:
             nearby.append((v, dist))
 
-    # sort nearest first
-    nearby.sort(key=lambda x: x[1])
-    return nearby[:5]  # max 5 ko notify
+    # nearest first, max 5 ko notify
+    return heapq.nsmallest(limit, nearby, key=lambda x: x[1])
@@ -1,8 +1,20 @@
-import socketio
+"""
+socket.io server for the web frontend (socket.io-client).
+Optional: python-socketio is only needed when socket.io clients connect.
+Handlers in app/socket_events bridge it onto the realtime gateway.
+"""
 
-sio = socketio.AsyncServer(
-    async_mode="asgi",
-    cors_allowed_origins="*"
-)
+try:
+    import socketio
+except ImportError:  # optional dependency
+    socketio = None
 
-socket_app = socketio.ASGIApp(sio)
+if socketio is not None:
+    sio = socketio.AsyncServer(
+        async_mode="asgi",
+        cors_allowed_origins="*"
+    )
+    socket_app = socketio.ASGIApp(sio)
+else:
+    sio = None
+    socket_app = None
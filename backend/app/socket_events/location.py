@@ -1,23 +1,120 @@
+"""
+socket.io handlers, bridged onto the realtime gateway: a socket.io client
+is one more gateway connection, and its rooms are gateway topics
+(alert_<id> -> alert:<id>), so it gets the same messages as /ws clients.
+A client connecting with auth {"binary": true} gets live location as
+binary frames (app/utils/wire.py) on "location:batch" and may send its
+own batches the same way.
+"""
+
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.database import SessionLocal
+from app.core.gateway import gateway, Connection, Frame, alert_topic, home_topics
+from app.core.tracing import record_ack
+from app.services.gateway_service import authenticate, authorize_with
+from app.services.track_service import record_batch
 from app.socket import sio
+from app.utils import wire
+
+logger = logging.getLogger("silent_shield.socket")
+
+# gateway message type -> socket.io event the frontend listens for
+EVENTS = {
+    "NEW_ALERT": "alert:new",
+    "LIVE_LOCATION": "location:update",
+}
+BINARY_EVENT = "location:batch"
+
+_connections: dict[str, "SocketIOConnection"] = {}
+
+
+class SocketIOConnection(Connection):
+    __slots__ = ("sid",)
+
+    # engine.io pings on its own and fires disconnect when they stop
+    heartbeat = False
+
+    def __init__(self, sid: str, principal: dict, binary: bool = False):
+        super().__init__("socketio", principal, binary)
+        self.sid = sid
+
+    async def deliver(self, frame: Frame):
+        if self.binary and frame.batch is not None:
+            await sio.emit(BINARY_EVENT, frame.binary, to=self.sid)
+            return
+        event = EVENTS.get(frame.data.get("type"), "message")
+        await sio.emit(event, frame.data, to=self.sid)
+
+    async def close(self):
+        await sio.disconnect(self.sid)
+
+
+async def _join(sid: str, topic: str) -> bool:
+    conn = _connections.get(sid)
+    if conn is None or not await run_in_threadpool(authorize_with, SessionLocal, conn.principal, topic):
+        return False
+    gateway.subscribe(conn, topic)
+    return True
+
+
+@sio.event
+async def connect(sid, environ, auth=None):
+    # Auth at handshake: io(url, {auth: {token}})
+    auth = auth or {}
+    principal = authenticate(auth.get("token"))
+    if principal is None:
+        raise ConnectionRefusedError("authentication failed")
+    conn = SocketIOConnection(sid, principal, binary=bool(auth.get("binary")))
+    _connections[sid] = gateway.register(conn, home_topics(principal))
+    logger.debug("socket connected", extra={"sid": sid, **principal})
 
 @sio.event
-async def connect(sid, environ):
-    print("Socket connected:", sid)
+async def disconnect(sid):
+    conn = _connections.pop(sid, None)
+    if conn is not None:
+        gateway.unregister(conn)
 
 @sio.event
 async def join_alert_room(sid, data):
-    alert_id = data["alert_id"]
-    await sio.enter_room(sid, f"alert_{alert_id}")
+    return await _join(sid, alert_topic(data["alert_id"]))
+
+@sio.on("room:join")
+async def join_room(sid, topic):
+    return await _join(sid, topic)
+
+@sio.on("room:leave")
+async def leave_room(sid, topic):
+    conn = _connections.get(sid)
+    if conn is not None:
+        gateway.unsubscribe(conn, topic)
+
+async def _publish_location(sid: str, alert_id: int, points: list) -> bool:
+    conn = _connections.get(sid)
+    topic = alert_topic(alert_id)
+    if conn is None or topic not in conn.topics:
+        return False
+    gateway.touch(conn)
+    batch = gateway.location_batch(alert_id, points, sender=conn.principal)
+    record_batch(batch, conn.principal)
+    await gateway.publish(topic, batch, exclude=conn)
+    return True
 
 @sio.event
 async def send_location(sid, data):
-    alert_id = data["alert_id"]
-
-    await sio.emit(
-        "location_update",
-        {
-            "lat": data["latitude"],
-            "lng": data["longitude"]
-        },
-        room=f"alert_{alert_id}"
-    )
+    return await _publish_location(sid, int(data["alert_id"]), [(data["latitude"], data["longitude"])])
+
+@sio.on(BINARY_EVENT)
+async def send_location_batch(sid, data):
+    try:
+        alert_id, _, points = wire.decode_locations(data)
+    except (ValueError, TypeError):
+        return False
+    return await _publish_location(sid, alert_id, points)
+
+@sio.on("ack")
+async def ack(sid, data):
+    trace = (data or {}).get("trace") or {}
+    record_ack(trace.get("traceparent"), trace.get("sent_at", 0), kind="socketio")
@@ -17,4 +17,31 @@ def haversine(lat1, lon1, lat2, lon2):
     a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
     c = 2 * asin(sqrt(a))
     r = 6371  # Radius of earth in km
-    return c * r
\ No newline at end of file
+    return c * r
+
+def bounding_box(lat, lon, radius_km):
+    """
+    (min_lat, max_lat, min_lon, max_lon) of a box that contains the circle.
+    Cheap pre-filter before the exact haversine check.
+    """
+    dlat = radius_km / 111.32
+    # longitude degrees shrink towards the poles
+    dlon = radius_km / max(111.32 * cos(radians(lat)), 1e-6)
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+def point_in_polygon(lat, lon, polygon):
+    """
+    Ray casting on [[lat, lon], ...] (first vertex not repeated).
+    Planar, which is fine for neighbourhood-sized areas.
+    """
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lon_i = polygon[i]
+        lat_j, lon_j = polygon[j]
+        if (lat_i > lat) != (lat_j > lat):
+            crossing = lon_i + (lat - lat_i) * (lon_j - lon_i) / (lat_j - lat_i)
+            if lon < crossing:
+                inside = not inside
+        j = i
+    return inside
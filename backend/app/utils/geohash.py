@@ -0,0 +1,109 @@
+"""
+Geohash helpers (base32, same cells as every other geohash library).
+Used for area topics and anything else that buckets points by prefix.
+"""
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(BASE32)}
+_PAIRS = [a + b for a in BASE32 for b in BASE32]  # 10 bits -> 2 chars
+
+# Rough cell size at each precision (km, width x height at the equator)
+CELL_KM = {1: 5000, 2: 1250, 3: 156, 4: 39, 5: 4.9, 6: 1.2, 7: 0.15, 8: 0.038}
+
+
+def _spread(x: int) -> int:
+    """
+    Bits of x (up to 32) moved to the even positions: abc -> a0b0c.
+    """
+    x = (x | (x << 16)) & 0x0000FFFF0000FFFF
+    x = (x | (x << 8)) & 0x00FF00FF00FF00FF
+    x = (x | (x << 4)) & 0x0F0F0F0F0F0F0F0F
+    x = (x | (x << 2)) & 0x3333333333333333
+    return (x | (x << 1)) & 0x5555555555555555
+
+
+def grid_bits(precision: int) -> tuple[int, int]:
+    """
+    (lat bits, lng bits); longitude gets the extra bit on odd totals.
+    """
+    lng_bits = (5 * precision + 1) // 2
+    return 5 * precision - lng_bits, lng_bits
+
+
+def encode_cell(row: int, col: int, precision: int) -> str:
+    """
+    Geohash of the cell at (row, col) in the precision's grid, rows
+    counted from -90 latitude and columns from -180 longitude.
+    """
+    lat_bits, lng_bits = grid_bits(precision)
+    if lat_bits == lng_bits:
+        code = (_spread(col) << 1) | _spread(row)
+    else:
+        code = _spread(col) | (_spread(row) << 1)
+    if precision % 2:
+        head, code = BASE32[code >> (5 * precision - 5)], code & ((1 << (5 * precision - 5)) - 1)
+        precision -= 1
+    else:
+        head = ""
+    return head + "".join([_PAIRS[(code >> shift) & 1023] for shift in range(5 * precision - 10, -1, -10)])
+
+
+def encode(lat: float, lng: float, precision: int = 5) -> str:
+    lat_bits, lng_bits = grid_bits(precision)
+    row = min(int((lat + 90) / 180 * (1 << lat_bits)), (1 << lat_bits) - 1)
+    col = min(int((lng + 180) / 360 * (1 << lng_bits)), (1 << lng_bits) - 1)
+    return encode_cell(row, col, precision)
+
+
+def bounds(geohash: str) -> tuple[float, float, float, float]:
+    """
+    (min_lat, max_lat, min_lng, max_lng) of the cell.
+    """
+    lat_lo, lat_hi, lng_lo, lng_hi = -90.0, 90.0, -180.0, 180.0
+    even = True
+    for c in geohash:
+        value = _DECODE[c]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lng_lo + lng_hi) / 2
+                lng_lo, lng_hi = (mid, lng_hi) if bit else (lng_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lat_hi, lng_lo, lng_hi
+
+
+def decode(geohash: str) -> tuple[float, float]:
+    """
+    Cell centre (lat, lng).
+    """
+    lat_lo, lat_hi, lng_lo, lng_hi = bounds(geohash)
+    return (lat_lo + lat_hi) / 2, (lng_lo + lng_hi) / 2
+
+
+def neighbors(geohash: str) -> list[str]:
+    """
+    The 8 surrounding cells at the same precision (fewer at the poles).
+    """
+    lat_lo, lat_hi, lng_lo, lng_hi = bounds(geohash)
+    dlat, dlng = lat_hi - lat_lo, lng_hi - lng_lo
+    lat, lng = (lat_lo + lat_hi) / 2, (lng_lo + lng_hi) / 2
+    cells = []
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            if i == j == 0:
+                continue
+            nlat = lat + i * dlat
+            if not -90 < nlat < 90:
+                continue
+            nlng = (lng + j * dlng + 180) % 360 - 180
+            cell = encode(nlat, nlng, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def is_valid(geohash: str) -> bool:
+    return bool(geohash) and all(c in _DECODE for c in geohash)
@@ -0,0 +1,116 @@
+"""
+Keyset (seek) pagination and streaming exports.
+- Pages are fetched with WHERE (sort cols) > (last seen values), never OFFSET
+- Cursors are opaque base64 tokens tied to the sort they were issued for
+- Exports stream NDJSON over a server-side cursor (yield_per)
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+
+
+def parse_sort(sort: str, allowed: dict, tiebreaker) -> list[tuple]:
+    """
+    "-created_at,id" -> [(Alert.created_at, True), (Alert.id, False)]
+    The tiebreaker (primary key) is always appended so the order is total.
+    """
+    keys = []
+    for part in filter(None, (p.strip() for p in sort.split(","))):
+        desc = part.startswith("-")
+        name = part.lstrip("-+")
+        if name not in allowed:
+            raise HTTPException(status_code=400, detail=f"Cannot sort by '{name}'")
+        keys.append((allowed[name], desc))
+    if not any(col is tiebreaker for col, _ in keys):
+        keys.append((tiebreaker, keys[-1][1] if keys else False))
+    return keys
+
+
+def _to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type in (datetime, date):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(sort: str, values) -> str:
+    raw = json.dumps({"s": sort, "v": [_to_json(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, keys: list[tuple]) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        if data["s"] != sort or len(data["v"]) != len(keys):
+            raise ValueError
+        return [_from_json(col, v) for (col, _), v in zip(keys, data["v"])]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _seek(keys: list[tuple], values: list):
+    # (a, b, c) > (x, y, z) written out so mixed ASC/DESC works on every DB
+    clauses = []
+    for i, (col, desc) in enumerate(keys):
+        equal = [c == v for (c, _), v in zip(keys[:i], values[:i])]
+        step = col < values[i] if desc else col > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+def keyset_page(query: Query, keys: list[tuple], sort: str, cursor: str | None, limit: int):
+    """
+    Returns (rows, next_cursor). Rows must include the sort columns
+    (at their positions in `keys`) at the end of each row tuple.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        query = query.filter(_seek(keys, decode_cursor(cursor, sort, keys)))
+    query = query.order_by(*(col.desc() if desc else col.asc() for col, desc in keys))
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, rows[-1][-len(keys):])
+    return [row[:-len(keys)] for row in rows], next_cursor
+
+
+def stream_export(db: Session, build_query, encoder, filename: str, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    Streams every row of build_query(session) as NDJSON.
+    The request session is closed before the body is sent, so the stream
+    opens its own session on the same engine.
+    """
+    bind = db.get_bind()
+
+    def body():
+        with Session(bind=bind) as session:
+            statement = build_query(session).statement.execution_options(yield_per=chunk_size)
+            for chunk in session.execute(statement).partitions():
+                yield encoder.ndjson(chunk)
+
+    return StreamingResponse(
+        body(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
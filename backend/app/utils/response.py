@@ -1,11 +1,97 @@
 """
-Standard API responses
+Standard API responses.
+- FastJSONResponse: orjson-backed default response class (stdlib json fallback)
+- MsgPackResponse: for clients sending Accept: application/msgpack
+- RowEncoder: precompiled row-tuple -> bytes serializers for hot list endpoints
 """
 
-from fastapi.responses import JSONResponse
+import json
+from datetime import date, datetime
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # in requirements.txt; without it msgpack clients get JSON
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content) -> bytes:
+        return msgpack.packb(content, default=_default, use_bin_type=True)
+
+
+def wants_msgpack(request: Request) -> bool:
+    return msgpack is not None and MSGPACK_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+class RowEncoder:
+    """
+    Turns row tuples straight into response bytes for a fixed list of fields.
+    The tuple -> dict step is compiled once per schema, so large lists skip
+    per-object pydantic validation entirely.
+    """
+    def __init__(self, fields: list[str]):
+        self.fields = list(fields)
+        body = ", ".join(f"{name!r}: r[{i}]" for i, name in enumerate(self.fields))
+        namespace = {}
+        exec(f"def to_dicts(rows):\n    return [{{{body}}} for r in rows]", namespace)
+        self.to_dicts = namespace["to_dicts"]
+
+    @classmethod
+    def for_model(cls, model):
+        return cls(list(model.model_fields))
+
+    def json(self, rows) -> bytes:
+        return dumps(self.to_dicts(rows))
+
+    def ndjson(self, rows) -> bytes:
+        return b"".join(dumps(item) + b"\n" for item in self.to_dicts(rows))
+
+    def msgpack(self, rows) -> bytes:
+        return msgpack.packb(self.to_dicts(rows), default=_default, use_bin_type=True)
+
+    def respond(self, request: Request, rows, **extra) -> Response:
+        """
+        Picks JSON or MessagePack from the Accept header.
+        Extra keys wrap the rows as {"items": [...], **extra}.
+        """
+        items = self.to_dicts(rows)
+        content = {"items": items, **extra} if extra else items
+        if wants_msgpack(request):
+            return MsgPackResponse(content)
+        return FastJSONResponse(content)
+
 
 def success(data, message="Success"):
-    return JSONResponse({"status": "success", "message": message, "data": data})
+    return FastJSONResponse({"status": "success", "message": message, "data": data})
 
 def error(message="Error", status_code=400):
-    return JSONResponse({"status": "error", "message": message}, status_code=status_code)
+    return FastJSONResponse({"status": "error", "message": message}, status_code=status_code)
@@ -0,0 +1,97 @@
+"""
+DDSketch: a mergeable streaming quantile sketch with relative error.
+A value v goes to bucket ceil(log_gamma(v)), gamma = (1 + a) / (1 - a),
+so every quantile it returns is within a (default 1%) of the true value,
+whatever the distribution. Memory is the number of non-empty buckets
+(~600 cover 1 s .. 1 day at 1%), capped by collapsing the lowest ones.
+"""
+
+import math
+
+
+class DDSketch:
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.alpha = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets: dict[int, int] = {}
+        self.zeros = 0  # values <= 0 (e.g. accepted within the same clock tick)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, count: int = 1):
+        if value <= 0:
+            self.zeros += count
+        else:
+            index = math.ceil(math.log(value) / self.log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _collapse(self):
+        # the lowest buckets merge into one: only the smallest quantiles lose accuracy
+        indexes = sorted(self.buckets)
+        extra = indexes[:len(indexes) - self.max_buckets + 1]
+        self.buckets[extra[-1]] += sum(self.buckets.pop(i) for i in extra[:-1])
+
+    def merge(self, other: "DDSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Sketches with different accuracy can't be merged")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zeros += other.zeros
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zeros:
+            return max(self.min, 0.0)
+        seen = self.zeros
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # bucket midpoint (in the relative sense), clamped to what was seen
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float | None:
+        return self.sum / self.count if self.count else None
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            **{f"p{round(q * 100):g}": self.quantile(q) for q in quantiles},
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    def to_dict(self) -> dict:
+        return {"alpha": self.alpha, "zeros": self.zeros, "count": self.count, "sum": self.sum,
+                "min": self.min if self.count else None, "max": self.max if self.count else None,
+                "buckets": {str(i): c for i, c in self.buckets.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DDSketch":
+        sketch = cls(data["alpha"])
+        sketch.buckets = {int(i): c for i, c in data["buckets"].items()}
+        sketch.zeros, sketch.count, sketch.sum = data["zeros"], data["count"], data["sum"]
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
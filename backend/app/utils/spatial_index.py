@@ -0,0 +1,101 @@
+"""
+Reverse spatial index: regions go in as bounding boxes, a point comes out
+as "which regions' boxes may contain it".
+
+Multi-level geohash grid: each region is filed under the cells of the
+finest precision level where its box spans at most MAX_CELLS cells, so
+big regions sit in a few coarse cells and small ones in a few fine cells. A lookup reads
+one cell per level in use, so it costs O(levels + k candidates) whatever
+the number of regions. Callers do the exact shape test on the candidates.
+"""
+
+from math import floor
+
+from app.utils import geohash
+
+MAX_LEVEL = 8
+MAX_CELLS = 9  # more cells per region: fewer false candidates, more memory
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """
+    (height, width) of a geohash cell in degrees.
+    """
+    lat_bits, lng_bits = geohash.grid_bits(precision)
+    return 180 / 2 ** lat_bits, 360 / 2 ** lng_bits
+
+
+_SIZES = {p: cell_size(p) for p in range(1, MAX_LEVEL + 1)}
+
+
+def _ranges(min_lat: float, max_lat: float, min_lng: float, max_lng: float, precision: int) -> tuple[range, range]:
+    cell_h, cell_w = _SIZES[precision]
+    rows = range(floor((max(min_lat, -90) + 90) / cell_h), floor((min(max_lat, 90 - 1e-9) + 90) / cell_h) + 1)
+    cols = range(floor((max(min_lng, -180) + 180) / cell_w), floor((min(max_lng, 180 - 1e-9) + 180) / cell_w) + 1)
+    return rows, cols
+
+
+def level_for(min_lat: float, max_lat: float, min_lng: float, max_lng: float) -> int:
+    """
+    Finest precision where the box covers at most MAX_CELLS cells.
+    """
+    for precision in range(MAX_LEVEL, 0, -1):
+        rows, cols = _ranges(min_lat, max_lat, min_lng, max_lng, precision)
+        if len(rows) * len(cols) <= MAX_CELLS:
+            return precision
+    return 1
+
+
+def covering_cells(min_lat: float, max_lat: float, min_lng: float, max_lng: float, precision: int) -> list[str]:
+    rows, cols = _ranges(min_lat, max_lat, min_lng, max_lng, precision)
+    return [geohash.encode_cell(r, c, precision) for r in rows for c in cols]
+
+
+class GridIndex:
+    def __init__(self):
+        self.cells: dict[str, list] = {}
+        self.level_counts = [0] * (MAX_LEVEL + 1)
+        self._levels: list[int] = []  # levels with at least one region, for lookups
+
+    def __len__(self):
+        return sum(self.level_counts)
+
+    def insert(self, key, min_lat: float, max_lat: float, min_lng: float, max_lng: float):
+        precision = level_for(min_lat, max_lat, min_lng, max_lng)
+        for cell in covering_cells(min_lat, max_lat, min_lng, max_lng, precision):
+            bucket = self.cells.get(cell)
+            if bucket is None:
+                self.cells[cell] = [key]
+            else:
+                bucket.append(key)
+        self.level_counts[precision] += 1
+        if self.level_counts[precision] == 1:
+            self._levels = [p for p in range(1, MAX_LEVEL + 1) if self.level_counts[p]]
+
+    def remove(self, key, min_lat: float, max_lat: float, min_lng: float, max_lng: float) -> bool:
+        """
+        Needs the same box the key was inserted with.
+        """
+        precision = level_for(min_lat, max_lat, min_lng, max_lng)
+        found = False
+        for cell in covering_cells(min_lat, max_lat, min_lng, max_lng, precision):
+            bucket = self.cells.get(cell)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                found = True
+                if not bucket:
+                    del self.cells[cell]
+        if found:
+            self.level_counts[precision] -= 1
+            if self.level_counts[precision] == 0:
+                self._levels = [p for p in range(1, MAX_LEVEL + 1) if self.level_counts[p]]
+        return found
+
+    def candidates(self, lat: float, lng: float) -> list:
+        cell = geohash.encode(lat, lng, self._levels[-1]) if self._levels else ""
+        found = []
+        for precision in self._levels:
+            bucket = self.cells.get(cell[:precision])
+            if bucket:
+                found += bucket
+        return found
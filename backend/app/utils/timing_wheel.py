@@ -0,0 +1,61 @@
+"""
+Hashed timing wheel for many timers with the same few delays (socket
+heartbeats). An item sits in the slot of its deadline; advance() only
+visits the slots that came due, so a tick costs O(expired items), and
+re-arming a timer is O(1) (a no-op while it stays in the same slot).
+"""
+
+import time
+
+
+class TimingWheel:
+    def __init__(self, tick: float = 1.0, slots: int = 512, clock=time.monotonic):
+        self.tick = tick
+        self.clock = clock
+        self.slots = [set() for _ in range(slots)]
+        self.deadlines = {}  # item -> absolute slot number
+        self.position = int(clock() / tick)  # next slot number to expire
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def __contains__(self, item):
+        return item in self.deadlines
+
+    def schedule(self, item, delay: float):
+        """
+        Arms (or re-arms) the item's timer `delay` seconds from now.
+        """
+        if delay >= self.tick * (len(self.slots) - 1):
+            raise ValueError("Delay longer than the wheel, use a bigger tick or more slots")
+        number = max(int((self.clock() + delay) / self.tick) + 1, self.position)
+        current = self.deadlines.get(item)
+        if current == number:
+            return
+        if current is not None:
+            self.slots[current % len(self.slots)].discard(item)
+        self.slots[number % len(self.slots)].add(item)
+        self.deadlines[item] = number
+
+    def cancel(self, item):
+        number = self.deadlines.pop(item, None)
+        if number is not None:
+            self.slots[number % len(self.slots)].discard(item)
+
+    def advance(self) -> list:
+        """
+        Pops and returns every item whose deadline has passed.
+        """
+        now = int(self.clock() / self.tick)
+        expired = []
+        while self.position <= now:
+            bucket = self.slots[self.position % len(self.slots)]
+            if bucket:
+                # after a long stall a bucket can also hold a later lap's items
+                due = [item for item in bucket if self.deadlines[item] <= self.position]
+                for item in due:
+                    bucket.discard(item)
+                    del self.deadlines[item]
+                expired += due
+            self.position += 1
+        return expired
@@ -0,0 +1,81 @@
+"""
+Binary framing for live location, negotiated per connection (JSON stays
+the default and the fallback).
+
+One frame carries a batch of points for one alert, little-endian:
+  header  <BBHIIq   version, kind, point count, alert id, seq of the first
+                    point, time of the first point (epoch ms)
+  point   <iiH      latitude, longitude in micro-degrees (~0.1 m),
+                    ms since the previous point
+
+20 bytes + 10 per point; a JSON LIVE_LOCATION is ~100 bytes per point.
+"""
+
+import struct
+from functools import lru_cache
+
+VERSION = 1
+KIND_LOCATION = 1
+
+# WebSocket subprotocol a client offers to get (and send) binary location frames
+SUBPROTOCOL = "silentshield.loc.v1"
+
+HEADER = struct.Struct("<BBHIIq")
+POINT = struct.Struct("<iiH")
+MAX_POINTS = 0xFFFF
+MAX_GAP_MS = 0xFFFF  # a batch spans seconds, a longer gap starts a new frame
+SCALE = 1_000_000
+
+
+@lru_cache(maxsize=128)
+def _points_struct(count: int) -> struct.Struct:
+    return struct.Struct("<" + "iiH" * count)
+
+
+def encode_locations(alert_id: int, seq: int, points: list[tuple[float, float, int]]) -> bytes:
+    """
+    points: [(latitude, longitude, epoch ms), ...] in time order.
+    Raises ValueError when they don't fit the layout.
+    """
+    if not 0 < len(points) <= MAX_POINTS:
+        raise ValueError(f"A frame holds 1 to {MAX_POINTS} points")
+    base = points[0][2]
+    flat = []
+    previous = base
+    for lat, lng, ts in points:
+        gap = ts - previous
+        if not 0 <= gap <= MAX_GAP_MS:
+            raise ValueError(f"Points must be in time order and at most {MAX_GAP_MS} ms apart")
+        flat += (round(lat * SCALE), round(lng * SCALE), gap)
+        previous = ts
+    try:
+        return HEADER.pack(VERSION, KIND_LOCATION, len(points), alert_id, seq, base) + \
+            _points_struct(len(points)).pack(*flat)
+    except struct.error as exc:
+        raise ValueError(str(exc)) from None
+
+
+def decode_locations(data: bytes) -> tuple[int, int, list[tuple[float, float, int]]]:
+    """
+    -> (alert_id, seq, [(latitude, longitude, epoch ms), ...]).
+    Raises ValueError on anything malformed.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Frame too short")
+    version, kind, count, alert_id, seq, ts = HEADER.unpack_from(data)
+    if version != VERSION or kind != KIND_LOCATION:
+        raise ValueError(f"Unsupported frame {version}/{kind}")
+    if count == 0 or len(data) != HEADER.size + count * POINT.size:
+        raise ValueError("Frame length does not match its point count")
+    points = []
+    for lat, lng, gap in POINT.iter_unpack(memoryview(data)[HEADER.size:]):
+        ts += gap
+        points.append((lat / SCALE, lng / SCALE, ts))
+    return alert_id, seq, points
+
+
+def negotiate(offered) -> str | None:
+    """
+    The subprotocol to accept from a handshake's offered list, if any.
+    """
+    return SUBPROTOCOL if SUBPROTOCOL in (offered or ()) else None
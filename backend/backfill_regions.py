@@ -0,0 +1,61 @@
+import sys
+import os
+
+# Backend folder ko Python path me add karo
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Tags existing alerts, reports and volunteers with region ids (new rows
+# are tagged on insert). Only rows without one unless --all is given,
+# e.g. after the geocoder dataset changed. Safe to re-run.
+from sqlalchemy import bindparam, update
+
+from app.core.database import SessionLocal
+from app.models.alert import Alert
+from app.models.report import Report
+from app.models.volunteer import Volunteer
+from app.services.geocoder import region_for_city, region_for_point
+
+
+def backfill(db, model, columns, tag, batch_size: int = 1000, everything: bool = False) -> int:
+    """
+    Walks the table by id (keyset, so each batch is an index range scan)
+    and writes region ids back with one executemany per batch.
+    """
+    tagged, last_id = 0, 0
+    while True:
+        query = db.query(model.id, *columns).filter(model.id > last_id)
+        if not everything:
+            query = query.filter(model.region_id.is_(None))
+        rows = query.order_by(model.id).limit(batch_size).all()
+        if not rows:
+            return tagged
+        last_id = rows[-1][0]
+        updates = [{"row_id": row[0], "region": region} for row in rows
+                   if (region := tag(*row[1:])) is not None or everything]
+        if updates:
+            db.execute(
+                update(model.__table__).where(model.__table__.c.id == bindparam("row_id"))
+                .values(region_id=bindparam("region")),
+                updates,
+            )
+            db.commit()
+        tagged += sum(1 for u in updates if u["region"] is not None)
+
+
+def main(argv):
+    everything = "--all" in argv
+    db = SessionLocal()
+    try:
+        for name, model, columns, tag in [
+            ("alerts", Alert, (Alert.latitude, Alert.longitude), region_for_point),
+            ("reports", Report, (Report.latitude, Report.longitude), region_for_point),
+            ("volunteers", Volunteer, (Volunteer.latitude, Volunteer.longitude, Volunteer.city),
+             lambda lat, lng, city: region_for_point(lat, lng) or region_for_city(city)),
+        ]:
+            print(f"{name}: {backfill(db, model, columns, tag, everything=everything)} tagged")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,118 @@
+"""
+Response-time dashboards: ad hoc GROUP BY over the whole history vs the
+incrementally maintained sketches.
+- "ad hoc": what a dashboard query would do without analytics_service,
+  join alerts and their first accept, pull every duration and sort it for
+  exact percentiles
+- "sketch": GET /analytics/response-times, one row per metric
+- "transition": the extra cost record_response() adds to an accept
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from app.api.routes import analytics
+from app.core.security import create_access_token
+from app.models.alert import Alert
+from app.models.alert_volunteer import AlertVolunteer
+from app.services import analytics_service
+from benchmarks.common import build_app, report, sqlite_sessionmaker, Timer
+
+
+def seed(SessionBench, alerts: int, per_alert: int):
+    """
+    History written straight to the tables; resolutions are replayed into
+    the aggregates (read cost doesn't depend on how many were fed in).
+    """
+    rnd = random.Random(46)
+    db = SessionBench()
+    start = datetime.utcnow() - timedelta(days=365)
+    for alert_id in range(1, alerts + 1):
+        created = start + timedelta(seconds=rnd.uniform(0, 365 * 86400))
+        db.add(Alert(id=alert_id, code="SOS", emergency_level="red", emergency_type="unsafe", status="resolved",
+                     latitude=rnd.uniform(8, 32), longitude=rnd.uniform(70, 88), created_at=created,
+                     resolved_at=created + timedelta(seconds=rnd.lognormvariate(7, 0.8))))
+        for i in range(per_alert):
+            db.add(AlertVolunteer(alert_id=alert_id, volunteer_id=rnd.randint(1, 500),
+                                  status="accepted" if i == 0 else rnd.choice(["accepted", "rejected"]),
+                                  accepted_at=created + timedelta(seconds=rnd.lognormvariate(4, 1))))
+        if alert_id % 2000 == 0:
+            db.commit()
+    db.commit()
+    for alert in db.query(Alert).yield_per(2000):
+        analytics_service.record_resolution(db, alert)
+    db.commit()
+    db.close()
+
+
+def adhoc(db):
+    first_accept = db.query(AlertVolunteer.alert_id, func.min(AlertVolunteer.accepted_at).label("at")).filter(
+        AlertVolunteer.status.in_(analytics_service.ACCEPTED)).group_by(AlertVolunteer.alert_id).subquery()
+    ttfa = sorted((at - created).total_seconds() for created, at in
+                  db.query(Alert.created_at, first_accept.c.at).join(first_accept, first_accept.c.alert_id == Alert.id))
+    resolution = sorted((resolved - created).total_seconds() for created, resolved in
+                        db.query(Alert.created_at, Alert.resolved_at).filter(Alert.resolved_at.isnot(None)))
+    return {name: [values[int(q * (len(values) - 1))] for q in (0.5, 0.9, 0.99)]
+            for name, values in (("ttfa", ttfa), ("resolution", resolution)) if values}
+
+
+def transitions(SessionBench, repeat: int):
+    db = SessionBench()
+    db.add(Alert(id=10_000_000, code="SOS", emergency_level="red", emergency_type="unsafe", status="active",
+                 latitude=12.97, longitude=77.59, created_at=datetime.utcnow()))
+    avs = [AlertVolunteer(alert_id=10_000_000, volunteer_id=i, status="pending") for i in range(repeat)]
+    db.add_all(avs)
+    db.commit()
+    for with_analytics in (False, True):
+        latencies = []
+        with Timer() as total:
+            for av in avs[:repeat // 2] if not with_analytics else avs[repeat // 2:]:
+                with Timer() as one:
+                    av.status = "accepted"
+                    if with_analytics:
+                        analytics_service.record_response(db, av, accepted=True)
+                    db.commit()
+                latencies.append(one.elapsed)
+        report("transition + analytics" if with_analytics else "transition only", latencies, total.elapsed)
+    db.close()
+
+
+def run(alerts: int, per_alert: int, repeat: int):
+    SessionBench = sqlite_sessionmaker()
+    seed(SessionBench, alerts, per_alert)
+    print(f"history: {alerts} alerts, {alerts * per_alert} volunteer responses")
+
+    latencies = []
+    with Timer() as total:
+        for _ in range(max(1, repeat // 20)):
+            db = SessionBench()
+            with Timer() as one:
+                adhoc(db)
+            latencies.append(one.elapsed)
+            db.close()
+    report("ad hoc GROUP BY + exact percentiles", latencies, total.elapsed)
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'role': 'user'})}"}
+    client = TestClient(build_app(analytics.router, SessionBench=SessionBench))
+    latencies = []
+    with Timer() as total:
+        for _ in range(repeat):
+            with Timer() as one:
+                assert client.get("/analytics/response-times", headers=headers).status_code == 200
+            latencies.append(one.elapsed)
+    report("GET /analytics/response-times", latencies, total.elapsed)
+
+    transitions(SessionBench, repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--alerts", type=int, default=50_000)
+    parser.add_argument("--per-alert", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.alerts, args.per_alert, args.repeat)
@@ -0,0 +1,106 @@
+"""
+Response cache on vs off.
+- reads: /heatmap/ and /users/me, 4 concurrent clients
+- writes: the same heatmap reads with a report written every --write-every
+  reads (each write invalidates the heatmap tag)
+- stampede: many concurrent misses right after an invalidation, with how
+  many times the heatmap was actually built
+Hit rate comes from http_cache_requests_total.
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+
+from app.api.routes import heatmap, users
+from app.core import cache
+from app.core.config import settings
+from app.core.cache import ResponseCache, cache_requests
+from app.core.security import create_access_token
+from app.models.user import User
+from app.services.report_service import create_report
+from benchmarks.common import build_app, report, sqlite_sessionmaker
+from benchmarks.scenarios import client_for, drive, seed_heat
+
+
+def hit_rate() -> str:
+    counts = {}
+    for (_, result), value in cache_requests.values().items():
+        counts[result] = counts.get(result, 0) + value
+    total = sum(counts.values())
+    served = counts.get("hit", 0) + counts.get("not_modified", 0) + counts.get("coalesced", 0)
+    return f"hit_rate={served / total:.1%} {dict(sorted(counts.items()))}" if total else ""
+
+
+def reset_metrics():
+    cache_requests._cells = type(cache_requests._cells)()
+
+
+async def reads(app, name: str, path: str, headers: dict, n: int):
+    async with client_for(app) as client:
+        latencies, elapsed, _ = await drive([lambda: client.get(path, headers=headers) for _ in range(n)], 4)
+    report(name, latencies, elapsed, hit_rate())
+
+
+async def reads_with_writes(app, SessionBench, name: str, n: int, write_every: int):
+    db = SessionBench()
+    rnd = random.Random(7)
+
+    async def read_or_write(i):
+        if i % write_every == 0:
+            create_report(db, None, "suspicious", 12.9 + rnd.random(), 77.5 + rnd.random())
+        return await client.get("/heatmap/")
+
+    async with client_for(app) as client:
+        latencies, elapsed, _ = await drive([lambda i=i: read_or_write(i) for i in range(n)], 4)
+    db.close()
+    report(name, latencies, elapsed, hit_rate())
+
+
+async def stampede(app, name: str, clients: int):
+    builds = []
+    real = heatmap.get_heatmap_rows
+    heatmap.get_heatmap_rows = lambda *a: builds.append(1) or real(*a)
+    try:
+        cache.invalidate("heatmap")
+        async with client_for(app) as client:
+            latencies, elapsed, _ = await drive([lambda: client.get("/heatmap/") for _ in range(clients)], clients)
+    finally:
+        heatmap.get_heatmap_rows = real
+    report(name, latencies, elapsed, f"builds={len(builds)}")
+
+
+async def run(rows: int, n: int, write_every: int):
+    settings.GEOCODER_CACHE_DIR = tempfile.mkdtemp(prefix="ss-geocoder-")  # reports are region-tagged
+    SessionBench = sqlite_sessionmaker()
+    seed_heat(SessionBench, rows)
+    db = SessionBench()
+    db.add(User(full_name="Bench", email="bench@example.com", hashed_password="x", role="USER"))
+    db.commit()
+    user_id = db.query(User.id).scalar()
+    db.close()
+    auth = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id), 'role': 'user'})}"}
+
+    for label in ("off", "on"):
+        app = build_app(heatmap.router, users.router, SessionBench=SessionBench)
+        if label == "on":
+            app.state.response_cache = ResponseCache()
+        reset_metrics()
+        await reads(app, f"cache {label}: /heatmap/ ({rows} rows)", "/heatmap/", {}, n)
+        reset_metrics()
+        await reads(app, f"cache {label}: /users/me", "/users/me", auth, n)
+        reset_metrics()
+        await reads_with_writes(app, SessionBench, f"cache {label}: /heatmap/ + 1 write/{write_every}",
+                                n, write_every)
+        reset_metrics()
+        await stampede(app, f"cache {label}: stampede after a write", 32)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--write-every", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.requests, args.write_every))
@@ -0,0 +1,84 @@
+"""
+Memory while exporting alerts: streaming export vs loading everything.
+Peak Python heap is measured with tracemalloc; streaming should stay flat
+as --rows grows. Also the /exports/ file formats (parquet / arrow only
+when pyarrow is installed), in rows/s.
+"""
+
+import argparse
+import asyncio
+import random
+import tracemalloc
+
+from app.api.routes.alerts import export_alerts
+from app.models.alert import Alert
+from app.services import export_service
+from benchmarks.common import sqlite_sessionmaker, Timer
+
+SEED_CHUNK = 50000
+
+
+def seed(SessionBench, rows: int):
+    db = SessionBench()
+    rnd = random.Random(1)
+    table = Alert.__table__
+    for start in range(0, rows, SEED_CHUNK):
+        db.execute(table.insert(), [
+            {"code": "SOS", "emergency_level": "red", "emergency_type": "unsafe", "panic_level": 1,
+             "status": "active", "latitude": 12.9 + rnd.random(), "longitude": 77.5 + rnd.random()}
+            for _ in range(min(SEED_CHUNK, rows - start))
+        ])
+    db.commit()
+    db.close()
+
+
+async def consume(response):
+    total = 0
+    async for chunk in response.body_iterator:
+        total += len(chunk)
+    return total
+
+
+def run(rows: int):
+    SessionBench = sqlite_sessionmaker()
+    with Timer() as t:
+        seed(SessionBench, rows)
+    print(f"seeded {rows} alerts in {t.elapsed:.1f}s")
+
+    db = SessionBench()
+    tracemalloc.start()
+    with Timer() as t:
+        size = asyncio.run(consume(export_alerts(db=db)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"streaming export: {rows / t.elapsed:10.0f} rows/s  {size / 1e6:8.1f} MB sent  peak heap {peak / 1e6:6.1f} MB")
+
+    tracemalloc.start()
+    with Timer() as t:
+        loaded = db.query(Alert).all()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"full ORM load:    {len(loaded) / t.elapsed:10.0f} rows/s  {'':>17}  peak heap {peak / 1e6:6.1f} MB")
+    del loaded
+
+    formats = ["csv"] + (["parquet", "arrow"] if export_service.pyarrow is not None else [])
+    filters = {"all rows": export_service.ExportFilters(),
+               "red, bbox": export_service.ExportFilters(level="red", bbox=(12.9, 77.5, 13.2, 77.8))}
+    for fmt in formats:
+        for label, export_filters in filters.items():
+            stats = {}
+            tracemalloc.start()
+            size = sum(len(piece) for piece in
+                       export_service.iter_export(db.get_bind(), "alerts", fmt, export_filters, stats=stats))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"export {fmt:<7} {label:<9}: {stats['rows_per_second']:10.0f} rows/s  {stats['rows']:>8} rows "
+                  f"{size / 1e6:7.1f} MB  peak heap {peak / 1e6:6.1f} MB")
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.rows)
@@ -0,0 +1,129 @@
+"""
+Realtime gateway at 50k connections:
+- bytes per connection for the gateway bookkeeping alone (Connection +
+  topic sets, via tracemalloc) and for a full /ws socket (ASGI task,
+  WebSocket, auth, via RSS)
+- publish cost: it should scale with the topic's subscribers, not with
+  the total number of connections
+- heartbeat sweep: should scale with the connections that came due
+tracemalloc runs last: while (and even after) it traces, every
+allocation is much slower and would skew the timings.
+"""
+
+import argparse
+import asyncio
+import gc
+import random
+import tracemalloc
+
+from app.api.routes import socket
+from app.core.gateway import Gateway, WebSocketConnection, gateway, area_topic, volunteer_topic
+from app.core.security import create_access_token
+from benchmarks.common import build_app, sqlite_sessionmaker, rss_mb, Timer
+from app.utils.timing_wheel import TimingWheel
+from benchmarks.scenarios import FakeSocket
+
+
+class NullWebSocket:
+    async def send_text(self, text):
+        pass
+
+    async def close(self):
+        pass
+
+
+def build_hub(connections: int) -> Gateway:
+    rnd = random.Random(5)
+    hub = Gateway()
+    ws = NullWebSocket()
+    for i in range(connections):
+        conn = WebSocketConnection(ws, "gateway", {"sub": str(i), "role": "volunteer"})
+        hub.register(conn, [volunteer_topic(i), area_topic(12.5 + rnd.random(), 77 + rnd.random())])
+    return hub
+
+
+def bookkeeping(connections: int):
+    gc.collect()
+    tracemalloc.start()
+    hub = build_hub(connections)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"gateway bookkeeping        {connections} conns  {held / connections:8.0f} bytes/conn  "
+          f"topics={len(hub.topics)}")
+
+
+async def publish_cost(hub: Gateway, rounds: int = 2000):
+    big_topic = max(hub.topics, key=lambda t: len(hub.topics[t]))
+    for topic, label in [(volunteer_topic(1), "1 subscriber"), (big_topic, f"{len(hub.topics[big_topic])} subscribers")]:
+        with Timer() as t:
+            for _ in range(rounds):
+                await hub.publish(topic, {"type": "LIVE_LOCATION", "latitude": 12.97, "longitude": 77.59})
+        delivered = rounds * len(hub.topics[topic])
+        print(f"publish to {label:<16} {t.elapsed / rounds * 1e6:9.1f} us/publish  "
+              f"{t.elapsed / delivered * 1e6:6.2f} us/delivery")
+
+
+async def sweep_cost(hub: Gateway, due: int = 500):
+    """
+    Every connection but `due` keeps talking; only those are pinged.
+    """
+    now = [0.0]
+    hub.wheel = TimingWheel(1.0, len(hub.wheel.slots), clock=lambda: now[0])
+    conns = list(hub.connections.values())
+    for conn in conns:
+        hub.touch(conn)
+    now[0] += hub.ping_interval / 2
+    for conn in conns[due:]:
+        hub.touch(conn)
+    now[0] += hub.ping_interval / 2 + 2
+    with Timer() as t:
+        await hub.sweep()
+    pinged = sum(1 for conn in conns if conn.pinged)
+    print(f"heartbeat sweep            {len(conns)} conns  {t.elapsed * 1e3:8.2f} ms  pinged={pinged}")
+
+
+async def full_sockets(connections: int):
+    app = build_app(socket.router, SessionBench=sqlite_sessionmaker())
+    tokens = [create_access_token({"sub": str(i), "role": "volunteer"}) for i in range(connections)]
+    sockets = []
+    for i in range(connections):
+        s = FakeSocket("/ws")
+        s.scope["query_string"] = f"token={tokens[i]}".encode()
+        s.scope["app"] = app
+        sockets.append(s)
+    del tokens
+
+    gc.collect()
+    rss_before = rss_mb()
+    with Timer() as connect:
+        tasks = [asyncio.create_task(app(s.scope, s.receive, s.send)) for s in sockets]
+        await asyncio.gather(*(s.accepted.wait() for s in sockets))
+    held = (rss_mb() - rss_before) * 2**20
+    print(f"/ws sockets (RSS)          {connections} conns  {held / connections:8.0f} bytes/conn  "
+          f"connect={connect.elapsed:.1f}s ({connections / connect.elapsed:.0f}/s)")
+
+    gc.collect()  # keep a full collection of 50k tasks out of the timing
+    with Timer() as t:
+        for i in range(0, connections, max(1, connections // 1000)):
+            await gateway.publish(volunteer_topic(i), {"type": "NEW_ALERT", "alert_id": 1})
+    print(f"targeted publish (1000)    {t.elapsed / 1000 * 1e6:8.1f} us/publish with {len(gateway.connections)} open")
+
+    for s in sockets:
+        s.closed.set()
+    await asyncio.gather(*tasks)
+
+
+async def run(connections: int):
+    await full_sockets(connections)
+    hub = build_hub(connections)
+    await publish_cost(hub)
+    await sweep_cost(hub)
+    del hub
+    bookkeeping(connections)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=50000)
+    args = parser.parse_args()
+    asyncio.run(run(args.connections))
@@ -0,0 +1,86 @@
+"""
+Reverse geocoding cost per write.
+- lookup: memory-mapped KD-tree vs a linear haversine scan over every
+  centroid, on the bundled dataset and on a synthetic one the size of a
+  full gazetteer
+- startup: building the tree vs mapping the cached file
+- backfill: rows tagged per second by backfill_regions.py
+"""
+
+import argparse
+import os
+import random
+import tempfile
+
+from backfill_regions import backfill
+from app.core.config import settings
+from app.models.alert import Alert
+from app.services.geocoder import ReverseGeocoder, region_for_point
+from app.utils.geo import haversine
+from benchmarks.common import report, sqlite_sessionmaker, Timer
+
+
+def synthetic_dataset(path: str, places: int):
+    rnd = random.Random(48)
+    with open(path, "w") as f:
+        f.write("city,state,lat,lng,aliases\n")
+        for i in range(places):
+            f.write(f"Place {i},XX,{rnd.uniform(8, 32):.4f},{rnd.uniform(68, 92):.4f},\n")
+
+
+def measure_lookups(name: str, lookup, points):
+    latencies = []
+    with Timer() as total:
+        for lat, lng in points:
+            with Timer() as one:
+                lookup(lat, lng)
+            latencies.append(one.elapsed)
+    report(name, latencies, total.elapsed, f"{total.elapsed / len(points) * 1e6:7.1f} us/lookup")
+
+
+def linear(coder):
+    def lookup(lat, lng):
+        best = min(coder.cities, key=lambda c: haversine(lat, lng, c.lat, c.lng))
+        return best if haversine(lat, lng, best.lat, best.lng) <= coder.max_km else None
+    return lookup
+
+
+def run(lookups: int, places: int, rows: int):
+    rnd = random.Random(1)
+    points = [(rnd.uniform(8, 32), rnd.uniform(68, 92)) for _ in range(lookups)]
+    cache = tempfile.mkdtemp(prefix="ss-geocoder-")
+
+    synthetic = os.path.join(cache, "gazetteer.csv")
+    synthetic_dataset(synthetic, places)
+    for label, dataset in (("bundled", settings.GEOCODER_DATASET), (f"{places} places", synthetic)):
+        with Timer() as build:
+            coder = ReverseGeocoder(dataset, cache, settings.GEOCODER_MAX_KM)
+        with Timer() as mapped:
+            coder = ReverseGeocoder(dataset, cache, settings.GEOCODER_MAX_KM)
+        print(f"{label}: {len(coder.cities)} centroids, first start {build.elapsed * 1000:.1f} ms "
+              f"(builds the tree), later starts {mapped.elapsed * 1000:.1f} ms (maps it)")
+        measure_lookups(f"{label}: KD-tree", coder.region_for_point, points)
+        # the scan is slow enough on big datasets that a sample will do
+        measure_lookups(f"{label}: linear scan", linear(coder), points[:max(10, 200_000 // len(coder.cities))])
+
+    SessionBench = sqlite_sessionmaker()
+    db = SessionBench()
+    db.execute(Alert.__table__.insert(), [
+        {"code": "SOS", "emergency_level": "red", "emergency_type": "unsafe", "status": "resolved",
+         "latitude": lat, "longitude": lng} for lat, lng in
+        ((rnd.uniform(8, 32), rnd.uniform(68, 92)) for _ in range(rows))
+    ])
+    db.commit()
+    with Timer() as t:
+        tagged = backfill(db, Alert, (Alert.latitude, Alert.longitude), region_for_point)
+    print(f"backfill: {rows} alerts in {t.elapsed:.2f} s ({rows / t.elapsed:,.0f} rows/s, {tagged} near a city)")
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--places", type=int, default=100_000)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.lookups, args.places, args.rows)
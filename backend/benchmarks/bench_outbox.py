@@ -0,0 +1,93 @@
+"""
+Outbox relay throughput and lag.
+Messages are queued in a SQLite outbox, then drained by the relay against
+stand-in adapters that only sleep (network round trip per send / per SMTP
+session). Compares one serial sender with the default per-channel limits.
+- throughput: delivered messages/s until the outbox is empty
+- lag: created_at -> sent_at per message
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from app.models.outbox_message import OutboxMessage
+from app.services.channels import ChannelAdapter
+from app.services.outbox import OutboxRelay
+from benchmarks.common import report, sqlite_sessionmaker, Timer
+
+CHANNELS = {"email": 0.2, "sms": 0.3, "push": 0.5}  # share of the messages
+
+
+class SleepyAdapter(ChannelAdapter):
+    def __init__(self, name, concurrency, max_batch, latency, per_message=0.0):
+        self.name, self.concurrency, self.max_batch = name, concurrency, max_batch
+        self.latency, self.per_message = latency, per_message
+
+    def send_batch(self, messages):
+        time.sleep(self.latency + self.per_message * len(messages))
+        return [None] * len(messages)
+
+
+def adapters(serial: bool, rtt: float) -> dict:
+    if serial:
+        return {name: SleepyAdapter(name, 1, 1, rtt) for name in CHANNELS}
+    return {
+        # one SMTP session per batch: connect + handshake, then a cheap DATA per mail
+        "email": SleepyAdapter("email", 2, 20, 3 * rtt, per_message=rtt / 2),
+        "sms": SleepyAdapter("sms", 8, 1, rtt),
+        "push": SleepyAdapter("push", 16, 1, rtt),
+    }
+
+
+def seed(SessionBench, count: int):
+    db = SessionBench()
+    now = datetime.utcnow()
+    rows, start = [], 0
+    for name, share in CHANNELS.items():
+        n = int(count * share)
+        rows += [{"channel": name, "recipient": str(i), "payload": '{"text": "SOS"}', "status": "pending",
+                  "attempts": 0, "available_at": now, "created_at": now} for i in range(start, start + n)]
+        start += n
+    db.execute(OutboxMessage.__table__.insert(), rows)
+    db.commit()
+    db.close()
+    return len(rows)
+
+
+async def drain(relay: OutboxRelay, SessionBench):
+    relay.start()
+    while True:
+        await asyncio.sleep(0.05)
+        db = SessionBench()
+        left = db.query(OutboxMessage).filter(OutboxMessage.status != "sent").count()
+        db.close()
+        if not left:
+            break
+    await relay.stop()
+
+
+def run(label: str, count: int, serial: bool, rtt: float):
+    SessionBench = sqlite_sessionmaker()
+    total = seed(SessionBench, count)
+    relay = OutboxRelay(SessionBench, adapters(serial, rtt), batch_size=50, poll_interval=0.05,
+                        workers=1 if serial else 2)
+    with Timer() as t:
+        asyncio.run(drain(relay, SessionBench))
+
+    db = SessionBench()
+    lags = [(sent - created).total_seconds() for created, sent in
+            db.query(OutboxMessage.created_at, OutboxMessage.sent_at)]
+    db.close()
+    report(label, lags, t.elapsed, f"(lag percentiles; {total} messages in {t.elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--rtt-ms", type=float, default=10)
+    args = parser.parse_args()
+    rtt = args.rtt_ms / 1000
+    run("serial (1 sender, no batching)", args.messages // 4, True, rtt)
+    run("relay (per-channel limits, SMTP batches)", args.messages, False, rtt)
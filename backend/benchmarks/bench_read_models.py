@@ -0,0 +1,73 @@
+"""
+Bytes per row and rows per second: full ORM loads vs read models.
+Compares the old `db.query(Volunteer).all()` with NamedTuple DTOs and
+the columnar (array) form used for bulk scans.
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+
+from app.models.volunteer import Volunteer
+from app.services.read_models import verified_volunteer_points, verified_volunteer_columns, heat_points
+from app.models.alert import Alert
+from app.models.report import Report
+from benchmarks.common import sqlite_sessionmaker, Timer
+
+
+def seed(SessionBench, rows: int):
+    db = SessionBench()
+    rnd = random.Random(1)
+    db.execute(Volunteer.__table__.insert(), [
+        {"full_name": f"Volunteer {i}", "email": f"v{i}@example.com", "phone": "9999999999",
+         "city": "Bengaluru", "id_photo": "0" * 64, "password": "x" * 60, "is_active": True,
+         "is_verified": True, "latitude": 12.9 + rnd.random(), "longitude": 77.5 + rnd.random()}
+        for i in range(rows)
+    ])
+    db.execute(Alert.__table__.insert(), [
+        {"code": "SOS", "message": "help", "emergency_level": "red", "emergency_type": "unsafe",
+         "panic_level": 3, "status": "active", "latitude": 12.9 + rnd.random(), "longitude": 77.5 + rnd.random()}
+        for _ in range(rows)
+    ])
+    db.execute(Report.__table__.insert(), [
+        {"description": "suspicious", "risk_level": "MEDIUM",
+         "latitude": 12.9 + rnd.random(), "longitude": 77.5 + rnd.random()}
+        for _ in range(rows)
+    ])
+    db.commit()
+    db.close()
+
+
+def measure(name, SessionBench, load, rows):
+    db = SessionBench()
+    gc.collect()
+    tracemalloc.start()
+    with Timer() as t:
+        result = load(db)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<32} {rows / t.elapsed:10.0f} rows/s  {held / rows:7.0f} bytes/row")
+    del result
+    db.close()
+
+
+def run(rows: int):
+    SessionBench = sqlite_sessionmaker()
+    seed(SessionBench, rows)
+
+    measure("volunteers: ORM entities", SessionBench,
+            lambda db: db.query(Volunteer).filter(Volunteer.is_verified == True).all(), rows)
+    measure("volunteers: VolunteerPoint", SessionBench, verified_volunteer_points, rows)
+    measure("volunteers: columnar arrays", SessionBench, verified_volunteer_columns, rows)
+
+    measure("heatmap: ORM entities", SessionBench,
+            lambda db: db.query(Alert).all() + db.query(Report).all(), rows * 2)
+    measure("heatmap: HeatPoint", SessionBench, heat_points, rows * 2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+    run(args.rows)
@@ -0,0 +1,111 @@
+"""
+Region shards: one global database vs region shards (separate SQLite
+files) for the two geo reads of an SOS, with volunteers and alerts spread
+over India.
+- matching: candidates inside the 20 km box, as assign_volunteers loads them
+- heatmap: points within 20 km (sharded) vs the whole table (today's /heatmap/)
+A "boundary" SOS sits next to a region line and reads two shards.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+
+from app.core import sharding
+from app.core.database import build_engine
+from app.core.sharding import RegionRouter, covering_cells
+from app.models.alert import Alert
+from app.models.volunteer import Volunteer
+from app.services import read_models, region_service
+from app.services.alert_service import MAX_RADIUS_KM
+from benchmarks.common import report, sqlite_sessionmaker, Timer
+
+INDIA = (8.0, 32.0, 68.0, 90.0)
+
+
+def seed(SessionBench, volunteers: int, alerts: int):
+    rnd = random.Random(47)
+
+    def point():
+        # most people live in a few metros, the rest anywhere
+        if rnd.random() < 0.6:
+            lat, lng = rnd.choice([(12.97, 77.59), (28.61, 77.21), (19.07, 72.87), (22.57, 88.36), (13.08, 80.27)])
+            return lat + rnd.gauss(0, 0.15), lng + rnd.gauss(0, 0.15)
+        return rnd.uniform(INDIA[0], INDIA[1]), rnd.uniform(INDIA[2], INDIA[3])
+
+    db = SessionBench()
+    db.execute(Volunteer.__table__.insert(), [
+        dict(zip(("latitude", "longitude"), point()), full_name=f"v{i}", email=f"v{i}@example.com",
+             password="x", is_verified=True) for i in range(volunteers)
+    ])
+    db.execute(Alert.__table__.insert(), [
+        dict(zip(("latitude", "longitude"), point()), code="SOS", emergency_level="red",
+             emergency_type="unsafe", panic_level=3, status="resolved") for _ in range(alerts)
+    ])
+    db.commit()
+    db.close()
+
+
+def region_router(shards: int) -> RegionRouter:
+    """
+    Precision-2 cells over India dealt round-robin to `shards` SQLite files.
+    """
+    directory = tempfile.mkdtemp(prefix="ss-regions-")
+    engines = {f"r{i}": build_engine(f"sqlite:///{os.path.join(directory, f'r{i}.db')}", name=f"region-r{i}")
+               for i in range(shards)}
+    regions = {cell: f"r{i % shards}" for i, cell in enumerate(covering_cells(INDIA, 2))}
+    router = RegionRouter(engines, regions)
+    router.create_tables()
+    return router
+
+
+def measure(name: str, SessionBench, read, points, repeat: int):
+    latencies, found = [], 0
+    with Timer() as total:
+        for i in range(repeat):
+            lat, lng = points[i % len(points)]
+            db = SessionBench()
+            with Timer() as one:
+                found += len(read(db, lat, lng))
+            latencies.append(one.elapsed)
+            db.close()
+    report(name, latencies, total.elapsed, f"rows/read={found / repeat:8.0f}")
+
+
+def run(volunteers: int, alerts: int, shards: int, repeat: int):
+    SessionBench = sqlite_sessionmaker()
+    seed(SessionBench, volunteers, alerts)
+    rnd = random.Random(1)
+    metros = [(12.97 + rnd.gauss(0, 0.1), 77.59 + rnd.gauss(0, 0.1)) for _ in range(50)]
+    boundary = [(12.97, 77.36)]  # 2 km from the tdr / tdq line
+
+    radius = MAX_RADIUS_KM
+    print(f"{volunteers} volunteers, {alerts} alerts, {shards} shards")
+    for label, router in (("global", RegionRouter({}, {})), ("sharded", None)):
+        if router is None:
+            router = region_router(shards)
+            sharding.region_router = router
+            db = SessionBench()
+            region_service.sync_from_primary(db)
+            db.close()
+        sharding.region_router = router
+        measure(f"{label}: matching (metro SOS)", SessionBench,
+                lambda db, lat, lng: region_service.volunteer_points(db, lat, lng, radius), metros, repeat)
+        measure(f"{label}: matching (boundary SOS)", SessionBench,
+                lambda db, lat, lng: region_service.volunteer_points(db, lat, lng, radius), boundary, repeat)
+        measure(f"{label}: heatmap within {radius} km", SessionBench,
+                lambda db, lat, lng: region_service.heat_points(db, lat, lng, radius), metros, repeat)
+    sharding.region_router = RegionRouter({}, {})
+    measure("global: heatmap, whole table", SessionBench,
+            lambda db, lat, lng: read_models.heat_points(db), metros, max(1, repeat // 20))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--volunteers", type=int, default=200_000)
+    parser.add_argument("--alerts", type=int, default=200_000)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.volunteers, args.alerts, args.shards, args.repeat)
@@ -0,0 +1,90 @@
+"""
+/heatmap/ and /users/ before and after the fast response layer.
+"before" re-creates the old routes: full ORM loads, response_model
+validation and stdlib JSONResponse.
+"""
+
+import argparse
+import random
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.api.routes import heatmap, users
+from app.core.database import get_db
+from app.core.security import create_access_token
+from app.models.alert import Alert
+from app.models.report import Report
+from app.models.user import User
+from app.schemas.user import UserResponse
+from benchmarks.common import build_app, report, sqlite_sessionmaker, Timer
+
+legacy = APIRouter(prefix="/legacy")
+
+
+@legacy.get("/heatmap/")
+def legacy_heatmap(db=Depends(get_db)):
+    data = [{"lat": a.latitude, "lon": a.longitude, "level": a.panic_level} for a in db.query(Alert).all()]
+    data += [{"lat": r.latitude, "lon": r.longitude, "level": r.risk_level} for r in db.query(Report).all()]
+    return JSONResponse(data)
+
+
+@legacy.get("/users/", response_model=list[UserResponse])
+def legacy_users(db=Depends(get_db)):
+    return db.query(User).all()
+
+
+def seed(SessionBench, rows: int):
+    db = SessionBench()
+    rnd = random.Random(1)
+    db.bulk_insert_mappings(Alert, [
+        {"code": "SOS", "emergency_level": "red", "emergency_type": "unsafe", "panic_level": rnd.randint(1, 5),
+         "status": "active", "latitude": 12.9 + rnd.random(), "longitude": 77.5 + rnd.random()}
+        for _ in range(rows)
+    ])
+    db.bulk_insert_mappings(Report, [
+        {"description": "suspicious", "risk_level": "MEDIUM",
+         "latitude": 12.9 + rnd.random(), "longitude": 77.5 + rnd.random()}
+        for _ in range(rows)
+    ])
+    db.bulk_insert_mappings(User, [
+        {"full_name": f"User {i}", "email": f"user{i}@example.com", "hashed_password": "x", "role": "USER"}
+        for i in range(rows)
+    ])
+    db.commit()
+    db.close()
+
+
+def run(rows: int, repeat: int):
+    SessionBench = sqlite_sessionmaker()
+    seed(SessionBench, rows)
+    client = TestClient(build_app(heatmap.router, users.router, legacy, SessionBench=SessionBench))
+    admin = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'role': 'user', 'staff': 'admin'})}"}
+
+    cases = [
+        ("before /heatmap/", "/legacy/heatmap/", {}),
+        ("after  /heatmap/", "/heatmap/", {}),
+        ("after  /heatmap/ msgpack", "/heatmap/", {"Accept": "application/msgpack"}),
+        ("before /users/", "/legacy/users/", {}),
+        ("after  /users/ (page of 50)", "/users/", admin),
+        ("after  /users/export", "/users/export", admin),
+    ]
+    for name, path, headers in cases:
+        latencies = []
+        size = 0
+        with Timer() as total:
+            for _ in range(repeat):
+                with Timer() as t:
+                    response = client.get(path, headers=headers)
+                latencies.append(t.elapsed)
+                size = len(response.content)
+        report(f"{name} ({rows} rows)", latencies, total.elapsed, f"bytes={size}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
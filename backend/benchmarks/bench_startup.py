@@ -0,0 +1,75 @@
+"""
+Cold start of a new worker, each run in a fresh interpreter:
+- import: `import app.main` plus building the app (create_app())
+- first request: GET / right after startup, and the first request that
+  checks a JWT (/users/me), with and without waiting for the warm-up
+- ready: startup until GET /ready answers 200
+Children use a throwaway SQLite database, so nothing needs MySQL.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import report, sqlite_sessionmaker, Timer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+application = app.main.app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+
+wait_ready = sys.argv[1] == "1"
+timings = {"import": imported - start}
+with TestClient(application) as client:
+    started = time.perf_counter()
+    if wait_ready:
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.005)
+        timings["ready"] = time.perf_counter() - started
+    t = time.perf_counter()
+    client.get("/")
+    timings["first_request"] = time.perf_counter() - t
+    t = time.perf_counter()
+    client.get("/users/me", headers={"Authorization": "Bearer not-a-token"})
+    timings["first_auth_request"] = time.perf_counter() - t
+print(json.dumps(timings))
+"""
+
+
+def probe(env: dict, wait_ready: bool) -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE, "1" if wait_ready else "0"], cwd=BACKEND_DIR,
+                         env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(runs: int):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="ss-startup-"), "startup.db")
+    sqlite_sessionmaker(db_path)  # tables for the warm-up's subscription index
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}",
+               GEOCODER_CACHE_DIR=os.path.join(os.path.dirname(db_path), "cache"))
+
+    for wait_ready in (False, True):
+        label = "after warm-up" if wait_ready else "no wait"
+        results = []
+        with Timer() as total:
+            for _ in range(runs):
+                results.append(probe(env, wait_ready))
+        for key in ("import", "ready", "first_request", "first_auth_request"):
+            values = [r[key] for r in results if key in r]
+            if values and (wait_ready or key != "ready"):
+                report(f"{label}: {key}", values, total.elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    run(args.runs)
@@ -0,0 +1,121 @@
+"""
+Geofenced subscriptions at 1M: which subscribers does a new alert reach?
+- index build from the DB (subs/s, RSS held by the index)
+- per-alert lookup: grid candidates only, and the full match (candidate
+  rows from SQLite + exact circle / polygon test)
+- baselines: the bbox scan over every subscription (in Python and in SQL)
+"""
+
+import argparse
+import gc
+import random
+
+from app.models.area_subscription import AreaSubscription
+from app.services.subscription_service import SubscriptionIndex, shape_fields
+from benchmarks.common import report, rss_mb, sqlite_sessionmaker, Timer
+
+# (lat, lng) of the metros most subscriptions cluster around
+CITIES = [(28.61, 77.21), (19.08, 72.88), (12.97, 77.59), (13.08, 80.27), (22.57, 88.36), (17.39, 78.49),
+          (18.52, 73.86), (23.02, 72.57), (26.91, 75.79), (26.85, 80.95), (21.15, 79.09), (30.73, 76.78)]
+
+
+def random_shape(rnd: random.Random) -> dict:
+    lat, lng = rnd.choice(CITIES)
+    lat, lng = lat + rnd.gauss(0, 0.15), lng + rnd.gauss(0, 0.15)
+    roll = rnd.random()
+    if roll < 0.85:  # home / office circles
+        return shape_fields(lat, lng, rnd.uniform(0.3, 5))
+    if roll < 0.99:  # campus / society polygons
+        size = rnd.uniform(0.002, 0.02)
+        return shape_fields(polygon=[[lat, lng], [lat, lng + size], [lat + size, lng + size], [lat + size, lng]])
+    return shape_fields(lat, lng, rnd.uniform(20, 50))  # city-wide watchers
+
+
+def seed(SessionBench, count: int, chunk: int = 50_000):
+    rnd = random.Random(21)
+    db = SessionBench()
+    # executemany needs the same keys in every row
+    blank = {"center_lat": None, "center_lng": None, "radius_km": None, "polygon": None}
+    for start in range(0, count, chunk):
+        db.execute(AreaSubscription.__table__.insert(), [
+            {"owner_role": "volunteer" if i % 3 else "user", "owner_id": i, "active": True,
+             **blank, **random_shape(rnd)}
+            for i in range(start, min(count, start + chunk))
+        ])
+    db.commit()
+    db.close()
+
+
+def alert_points(n: int) -> list[tuple[float, float]]:
+    rnd = random.Random(5)
+    points = []
+    for _ in range(n):
+        lat, lng = rnd.choice(CITIES)
+        points.append((lat + rnd.gauss(0, 0.1), lng + rnd.gauss(0, 0.1)))
+    return points
+
+
+def run(count: int, alerts: int):
+    SessionBench = sqlite_sessionmaker()
+    with Timer() as t:
+        seed(SessionBench, count)
+    print(f"seeded {count} subscriptions in {t.elapsed:.1f}s")
+
+    db = SessionBench()
+    index = SubscriptionIndex()
+    gc.collect()
+    before = rss_mb()
+    with Timer() as t:
+        index.refresh(db)
+    held = rss_mb() - before
+    print(f"index build   {count / t.elapsed:10.0f} subs/s  {t.elapsed:6.1f}s  rss +{held:.0f} MB "
+          f"({held * 2**20 / count:.0f} B/sub)  cells={len(index.grid.cells)}")
+
+    points = alert_points(alerts)
+    latencies, candidates = [], 0
+    with Timer() as total:
+        for lat, lng in points:
+            with Timer() as one:
+                candidates += len(index.candidates(lat, lng))
+            latencies.append(one.elapsed)
+    report("grid candidates", latencies, total.elapsed, f"avg candidates={candidates / alerts:.1f}")
+
+    latencies, matched = [], 0
+    with Timer() as total:
+        for lat, lng in points:
+            with Timer() as one:
+                matched += len(index.match(db, lat, lng))
+            latencies.append(one.elapsed)
+    report("full match (DB + exact)", latencies, total.elapsed, f"avg matches={matched / alerts:.1f}")
+
+    boxes = db.query(AreaSubscription.id, AreaSubscription.min_lat, AreaSubscription.max_lat,
+                     AreaSubscription.min_lng, AreaSubscription.max_lng).all()
+    sample = points[:20]
+    latencies = []
+    with Timer() as total:
+        for lat, lng in sample:
+            with Timer() as one:
+                [b for b in boxes if b[1] <= lat <= b[2] and b[3] <= lng <= b[4]]
+            latencies.append(one.elapsed)
+    report("baseline: python bbox scan", latencies, total.elapsed)
+    del boxes
+
+    latencies = []
+    with Timer() as total:
+        for lat, lng in sample:
+            with Timer() as one:
+                db.query(AreaSubscription.id).filter(
+                    AreaSubscription.min_lat <= lat, AreaSubscription.max_lat >= lat,
+                    AreaSubscription.min_lng <= lng, AreaSubscription.max_lng >= lng,
+                ).all()
+            latencies.append(one.elapsed)
+    report("baseline: SQL bbox scan", latencies, total.elapsed)
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscriptions", type=int, default=1_000_000)
+    parser.add_argument("--alerts", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.subscriptions, args.alerts)
@@ -0,0 +1,83 @@
+"""
+/alerts/{id}/track on a 2-hour track (1 Hz user + volunteer, 14,400 points).
+"raw rows" is what a plain endpoint would return: every LiveLocation row
+as JSON. Sizes are response bytes, plus gzip -6 as a proxy for a
+compressing proxy in front of the app.
+"""
+
+import argparse
+import gzip
+import random
+from datetime import datetime
+
+from fastapi import APIRouter, Depends
+from fastapi.testclient import TestClient
+
+from app.api.routes import alerts
+from app.core.database import get_db
+from app.core.security import create_access_token
+from app.models.alert import Alert
+from app.models.live_location import LiveLocation
+from app.services import track_service
+from app.services.track_service import epoch_ms
+from benchmarks.bench_tracks import random_walk
+from benchmarks.common import build_app, report, sqlite_sessionmaker, Timer
+
+legacy = APIRouter(prefix="/legacy")
+
+
+@legacy.get("/alerts/{alert_id}/track")
+def legacy_track(alert_id: int, db=Depends(get_db)):
+    rows = db.query(LiveLocation).filter(LiveLocation.alert_id == alert_id).order_by(LiveLocation.timestamp).all()
+    return [{"user_lat": r.user_lat, "user_lng": r.user_lng, "volunteer_lat": r.volunteer_lat,
+             "volunteer_lng": r.volunteer_lng, "timestamp": r.timestamp} for r in rows]
+
+
+def seed(SessionBench, seconds: int):
+    db = SessionBench()
+    db.add(Alert(id=1, user_id=10, code="SOS", emergency_level="red", emergency_type="unsafe",
+                 status="active", latitude=12.97, longitude=77.59))
+    db.commit()
+    db.close()
+    rnd = random.Random(44)
+    start = epoch_ms(datetime.utcnow()) - seconds * 1000
+    writer = track_service.TrackWriter()
+    writer.record(1, "user", random_walk(rnd, start, seconds))
+    writer.record(1, "volunteer", random_walk(rnd, start + 500, seconds))
+    track_service.TrackWriter.write(SessionBench, writer.take())
+    return start
+
+
+def measure(client, name: str, url: str, headers: dict, repeat: int):
+    latencies, body = [], b""
+    with Timer() as total:
+        for _ in range(repeat):
+            with Timer() as one:
+                response = client.get(url, headers=headers)
+                body = response.content
+            latencies.append(one.elapsed)
+    assert response.status_code == 200, response.text
+    report(name, latencies, total.elapsed, f"{len(body) / 1024:8.1f} KB  gzip {len(gzip.compress(body)) / 1024:7.1f} KB")
+
+
+def run(seconds: int, repeat: int):
+    SessionBench = sqlite_sessionmaker()
+    start = seed(SessionBench, seconds)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '10', 'role': 'user'})}"}
+    client = TestClient(build_app(alerts.router, legacy, SessionBench=SessionBench))
+
+    measure(client, "raw rows (JSON)", "/legacy/alerts/1/track", headers, repeat)
+    for tolerance in (0, 2, 5, 10):
+        measure(client, f"polyline chunks, tolerance={tolerance} m", f"/alerts/1/track?tolerance={tolerance}",
+                headers, repeat)
+    # a client polling every 5 s only gets what's new
+    since = start + (seconds - 5) * 1000
+    measure(client, "poll: since=last 5 s", f"/alerts/1/track?since={since}", headers, repeat * 10)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=int, default=7200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.seconds, args.repeat)
@@ -0,0 +1,115 @@
+"""
+Live location tiers: closed alerts with 2-hour tracks (1 Hz user + volunteer).
+- compaction: points/s simplified + encoded, bytes per point kept
+- archival: rows/s moved to gzip files, archive bytes per point
+- read latency of one alert's track from each tier
+- SQLite file size of the hot table before / after (VACUUM)
+"""
+
+import argparse
+import math
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.models.alert import Alert
+from app.models.alert_track import AlertTrack
+from app.services import track_service
+from app.services.track_service import epoch_ms
+from benchmarks.common import report, sqlite_sessionmaker, Timer
+
+
+def random_walk(rnd: random.Random, start_ms: int, seconds: int) -> list:
+    lat, lng = 12.9 + rnd.random() * 0.2, 77.5 + rnd.random() * 0.2
+    heading, points = rnd.random() * 2 * math.pi, []
+    for i in range(seconds):
+        heading += rnd.gauss(0, 0.15)
+        step = 1.4e-5 if i % 600 < 420 else 0  # walking, then waiting
+        lat, lng = lat + step * math.cos(heading), lng + step * math.sin(heading)
+        # GPS jitter of a couple of metres
+        points.append((lat + rnd.gauss(0, 1.5e-5), lng + rnd.gauss(0, 1.5e-5), start_ms + i * 1000))
+    return points
+
+
+def seed(SessionBench, alerts: int, seconds: int):
+    rnd = random.Random(43)
+    db = SessionBench()
+    start = datetime.utcnow() - timedelta(days=30)
+    db.execute(Alert.__table__.insert(), [
+        {"id": i, "code": "SOS", "emergency_level": "red", "emergency_type": "unsafe", "status": "resolved",
+         "latitude": 12.97, "longitude": 77.59, "panic_level": 1, "created_at": start}
+        for i in range(1, alerts + 1)
+    ])
+    db.commit()
+    db.close()
+    writer = track_service.TrackWriter()
+    for alert_id in range(1, alerts + 1):
+        start_ms = epoch_ms(start) + alert_id * 60_000
+        writer.record(alert_id, "user", random_walk(rnd, start_ms, seconds))
+        writer.record(alert_id, "volunteer", random_walk(rnd, start_ms + 500, seconds))
+        track_service.TrackWriter.write(SessionBench, writer.take())
+    return alerts * seconds * 2
+
+
+def read_latencies(SessionBench, alerts: int, raw: bool = False, root=None):
+    db = SessionBench()
+    latencies, tier = [], None
+    with Timer() as total:
+        for alert_id in range(1, alerts + 1):
+            with Timer() as one:
+                track = track_service.read_track(db, alert_id, raw=raw, root=root)
+            latencies.append(one.elapsed)
+            tier = track.tier
+    db.close()
+    return latencies, total.elapsed, tier
+
+
+def sqlite_size(SessionBench) -> float:
+    db = SessionBench()
+    db.execute(text("VACUUM"))
+    size = db.execute(text("PRAGMA page_count")).scalar() * db.execute(text("PRAGMA page_size")).scalar()
+    db.close()
+    return size / 2**20
+
+
+def run(alerts: int, seconds: int, tolerance: float):
+    SessionBench = sqlite_sessionmaker()
+    with Timer() as t:
+        points = seed(SessionBench, alerts, seconds)
+    print(f"seeded {alerts} alerts, {points} points in {t.elapsed:.1f}s; db {sqlite_size(SessionBench):.1f} MB")
+
+    report("read hot (raw rows)", *read_latencies(SessionBench, alerts)[:2])
+
+    with Timer() as t:
+        track_service.compact_closed(SessionBench, limit=alerts, tolerance=tolerance)
+    db = SessionBench()
+    kept = sum(r.kept_points for r in db.query(AlertTrack))
+    encoded = sum(len(r.user_track) + len(r.volunteer_track) for r in db.query(AlertTrack))
+    db.close()
+    print(f"compaction    {points / t.elapsed:10.0f} points/s  kept {kept}/{points} "
+          f"({kept / points:.1%}) at {tolerance} m, {encoded / max(kept, 1):.1f} B/kept point, "
+          f"{encoded / alerts / 1024:.1f} KB/alert")
+
+    root = tempfile.mkdtemp(prefix="ss-archive-")
+    with Timer() as t:
+        track_service.archive_expired(SessionBench, root=root, limit=alerts)
+    archive_bytes = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+    print(f"archival      {points / t.elapsed:10.0f} rows/s    {archive_bytes / points:.1f} B/point gzip CSV; "
+          f"db after {sqlite_size(SessionBench):.1f} MB")
+
+    latencies, elapsed, tier = read_latencies(SessionBench, alerts)
+    report(f"read {tier}", latencies, elapsed)
+    latencies, elapsed, tier = read_latencies(SessionBench, alerts, raw=True, root=root)
+    report(f"read {tier} (raw)", latencies, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--alerts", type=int, default=50)
+    parser.add_argument("--seconds", type=int, default=7200)
+    parser.add_argument("--tolerance", type=float, default=5)
+    args = parser.parse_args()
+    run(args.alerts, args.seconds, args.tolerance)
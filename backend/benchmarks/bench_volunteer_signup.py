@@ -0,0 +1,70 @@
+"""
+Concurrent volunteer signups with multi-MB ID photos.
+Also measures how quickly oversized uploads get rejected.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from app.api.routes import volunteers
+from app.core.config import settings
+from app.middlewares.upload_limit import UploadLimitMiddleware
+from benchmarks.common import build_app, report, sqlite_sessionmaker, Timer
+
+
+def fake_jpeg(size: int) -> bytes:
+    return b"\xff\xd8\xff\xe0" + os.urandom(size - 4)
+
+
+async def run(concurrency: int, total: int, photo_mb: float):
+    settings.BLOB_DIR = tempfile.mkdtemp(prefix="ss-bench-blobs-")
+    volunteers.schedule_id_photo_processing = lambda path, digest: None
+
+    app = build_app(
+        volunteers.router,
+        SessionBench=sqlite_sessionmaker(),
+        middlewares=[(UploadLimitMiddleware, {"paths": ["/volunteers/signup"], "max_bytes": 8 * 1024 * 1024})],
+    )
+    photo = fake_jpeg(int(photo_mb * 1024 * 1024))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def signup(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/volunteers/signup",
+                    data={"full_name": f"V{i}", "email": f"v{i}@bench.local", "password": "pw",
+                          "phone": "1", "city": "Bengaluru"},
+                    files={"id_photo": ("id.jpg", photo, "image/jpeg")},
+                )
+                assert response.status_code == 200, response.text
+                latencies.append(time.perf_counter() - start)
+
+        with Timer() as t:
+            await asyncio.gather(*(signup(i) for i in range(total)))
+        report(f"signup {photo_mb}MB x{concurrency} concurrent", latencies, t.elapsed)
+
+        oversized = fake_jpeg(32 * 1024 * 1024)
+        with Timer() as t:
+            response = await client.post(
+                "/volunteers/signup",
+                data={"full_name": "X", "email": "x@bench.local", "password": "pw", "phone": "1", "city": "X"},
+                files={"id_photo": ("id.jpg", oversized, "image/jpeg")},
+            )
+        report("oversized 32MB rejection", [t.elapsed], t.elapsed, f"status={response.status_code}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--total", type=int, default=64)
+    parser.add_argument("--photo-mb", type=float, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.total, args.photo_mb))
@@ -0,0 +1,89 @@
+"""
+Live location on the wire: bytes and CPU per message, legacy JSON dicts
+vs binary frames (app/utils/wire.py), single points and batches.
+- encode/decode: one message, what a sender and a receiver pay
+- fan-out: one update published to N subscribers, per delivery
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+from app.core.gateway import Gateway, WebSocketConnection, alert_topic
+from app.utils import wire
+from app.utils.response import dumps
+from benchmarks.common import Timer
+
+
+class NullWebSocket:
+    async def send_text(self, text):
+        pass
+
+    async def send_bytes(self, data):
+        pass
+
+
+def track(n: int, rnd: random.Random) -> list[tuple[float, float, int]]:
+    lat, lng, ts = 12.97, 77.59, 1_700_000_000_000
+    points = []
+    for _ in range(n):
+        lat += rnd.uniform(-1e-4, 1e-4)
+        lng += rnd.uniform(-1e-4, 1e-4)
+        ts += rnd.randint(200, 1500)
+        points.append((lat, lng, ts))
+    return points
+
+
+def per_call(fn, rounds: int) -> float:
+    with Timer() as t:
+        for _ in range(rounds):
+            fn()
+    return t.elapsed / rounds * 1e6
+
+
+def codecs(rounds: int):
+    rnd = random.Random(9)
+    print(f"{'format':<28} {'bytes':>7} {'B/point':>8} {'encode us':>10} {'decode us':>10} {'us/point':>9}")
+    for n in (1, 10, 50):
+        points = track(n, rnd)
+        legacy = [{"type": "LIVE_LOCATION", "latitude": lat, "longitude": lng} for lat, lng, _ in points]
+        fallback = Gateway().location_batch(1, points).data
+        cases = [
+            (f"legacy JSON x{n} msgs", lambda: [dumps(m) for m in legacy],
+             [dumps(m) for m in legacy], lambda enc: [json.loads(m) for m in enc]),
+            (f"JSON batch of {n}", lambda: dumps(fallback), dumps(fallback), json.loads),
+            (f"binary batch of {n}", lambda: wire.encode_locations(1, 0, points),
+             wire.encode_locations(1, 0, points), wire.decode_locations),
+        ]
+        for name, encode, encoded, decode in cases:
+            size = sum(map(len, encoded)) if isinstance(encoded, list) else len(encoded)
+            encode_us = per_call(encode, rounds)
+            decode_us = per_call(lambda: decode(encoded), rounds)
+            print(f"{name:<28} {size:7d} {size / n:8.1f} {encode_us:10.2f} {decode_us:10.2f} "
+                  f"{(encode_us + decode_us) / n:9.2f}")
+
+
+async def fanout(subscribers: int, rounds: int):
+    rnd = random.Random(4)
+    for binary in (False, True):
+        hub = Gateway()
+        ws = NullWebSocket()
+        for i in range(subscribers):
+            hub.register(WebSocketConnection(ws, "gateway", {"sub": str(i), "role": "volunteer"}, binary=binary),
+                         [alert_topic(1)])
+        with Timer() as t:
+            for _ in range(rounds):
+                await hub.publish(alert_topic(1), hub.location_batch(1, track(5, rnd)))
+        label = "binary" if binary else "JSON"
+        print(f"fan-out {label:<6} batch of 5 to {subscribers}  {t.elapsed / rounds * 1e6:9.1f} us/publish  "
+              f"{t.elapsed / rounds / subscribers * 1e6:6.2f} us/delivery")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--subscribers", type=int, default=1000)
+    args = parser.parse_args()
+    codecs(args.rounds)
+    asyncio.run(fanout(args.subscribers, max(1, args.rounds // 100)))
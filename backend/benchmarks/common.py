@@ -0,0 +1,102 @@
+"""
+Shared helpers for the benchmark scripts.
+Run them from the backend folder, e.g. `python -m benchmarks.bench_volunteer_signup`.
+"""
+
+import os
+import resource
+import statistics
+import tempfile
+import time
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, get_db, get_read_db, get_session_factory
+from app.models import user, volunteer, alert, alert_volunteer, report, live_location, trusted_contacts, stored_blob, area_subscription, outbox_message, alert_track, analytics_aggregate
+
+
+def sqlite_sessionmaker(path: str | None = None):
+    """
+    Fresh SQLite database with all tables created.
+    """
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="ss-bench-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def build_app(*routers, SessionBench, middlewares=()):
+    app = FastAPI()
+    for router in routers:
+        app.include_router(router)
+    for middleware, options in middlewares:
+        app.add_middleware(middleware, **options)
+
+    def override_get_db():
+        db = SessionBench()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_session_factory():
+        return SessionBench
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = override_session_factory
+    return app
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(round(len(sorted_values) * q)) - 1))]
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    """
+    Throughput (ops/s) and p50/p95/p99 in milliseconds.
+    """
+    latencies = sorted(latencies)
+    return {
+        "n": len(latencies),
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(latencies) * 1000, 3) if latencies else 0.0,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def rss_mb() -> float:
+    """
+    Current resident set size (falls back to peak RSS off Linux).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def report(name: str, latencies: list[float], elapsed: float, extra: str = ""):
+    stats = summarize(latencies, elapsed)
+    print(
+        f"{name:<40} n={stats['n']:<6} "
+        f"throughput={stats['throughput']:8.1f}/s "
+        f"p50={stats['p50_ms']:7.2f}ms "
+        f"p95={stats['p95_ms']:7.2f}ms "
+        f"p99={stats['p99_ms']:7.2f}ms {extra}"
+    )
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,131 @@
+"""
+Benchmark harness: runs the load scenarios in-process against SQLite,
+prints throughput / p50 / p95 / p99 / RSS, and compares with a stored
+baseline. Exits 1 when a scenario regressed more than --max-regression.
+
+    python -m benchmarks.run                      # everything, full size
+    python -m benchmarks.run --only sos_storm,accept_races --scale 0.1
+    python -m benchmarks.run --save-baseline      # record this machine's numbers
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+
+from benchmarks.common import summarize, rss_mb
+from benchmarks.scenarios import SCENARIOS
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Higher is better for throughput, lower is better for latency
+HIGHER_IS_BETTER = ("throughput",)
+COMPARED = ("throughput", "p95_ms", "p99_ms")
+
+
+def machine() -> dict:
+    return {"cpus": os.cpu_count(), "python": platform.python_version(), "platform": platform.platform()}
+
+
+def run_scenarios(names: list[str], scale: float) -> dict:
+    summaries = {}
+    for name in names:
+        for r in asyncio.run(SCENARIOS[name](scale)):
+            stats = summarize(r["latencies"], r["elapsed"])
+            stats.update(errors=r["errors"], rss_mb=round(rss_mb(), 1), **r["extra"])
+            summaries[r["name"]] = stats
+            print(
+                f"{r['name']:<18} n={stats['n']:<7} {stats['throughput']:10.1f}/s  "
+                f"p50={stats['p50_ms']:9.2f}ms p95={stats['p95_ms']:9.2f}ms p99={stats['p99_ms']:9.2f}ms  "
+                f"rss={stats['rss_mb']:7.1f}MB errors={stats['errors']}  {r['extra'] or ''}",
+                flush=True,
+            )
+    return summaries
+
+
+def regressions(current: dict, baseline: dict, max_regression: float) -> list[str]:
+    """
+    Human-readable lines for every compared metric worse than the baseline
+    by more than max_regression (0.2 = 20%). New errors always count.
+    """
+    problems = []
+    for name, stats in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in COMPARED:
+            old, new = base.get(metric), stats.get(metric)
+            if not old or new is None:
+                continue
+            change = (old - new) / old if metric in HIGHER_IS_BETTER else (new - old) / old
+            if change > max_regression:
+                problems.append(f"{name}.{metric}: {old} -> {new} ({change:+.0%} worse)")
+        if stats["errors"] > base.get("errors", 0):
+            problems.append(f"{name}.errors: {base.get('errors', 0)} -> {stats['errors']}")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help=f"comma separated, from {', '.join(SCENARIOS)}")
+    parser.add_argument("--scale", type=float, default=1.0, help="shrink sizes for quick runs, e.g. 0.1")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--max-regression", type=float,
+                        default=float(os.getenv("BENCH_MAX_REGRESSION", 0.25)),
+                        help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--output", help="also write results as JSON here")
+    args = parser.parse_args(argv)
+
+    # app logs (alert created, ...) would drown the table
+    logging.getLogger("silent_shield").setLevel(logging.WARNING)
+
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    current = run_scenarios(names, args.scale)
+    payload = {"scale": args.scale, "machine": machine(), "results": current}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(payload, f, indent=2)
+
+    if args.save_baseline:
+        saved = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved = json.load(f)
+        if saved.get("scale", args.scale) != args.scale:
+            saved = {}
+        saved = {"scale": args.scale, "machine": machine(), "results": {**saved.get("results", {}), **current}}
+        with open(args.baseline, "w") as f:
+            json.dump(saved, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline yet, run with --save-baseline to record one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("scale") != args.scale:
+        print(f"baseline was recorded at scale {baseline.get('scale')}, not comparing")
+        return 0
+    if baseline.get("machine", {}).get("cpus") != os.cpu_count():
+        print(f"note: baseline was recorded on {baseline.get('machine')}, numbers may not be comparable")
+
+    problems = regressions(current, baseline["results"], args.max_regression)
+    for line in problems:
+        print(f"REGRESSION {line}")
+    if not problems:
+        print(f"no regression beyond {args.max_regression:.0%} against {args.baseline}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""
+Load scenarios for benchmarks/run.py.
+Each scenario builds an in-process app on a fresh SQLite file and returns
+a list of results: {"name", "latencies", "elapsed", "errors", "extra"}.
+`scale` shrinks everything for quick runs (1.0 = full size).
+"""
+
+import asyncio
+import gc
+import random
+import time
+import tracemalloc
+
+import httpx
+
+from app.api.routes import alerts, auth, heatmap, socket
+from app.core.security import create_access_token, get_password_hash
+from app.core.socket_manager import manager
+from app.models.alert import Alert
+from app.models.alert_volunteer import AlertVolunteer
+from app.models.report import Report
+from app.models.user import User
+from app.models.volunteer import Volunteer
+from benchmarks.common import build_app, sqlite_sessionmaker, Timer
+
+SOS = {"code": "SOS", "message": "help", "emergency_level": "red", "emergency_type": "unsafe"}
+
+
+def result(name, latencies, elapsed, errors=0, **extra):
+    return {"name": name, "latencies": latencies, "elapsed": elapsed, "errors": errors, "extra": extra}
+
+
+def client_for(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+
+
+async def drive(requests, concurrency: int):
+    """
+    Runs the request coroutine factories `concurrency` at a time.
+    Returns (latencies, elapsed, responses); exceptions count as errors.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, responses = [], []
+
+    async def one(make):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                responses.append(await make())
+            except Exception as exc:  # a failed request is a data point, not a crash
+                responses.append(exc)
+            latencies.append(time.perf_counter() - start)
+
+    with Timer() as t:
+        await asyncio.gather(*(one(make) for make in requests))
+    return latencies, t.elapsed, responses
+
+
+def count_errors(responses) -> int:
+    return sum(1 for r in responses if isinstance(r, Exception) or r.status_code >= 500)
+
+
+def seed_volunteers(db, n: int, rnd: random.Random):
+    db.execute(Volunteer.__table__.insert(), [
+        {"full_name": f"Volunteer {i}", "email": f"v{i}@example.com", "phone": "9999999999",
+         "city": "Bengaluru", "id_photo": "0" * 64, "password": "x" * 60, "is_active": True,
+         "is_verified": True, "latitude": 12.8 + rnd.random() * 0.4, "longitude": 77.4 + rnd.random() * 0.4}
+        for i in range(n)
+    ])
+
+
+# ----------------- SOS STORM -----------------
+
+async def sos_storm(scale: float = 1.0):
+    """
+    Guest and logged-in SOS posts at once: create + volunteer matching + commits.
+    """
+    SessionBench = sqlite_sessionmaker()
+    rnd = random.Random(7)
+    db = SessionBench()
+    seed_volunteers(db, int(5000 * scale) or 50, rnd)
+    db.commit()
+    db.close()
+
+    app = build_app(alerts.router, SessionBench=SessionBench)
+    total = max(20, int(600 * scale))
+    async with client_for(app) as client:
+        def post(i):
+            body = {**SOS, "latitude": 12.8 + rnd.random() * 0.4, "longitude": 77.4 + rnd.random() * 0.4}
+            if i % 5 == 0:
+                return lambda: client.post("/alerts/guest", json=body)
+            token = create_access_token({"sub": str(i), "id": i, "role": "user"})
+            return lambda: client.post("/alerts/", json=body, headers={"Authorization": f"Bearer {token}"})
+
+        latencies, elapsed, responses = await drive([post(i) for i in range(total)], concurrency=50)
+    return [result("sos_storm", latencies, elapsed, count_errors(responses))]
+
+
+# ----------------- LOGIN STORM -----------------
+
+async def login_storm(scale: float = 1.0):
+    """
+    Concurrent /auth/login; bcrypt verify dominates.
+    """
+    SessionBench = sqlite_sessionmaker()
+    users = max(10, int(200 * scale))
+    hashed = get_password_hash("correct horse")  # one hash, bcrypt is slow to seed
+    db = SessionBench()
+    db.execute(User.__table__.insert(), [
+        {"full_name": f"User {i}", "email": f"u{i}@example.com", "hashed_password": hashed, "role": "USER"}
+        for i in range(users)
+    ])
+    db.commit()
+    db.close()
+
+    app = build_app(auth.router, SessionBench=SessionBench)
+    async with client_for(app) as client:
+        def login(i):
+            return lambda: client.post("/auth/login", json={"email": f"u{i % users}@example.com", "password": "correct horse"})
+
+        latencies, elapsed, responses = await drive([login(i) for i in range(users)], concurrency=50)
+    failed = sum(1 for r in responses if not isinstance(r, Exception) and r.status_code != 200)
+    return [result("login_storm", latencies, elapsed, count_errors(responses), rejected=failed)]
+
+
+# ----------------- HEATMAP -----------------
+
+def seed_heat(SessionBench, rows: int, chunk: int = 50000):
+    rnd = random.Random(3)
+    db = SessionBench()
+    alerts_rows = rows // 2
+    for start in range(0, alerts_rows, chunk):
+        db.execute(Alert.__table__.insert(), [
+            {"code": "SOS", "emergency_level": "red", "emergency_type": "unsafe", "panic_level": 2,
+             "status": "resolved", "latitude": 8 + rnd.random() * 28, "longitude": 68 + rnd.random() * 29}
+            for _ in range(min(chunk, alerts_rows - start))
+        ])
+    for start in range(0, rows - alerts_rows, chunk):
+        db.execute(Report.__table__.insert(), [
+            {"description": "unsafe", "risk_level": "HIGH",
+             "latitude": 8 + rnd.random() * 28, "longitude": 68 + rnd.random() * 29}
+            for _ in range(min(chunk, rows - alerts_rows - start))
+        ])
+    db.commit()
+    db.close()
+
+
+async def heatmap_sizes(scale: float = 1.0):
+    """
+    GET /heatmap/ over 10k / 100k / 1M points (alerts + reports).
+    """
+    results = []
+    for rows in (10_000, 100_000, 1_000_000):
+        rows = max(1000, int(rows * scale))
+        SessionBench = sqlite_sessionmaker()
+        seed_heat(SessionBench, rows)
+        app = build_app(heatmap.router, SessionBench=SessionBench)
+        requests_count = max(3, min(100, 1_000_000 // rows))
+        async with client_for(app) as client:
+            latencies, elapsed, responses = await drive(
+                [lambda: client.get("/heatmap/") for _ in range(requests_count)], concurrency=4
+            )
+        size = len(responses[0].content) if not isinstance(responses[0], Exception) else 0
+        results.append(result(f"heatmap_{rows}", latencies, elapsed, count_errors(responses), bytes=size))
+        SessionBench.kw["bind"].dispose()
+    return results
+
+
+# ----------------- ACCEPT RACES -----------------
+
+async def accept_races(scale: float = 1.0):
+    """
+    Every assigned volunteer taps "accept" several times at once.
+    Exactly one accept per volunteer should win; extra wins are races.
+    """
+    SessionBench = sqlite_sessionmaker()
+    rnd = random.Random(11)
+    alerts_count, per_alert, taps = max(2, int(10 * scale)), 20, 4
+    db = SessionBench()
+    seed_volunteers(db, per_alert, rnd)
+    db.execute(Alert.__table__.insert(), [
+        {**SOS, "panic_level": 3, "status": "active", "latitude": 12.97, "longitude": 77.59}
+        for _ in range(alerts_count)
+    ])
+    db.execute(AlertVolunteer.__table__.insert(), [
+        {"alert_id": a, "volunteer_id": v, "status": "pending"}
+        for a in range(1, alerts_count + 1) for v in range(1, per_alert + 1)
+    ])
+    db.commit()
+    db.close()
+
+    app = build_app(alerts.router, SessionBench=SessionBench)
+    async with client_for(app) as client:
+        def respond(alert_id, volunteer_id):
+            return lambda: client.post(f"/alerts/{alert_id}/volunteers/respond",
+                                       params={"volunteer_id": volunteer_id, "action": "accept"})
+
+        requests = [respond(a, v) for a in range(1, alerts_count + 1) for v in range(1, per_alert + 1)
+                    for _ in range(taps)]
+        rnd.shuffle(requests)
+        latencies, elapsed, responses = await drive(requests, concurrency=50)
+
+    wins = sum(1 for r in responses if not isinstance(r, Exception) and r.status_code == 200)
+    return [result("accept_races", latencies, elapsed, count_errors(responses),
+                   double_accepts=wins - alerts_count * per_alert)]
+
+
+# ----------------- WEBSOCKET FAN-OUT -----------------
+
+class FakeSocket:
+    """
+    In-memory ASGI websocket peer: connects, then stays open until closed.
+    """
+    def __init__(self, path: str, query_string: bytes = b""):
+        self.scope = {"type": "websocket", "path": path, "raw_path": path.encode(), "query_string": query_string,
+                      "headers": [], "scheme": "ws", "server": ("bench", 80), "client": ("127.0.0.1", 0),
+                      "subprotocols": [], "root_path": "", "app": None}
+        self.accepted = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.received = []
+        self._connected = False
+
+    async def receive(self):
+        if not self._connected:
+            self._connected = True
+            return {"type": "websocket.connect"}
+        await self.closed.wait()
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send(self, message):
+        if message["type"] == "websocket.accept":
+            self.accepted.set()
+        elif message["type"] == "websocket.send":
+            self.received.append(time.perf_counter())
+
+
+async def ws_fanout(scale: float = 1.0, updates: int = 20):
+    """
+    10k volunteer sockets on /ws/volunteer/{id}, each gets LIVE_LOCATION
+    updates sent the way location.update_location sends them.
+    Latency = update start -> that socket's send() call.
+    """
+    app = build_app(socket.router, SessionBench=sqlite_sessionmaker())
+    sockets_count = max(100, int(10_000 * scale))
+    gc.collect()
+    tracemalloc.start()
+
+    sockets = [FakeSocket(f"/ws/volunteer/{i}", f"token={create_access_token({'sub': str(i), 'role': 'volunteer'})}".encode())
+               for i in range(1, sockets_count + 1)]
+    for s in sockets:
+        s.scope["app"] = app
+    tasks = [asyncio.create_task(app(s.scope, s.receive, s.send)) for s in sockets]
+    with Timer() as connect:
+        await asyncio.gather(*(s.accepted.wait() for s in sockets))
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    with Timer() as t:
+        for n in range(updates):
+            start = time.perf_counter()
+            payload = {"type": "LIVE_LOCATION", "latitude": 12.97 + n * 1e-4, "longitude": 77.59}
+            for volunteer_id in range(1, sockets_count + 1):
+                await manager.send_to_volunteer(volunteer_id, payload)
+            latencies += [s.received[-1] - start for s in sockets]
+
+    for s in sockets:
+        s.closed.set()
+    await asyncio.gather(*tasks)
+    return [
+        result("ws_fanout", latencies, t.elapsed,
+               errors=sum(1 for s in sockets if len(s.received) != updates),
+               sockets=sockets_count, connect_s=round(connect.elapsed, 3),
+               kb_per_socket=round(held / 1024 / sockets_count, 2)),
+    ]
+
+
+SCENARIOS = {
+    "sos_storm": sos_storm,
+    "login_storm": login_storm,
+    "heatmap": heatmap_sizes,
+    "accept_races": accept_races,
+    "ws_fanout": ws_fanout,
+}
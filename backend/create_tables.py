@@ -7,12 +7,11 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
 
 # create_tables.py
-from app.models import user, volunteer, alert, report  # apni files ke naam yahan likho
+# Tables + indexes ab migrations se bante hain (see migrate.py)
 from app.core.database import engine
-from app.core.database import Base
+from app.core.migrations import upgrade
 
 print("Creating tables...")
-# Ye line sab tables create kar degi agar exist nahi karti
-Base.metadata.create_all(bind=engine)
+upgrade(engine)
 
 print("All tables created successfully!")
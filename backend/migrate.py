@@ -0,0 +1,16 @@
+import sys
+import os
+
+# Backend folder ko Python path me add karo
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import engine
+from app.core.migrations import upgrade, discover
+from app.core.sharding import region_router
+
+if __name__ == "__main__":
+    applied = upgrade(engine)
+    print(f"{len(applied)} migration(s) applied, {len(discover())} known")
+    if region_router.enabled:
+        region_router.create_tables()
+        print(f"Region shard tables ready on {', '.join(region_router.names)}")
@@ -0,0 +1,62 @@
+import sys
+import os
+
+# Backend folder ko Python path me add karo
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Moves old uploads/volunteer_ids/{uuid}.{ext} files into the
+# content-addressed blob store and points volunteers at the digest.
+# Safe to re-run: rows that already hold a digest are skipped.
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, Base
+from app.models import volunteer, stored_blob
+from app.models.volunteer import Volunteer
+from app.services.blob_store import hash_file, is_digest, place_file, add_ref, staging_dir, CONTENT_TYPES
+from app.services.upload_service import detect_image_type
+
+
+def migrate(upload_dir: str = settings.UPLOAD_DIR, dry_run: bool = False):
+    Base.metadata.create_all(bind=engine, tables=[stored_blob.StoredBlob.__table__])
+    db = SessionLocal()
+    moved = deduped = missing = 0
+    try:
+        volunteers = db.query(Volunteer).filter(Volunteer.id_photo.isnot(None)).all()
+        for v in volunteers:
+            if is_digest(v.id_photo):
+                continue
+            if not os.path.exists(v.id_photo):
+                print("Missing file for volunteer", v.id, v.id_photo)
+                missing += 1
+                continue
+
+            with open(v.id_photo, "rb") as f:
+                ext = detect_image_type(f.read(16))
+            content_type = CONTENT_TYPES.get(ext, "application/octet-stream")
+            digest = hash_file(v.id_photo)
+            size = os.path.getsize(v.id_photo)
+
+            if dry_run:
+                print(f"{v.id_photo} -> {digest}")
+                continue
+
+            # Copy through staging so the move into the store is a rename
+            staged = os.path.join(staging_dir(), digest)
+            os.replace(v.id_photo, staged)
+            if place_file(staged, digest):
+                moved += 1
+            else:
+                deduped += 1
+            add_ref(db, digest, size, content_type)
+            v.id_photo = digest
+            db.commit()
+
+        leftovers = os.listdir(upload_dir) if os.path.isdir(upload_dir) else []
+        print(f"Moved {moved}, deduplicated {deduped}, missing {missing}")
+        if leftovers:
+            print(f"{len(leftovers)} unreferenced files left in {upload_dir}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate(dry_run="--dry-run" in sys.argv)
@@ -0,0 +1,33 @@
+import sys
+import os
+
+# Backend folder ko Python path me add karo
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Gives an existing user a staff role (ADMIN / ANALYST) or takes it back (USER).
+# Staff accounts get a "staff" claim on their next login.
+# Usage: python promote_user.py <email> [ADMIN|ANALYST|USER]
+from app.core.database import SessionLocal
+from app.core.security import STAFF_ROLES
+from app.models.user import User
+
+
+def promote(email: str, role: str = "ADMIN"):
+    if role not in STAFF_ROLES and role != "USER":
+        raise SystemExit(f"Unknown role {role}, use one of ADMIN, ANALYST, USER")
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+        if not user:
+            raise SystemExit(f"No user with email {email}")
+        user.role = role
+        db.commit()
+        print(f"{email} is now {role}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        raise SystemExit("Usage: python promote_user.py <email> [ADMIN|ANALYST|USER]")
+    promote(sys.argv[1], sys.argv[2].upper() if len(sys.argv) > 2 else "ADMIN")
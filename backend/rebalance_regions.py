@@ -0,0 +1,41 @@
+import sys
+import os
+
+# Backend folder ko Python path me add karo
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Region shards (REGION_SHARDS / REGION_MAP, see app/core/sharding.py).
+#   python rebalance_regions.py           move rows whose prefix now maps to another shard
+#   python rebalance_regions.py --dry-run only count what would move
+#   python rebalance_regions.py --sync    rebuild every shard from the primary
+# To split a busy region: add the new shard and its longer prefixes to
+# REGION_MAP, run migrate.py (creates the shard tables), then this.
+from app.core.database import SessionLocal
+from app.core.sharding import region_router
+from app.services.region_service import rebalance, sync_from_primary
+
+
+def main(argv):
+    if not region_router.enabled:
+        print("REGION_SHARDS is not set, nothing to do")
+        return
+    region_router.create_tables()
+    if "--sync" in argv:
+        db = SessionLocal()
+        try:
+            counts = sync_from_primary(db)
+        finally:
+            db.close()
+        for (shard, table), rows in sorted(counts.items()):
+            print(f"{shard:<12} {table:<20} {rows}")
+        return
+
+    dry_run = "--dry-run" in argv
+    moved = rebalance(dry_run=dry_run)
+    for (source, target), rows in sorted(moved.items()):
+        print(f"{source} -> {target}: {rows}{' (dry run)' if dry_run else ''}")
+    print(f"{sum(moved.values())} row(s) {'to move' if dry_run else 'moved'}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
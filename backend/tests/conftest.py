@@ -0,0 +1,76 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base, get_db, get_read_db, get_session_factory
+from app.core.security import create_access_token
+from app.models import user, volunteer, alert, alert_volunteer, report, live_location, trusted_contacts, stored_blob, area_subscription, outbox_message, alert_track, analytics_aggregate
+from app.services.subscription_service import index as subscription_index
+
+
+@pytest.fixture(autouse=True, scope="session")
+def geocoder_cache(tmp_path_factory):
+    # the KD-tree cache file goes to a temp dir, not the working directory
+    settings.GEOCODER_CACHE_DIR = str(tmp_path_factory.mktemp("geocoder"))
+
+
+@pytest.fixture(autouse=True)
+def fresh_subscription_index():
+    # the index is per process and each test gets a new database
+    subscription_index.reset()
+
+
+@pytest.fixture
+def admin_headers():
+    """
+    Bearer header for an admin account (listings and exports need one).
+    """
+    token = create_access_token({"sub": "1", "role": "user", "staff": "admin"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def SessionTest(db_engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+
+@pytest.fixture
+def make_client(SessionTest):
+    """
+    Builds a small app with only the routers under test,
+    backed by a throwaway SQLite database.
+    """
+    def _make(*routers, middlewares=()):
+        app = FastAPI()
+        for router in routers:
+            app.include_router(router)
+        for middleware, options in middlewares:
+            app.add_middleware(middleware, **options)
+
+        def override_get_db():
+            db = SessionTest()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        async def override_session_factory():
+            return SessionTest
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        app.dependency_overrides[get_session_factory] = override_session_factory
+        return TestClient(app)
+
+    return _make
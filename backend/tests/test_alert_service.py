@@ -0,0 +1,26 @@
+from app.models.alert_volunteer import AlertVolunteer
+from app.models.volunteer import Volunteer
+from app.services.alert_service import create_alert
+
+
+def add_volunteer(db, name, lat, lng, verified=True):
+    v = Volunteer(full_name=name, email=f"{name}@example.com", password="x",
+                  is_verified=verified, latitude=lat, longitude=lng)
+    db.add(v)
+    return v
+
+
+def test_red_alert_assigns_nearest_verified_volunteers(SessionTest):
+    db = SessionTest()
+    near = [add_volunteer(db, f"near{i}", 12.97 + i * 0.01, 77.59) for i in range(4)]
+    add_volunteer(db, "unverified", 12.97, 77.59, verified=False)
+    add_volunteer(db, "no_location", None, None)
+    add_volunteer(db, "far", 13.9, 77.59)  # ~100 km away
+    db.commit()
+
+    alert = create_alert(db, user_id=None, code="SOS", emergency_level="red", emergency_type="unsafe",
+                         latitude=12.97, longitude=77.59)
+
+    assigned = [vid for (vid,) in db.query(AlertVolunteer.volunteer_id).filter(AlertVolunteer.alert_id == alert.id)]
+    assert sorted(assigned) == sorted(v.id for v in near[:3])
+    db.close()
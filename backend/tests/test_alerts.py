@@ -1,13 +1,29 @@
 import pytest
 from fastapi.testclient import TestClient
+from app.core.database import get_db
 from app.main import app
 
-client = TestClient(app)
 
-def test_guest_alert():
+@pytest.fixture
+def client(SessionTest):
+    def override_get_db():
+        db = SessionTest()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_guest_alert(client):
     response = client.post("/alerts/guest", json={
         "code": "SOS",
         "message": "Test emergency",
+        "emergency_level": "red",
+        "emergency_type": "unsafe",
         "latitude": 12.9716,
         "longitude": 77.5946
     })
@@ -0,0 +1,110 @@
+import random
+from datetime import datetime, timedelta
+
+from app.api.routes import alerts, analytics, volunteers
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.alert import Alert
+from app.models.analytics_aggregate import AnalyticsAggregate
+from app.models.alert_volunteer import AlertVolunteer
+from app.services import analytics_service
+from app.services.geocoder import read_dataset
+from app.utils import geohash
+from app.utils.sketch import DDSketch
+
+HEADERS = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'role': 'user'})}"}
+ANALYST = {"Authorization": f"Bearer {create_access_token({'sub': '2', 'role': 'user', 'staff': 'analyst'})}"}
+
+
+def volunteer_headers(volunteer_id):
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(volunteer_id), 'role': 'volunteer'})}"}
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rnd = random.Random(7)
+    values = [rnd.lognormvariate(4, 1.2) for _ in range(20000)]
+    sketch, other = DDSketch(), DDSketch()
+    for i, v in enumerate(values):
+        (sketch if i % 2 else other).add(v)
+    sketch.merge(DDSketch.from_dict(other.to_dict()))
+
+    values.sort()
+    for q in (0.1, 0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact
+    assert sketch.count == 20000
+    assert DDSketch().summary()["p50"] is None
+
+
+def test_transitions_update_aggregates(make_client, SessionTest):
+    created = datetime.utcnow() - timedelta(minutes=10)
+    db = SessionTest()
+    db.add(Alert(id=1, code="SOS", emergency_level="red", emergency_type="unsafe", status="active",
+                 latitude=12.97, longitude=77.59, created_at=created))
+    for volunteer_id in (11, 12, 13):
+        db.add(AlertVolunteer(alert_id=1, volunteer_id=volunteer_id, status="pending",
+                              accepted_at=created + timedelta(minutes=1)))
+    db.commit()
+    db.close()
+
+    with make_client(alerts.router, volunteers.router, analytics.router) as client:
+        assert client.post("/volunteers/alerts/1/accept", headers=volunteer_headers(11)).status_code == 200
+        assert client.post("/alerts/1/volunteers/respond?volunteer_id=12&action=accept").status_code == 200
+        assert client.post("/volunteers/alerts/1/reject", headers=volunteer_headers(13)).status_code == 200
+        assert client.post("/volunteers/alerts/1/reject", headers=volunteer_headers(13)).status_code == 400
+        assert client.post("/alerts/1/resolve").status_code == 200
+
+        overall = client.get("/analytics/response-times", headers=HEADERS).json()
+        # only the first accept counts towards time to first accept
+        assert overall["time_to_first_accept"]["count"] == 1
+        assert abs(overall["time_to_first_accept"]["p50"] - 600) < 600 * 0.01 + 5
+        assert overall["resolution_time"]["count"] == 1
+
+        cell = geohash.encode(12.97, 77.59, 5)
+        for precision in (4, 5):
+            by_cell = client.get(f"/analytics/cells/{cell[:precision]}", headers=HEADERS).json()
+            assert by_cell["time_to_first_accept"]["count"] == 1
+            assert by_cell["resolution_time"]["count"] == 1
+        elsewhere = client.get("/analytics/cells/ttnf", headers=HEADERS).json()
+        assert elsewhere["resolution_time"]["count"] == 0
+        assert client.get("/analytics/cells/tdr1v9q", headers=HEADERS).status_code == 400
+
+        assert client.get("/analytics/volunteers/11", headers=HEADERS).status_code == 403
+        accepted = client.get("/analytics/volunteers/11", headers=ANALYST).json()
+        assert accepted["acceptance_rate"] == 1.0
+        assert abs(accepted["response_seconds"]["p50"] - 540) < 540 * 0.01 + 5
+        rejected = client.get("/analytics/volunteers/13", headers=ANALYST).json()
+        assert (rejected["accepted"], rejected["rejected"], rejected["acceptance_rate"]) == (0, 1, 0.0)
+        assert client.get("/analytics/volunteers/99", headers=ANALYST).json()["acceptance_rate"] is None
+        assert client.get("/analytics/response-times").status_code in (401, 403)
+
+
+def test_every_region_scope_fits_the_column():
+    cities, _ = read_dataset(settings.GEOCODER_DATASET)
+    length = AnalyticsAggregate.__table__.c.scope.type.length
+    for city in cities:
+        alert = Alert(latitude=city.lat, longitude=city.lng, region_id=city.region_id)
+        assert all(len(scope) <= length for scope in analytics_service.alert_scopes(alert)), city.region_id
+
+
+def test_only_one_of_two_racing_responses_is_recorded(SessionTest):
+    db = SessionTest()
+    db.add(Alert(id=1, code="SOS", emergency_level="red", emergency_type="unsafe", status="active",
+                 latitude=12.97, longitude=77.59, created_at=datetime.utcnow()))
+    db.add(AlertVolunteer(id=1, alert_id=1, volunteer_id=11, status="pending", accepted_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+
+    # both requests read the assignment while it was still pending
+    first, second = SessionTest(), SessionTest()
+    first_av, second_av = first.get(AlertVolunteer, 1), second.get(AlertVolunteer, 1)
+    assert analytics_service.set_response(first, first_av, "accepted")
+    first.commit()
+    assert not analytics_service.set_response(second, second_av, "rejected")
+    second.rollback()
+
+    summary = analytics_service.volunteer_summary(first, 11)
+    assert (summary["accepted"], summary["rejected"]) == (1, 0)
+    assert first.get(AlertVolunteer, 1).status == "accepted"
+    first.close()
+    second.close()
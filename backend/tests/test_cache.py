@@ -0,0 +1,121 @@
+import threading
+import time
+
+from fastapi import APIRouter, Request
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import heatmap, users
+from app.core import cache
+from app.core.cache import ResponseCache, cached
+from app.core.database import Base, get_read_db
+from app.core.security import create_access_token
+from app.models.user import User
+from app.services.report_service import create_report
+
+
+def cached_client(make_client, *routers, **options):
+    client = make_client(*routers)
+    client.app.state.response_cache = ResponseCache(**options)
+    return client
+
+
+def test_heatmap_is_cached_until_a_report_is_written(make_client, SessionTest, monkeypatch):
+    calls = []
+    real = heatmap.get_heatmap_rows
+    monkeypatch.setattr(heatmap, "get_heatmap_rows", lambda *a: calls.append(1) or real(*a))
+    client = cached_client(make_client, heatmap.router)
+
+    first = client.get("/heatmap/")
+    assert first.json() == [] and first.headers["cache-control"] == "no-cache"
+    etag = first.headers["etag"]
+    assert client.get("/heatmap/").headers["etag"] == etag
+    assert client.get("/heatmap/", headers={"If-None-Match": etag}).status_code == 304
+    assert len(calls) == 1
+
+    db = SessionTest()
+    create_report(db, None, "danger near the station", 12.97, 77.59)
+    db.close()
+
+    fresh = client.get("/heatmap/", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["etag"] != etag
+    assert fresh.json() == [{"lat": 12.97, "lon": 77.59, "level": "HIGH"}]
+    assert len(calls) == 2
+    # another query string is another entry
+    client.get("/heatmap/?lat=12.97&lng=77.59&radius_km=5")
+    assert len(calls) == 3
+
+
+def test_users_me_is_per_user_and_dropped_by_tag(make_client, SessionTest):
+    db = SessionTest()
+    db.add_all([User(full_name="A", email="a@example.com", hashed_password="x", role="USER"),
+                User(full_name="B", email="b@example.com", hashed_password="x", role="USER")])
+    db.commit()
+    client = cached_client(make_client, users.router)
+
+    def me(user_id, role="user"):
+        token = create_access_token({"sub": str(user_id), "role": role})
+        return client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert me(1).json()["full_name"] == "A" and me(2).json()["full_name"] == "B"
+    assert me(1).headers["cache-control"] == "private, no-cache"
+    assert me(1, role="volunteer").status_code == 404
+
+    db.query(User).filter(User.id == 1).update({"full_name": "A2"})
+    db.commit()
+    db.close()
+    assert me(1).json()["full_name"] == "A"  # until the write path invalidates
+    cache.invalidate("user:1")
+    assert me(1).json()["full_name"] == "A2"
+
+
+def test_concurrent_misses_build_once_and_entries_expire(make_client):
+    builds = []
+    gate = threading.Event()
+    router = APIRouter()
+
+    @router.get("/slow")
+    @cached(tags=("slow",), ttl=0.2)
+    def slow(request: Request):
+        builds.append(1)
+        gate.wait(5)
+        return {"builds": len(builds)}
+
+    client = cached_client(make_client, router)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get("/slow").json())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(builds) == 1 and results == [{"builds": 1}] * 8
+
+    time.sleep(0.25)
+    assert client.get("/slow").json() == {"builds": 2}
+
+
+def test_lru_keeps_the_most_recently_used_entries():
+    lru = ResponseCache(max_entries=2, ttl=60)
+    entry = cache.Entry(200, b"{}", "application/json", {}, '"0-x"')
+    lru.set("a", entry)
+    lru.set("b", entry)
+    lru.get("a")
+    lru.set("c", entry)
+    assert list(lru.local) == ["a", "c"]
+
+
+def test_cached_misses_are_built_from_the_primary(make_client, SessionTest, tmp_path):
+    # a replica that never caught up
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(replica)
+    db = SessionTest()
+    create_report(db, None, "danger near the station", 12.97, 77.59)
+    db.close()
+
+    client = make_client(heatmap.router)
+    client.app.dependency_overrides[get_read_db] = lambda: sessionmaker(bind=replica)()
+    assert client.get("/heatmap/").json() == []  # no cache: the replica, as before
+    client.app.state.response_cache = ResponseCache()
+    assert len(client.get("/heatmap/").json()) == 1
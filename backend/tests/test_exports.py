@@ -0,0 +1,98 @@
+import csv
+import io
+from datetime import datetime
+
+import pytest
+
+from app.api.routes import exports
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.alert import Alert
+from app.models.report import Report
+from app.services import export_service
+
+HEADERS = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'role': 'user', 'staff': 'analyst'})}"}
+
+
+def seed(SessionTest):
+    db = SessionTest()
+    for i, (level, lat, day) in enumerate([("red", 12.97, 1), ("green", 12.98, 2), ("red", 28.61, 3),
+                                           ("red", 12.99, 4)], start=1):
+        db.add(Alert(id=i, code="SOS", emergency_level=level, emergency_type="unsafe", status="active",
+                     latitude=lat, longitude=77.59, created_at=datetime(2026, 5, day)))
+    db.add(Report(description="dark lane", risk_level="HIGH", latitude=12.97, longitude=77.59,
+                  created_at=datetime(2026, 5, 2)))
+    db.add(Report(description="newer report", risk_level="HIGH", latitude=12.97, longitude=77.59))
+    db.commit()
+    db.close()
+
+
+def rows(response):
+    return list(csv.DictReader(io.StringIO(response.text)))
+
+
+def test_export_streams_filtered_rows(make_client, SessionTest, monkeypatch):
+    seed(SessionTest)
+    monkeypatch.setattr(export_service, "pyarrow", None)  # CSV fallback
+    with make_client(exports.router) as client:
+        response = client.get("/exports/alerts?format=parquet&level=red&bbox=12.9,77.5,13.1,77.7"
+                              "&since=2026-05-01T00:00:00&until=2026-05-04T00:00:00", headers=HEADERS)
+        assert response.status_code == 200
+        assert response.headers["x-export-format"] == "csv"
+        assert response.headers["content-disposition"].endswith('.csv"')
+        assert [r["id"] for r in rows(response)] == ["1"]
+
+        everything = rows(client.get("/exports/alerts", headers=HEADERS))
+        assert [r["id"] for r in everything] == ["1", "2", "3", "4"]
+        assert everything[0]["created_at"] == "2026-05-01 00:00:00"
+
+        reports = rows(client.get("/exports/reports?since=2026-05-01T00:00:00&until=2026-06-01T00:00:00", headers=HEADERS))
+        assert [r["description"] for r in reports] == ["dark lane"]
+        empty = client.get("/exports/reports?level=LOW", headers=HEADERS)
+        assert empty.text.strip() == "id,description,risk_level,latitude,longitude,user_id,created_at"
+
+        assert client.get("/exports/users", headers=HEADERS).status_code == 404
+        assert client.get("/exports/alerts?bbox=1,2,3", headers=HEADERS).status_code == 400
+        assert client.get("/exports/alerts?format=xlsx", headers=HEADERS).status_code == 400
+        assert client.get("/exports/alerts").status_code in (401, 403)
+        plain = {"Authorization": f"Bearer {create_access_token({'sub': '2', 'role': 'user'})}"}
+        assert client.get("/exports/alerts", headers=plain).status_code == 403
+
+
+def test_export_job_writes_file(make_client, SessionTest, monkeypatch, tmp_path):
+    seed(SessionTest)
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path / "exports"))
+    monkeypatch.setattr(export_service, "pyarrow", None)
+    with make_client(exports.router) as client:
+        job = client.post("/exports/alerts?level=red", headers=HEADERS).json()
+        again = client.post("/exports/alerts?level=red", headers=HEADERS).json()
+    assert job["path"] != again["path"]
+    assert job["format"] == "csv" and job["rows"] == 3 and job["rows_per_second"] > 0
+    with open(job["path"]) as f:
+        assert len(list(csv.DictReader(f))) == 3
+    assert sorted(p.name for p in (tmp_path / "exports").iterdir()) == sorted(
+        j["path"].rsplit("/", 1)[-1] for j in (job, again))
+
+
+def test_failed_export_job_leaves_no_part_file(db_engine, monkeypatch, tmp_path):
+    def broken(*args, **kwargs):
+        yield b"id,code\n"
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(export_service, "iter_export", broken)
+    with pytest.raises(RuntimeError):
+        export_service.run_export(db_engine, "alerts", "csv", export_service.ExportFilters(),
+                                  str(tmp_path / "exports"))
+    assert list((tmp_path / "exports").iterdir()) == []
+
+
+def test_parquet_round_trip(SessionTest):
+    pq = pytest.importorskip("pyarrow.parquet")
+    seed(SessionTest)
+    db = SessionTest()
+    data = b"".join(export_service.iter_export(db.get_bind(), "alerts", "parquet",
+                                               export_service.ExportFilters(level="red"), chunk_size=2))
+    db.close()
+    table = pq.read_table(io.BytesIO(data))
+    assert table.column("id").to_pylist() == [1, 3, 4]
+    assert pq.ParquetFile(io.BytesIO(data)).num_row_groups == 2
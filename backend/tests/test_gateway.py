@@ -0,0 +1,82 @@
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.routes import socket
+from app.core.gateway import gateway
+from app.core.security import create_access_token
+from app.core.socket_manager import manager
+from app.models.alert import Alert
+from app.models.alert_volunteer import AlertVolunteer
+from app.utils import geohash
+
+
+def token(role, sub):
+    return create_access_token({"sub": str(sub), "role": role})
+
+
+def test_geohash_matches_reference_cells():
+    assert geohash.encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    lat, lng = geohash.decode("tdr1w")
+    assert geohash.encode(lat, lng, 5) == "tdr1w"
+    assert len(geohash.neighbors("tdr1w")) == 8
+
+
+def test_gateway_multiplexes_topics_with_handshake_auth(make_client, SessionTest):
+    db = SessionTest()
+    db.add(Alert(id=1, user_id=10, code="SOS", emergency_level="red", emergency_type="unsafe",
+                 status="active", latitude=12.97, longitude=77.59))
+    db.add(AlertVolunteer(alert_id=1, volunteer_id=7, status="accept"))
+    db.commit()
+    db.close()
+
+    with make_client(socket.router) as client:
+        with pytest.raises(WebSocketDisconnect) as refused:
+            with client.websocket_connect("/ws?token=garbage"):
+                pass
+        assert refused.value.code == 4401
+
+        with client.websocket_connect(f"/ws?token={token('user', 10)}") as owner, \
+                client.websocket_connect(f"/ws?token={token('volunteer', 7)}") as volunteer, \
+                client.websocket_connect(f"/ws?token={token('user', 99)}") as stranger, \
+                client.websocket_connect(f"/ws/volunteer/7?token={token('volunteer', 7)}") as legacy:
+            owner.send_json({"op": "subscribe", "topic": "alert:1"})
+            assert owner.receive_json() == {"op": "subscribed", "topic": "alert:1"}
+            volunteer.send_json({"op": "subscribe", "topic": "alert:1"})
+            assert volunteer.receive_json()["op"] == "subscribed"
+            stranger.send_json({"op": "subscribe", "topic": "alert:1"})
+            assert stranger.receive_json()["op"] == "error"
+            stranger.send_json({"op": "subscribe", "topic": "volunteer:7"})
+            assert stranger.receive_json()["op"] == "error"
+
+            # owner's location goes to the alert's watchers, not back to the owner
+            owner.send_json({"op": "location", "alert_id": 1, "latitude": 12.971, "longitude": 77.591})
+            update = volunteer.receive_json()
+            assert update["topic"] == "alert:1"
+            assert update["data"]["latitude"] == 12.971
+            assert len(gateway.subscribers("alert:1")) == 2
+
+            # the legacy API reaches the volunteer on both transports
+            client.portal.call(manager.send_to_volunteer, 7, {"type": "NEW_ALERT", "alert_id": 1})
+            assert volunteer.receive_json() == {"topic": "volunteer:7", "data": {"type": "NEW_ALERT", "alert_id": 1}}
+            assert legacy.receive_json() == {"type": "NEW_ALERT", "alert_id": 1}
+
+    # disconnects clean every topic set
+    assert "alert:1" not in gateway.topics
+    assert "volunteer:7" not in gateway.topics
+
+
+def test_legacy_sockets_need_the_path_owners_token(make_client):
+    with make_client(socket.router) as client:
+        for path in ("/ws/volunteer/7",
+                     "/ws/volunteer/7?token=garbage",
+                     f"/ws/volunteer/7?token={token('volunteer', 8)}",
+                     f"/ws/volunteer/7?token={token('user', 7)}",
+                     f"/ws/user/3?token={token('volunteer', 3)}"):
+            with pytest.raises(WebSocketDisconnect) as refused:
+                with client.websocket_connect(path):
+                    pass
+            assert refused.value.code == 4401
+        assert not gateway.subscribers("volunteer:7")
+
+        with client.websocket_connect(f"/ws/user/3?token={token('user', 3)}"):
+            assert len(gateway.subscribers("user:3")) == 1
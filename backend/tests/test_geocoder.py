@@ -0,0 +1,82 @@
+import os
+import random
+
+import backfill_regions
+from app.api.routes import alerts
+from app.core.config import settings
+from app.models.alert import Alert
+from app.models.report import Report
+from app.models.volunteer import Volunteer
+from app.services import geocoder
+from app.services.alert_service import create_alert
+from app.services.geocoder import ReverseGeocoder
+from app.utils.geo import haversine
+
+SOS = {"code": "SOS", "emergency_level": "green", "emergency_type": "unsafe"}
+
+
+def test_kdtree_matches_brute_force(tmp_path):
+    coder = ReverseGeocoder(settings.GEOCODER_DATASET, str(tmp_path), max_km=50)
+    rnd = random.Random(48)
+    for _ in range(2000):
+        lat, lng = rnd.uniform(8, 32), rnd.uniform(68, 92)
+        distance, city = min((haversine(lat, lng, c.lat, c.lng), c) for c in coder.cities)
+        found = coder.nearest(lat, lng)
+        if distance > 50.01:
+            assert found is None
+        else:
+            assert found[0] == city and abs(found[1] - distance) < 0.01
+
+    assert coder.region_for_point(12.93, 77.62) == "IN-KA.bengaluru"
+    assert coder.region_for_point(20.0, 60.0) is None  # Arabian Sea
+    assert coder.region_for_city("Bangalore") == "IN-KA.bengaluru"
+    assert coder.region_for_city(" new  DELHI ") == "IN-DL.delhi"
+    assert coder.region_for_city("Gurgaon, Haryana") == "IN-HR.gurugram"
+    assert coder.region_for_city("Atlantis") is None
+
+    # the tree file is reused while the dataset is unchanged, rebuilt when it changes
+    tree = os.path.join(tmp_path, "in_cities.kdtree")
+    built_at = os.stat(tree).st_mtime_ns
+    ReverseGeocoder(settings.GEOCODER_DATASET, str(tmp_path), max_km=50)
+    assert os.stat(tree).st_mtime_ns == built_at
+    dataset = tmp_path / "cities.csv"
+    dataset.write_text("city,state,lat,lng,aliases\nLeh,LA,34.1526,77.5771,\n")
+    assert ReverseGeocoder(str(dataset), str(tmp_path), 50).region_for_point(12.97, 77.59) is None
+    dataset.write_text("city,state,lat,lng,aliases\nLeh,LA,34.1526,77.5771,\nBengaluru,KA,12.9716,77.5946,\n")
+    assert ReverseGeocoder(str(dataset), str(tmp_path), 50).region_for_point(12.97, 77.59) == "IN-KA.bengaluru"
+
+
+def test_rows_tagged_on_write_and_backfilled(make_client, SessionTest, admin_headers):
+    db = SessionTest()
+    alert = create_alert(db, user_id=None, **SOS, latitude=12.95, longitude=77.60)
+    assert alert.region_id == "IN-KA.bengaluru"
+    volunteer = Volunteer(full_name="v", email="v@example.com", password="x", city="Bombay")
+    db.add(volunteer)
+    db.commit()
+    assert volunteer.region_id == "IN-MH.mumbai"
+    volunteer.latitude, volunteer.longitude = 18.52, 73.86  # moved to Pune
+    db.commit()
+    assert volunteer.region_id == "IN-MH.pune"
+
+    # rows written around the ORM (bulk loads, old data) have no region until backfilled
+    db.execute(Alert.__table__.insert(), [
+        {**SOS, "status": "active", "latitude": 28.62, "longitude": 77.21},
+        {**SOS, "status": "active", "latitude": 12.30, "longitude": 76.65},
+        {**SOS, "status": "active", "latitude": 20.0, "longitude": 60.0},
+    ])
+    db.execute(Report.__table__.insert(), [{"description": "x", "risk_level": "LOW", "latitude": 22.57,
+                                            "longitude": 88.36}])
+    db.commit()
+    assert backfill_regions.backfill(db, Alert, (Alert.latitude, Alert.longitude), geocoder.region_for_point,
+                                     batch_size=2) == 2
+    assert backfill_regions.backfill(db, Report, (Report.latitude, Report.longitude),
+                                     geocoder.region_for_point) == 1
+    assert [r for r, in db.query(Alert.region_id).order_by(Alert.id)] == \
+        ["IN-KA.bengaluru", "IN-DL.delhi", "IN-KA.mysuru", None]
+    db.close()
+
+    with make_client(alerts.router) as client:
+        state = client.get("/alerts/?region=IN-KA&sort=id", headers=admin_headers).json()["items"]
+        assert [a["region_id"] for a in state] == ["IN-KA.bengaluru", "IN-KA.mysuru"]
+        city = client.get("/alerts/?region=IN-DL.delhi", headers=admin_headers).json()["items"]
+        assert len(city) == 1
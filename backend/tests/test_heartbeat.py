@@ -0,0 +1,79 @@
+import asyncio
+
+from app.api.routes import socket, volunteers
+from app.core.gateway import Gateway, WebSocketConnection, gateway, volunteer_topic
+from app.core.security import create_access_token
+from app.utils.timing_wheel import TimingWheel
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_timing_wheel_only_pops_due_items():
+    clock = Clock()
+    wheel = TimingWheel(tick=1.0, slots=16, clock=clock)
+    for i in range(100):
+        wheel.schedule(i, 5 if i < 10 else 10)
+    wheel.schedule(3, 10)  # re-armed before it fired
+
+    clock.now += 6
+    assert sorted(wheel.advance()) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    assert wheel.advance() == []
+    clock.now += 60  # a stall longer than the wheel still drains everything
+    assert len(wheel.advance()) == 91 and len(wheel) == 0
+
+
+def test_silent_connections_are_pinged_then_reaped():
+    clock = Clock()
+    hub = Gateway(ping_interval=10, ping_timeout=30)
+    hub.wheel = TimingWheel(1.0, 40, clock=clock)
+    quiet, chatty = RecordingSocket(), RecordingSocket()
+    quiet_conn = hub.register(WebSocketConnection(quiet, "gateway", {"sub": "1", "role": "volunteer"}),
+                              [volunteer_topic(1)])
+    chatty_conn = hub.register(WebSocketConnection(chatty, "volunteer", envelope=False), [volunteer_topic(2)])
+
+    clock.now += 11
+    assert asyncio.run(hub.sweep()) == 0
+    assert quiet.sent == ['{"op":"ping"}'] and chatty.sent == ['{"type":"PING"}']
+
+    hub.touch(chatty_conn)  # chatty answers, quiet doesn't
+    clock.now += 22
+    assert asyncio.run(hub.sweep()) == 1
+    assert quiet.closed and quiet_conn.id not in hub.connections
+    assert volunteer_topic(1) not in hub.topics
+    assert list(hub.presence("volunteer")) == ["2"]
+
+
+def test_reconnect_replaces_socket_and_presence(make_client):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'role': 'user'})}"}
+    volunteer = f"/ws/volunteer/7?token={create_access_token({'sub': '7', 'role': 'volunteer'})}"
+    with make_client(socket.router, volunteers.router) as client:
+        with client.websocket_connect(volunteer) as first:
+            with client.websocket_connect(volunteer) as second:
+                # the first socket is closed by the server, not leaked
+                assert first.receive()["type"] == "websocket.close"
+                assert len(gateway.subscribers(volunteer_topic(7))) == 1
+
+                online = client.get("/volunteers/online", headers=headers).json()
+                assert online["count"] == 1 and online["volunteers"][0]["id"] == 7
+                assert client.get("/volunteers/online?ids=7,8", headers=headers).json()["count"] == 1
+
+                second.send_text("hello")
+        assert client.get("/volunteers/online", headers=headers).json()["count"] == 0
@@ -0,0 +1,96 @@
+import re
+
+from app.core.config import settings
+
+from app.api.routes import alerts, metrics
+from app.core.metrics import instrument_queries, Counter, Histogram
+from app.middlewares.metrics_middleware import MetricsMiddleware
+
+
+def sample(text, name, **labels):
+    label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    match = re.search(rf"^{re.escape(name)}\{{{re.escape(label_text)}[,}}].* (\S+)$", text, re.M)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_requests_and_queries_show_up_in_prometheus_output(make_client, db_engine, admin_headers):
+    instrument_queries(db_engine, "test")
+    client = make_client(alerts.router, metrics.router, middlewares=[(MetricsMiddleware, {})])
+
+    before = client.get("/metrics").text
+    for _ in range(3):
+        assert client.get("/alerts/", headers=admin_headers).status_code == 200
+    after = client.get("/metrics").text
+
+    # Route template is the label, not the raw URL
+    route = dict(method="GET", route="/alerts/", status="200")
+    assert sample(after, "http_requests_total", **route) - sample(before, "http_requests_total", **route) == 3
+    assert sample(after, "http_request_db_queries_count", route="/alerts/") >= 3
+    assert sample(after, "db_queries_total", engine="test") >= 3
+    assert "db_pool_in_use" in after
+
+
+def test_counters_merge_across_threads():
+    import threading
+
+    hits = Counter("test_hits_total", "test")
+    latency = Histogram("test_latency_seconds", "test", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            hits.inc("a")
+            latency.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert hits.values() == {("a",): 4000}
+    buckets = {labels["le"]: value for name, labels, value in latency.samples() if name.endswith("_bucket")}
+    assert buckets == {"0.1": 0, "1.0": 4000, "+Inf": 4000}
+
+
+def test_cells_of_exited_threads_are_folded_away():
+    import threading
+
+    hits = Counter("test_churn_total", "test")
+    latency = Histogram("test_churn_seconds", "test", buckets=(0.1, 1.0))
+
+    def work():
+        hits.inc("a")
+        latency.observe(0.05)
+
+    # threadpool workers come and go; each one leaves its counts behind, not its cells
+    for _ in range(50):
+        t = threading.Thread(target=work)
+        t.start()
+        t.join()
+
+    assert hits.values() == {("a",): 50}
+    buckets = {labels["le"]: value for name, labels, value in latency.samples() if name.endswith("_bucket")}
+    assert buckets == {"0.1": 50, "1.0": 50, "+Inf": 50}
+    assert len(hits._cells._threads) <= 1 and len(latency._cells._threads) <= 1
+
+
+def test_failed_statements_leave_no_start_time_behind(db_engine):
+    import pytest
+    from sqlalchemy.exc import OperationalError
+
+    instrument_queries(db_engine, "test")
+    with db_engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+        conn.exec_driver_sql("SELECT 1")
+        assert conn.info["query_start"] == {}
+
+
+def test_pool_details_need_the_debug_token(make_client, monkeypatch):
+    client = make_client(metrics.router)
+    assert client.get("/metrics/pool").status_code == 404
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", "s3cret")
+    assert client.get("/metrics/pool", headers={"X-Debug-Token": "nope"}).status_code == 403
+    response = client.get("/metrics/pool", headers={"X-Debug-Token": "s3cret"})
+    assert response.status_code == 200 and "in_use" in response.json()["primary"]
@@ -0,0 +1,24 @@
+from sqlalchemy import create_engine, inspect
+
+from app.core.database import Base
+from app.models import user, volunteer, alert, alert_volunteer, report, live_location, trusted_contacts, stored_blob, area_subscription, outbox_message, alert_track, analytics_aggregate
+from app.core.migrations import upgrade
+
+
+def schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: ({col["name"] for col in inspector.get_columns(table)},
+                {ix["name"] for ix in inspector.get_indexes(table)})
+        for table in inspector.get_table_names() if table != "schema_migrations"
+    }
+
+
+def test_migrations_build_the_same_schema_as_the_models(tmp_path):
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    modelled = create_engine(f"sqlite:///{tmp_path / 'modelled.db'}")
+    upgrade(migrated)
+    Base.metadata.create_all(modelled)
+
+    assert schema(migrated) == schema(modelled)
+    assert upgrade(migrated) == []
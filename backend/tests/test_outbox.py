@@ -0,0 +1,178 @@
+import asyncio
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.models.alert import Alert
+from app.models.outbox_message import OutboxMessage
+from app.models.trusted_contacts import TrustedContact
+from app.models.volunteer import Volunteer
+from app.services import alert_service
+from app.services.alert_service import create_alert
+from app.services.channels import ChannelAdapter, DeliveryError, EmailAdapter, HttpAdapter
+from app.services.outbox import OutboxRelay
+
+SOS = {"code": "SOS", "emergency_level": "red", "emergency_type": "unsafe", "latitude": 12.97, "longitude": 77.59}
+
+
+@pytest.fixture
+def channels(monkeypatch):
+    monkeypatch.setattr(settings, "SMTP_HOST", "localhost")
+    monkeypatch.setattr(settings, "SMS_WEBHOOK_URL", "http://localhost/sms")
+    monkeypatch.setattr(settings, "PUSH_WEBHOOK_URL", "http://localhost/push")
+
+
+def seed(SessionTest):
+    db = SessionTest()
+    db.add(TrustedContact(user_id=1, name="Maa", phone="+919800000001", email="maa@example.com"))
+    db.add(TrustedContact(user_id=1, name="Dost", phone="+919800000002"))
+    db.add(Volunteer(id=7, full_name="V", email="v@example.com", password="x", latitude=12.971, longitude=77.591))
+    db.commit()
+    db.close()
+
+
+class HookSink(BaseHTTPRequestHandler):
+    """
+    SMS / push gateway stand-in: records the JSON, 400s a bad number.
+    """
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.received.append((self.path, self.headers["Idempotency-Key"], body))
+        self.send_response(400 if body["to"] == "+919800000002" else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class SMTPSink(socketserver.StreamRequestHandler):
+    """
+    Just enough SMTP for smtplib.send_message.
+    """
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.reply("220 sink")
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250 sink")
+            elif command == "DATA":
+                self.reply("354 go on")
+                data = []
+                while (line := self.rfile.readline()) != b".\r\n":
+                    data.append(line)
+                self.server.received.append(b"".join(data).decode())
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:  # MAIL FROM, RCPT TO, RSET
+                self.reply("250 ok")
+
+
+def serve(server):
+    server.received = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_alert_and_notifications_commit_together(SessionTest, channels, monkeypatch):
+    seed(SessionTest)
+    db = SessionTest()
+    alert = create_alert(db, user_id=1, **SOS)
+    rows = db.query(OutboxMessage).filter(OutboxMessage.alert_id == alert.id).all()
+    assert sorted((m.channel, m.recipient) for m in rows) == [
+        ("email", "maa@example.com"), ("push", "7"), ("sms", "+919800000001"), ("sms", "+919800000002")]
+    assert all(m.status == "pending" for m in rows)
+    db.close()
+
+    # the alert is rolled back if its notifications can't be queued
+    def broken(db, alert, volunteer_ids):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(alert_service, "queue_alert_notifications", broken)
+    db = SessionTest()
+    with pytest.raises(RuntimeError):
+        create_alert(db, user_id=2, **SOS)
+    db.rollback()
+    assert db.query(Alert).filter(Alert.user_id == 2).count() == 0
+    db.close()
+
+
+def test_relay_delivers_over_smtp_and_http(SessionTest, channels):
+    seed(SessionTest)
+    db = SessionTest()
+    create_alert(db, user_id=1, **SOS)
+    db.close()
+
+    hooks = serve(HTTPServer(("127.0.0.1", 0), HookSink))
+    smtp = serve(socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPSink))
+    base = f"http://127.0.0.1:{hooks.server_port}"
+    relay = OutboxRelay(SessionTest, {
+        "email": EmailAdapter("127.0.0.1", smtp.server_address[1], "alerts@silentshield.local"),
+        "sms": HttpAdapter("sms", f"{base}/sms"),
+        "push": HttpAdapter("push", f"{base}/push"),
+    })
+    try:
+        assert asyncio.run(relay.drain_once()) == 4
+        assert asyncio.run(relay.drain_once()) == 0
+    finally:
+        hooks.shutdown()
+        smtp.shutdown()
+        relay.executor.shutdown()
+
+    assert len(smtp.received) == 1 and "To: maa@example.com" in smtp.received[0]
+    assert sorted(path for path, _, _ in hooks.received) == ["/push", "/sms", "/sms"]
+    push = next(body for path, _, body in hooks.received if path == "/push")
+    assert push["to"] == "7" and push["type"] == "NEW_ALERT"
+    assert all(key.startswith("outbox-") for _, key, _ in hooks.received)
+
+    db = SessionTest()
+    status = {m.recipient: (m.status, m.attempts) for m in db.query(OutboxMessage)}
+    assert status["maa@example.com"] == ("sent", 1) and status["7"] == ("sent", 1)
+    assert status["+919800000002"] == ("dead", 1)  # 4xx is not retried
+    db.close()
+
+
+class Flaky(ChannelAdapter):
+    """
+    Fails every send to `down`, and the first send to everyone else.
+    """
+    name = "sms"
+
+    def __init__(self, down):
+        self.down = down
+        self.seen = set()
+
+    def send(self, message):
+        if message.recipient == self.down or message.recipient not in self.seen:
+            self.seen.add(message.recipient)
+            raise DeliveryError("gateway timeout")
+
+
+def test_failed_sends_back_off_then_dead_letter(SessionTest):
+    db = SessionTest()
+    db.add(OutboxMessage(channel="sms", recipient="a", payload="{}"))
+    db.add(OutboxMessage(channel="sms", recipient="b", payload="{}"))
+    db.commit()
+    db.close()
+
+    relay = OutboxRelay(SessionTest, {"sms": Flaky(down="a")}, max_attempts=2, backoff=0, backoff_max=0)
+    assert asyncio.run(relay.drain_once()) == 2  # both fail, retried after backoff
+    db = SessionTest()
+    assert {m.status for m in db.query(OutboxMessage)} == {"pending"}
+    db.close()
+
+    assert asyncio.run(relay.drain_once()) == 2  # a fails again -> dead; b goes through
+    db = SessionTest()
+    status = {m.recipient: (m.status, m.attempts, m.last_error) for m in db.query(OutboxMessage)}
+    assert status == {"a": ("dead", 2, "gateway timeout"), "b": ("sent", 2, None)}
+    db.close()
+    assert asyncio.run(relay.drain_once()) == 0
+    relay.executor.shutdown()
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from sqlalchemy import exc, text
+
+from app.core.database import build_engine
+from app.core.pool_metrics import PoolStats
+
+
+def hammer(engine, workers: int, hold: float):
+    """
+    Each worker holds a connection for `hold` seconds; returns timeout count.
+    """
+    timeouts = []
+
+    def work():
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                time.sleep(hold)
+        except exc.TimeoutError:
+            timeouts.append(1)
+
+    threads = [threading.Thread(target=work) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return len(timeouts)
+
+
+def test_small_pool_starves_and_burst_profile_recovers(tmp_path):
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+
+    starved = build_engine(url, "small", name="starved", pool_size=1, max_overflow=1, pool_timeout=0.1)
+    timeouts = hammer(starved, workers=6, hold=0.3)
+    stats = starved.pool.stats.snapshot(starved.pool)
+    assert timeouts > 0
+    assert stats["timeouts"] == timeouts
+    assert stats["overflow_hits"] > 0
+    assert stats["in_use"] == 0
+    starved.dispose()
+
+    healthy = build_engine(url, "burst", name="healthy")
+    assert hammer(healthy, workers=6, hold=0.3) == 0
+    stats = healthy.pool.stats.snapshot(healthy.pool)
+    assert stats["timeouts"] == 0
+    assert stats["max_in_use"] == 6
+    healthy.dispose()
+
+
+def test_counters_stay_exact_under_concurrent_checkouts():
+    stats = PoolStats("race")
+
+    def work():
+        for _ in range(20_000):
+            stats.checked_out()
+            stats.checked_in()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    snapshot = stats.snapshot()
+    assert snapshot["checkouts"] == 160_000 and snapshot["in_use"] == 0
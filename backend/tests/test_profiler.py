@@ -0,0 +1,72 @@
+import threading
+import time
+
+from fastapi import APIRouter
+
+from app.api.routes import alerts, debug
+from app.core import profiler
+from app.core.config import settings
+
+
+def spin_for_profiler(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_sees_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=spin_for_profiler, args=(stop,), name="spinner")
+    worker.start()
+    try:
+        stacks, samples = profiler.SamplingProfiler().run(0.2, interval=0.002)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert samples > 10
+    spinner = [line for line in profiler.collapsed(stacks).splitlines() if line.startswith("spinner;")]
+    assert spinner and "spin_for_profiler" in spinner[0]
+
+
+def test_x_profile_header_profiles_only_whitelisted_requests(make_client, monkeypatch, admin_headers):
+    monkeypatch.setattr(settings, "PROFILE_TOKENS", ["letmein"])
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", "s3cret")
+    client = make_client(alerts.router, debug.router)
+    assert profiler.install_profiling(client.app)
+    client.headers.update(admin_headers)
+
+    assert "x-profile-id" not in client.get("/alerts/").headers
+    assert "x-profile-id" not in client.get("/alerts/", headers={"X-Profile": "wrong"}).headers
+
+    response = client.get("/alerts/", headers={"X-Profile": "letmein"})
+    assert response.status_code == 200
+    report = client.get(f"/debug/profile/requests/{response.headers['x-profile-id']}",
+                        headers={"X-Debug-Token": "s3cret"}).text
+    # the sync endpoint ran in a worker thread and still shows up
+    assert "list_alerts" in report
+
+
+def test_only_one_request_is_profiled_at_a_time(make_client, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_TOKENS", ["letmein"])
+    started, release = threading.Event(), threading.Event()
+    router = APIRouter()
+
+    @router.get("/slow")
+    def slow():
+        started.set()
+        release.wait(5)
+        return {"ok": True}
+
+    client = make_client(router)
+    profiler.install_profiling(client.app)
+    first = []
+    worker = threading.Thread(target=lambda: first.append(client.get("/slow", headers={"X-Profile": "letmein"})))
+    worker.start()
+    assert started.wait(5)
+    try:
+        assert client.get("/slow", headers={"X-Profile": "letmein"}).status_code == 409
+    finally:
+        release.set()
+        worker.join()
+    assert first[0].status_code == 200 and "x-profile-id" in first[0].headers
+    assert "x-profile-id" in client.get("/slow", headers={"X-Profile": "letmein"}).headers
@@ -0,0 +1,131 @@
+"""
+Query-plan regression suite.
+Runs the hot alert / volunteer / location paths, captures every SELECT
+they send, EXPLAINs it and fails on a full table scan.
+Runs on SQLite; also on MySQL when TEST_MYSQL_URL is set.
+"""
+
+import os
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import alerts, location, volunteers
+from app.core.database import Base, get_db, get_read_db
+from app.core.migrations import upgrade
+from app.core.security import get_current_user, require_admin
+from app.models.volunteer import Volunteer
+
+TABLES = set(Base.metadata.tables)
+
+
+@pytest.fixture(params=["sqlite", "mysql"])
+def plan_engine(request, tmp_path):
+    if request.param == "sqlite":
+        engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}", connect_args={"check_same_thread": False})
+    else:
+        url = os.getenv("TEST_MYSQL_URL")
+        if not url:
+            pytest.skip("TEST_MYSQL_URL not set")
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE IF EXISTS schema_migrations")
+    upgrade(engine)
+    yield engine
+    engine.dispose()
+
+
+class QueryRecorder:
+    def __init__(self, engine):
+        self.engine = engine
+        self.queries = []
+        event.listen(engine, "before_cursor_execute", self.record)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            self.queries.append((statement, parameters))
+
+    def close(self):
+        event.remove(self.engine, "before_cursor_execute", self.record)
+
+
+def full_scans(engine, statement, parameters):
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            # "SCAN alerts" is a full scan; "SCAN alerts USING INDEX ..." walks an index
+            return [row[-1] for row in plan if re.fullmatch(r"SCAN (\w+)", row[-1]) and row[-1].split()[1] in TABLES]
+        plan = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().fetchall()
+        return [f"{row['table']}: type=ALL" for row in plan if row["type"] == "ALL" and row["table"] in TABLES]
+
+
+def seed(Session):
+    db = Session()
+    for i in range(20):
+        db.add(Volunteer(full_name=f"v{i}", email=f"v{i}@example.com", password="x",
+                         is_verified=i % 2 == 0, latitude=12.9 + i * 0.01, longitude=77.5))
+    db.commit()
+    db.close()
+
+
+def test_hot_queries_use_indexes(plan_engine, monkeypatch):
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=plan_engine)
+    seed(Session)
+
+    app = FastAPI()
+    for router in (alerts.router, volunteers.router, location.router):
+        app.include_router(router)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    owner = {"id": 1, "sub": "1", "role": "user"}
+    volunteer = {"id": None, "sub": "7", "role": "volunteer"}
+
+    def as_(user):
+        app.dependency_overrides[get_current_user] = lambda: user
+
+    app.dependency_overrides[require_admin] = lambda: {"sub": "1", "role": "user", "staff": "admin"}
+    monkeypatch.setattr("app.core.database.SessionLocal", Session)
+    client = TestClient(app)
+    sos = {"code": "SOS", "emergency_level": "red", "emergency_type": "unsafe", "latitude": 12.95, "longitude": 77.5}
+
+    def ok(response):
+        assert response.status_code == 200, (response.request.url, response.text)
+        return response
+
+    recorder = QueryRecorder(plan_engine)
+    try:
+        as_(owner)
+        alert = ok(client.post("/alerts/", json=sos)).json()
+        ok(client.post("/alerts/guest", json=sos))
+        ok(client.post(f"/alerts/{alert['id']}/volunteers/respond", params={"volunteer_id": 5, "action": "accept"}))
+        as_(volunteer)
+        ok(client.post(f"/volunteers/alerts/{alert['id']}/accept"))
+        as_(owner)
+        ok(client.post("/location/update", json={"alert_id": alert["id"], "latitude": 12.95, "longitude": 77.5}))
+        ok(client.get(f"/alerts/{alert['id']}/track"))
+        ok(client.get("/alerts/", params={"status": "active", "limit": 5}))
+        ok(client.get("/alerts/", params={"level": "red", "limit": 5}))
+        ok(client.post(f"/alerts/{alert['id']}/resolve"))
+    finally:
+        recorder.close()
+
+    assert recorder.queries, "no queries captured"
+    problems = {}
+    for statement, parameters in recorder.queries:
+        scans = full_scans(plan_engine, statement, parameters)
+        if scans:
+            problems[statement] = scans
+    assert not problems, "full table scans:\n" + "\n\n".join(f"{sql}\n  -> {scans}" for sql, scans in problems.items())
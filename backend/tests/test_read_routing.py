@@ -0,0 +1,72 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import auth, users
+from app.core import database
+from app.core.database import Base, ReadRouter, build_engine
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+def sqlite_engine(path, name):
+    engine = build_engine(f"sqlite:///{path}", name=name)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def add_user(engine, email):
+    with database.SessionLocal(bind=engine) as db:
+        db.add(User(full_name=email, email=email, hashed_password="x", role="USER"))
+        db.commit()
+
+
+def admin(sub):
+    token = create_access_token({"sub": sub, "role": "user", "staff": "admin"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def emails(response):
+    return [u["email"] for u in response.json()["items"]]
+
+
+def test_reads_go_to_replica_until_client_writes(tmp_path, monkeypatch):
+    primary = sqlite_engine(tmp_path / "primary.db", "primary")
+    replica = sqlite_engine(tmp_path / "replica.db", "replica0")
+    add_user(primary, "primary@example.com")
+    add_user(replica, "replica@example.com")
+
+    monkeypatch.setitem(database.SessionLocal.kw, "bind", primary)
+    monkeypatch.setattr(database, "read_router", ReadRouter(primary, [replica], sticky_seconds=60))
+
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.include_router(users.router)
+    client = TestClient(app)
+    me, other = admin("1"), admin("2")
+
+    assert emails(client.get("/users/", headers=me)) == ["replica@example.com"]
+
+    response = client.post("/auth/signup", headers=me, json={
+        "full_name": "New", "email": "new@example.com", "password": "pw", "role": "USER",
+    })
+    assert response.status_code == 200
+
+    # Our own write is visible right away, other clients still use the replica
+    assert emails(client.get("/users/", headers=me)) == ["primary@example.com", "new@example.com"]
+    assert emails(client.get("/users/", headers=other)) == ["replica@example.com"]
+
+
+def test_round_robin_skips_unhealthy_replicas(tmp_path):
+    primary = sqlite_engine(tmp_path / "primary.db", "primary")
+    a = sqlite_engine(tmp_path / "a.db", "a")
+    b = sqlite_engine(tmp_path / "b.db", "b")
+    broken = build_engine(f"sqlite:///{tmp_path / 'missing' / 'x.db'}", name="broken")
+
+    router = ReadRouter(primary, [a, b], health_interval=0)
+    assert [router.pick() for _ in range(4)] == [a, b, a, b]
+
+    router = ReadRouter(primary, [broken, a], health_interval=0)
+    assert {router.pick() for _ in range(4)} == {a}
+
+    router = ReadRouter(primary, [broken], health_interval=0)
+    assert router.pick() is primary
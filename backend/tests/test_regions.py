@@ -0,0 +1,147 @@
+import pytest
+
+from app.api.routes import heatmap
+from app.core import sharding
+from app.core.database import build_engine
+from app.core.sharding import RegionRouter
+from app.models.alert import Alert
+from app.models.alert_volunteer import AlertVolunteer
+from app.models.region_point import RegionHeatPoint, RegionVolunteer
+from app.models.report import Report
+from app.models.volunteer import Volunteer
+from app.services import region_service
+from app.services.alert_service import create_alert
+
+# tdr / tdq meet at longitude 77.34375 (west of Bengaluru), tt is Delhi
+REGIONS = {"tdr": "east", "tdq": "west", "tt": "north"}
+SOS = {"code": "SOS", "emergency_level": "red", "emergency_type": "unsafe"}
+
+
+@pytest.fixture
+def shard_engines(tmp_path):
+    return {name: build_engine(f"sqlite:///{tmp_path / f'{name}.db'}", name=f"region-{name}")
+            for name in ("east", "west", "north")}
+
+
+@pytest.fixture
+def router(shard_engines, monkeypatch):
+    router = RegionRouter(shard_engines, REGIONS, default="west")
+    router.create_tables()
+    monkeypatch.setattr(sharding, "region_router", router)
+    return router
+
+
+def rows(router, name, model):
+    with router.session(name) as shard:
+        return shard.query(model).count()
+
+
+def seed_primary(SessionTest):
+    db = SessionTest()
+    for name, lat, lng in [("west", 12.97, 77.32), ("east", 12.98, 77.37), ("delhi", 28.61, 77.21)]:
+        db.add(Volunteer(full_name=name, email=f"{name}@example.com", password="x",
+                         is_verified=True, latitude=lat, longitude=lng))
+    db.add(Volunteer(full_name="unverified", email="u@example.com", password="x",
+                     is_verified=False, latitude=12.97, longitude=77.36))
+    db.add(Report(description="dark lane", risk_level="HIGH", latitude=28.6, longitude=77.2))
+    db.add(Alert(code="SOS", emergency_level="red", emergency_type="unsafe", status="resolved", panic_level=2,
+                 latitude=28.62, longitude=77.22))
+    db.commit()
+    db.close()
+
+
+def test_router_maps_points_and_boundaries(shard_engines):
+    router = RegionRouter(shard_engines, REGIONS, default="west")
+    assert router.shard_for(12.97, 77.59) == "east"
+    assert router.shard_for(28.61, 77.21) == "north"
+    assert router.shard_for(19.07, 72.87) == "west"  # unmapped -> default
+    # 20 km around a point 1.7 km from the tdr/tdq line reaches both shards, home first
+    assert router.shards_for_radius(12.97, 77.36, 20) == ["east", "west"]
+    assert router.shards_for_radius(12.97, 78.0, 20) == ["east"]
+    assert RegionRouter({}, {}).enabled is False
+    with pytest.raises(ValueError):
+        RegionRouter(shard_engines, {"tdr": "nowhere"})
+    with pytest.raises(ValueError):
+        RegionRouter(shard_engines, {"tdra": "east"}, default="south")
+
+
+def test_matching_and_heatmap_read_covering_shards(router, SessionTest, make_client):
+    seed_primary(SessionTest)
+    db = SessionTest()
+    counts = region_service.sync_from_primary(db)
+    assert counts["east", "region_volunteers"] == 1 and counts["west", "region_volunteers"] == 1
+    assert rows(router, "north", RegionHeatPoint) == 2  # the old alert and the report
+
+    # boundary SOS: the volunteer across the line in the west shard is assigned too
+    alert = create_alert(db, user_id=None, **SOS, latitude=12.97, longitude=77.36)
+    assigned = db.query(AlertVolunteer.volunteer_id).filter(AlertVolunteer.alert_id == alert.id).all()
+    assert sorted(v for v, in assigned) == [1, 2]
+    assert rows(router, "east", RegionHeatPoint) == 1  # placed in its home shard
+    db.close()
+
+    with make_client(heatmap.router) as client:
+        near = client.get("/heatmap/?lat=12.97&lng=77.36&radius_km=20").json()
+        assert [p["level"] for p in near] == [alert.panic_level]
+        assert len(client.get("/heatmap/").json()) == 3
+
+    # a shard that can't be reached: the read falls back to the primary
+    router.engines["west"].dispose()
+    broken = build_engine("sqlite:////nonexistent/dir/west.db", name="region-west")
+    router._sessions["west"].configure(bind=broken)
+    db = SessionTest()
+    db.add(Volunteer(full_name="late", email="late@example.com", password="x",
+                     is_verified=True, latitude=12.975, longitude=77.36))  # placement half fails (west is down)
+    db.commit()
+    points = region_service.volunteer_points(db, 12.97, 77.36, 20)
+    assert sorted(p.id for p in points) == [1, 2, 5]
+    db.close()
+
+
+def test_volunteer_writes_follow_into_the_shards(router, SessionTest):
+    db = SessionTest()
+    volunteer = Volunteer(full_name="v", email="v@example.com", password="x", is_verified=False,
+                          latitude=12.98, longitude=77.37)
+    db.add(volunteer)
+    db.commit()
+    assert rows(router, "east", RegionVolunteer) == 0  # signup: not verified yet
+
+    volunteer.is_verified = True
+    db.commit()
+    assert rows(router, "east", RegionVolunteer) == 1
+
+    volunteer.longitude = 77.32  # moved across the line
+    db.commit()
+    assert (rows(router, "east", RegionVolunteer), rows(router, "west", RegionVolunteer)) == (0, 1)
+
+    volunteer.is_verified = False
+    db.commit()
+    assert rows(router, "west", RegionVolunteer) == 0
+
+    volunteer.is_verified = True
+    db.commit()
+    db.delete(volunteer)
+    db.commit()
+    assert sum(rows(router, name, RegionVolunteer) for name in router.names) == 0
+    db.close()
+
+
+def test_rebalance_moves_rows_to_their_new_shard(router, shard_engines, SessionTest, monkeypatch):
+    seed_primary(SessionTest)
+    db = SessionTest()
+    region_service.sync_from_primary(db)
+    db.close()
+
+    # Delhi gets its own shard split off "north": tt -> east (reusing a file keeps the test small)
+    monkeypatch.setattr(sharding, "region_router", RegionRouter(shard_engines, {**REGIONS, "tt": "east"}, "west"))
+    planned = region_service.rebalance(dry_run=True)
+    assert planned == {("north", "east"): 3}
+    assert rows(router, "north", RegionVolunteer) == 1
+
+    assert region_service.rebalance(batch_size=1) == planned
+    assert rows(router, "north", RegionVolunteer) + rows(router, "north", RegionHeatPoint) == 0
+    assert rows(router, "east", RegionVolunteer) == 2
+    assert region_service.rebalance() == {}
+
+    db = SessionTest()
+    assert [p.id for p in region_service.volunteer_points(db, 28.61, 77.21, 5)] == [3]
+    db.close()
@@ -0,0 +1,51 @@
+import json
+
+import msgpack
+
+from app.api.routes import heatmap, users
+from app.models.alert import Alert
+from app.models.report import Report
+from app.models.user import User
+from app.schemas.user import UserResponse
+from app.utils.response import MSGPACK_MEDIA_TYPE, RowEncoder
+
+
+def test_row_encoder_matches_schema_fields():
+    encoder = RowEncoder.for_model(UserResponse)
+    rows = [(1, "Asha", "asha@example.com", "USER", True)]
+
+    assert json.loads(encoder.json(rows)) == [
+        {"id": 1, "full_name": "Asha", "email": "asha@example.com", "role": "USER", "is_active": True}
+    ]
+
+
+def test_heatmap_and_users_use_fast_path(make_client, SessionTest, admin_headers):
+    db = SessionTest()
+    db.add(Alert(code="SOS", emergency_level="red", emergency_type="unsafe", panic_level=3,
+                 latitude=12.97, longitude=77.59))
+    db.add(Report(description="suspicious", risk_level="MEDIUM", latitude=12.98, longitude=77.6))
+    db.add(User(full_name="Asha", email="asha@example.com", hashed_password="x", role="USER"))
+    db.commit()
+    db.close()
+
+    client = make_client(heatmap.router, users.router)
+
+    assert client.get("/heatmap/").json() == [
+        {"lat": 12.97, "lon": 77.59, "level": 3},
+        {"lat": 12.98, "lon": 77.6, "level": "MEDIUM"},
+    ]
+    assert client.get("/users/", headers=admin_headers).json()["items"][0]["email"] == "asha@example.com"
+
+
+def test_heatmap_msgpack_round_trip(make_client, SessionTest):
+    db = SessionTest()
+    db.add(Alert(code="SOS", emergency_level="red", emergency_type="unsafe", panic_level=3,
+                 latitude=12.97, longitude=77.59))
+    db.commit()
+    db.close()
+
+    client = make_client(heatmap.router)
+    response = client.get("/heatmap/", headers={"Accept": MSGPACK_MEDIA_TYPE})
+
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert msgpack.unpackb(response.content) == [{"lat": 12.97, "lon": 77.59, "level": 3}]
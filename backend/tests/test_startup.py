@@ -0,0 +1,55 @@
+import subprocess
+import sys
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.config import Settings
+from app.main import create_app
+
+
+def test_ready_answers_503_until_warm_up_is_done(SessionTest, monkeypatch):
+    # startup / shutdown hooks (outbox, track writer) use the test database
+    monkeypatch.setattr("app.main.SessionLocal", SessionTest)
+    app = create_app(Settings(WARMUP_ENABLED=False))
+    release = threading.Event()
+    app.state.warmup.add("slow", lambda: release.wait(5))
+    app.state.warmup.add("broken", lambda: 1 / 0)
+
+    with TestClient(app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+
+        release.set()
+        for _ in range(100):
+            response = client.get("/ready")
+            if response.status_code == 200:
+                break
+            time.sleep(0.02)
+        assert response.status_code == 200
+        steps = response.json()["steps"]
+        assert steps["slow"]["ms"] is not None and steps["slow"]["error"] is None
+        # a failing step is reported, it doesn't keep the worker out of rotation
+        assert steps["broken"]["error"].startswith("ZeroDivisionError")
+
+
+def test_importing_the_app_defers_heavy_libraries():
+    code = "import sys, app.main; print(sorted({'passlib', 'jose', 'requests'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
+
+
+def test_settings_passed_to_create_app_reach_the_app(monkeypatch, SessionTest):
+    monkeypatch.setattr("app.main.SessionLocal", SessionTest)
+    client = TestClient(create_app(Settings(WARMUP_ENABLED=False, DEBUG_TOKEN="s3cret")))
+    assert client.get("/debug/traces", headers={"X-Debug-Token": "s3cret"}).status_code == 200
+    assert client.get("/debug/traces", headers={"X-Debug-Token": "nope"}).status_code == 403
+
+
+def test_module_app_is_only_built_when_asked_for():
+    # uvicorn --factory calls create_app() itself and never touches app.main.app
+    code = "import app.main; print('app' in vars(app.main)); app.main.app; print('app' in vars(app.main))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["False", "True"]
@@ -0,0 +1,102 @@
+from app.api.routes import socket, subscriptions
+from app.core.security import create_access_token
+from app.models.volunteer import Volunteer
+from app.services import subscription_service
+from app.services.alert_service import create_alert
+from app.services.notifications_service import alert_payload, notify_new_alert
+from app.utils.spatial_index import GridIndex
+
+SOS = {"code": "SOS", "emergency_level": "green", "emergency_type": "unsafe"}
+
+
+def auth(role, sub):
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(sub), 'role': role})}"}
+
+
+def test_grid_index_files_regions_by_size():
+    grid = GridIndex()
+    grid.insert("city", 12.8, 13.1, 77.4, 77.8)
+    grid.insert("campus", 12.93, 12.94, 77.53, 77.54)
+    grid.insert("far", 28.5, 28.7, 77.1, 77.3)
+    assert sorted(grid.candidates(12.935, 77.535)) == ["campus", "city"]
+    assert grid.candidates(12.95, 77.7) == ["city"]
+    assert grid.remove("campus", 12.93, 12.94, 77.53, 77.54)
+    assert grid.candidates(12.935, 77.535) == ["city"]
+
+
+def test_new_alert_reaches_area_subscribers(make_client, SessionTest):
+    db = SessionTest()
+    db.add_all([Volunteer(id=7, full_name="v7", email="v7@example.com", password="x", is_verified=True),
+                Volunteer(id=8, full_name="v8", email="v8@example.com", password="x", is_verified=False)])
+    db.commit()
+    db.close()
+
+    with make_client(subscriptions.router, socket.router) as client:
+        # exact SOS locations are for verified volunteers only
+        assert client.post("/subscriptions/", headers=auth("volunteer", 8),
+                           json={"center_lat": 12.97, "center_lng": 77.59, "radius_km": 2}).status_code == 403
+        home = client.post("/subscriptions/", headers=auth("volunteer", 7),
+                           json={"name": "home", "center_lat": 12.97, "center_lng": 77.59, "radius_km": 2})
+        assert home.status_code == 200 and home.json()["shape"] == "circle"
+        campus = client.post("/subscriptions/", headers=auth("user", 3), json={
+            "name": "campus", "polygon": [[12.96, 77.58], [12.96, 77.60], [12.98, 77.60], [12.98, 77.58]]})
+        assert campus.status_code == 200
+        client.post("/subscriptions/", headers=auth("user", 4),
+                    json={"center_lat": 28.6, "center_lng": 77.2, "radius_km": 5})  # Delhi
+        assert client.post("/subscriptions/", headers=auth("user", 4),
+                           json={"center_lat": 28.6, "center_lng": 77.2, "radius_km": 500}).status_code == 400
+        dropped = client.post("/subscriptions/", headers=auth("user", 5),
+                              json={"center_lat": 12.97, "center_lng": 77.59, "radius_km": 3}).json()
+        assert client.delete(f"/subscriptions/{dropped['id']}", headers=auth("user", 4)).status_code == 404
+        assert client.delete(f"/subscriptions/{dropped['id']}", headers=auth("user", 5)).status_code == 200
+        assert [s["name"] for s in client.get("/subscriptions/", headers=auth("user", 3)).json()] == ["campus"]
+
+        calls = []
+        db = SessionTest()
+        alert = create_alert(db, user_id=None, notify=lambda *args: calls.append(args),
+                             latitude=12.975, longitude=77.595, **SOS)
+        db.close()
+        (_, volunteer_ids, watchers), = calls
+        assert watchers == {("volunteer", 7): [home.json()["id"]], ("user", 3): [campus.json()["id"]]}
+
+        with client.websocket_connect("/ws/volunteer/7", headers=auth("volunteer", 7)) as ws, \
+                client.websocket_connect("/ws/user/3", headers=auth("user", 3)) as user_ws:
+            client.portal.call(notify_new_alert, alert_payload(alert), volunteer_ids, None, watchers)
+            message = ws.receive_json()
+            assert message["type"] == "AREA_ALERT" and message["alert_id"] == alert.id
+            assert (message["latitude"], message["longitude"]) == (12.975, 77.595)
+            # plain users only learn roughly where it is
+            message = user_ws.receive_json()
+            assert message["type"] == "AREA_ALERT" and message["approximate"] is True
+            assert (message["latitude"], message["longitude"]) == (round(12.975, 2), round(77.595, 2))
+
+        # outside every area: no match
+        db = SessionTest()
+        assert subscription_service.area_watchers(db, alert.__class__(id=0, latitude=13.5, longitude=77.59)) == {}
+        db.close()
+
+
+def test_subscriptions_committed_out_of_id_order_are_indexed(SessionTest, monkeypatch):
+    from datetime import datetime, timedelta
+    from app.models.area_subscription import AreaSubscription
+
+    monkeypatch.setattr(subscription_service, "SWEEP_EVERY", timedelta(0))  # sweep on every refresh
+
+    def add(sub_id, created_at):
+        db = SessionTest()
+        db.add(AreaSubscription(id=sub_id, owner_role="user", owner_id=sub_id, created_at=created_at,
+                                **subscription_service.shape_fields(center_lat=12.97, center_lng=77.59, radius_km=2)))
+        db.commit()
+        db.close()
+
+    index = subscription_service.SubscriptionIndex()
+    db = SessionTest()
+    now = datetime.utcnow()
+    add(5, now)
+    assert index.refresh(db) == 1
+    # a transaction that got id 3 earlier commits only now
+    add(3, now - timedelta(seconds=30))
+    assert index.refresh(db) == 1
+    assert index.refresh(db) == 0  # the sweep doesn't add rows twice
+    assert sorted(row.id for row in index.match(db, 12.97, 77.59)) == [3, 5]
+    db.close()
@@ -0,0 +1,58 @@
+from app.api.routes import alerts, debug, socket
+from app.core import tracing
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.middlewares.metrics_middleware import MetricsMiddleware
+from app.models.volunteer import Volunteer
+
+SOS = {"code": "SOS", "emergency_level": "red", "emergency_type": "unsafe", "latitude": 12.97, "longitude": 77.59}
+
+
+def test_sos_trace_runs_from_post_to_volunteer_ack(make_client, SessionTest, monkeypatch):
+    db = SessionTest()
+    db.add(Volunteer(full_name="v", email="v@example.com", password="x", is_verified=True, latitude=12.971, longitude=77.59))
+    db.commit()
+    volunteer_id = db.query(Volunteer.id).scalar()
+    db.close()
+    tracing.clear()
+    token = create_access_token({"sub": str(volunteer_id), "role": "volunteer"})
+
+    with make_client(alerts.router, socket.router, debug.router, middlewares=[(MetricsMiddleware, {})]) as client:
+        with client.websocket_connect(f"/ws/volunteer/{volunteer_id}?token={token}") as ws:
+            assert client.post("/alerts/guest", json=SOS).status_code == 200
+            message = ws.receive_json()
+            assert message["type"] == "NEW_ALERT"
+            ws.send_json({"type": "ACK", "trace": message["trace"]})
+            ws.close()
+
+        # hidden until a token is configured
+        assert client.get("/debug/traces").status_code == 404
+        monkeypatch.setattr(settings, "DEBUG_TOKEN", "s3cret")
+        assert client.get("/debug/traces", headers={"X-Debug-Token": "nope"}).status_code == 403
+        traces = client.get("/debug/traces", headers={"X-Debug-Token": "s3cret"}).json()["traces"]
+
+    trace = next(t for t in traces if t["root"] == "alerts.guest_alert")
+    assert trace["acked"]
+    names = [s["name"] for s in trace["spans"]]
+    for name in ["alerts.guest_alert", "create_alert", "db.commit", "assign_volunteers",
+                 "alert.notify", "ws.send_to_volunteer", "volunteer.ack"]:
+        assert name in names
+
+    # one connected tree
+    ids = {s["span_id"] for s in trace["spans"]}
+    assert [s["name"] for s in trace["spans"] if s["parent_id"] not in ids] == ["alerts.guest_alert"]
+
+
+def test_otlp_file_exporter_writes_resource_spans(tmp_path):
+    exporter = tracing.OTLPFileExporter(str(tmp_path / "spans.jsonl"))
+    with tracing.span("root", level="red") as root:
+        child = tracing.start_span("child", attempt=2)
+        child.end()
+    exporter.write([root, child])
+
+    import json
+    payload = json.loads((tmp_path / "spans.jsonl").read_text())
+    spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+    assert spans[0]["attributes"] == [{"key": "level", "value": {"stringValue": "red"}}]
+    assert spans[1]["attributes"] == [{"key": "attempt", "value": {"intValue": "2"}}]
@@ -0,0 +1,178 @@
+import json
+import math
+from datetime import datetime, timedelta
+
+from app.api.routes import alerts, location
+from app.core.security import create_access_token
+from app.models.alert import Alert
+from app.models.alert_volunteer import AlertVolunteer
+from app.models.alert_track import AlertTrack
+from app.models.live_location import LiveLocation
+from app.services import track_service
+from app.services.track_service import epoch_ms
+from app.utils import polyline
+
+
+def auth(role, sub):
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(sub), 'role': role})}"}
+
+
+def walk(start_ms, count, step_ms=1000):
+    """
+    A walk east along a street, then a loop around a block.
+    """
+    points = []
+    for i in range(count):
+        if i < count // 2:
+            lat, lng = 12.97, 77.59 + i * 1e-5
+        else:
+            angle = (i - count // 2) / (count - count // 2) * 2 * math.pi
+            lat, lng = 12.97 + 0.001 * math.sin(angle), 77.59 + count // 2 * 1e-5 + 0.001 * (1 - math.cos(angle))
+        points.append((round(lat, 5), round(lng, 5), start_ms + i * step_ms))
+    return points
+
+
+def test_simplify_and_polyline_round_trip():
+    points = walk(1_700_000_000_000, 600)
+    kept = polyline.simplify(points, tolerance=5)
+    assert kept[0] == points[0] and kept[-1] == points[-1]
+    assert len(kept) < len(points) / 5  # the straight half collapses to its ends
+    assert polyline.simplify(points, 0) == points
+
+    text = polyline.encode(points)
+    assert len(text) < 8 * len(points)
+    assert polyline.decode(text) == points
+    # chunks continue each other's deltas
+    first, rest = polyline.encode(points[:100]), polyline.encode(points[100:], previous=points[99])
+    assert polyline.decode(rest, previous=points[99]) == points[100:]
+    assert first + rest == text
+
+
+def test_track_reads_follow_it_across_tiers(SessionTest, tmp_path):
+    track_service.writer.take()  # points other tests published
+    db = SessionTest()
+    db.add(Alert(id=1, user_id=10, code="SOS", emergency_level="red", emergency_type="unsafe",
+                 status="active", latitude=12.97, longitude=77.59))
+    db.commit()
+
+    start = epoch_ms(datetime.utcnow() - timedelta(days=10))
+    user, volunteer = walk(start, 400), walk(start + 500, 300)
+    track_service.writer.record(1, "user", user)
+    track_service.writer.record(1, "volunteer", volunteer)
+    track_service.TrackWriter.write(SessionTest, track_service.writer.take())
+
+    hot = track_service.read_track(db, 1)
+    assert hot.tier == "hot" and hot.user == user and hot.volunteer == volunteer
+    assert track_service.read_track(db, 1, since_ms=user[349][2]).user == user[350:]
+
+    # still active: nothing to compact yet
+    assert track_service.compact_closed(SessionTest) == 0
+    db.query(Alert).filter(Alert.id == 1).update({"status": "resolved"})
+    db.commit()
+    assert track_service.compact_closed(SessionTest) == 1
+    assert track_service.compact_closed(SessionTest) == 0
+    assert track_service.read_track(db, 1).tier == "hot"  # raw rows win until archived
+
+    assert track_service.archive_expired(SessionTest, root=str(tmp_path)) == 1
+    assert db.query(LiveLocation).count() == 0
+    row = db.get(AlertTrack, 1)
+    assert row.raw_points == 700 and row.kept_points < 150
+    assert (tmp_path / row.archive_path).exists()
+
+    compacted = track_service.read_track(db, 1)
+    assert compacted.tier == "compacted"
+    assert compacted.user[0] == user[0] and compacted.user[-1] == user[-1]
+    archived = track_service.read_track(db, 1, raw=True, root=str(tmp_path))
+    assert archived.tier == "archive" and archived.user == user and archived.volunteer == volunteer
+    db.close()
+
+
+def read_stream(response):
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    header, chunks, done = lines[0], lines[1:-1], lines[-1]
+    tracks = {"user": [], "volunteer": []}
+    for chunk in chunks:
+        points = tracks[chunk["track"]]
+        points += polyline.decode(chunk["polyline"], previous=points[-1] if points else None)
+    return header, tracks, done
+
+
+def test_track_endpoint_streams_polyline_chunks(make_client, SessionTest):
+    track_service.writer.take()
+    db = SessionTest()
+    db.add(Alert(id=1, user_id=10, code="SOS", emergency_level="red", emergency_type="unsafe",
+                 status="active", latitude=12.97, longitude=77.59))
+    db.add(AlertVolunteer(alert_id=1, volunteer_id=7, status="accept"))
+    db.commit()
+    db.close()
+    user = walk(1_700_000_000_000, 1200)
+    track_service.writer.record(1, "user", user[:1000])
+    track_service.writer.record(1, "volunteer", walk(1_700_000_000_500, 300))
+    track_service.TrackWriter.write(SessionTest, track_service.writer.take())
+
+    with make_client(alerts.router) as client:
+        response = client.get("/alerts/1/track?chunk=400", headers=auth("volunteer", 7))
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        header, tracks, done = read_stream(response)
+        assert header["tier"] == "hot"
+        assert [(round(lat, 5), round(lng, 5), ts) for lat, lng, ts in tracks["user"]] == user[:1000]
+        assert len(tracks["volunteer"]) == 300 and done["until"] == user[999][2]
+
+        simplified = read_stream(client.get("/alerts/1/track?tolerance=5", headers=auth("user", 10)))[1]
+        assert len(simplified["user"]) < 200
+
+        # incremental poll: only what arrived after `until`
+        track_service.writer.record(1, "user", user[1000:])
+        track_service.TrackWriter.write(SessionTest, track_service.writer.take())
+        _, tracks, done = read_stream(client.get(f"/alerts/1/track?since={done['until']}", headers=auth("user", 10)))
+        assert len(tracks["user"]) == 200 and tracks["volunteer"] == [] and done["until"] == user[-1][2]
+
+        assert client.get("/alerts/1/track", headers=auth("user", 11)).status_code == 403
+        assert client.get("/alerts/2/track", headers=auth("user", 10)).status_code == 404
+
+
+def test_location_update_checks_the_alert_and_bad_rows_cost_only_their_alert(make_client, SessionTest, db_engine):
+    track_service.writer.take()
+    db = SessionTest()
+    db.add(Alert(id=1, user_id=10, code="SOS", emergency_level="red", emergency_type="unsafe",
+                 status="active", latitude=12.97, longitude=77.59))
+    db.add(Alert(id=2, user_id=10, code="SOS", emergency_level="red", emergency_type="unsafe",
+                 status="resolved", latitude=12.97, longitude=77.59))
+    db.commit()
+
+    client = make_client(location.router)
+    client.headers.update(auth("user", 10))
+    point = {"latitude": 12.971, "longitude": 77.591}
+    assert client.post("/location/update", json={"alert_id": 1, **point}).status_code == 200
+    assert client.post("/location/update", json={"alert_id": 2, **point}).status_code == 404
+    assert client.post("/location/update", json={"alert_id": 99, **point}).status_code == 404
+    assert client.post("/location/update", json={"alert_id": 1}).status_code == 422
+    assert [row["alert_id"] for row in track_service.writer.rows] == [1]
+
+    # a row the database rejects (no such alert) only drops its own alert's points
+    with db_engine.connect() as conn:
+        conn.exec_driver_sql("CREATE TRIGGER reject_99 BEFORE INSERT ON live_locations "
+                             "WHEN NEW.alert_id = 99 BEGIN SELECT RAISE(ABORT, 'no such alert'); END")
+        conn.commit()
+    start = epoch_ms(datetime.utcnow())
+    track_service.writer.record(99, "user", walk(start, 5))
+    track_service.TrackWriter.write(SessionTest, track_service.writer.take())
+    assert [alert_id for alert_id, in db.query(LiveLocation.alert_id)] == [1]
+    db.close()
+
+
+def test_only_the_alert_owner_posts_its_location(make_client, SessionTest):
+    track_service.writer.take()
+    db = SessionTest()
+    db.add(Alert(id=1, user_id=10, code="SOS", emergency_level="red", emergency_type="unsafe",
+                 status="active", latitude=12.97, longitude=77.59))
+    db.commit()
+    db.close()
+
+    client = make_client(location.router)
+    update = {"alert_id": 1, "latitude": 12.971, "longitude": 77.591}
+    assert client.post("/location/update", json=update).status_code in (401, 403)
+    assert client.post("/location/update", json=update, headers=auth("user", 11)).status_code == 403
+    assert client.post("/location/update", json=update, headers=auth("volunteer", 10)).status_code == 403
+    assert track_service.writer.rows == []
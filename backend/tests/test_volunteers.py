@@ -0,0 +1,148 @@
+import io
+
+import pytest
+
+from app.api.routes import volunteers, blobs
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.middlewares.upload_limit import UploadLimitMiddleware
+from app.models.stored_blob import StoredBlob
+from app.models.volunteer import Volunteer
+from app.services.blob_store import blob_path
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 1024
+
+
+@pytest.fixture(autouse=True)
+def blob_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BLOB_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setattr(volunteers, "schedule_id_photo_processing", lambda path, digest: None)
+    return tmp_path / "blobs"
+
+
+def stored_files(blob_dir):
+    return [p for p in blob_dir.rglob("*") if p.is_file()]
+
+
+def signup(client, email="v@example.com", photo=PNG_BYTES):
+    return client.post(
+        "/volunteers/signup",
+        data={
+            "full_name": "Test Volunteer",
+            "email": email,
+            "password": "secret",
+            "phone": "9999999999",
+            "city": "Bengaluru",
+        },
+        files={"id_photo": ("id.png", io.BytesIO(photo), "image/png")},
+    )
+
+
+def test_signup_stores_photo_by_content_hash(make_client, SessionTest, blob_dir):
+    client = make_client(volunteers.router)
+
+    assert signup(client, "a@example.com").status_code == 200
+    assert signup(client, "b@example.com").status_code == 200
+
+    db = SessionTest()
+    a, b = db.query(Volunteer).order_by(Volunteer.id).all()
+    assert a.id_photo == b.id_photo
+    with open(blob_path(a.id_photo), "rb") as f:
+        assert f.read() == PNG_BYTES
+    assert db.get(StoredBlob, a.id_photo).ref_count == 2
+    db.close()
+
+    # Same bytes uploaded twice -> one file on disk
+    assert len(stored_files(blob_dir)) == 1
+
+
+def test_signup_rejects_non_image(make_client, blob_dir):
+    client = make_client(volunteers.router)
+
+    assert signup(client, photo=b"not an image").status_code == 415
+    assert stored_files(blob_dir) == []
+
+
+def test_oversized_upload_rejected_before_parsing(make_client, blob_dir):
+    client = make_client(
+        volunteers.router,
+        middlewares=[(UploadLimitMiddleware, {"paths": ["/volunteers/signup"], "max_bytes": 4096})],
+    )
+
+    assert signup(client, photo=PNG_BYTES * 8).status_code == 413
+    assert stored_files(blob_dir) == []
+
+
+def test_blob_serving_supports_etag_and_range(make_client, SessionTest):
+    client = make_client(volunteers.router, blobs.router)
+    signup(client)
+    signup(client, "other@example.com", photo=PNG_BYTES + b"other")
+
+    db = SessionTest()
+    volunteer_id, digest = db.query(Volunteer.id, Volunteer.id_photo).order_by(Volunteer.id).first()
+    db.close()
+
+    # only the photo's volunteer and staff may fetch it; a missing blob is 404 even with a matching tag
+    for user in ({"sub": "1", "role": "user"}, {"sub": str(volunteer_id + 1), "role": "volunteer"}):
+        client.app.dependency_overrides[get_current_user] = lambda: user
+        assert client.get(f"/blobs/{digest}").status_code == 403
+    client.app.dependency_overrides[get_current_user] = lambda: {"sub": "1", "role": "user", "staff": "analyst"}
+    assert client.get(f"/blobs/{digest}").status_code == 200
+    missing = "0" * 64
+    assert client.get(f"/blobs/{missing}", headers={"If-None-Match": f'"{missing}"'}).status_code == 404
+
+    client.app.dependency_overrides[get_current_user] = lambda: {"sub": str(volunteer_id), "role": "volunteer"}
+
+    response = client.get(f"/blobs/{digest}")
+    assert response.status_code == 200
+    assert response.content == PNG_BYTES
+    assert response.headers["etag"] == f'"{digest}"'
+    assert "immutable" in response.headers["cache-control"]
+
+    response = client.get(f"/blobs/{digest}", headers={"If-None-Match": f'"{digest}"'})
+    assert response.status_code == 304
+
+    response = client.get(f"/blobs/{digest}", headers={"Range": "bytes=0-7"})
+    assert response.status_code == 206
+    assert response.content == PNG_BYTES[:8]
+
+
+def test_failed_insert_leaves_no_blob_and_deletes_release_it(make_client, SessionTest, blob_dir, monkeypatch):
+    client = make_client(volunteers.router)
+    assert signup(client, "a@example.com").status_code == 200
+    assert signup(client, "b@example.com").status_code == 200
+
+    # duplicate email slipping past the pre-check: the commit fails
+    monkeypatch.setattr(volunteers, "_volunteer_exists", lambda db, email: False)
+    with pytest.raises(Exception):
+        signup(client, "a@example.com", photo=PNG_BYTES + b"other")
+    assert len(stored_files(blob_dir)) == 1  # neither the staged copy nor a new blob is left
+
+    db = SessionTest()
+    a, b = db.query(Volunteer).order_by(Volunteer.id).all()
+    digest = a.id_photo
+    db.delete(a)
+    db.commit()
+    assert db.get(StoredBlob, digest).ref_count == 1
+    assert len(stored_files(blob_dir)) == 1
+
+    b.id_photo = None
+    db.commit()
+    assert db.get(StoredBlob, digest) is None
+    assert stored_files(blob_dir) == []
+    db.close()
+
+
+def test_failed_file_move_undoes_the_signup(make_client, SessionTest, blob_dir, monkeypatch):
+    def disk_full(staged_path, digest):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(volunteers, "place_file", disk_full)
+    client = make_client(volunteers.router)
+    assert signup(client).status_code == 500
+
+    db = SessionTest()
+    assert db.query(Volunteer).count() == 0
+    assert db.query(StoredBlob).count() == 0
+    db.close()
+    assert stored_files(blob_dir) == []
@@ -0,0 +1,71 @@
+import pytest
+
+from app.api.routes import socket
+from app.core.security import create_access_token
+from app.models.alert import Alert
+from app.models.alert_volunteer import AlertVolunteer
+from app.utils import wire
+
+
+def token(role, sub):
+    return create_access_token({"sub": str(sub), "role": role})
+
+
+def test_location_frames_round_trip():
+    points = [(12.971599, 77.594566, 1_700_000_000_000), (12.9717, 77.5946, 1_700_000_000_250),
+              (-33.8688, 151.2093, 1_700_000_065_785)]
+    frame = wire.encode_locations(42, 7, points)
+    assert len(frame) == wire.HEADER.size + 3 * wire.POINT.size == 50
+
+    alert_id, seq, decoded = wire.decode_locations(frame)
+    assert (alert_id, seq) == (42, 7)
+    assert [ts for _, _, ts in decoded] == [ts for _, _, ts in points]
+    for (lat, lng, _), (dlat, dlng, _) in zip(points, decoded):
+        assert abs(lat - dlat) < 1e-6 and abs(lng - dlng) < 1e-6
+
+    with pytest.raises(ValueError):
+        wire.decode_locations(frame[:-1])
+    with pytest.raises(ValueError):
+        wire.encode_locations(42, 0, [(0, 0, 1000), (0, 0, 1000 + wire.MAX_GAP_MS + 1)])
+
+
+def test_binary_location_negotiated_per_connection(make_client, SessionTest):
+    db = SessionTest()
+    db.add(Alert(id=1, user_id=10, code="SOS", emergency_level="red", emergency_type="unsafe",
+                 status="active", latitude=12.97, longitude=77.59))
+    db.add(AlertVolunteer(alert_id=1, volunteer_id=7, status="accept"))
+    db.add(AlertVolunteer(alert_id=1, volunteer_id=8, status="accept"))
+    db.commit()
+    db.close()
+
+    with make_client(socket.router) as client:
+        with client.websocket_connect(f"/ws?token={token('user', 10)}", subprotocols=[wire.SUBPROTOCOL]) as owner, \
+                client.websocket_connect(f"/ws?token={token('volunteer', 7)}",
+                                         subprotocols=[wire.SUBPROTOCOL]) as binary, \
+                client.websocket_connect(f"/ws?token={token('volunteer', 8)}") as plain:
+            assert binary.accepted_subprotocol == wire.SUBPROTOCOL
+            assert plain.accepted_subprotocol is None
+            for ws in (owner, binary, plain):
+                ws.send_json({"op": "subscribe", "topic": "alert:1"})
+                assert ws.receive_json()["op"] == "subscribed"
+
+            # the owner uploads a batch of three points in one binary frame
+            points = [(12.9701, 77.5901, 1000), (12.9702, 77.5902, 2000), (12.9703, 77.5903, 3000)]
+            owner.send_bytes(wire.encode_locations(1, 0, points))
+
+            alert_id, seq, received = wire.decode_locations(binary.receive_bytes())
+            assert (alert_id, len(received)) == (1, 3)
+
+            fallback = plain.receive_json()["data"]
+            assert fallback["type"] == "LIVE_LOCATION"
+            assert (fallback["latitude"], fallback["longitude"], fallback["ts"]) == points[-1]
+            assert len(fallback["points"]) == 3
+
+            # the next update continues the alert's sequence
+            owner.send_json({"op": "location", "alert_id": 1, "latitude": 12.9704, "longitude": 77.5904})
+            assert wire.decode_locations(binary.receive_bytes())[1] == seq + 3
+            assert plain.receive_json()["data"]["seq"] == seq + 3
+
+            # binary needs the subprotocol
+            plain.send_bytes(wire.encode_locations(1, 0, points))
+            assert plain.receive_json()["op"] == "error"